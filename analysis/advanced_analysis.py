@@ -1,6 +1,10 @@
 import numpy as np
 import logging
+from collections import Counter
 from itertools import combinations
+from analysis.bo_engine import compute_bo_scores_matrix
+from analysis.jaccard import compute_jaccard_matrix, DEFAULT_NUM_PERM
+from analysis.similarity import compute_similarity_matrix, DEFAULT_SMOOTHING
 
 ##############################################################################
 # Debug helper and toggle for debug messages
@@ -22,9 +26,14 @@ class OverlapAnalyzer:
       analyzer = OverlapAnalyzer(file_reports)
       analyzer.compute_bo_scores()  # aggregates final results
       bon1_dict, bon2_dict = analyzer.get_bo_scores()
+
+    With streaming=True the per-(word, T1, T2) entries are never stored:
+    contributions are summed into per-word arrays as each pair is processed,
+    so memory stays O(vocabulary). Use explain_word(word) to recompute a
+    single word's pairwise contributions on demand.
     """
 
-    def __init__(self, file_reports):
+    def __init__(self, file_reports, streaming=False):
         """
         file_reports (dict):
           {
@@ -38,6 +47,7 @@ class OverlapAnalyzer:
           }
         """
         self.file_reports = file_reports
+        self.streaming = streaming
 
         # For text-based intersection logic:
         self.word_sets = {}  # text_key -> set of words (excl. Master)
@@ -45,7 +55,14 @@ class OverlapAnalyzer:
         # For BO computations:
         self.word_counts = {}   # text_key -> {word: count}
         self.total_words = {}   # text_key -> sum of counts
+        self.word_freqs = {}    # text_key -> {word: count / total}
+        self.mean_freqs = {}    # text_key -> mean relative frequency
         self.pairwise_pw = {}   # (word, T1, T2) -> { "PW":..., "BOn1":..., "BOn2":... }
+
+        # Streaming accumulators: word -> slot in the per-word arrays
+        self.word_index = {}
+        self.bon1_totals = []
+        self.bon2_totals = []
         self.summed_pw_bon1 = {}  # final {word -> BO Score (BOn1)}
         self.summed_pw_bon2 = {}  # final {word -> BO Score (BOn2)}
 
@@ -72,63 +89,93 @@ class OverlapAnalyzer:
 
         debug(f" -> Built word_sets for {len(self.word_sets)} texts (excluding Master).")
 
+    def document_frequencies(self):
+        """
+        Number of texts (excl. Master) containing each word: {word: df}.
+        One pass over the word sets, O(total postings).
+        """
+        if not self.word_sets:
+            self.create_word_sets_excluding_master()
+        doc_freqs = Counter()
+        for wordset in self.word_sets.values():
+            doc_freqs.update(wordset)
+        debug(f" -> document_frequencies over {len(self.word_sets)} texts: {len(doc_freqs)} words.")
+        return doc_freqs
+
+    def iter_pairwise_intersections(self):
+        """
+        Yield (text1, text2, set_of_shared_words) for all pairs of actual
+        texts, one pair at a time. Words found in a single text can never be
+        shared, so each word set is first cut down to the words with df >= 2.
+        """
+        doc_freqs = self.document_frequencies()
+        shared_sets = {
+            text: {w for w in wordset if doc_freqs[w] >= 2}
+            for text, wordset in self.word_sets.items()
+        }
+        for T1, T2 in combinations(list(shared_sets.keys()), 2):
+            yield T1, T2, shared_sets[T1] & shared_sets[T2]
+
     def generate_pairwise_intersections(self):
         """
         Create intersection sets for all pairs of actual texts.
         Returns: dict { (text1, text2): set_of_shared_words }
+
+        This holds N*(N-1)/2 sets; the assurance metrics do not need it.
         """
         debug("generate_pairwise_intersections() invoked.")
         pairwise_intersections = {}
-        text_keys = list(self.word_sets.keys())  # no Master
-
-        for T1, T2 in combinations(text_keys, 2):
-            intersection = self.word_sets[T1] & self.word_sets[T2]
+        for T1, T2, intersection in self.iter_pairwise_intersections():
             pairwise_intersections[(T1, T2)] = intersection
             debug(f"   -> Intersection of '{T1}' and '{T2}' has {len(intersection)} words.")
 
         debug(f" -> Generated {len(pairwise_intersections)} pairwise intersections.")
         return pairwise_intersections
 
-    def calculate_total_intersection_words(self, pairwise_intersections):
+    def calculate_total_intersection_words(self, pairwise_intersections=None):
         """
-        Given the dictionary of intersections, find how many unique
-        words appear in *any* intersection across all text pairs.
+        How many unique words appear in *any* intersection across all text
+        pairs. Without pairwise_intersections this is the number of words
+        with df >= 2.
         """
         debug("calculate_total_intersection_words() invoked.")
-        all_intersection_words = set()
-        for inter_set in pairwise_intersections.values():
-            all_intersection_words.update(inter_set)
-
-        result = len(all_intersection_words)
+        if pairwise_intersections is None:
+            result = sum(1 for df in self.document_frequencies().values() if df >= 2)
+        else:
+            all_intersection_words = set()
+            for inter_set in pairwise_intersections.values():
+                all_intersection_words.update(inter_set)
+            result = len(all_intersection_words)
         debug(f" -> total_intersection_words = {result}")
         return result
 
-    def calculate_assurance_metrics(self, pairwise_intersections):
+    def calculate_assurance_metrics(self, pairwise_intersections=None):
         """
         Checks that the total unique words across all texts is
         the sum of intersection words + unique-to-single-text words.
 
+        Everything is read off one document-frequency vector: a word is in
+        some pairwise intersection iff df >= 2 and unique to a single text
+        iff df == 1, so the check is O(total postings) rather than O(N^2 * V).
+        The total is taken independently, from the union of the word sets.
+        Passing pairwise_intersections counts intersection words from those
+        sets instead (the former, quadratic behavior).
+
         Returns a dictionary with details.
         """
         debug("calculate_assurance_metrics() invoked.")
-        # union of all intersection sets
-        all_intersection_words = set()
-        for inter_set in pairwise_intersections.values():
-            all_intersection_words.update(inter_set)
-        total_intersection_words = len(all_intersection_words)
+        doc_freqs = self.document_frequencies()
+        if pairwise_intersections is None:
+            total_intersection_words = sum(1 for df in doc_freqs.values() if df >= 2)
+        else:
+            total_intersection_words = self.calculate_total_intersection_words(pairwise_intersections)
 
         # words unique to a single text
-        unique_to_single_text = set()
-        for text, wordset in self.word_sets.items():
-            other_texts = set(self.word_sets.keys()) - {text}
-            combined_others = set.union(*(self.word_sets[o] for o in other_texts)) if other_texts else set()
-            # difference => words that appear in text but not in any other
-            unique_to_single_text.update(wordset - combined_others)
-        total_unique_to_single_text = len(unique_to_single_text)
+        total_unique_to_single_text = sum(1 for df in doc_freqs.values() if df == 1)
 
         # total unique across all actual texts
         if self.word_sets:
-            total_unique_words_in_corpus = len(set.union(*self.word_sets.values()))
+            total_unique_words_in_corpus = len(set().union(*self.word_sets.values()))
         else:
             total_unique_words_in_corpus = 0
 
@@ -154,11 +201,15 @@ class OverlapAnalyzer:
     ###########################################################################
     def prepare_bo_data(self):
         """
-        Gathers word_counts & total_words for each actual text (excl. Master).
+        Gathers word_counts, total_words and relative frequencies for each
+        actual text (excl. Master). Frequencies are computed once per text
+        rather than once per pair.
         """
         debug("prepare_bo_data() invoked.")
         self.word_counts.clear()
         self.total_words.clear()
+        self.word_freqs.clear()
+        self.mean_freqs.clear()
 
         for text_key, report in self.file_reports.items():
             if text_key == "Master Report":
@@ -169,64 +220,97 @@ class OverlapAnalyzer:
 
             self.word_counts[text_key] = counts
             self.total_words[text_key] = total_count
+            freqs = {w: (counts[w]/total_count) for w in counts}
+            self.word_freqs[text_key] = freqs
+            self.mean_freqs[text_key] = np.mean(list(freqs.values())) if freqs else 0.0
             debug(f"   -> {text_key!r} has total_word_count={total_count}")
 
         debug(f" -> Prepared data for {len(self.word_counts)} texts (excluding Master).")
 
+    def pair_normalizers(self, T1, T2):
+        """
+        Returns (norm_bon1, avg_union) for the pair (T1, T2).
+        """
+        freq1 = self.word_freqs[T1]
+        freq2 = self.word_freqs[T2]
+
+        avg_f1 = self.mean_freqs[T1]
+        avg_f2 = self.mean_freqs[T2]
+        norm_bon1 = (avg_f1 + avg_f2) / 2.0 if (avg_f1 + avg_f2) else 0.0
+
+        union_words = self.word_sets[T1] | self.word_sets[T2]
+        union_vals = []
+        for w in union_words:
+            p1 = freq1.get(w, 0.0)
+            p2 = freq2.get(w, 0.0)
+            union_vals.append((p1 + p2)/2.0)
+        avg_union = np.mean(union_vals) if union_vals else 0.0
+        return norm_bon1, avg_union
+
+    def pair_contributions(self, T1, T2, words=None):
+        """
+        Yields (word, PW, BOn1, BOn2) for every word shared by T1 and T2
+        (or only for `words`, if given).
+        """
+        intersection = self.word_sets[T1] & self.word_sets[T2]
+        if words is not None:
+            intersection = intersection & set(words)
+        if not intersection:
+            debug(f"   -> T1={T1!r}, T2={T2!r} had NO intersection.")
+            return
+
+        freq1 = self.word_freqs[T1]
+        freq2 = self.word_freqs[T2]
+        norm_bon1, avg_union = self.pair_normalizers(T1, T2)
+
+        debug(f"   -> T1={T1!r}, T2={T2!r}, intersection_size={len(intersection)}, "
+              f"norm_bon1={norm_bon1:.4f}, avg_union={avg_union:.4f}")
+
+        for w in intersection:
+            p1 = freq1[w]
+            p2 = freq2[w]
+            pw = p1 * p2
+            bon1_val = pw / norm_bon1 if norm_bon1 else 0.0
+            bon2_val = pw / avg_union if avg_union else 0.0
+            yield w, pw, bon1_val, bon2_val
+
     def calculate_bo_pairwise_weights(self):
         """
         For each pair (T1, T2), compute pairwise weight (PW),
-        then do BOn1/BOn2 normalizations. Results go into self.pairwise_pw.
+        then do BOn1/BOn2 normalizations. Results go into self.pairwise_pw,
+        or straight into the per-word totals in streaming mode.
         """
         debug("calculate_bo_pairwise_weights() invoked.")
         self.pairwise_pw.clear()
+        self.word_index.clear()
+        self.bon1_totals = []
+        self.bon2_totals = []
 
         text_keys = list(self.word_sets.keys())
-        debug(f" -> We'll compare {len(text_keys)} texts in pairs.")
+        debug(f" -> We'll compare {len(text_keys)} texts in pairs (streaming={self.streaming}).")
 
         for T1, T2 in combinations(text_keys, 2):
-            intersection = self.word_sets[T1] & self.word_sets[T2]
-            if not intersection:
-                debug(f"   -> T1={T1!r}, T2={T2!r} had NO intersection.")
-                continue
-
-            counts1 = self.word_counts[T1]
-            counts2 = self.word_counts[T2]
-            total1 = self.total_words[T1]
-            total2 = self.total_words[T2]
-
-            freq1 = {w: (counts1[w]/total1) for w in counts1}
-            freq2 = {w: (counts2[w]/total2) for w in counts2}
-
-            avg_f1 = np.mean(list(freq1.values())) if freq1 else 0.0
-            avg_f2 = np.mean(list(freq2.values())) if freq2 else 0.0
-            norm_bon1 = (avg_f1 + avg_f2) / 2.0 if (avg_f1 + avg_f2) else 0.0
-
-            union_words = self.word_sets[T1] | self.word_sets[T2]
-            union_vals = []
-            for w in union_words:
-                p1 = freq1.get(w, 0.0)
-                p2 = freq2.get(w, 0.0)
-                union_vals.append((p1 + p2)/2.0)
-            avg_union = np.mean(union_vals) if union_vals else 0.0
-
-            debug(f"   -> T1={T1!r}, T2={T2!r}, intersection_size={len(intersection)}, "
-                  f"norm_bon1={norm_bon1:.4f}, avg_union={avg_union:.4f}")
-
-            for w in intersection:
-                p1 = freq1[w]
-                p2 = freq2[w]
-                pw = p1 * p2
-                bon1_val = pw / norm_bon1 if norm_bon1 else 0.0
-                bon2_val = pw / avg_union if avg_union else 0.0
-
-                self.pairwise_pw[(w, T1, T2)] = {
-                    "PW": pw,
-                    "BOn1": bon1_val,
-                    "BOn2": bon2_val
-                }
-
-        debug(f" -> Calculated PW for {len(self.pairwise_pw)} (word, T1, T2) combos.")
+            for w, pw, bon1_val, bon2_val in self.pair_contributions(T1, T2):
+                if self.streaming:
+                    slot = self.word_index.get(w)
+                    if slot is None:
+                        slot = len(self.bon1_totals)
+                        self.word_index[w] = slot
+                        self.bon1_totals.append(0.0)
+                        self.bon2_totals.append(0.0)
+                    self.bon1_totals[slot] += bon1_val
+                    self.bon2_totals[slot] += bon2_val
+                else:
+                    self.pairwise_pw[(w, T1, T2)] = {
+                        "PW": pw,
+                        "BOn1": bon1_val,
+                        "BOn2": bon2_val
+                    }
+
+        if self.streaming:
+            debug(f" -> Accumulated BO totals for {len(self.word_index)} words.")
+        else:
+            debug(f" -> Calculated PW for {len(self.pairwise_pw)} (word, T1, T2) combos.")
 
     def aggregate_bo_scores(self):
         """
@@ -236,13 +320,50 @@ class OverlapAnalyzer:
         self.summed_pw_bon1.clear()
         self.summed_pw_bon2.clear()
 
-        for (w, T1, T2), vals in self.pairwise_pw.items():
-            self.summed_pw_bon1[w] = self.summed_pw_bon1.get(w, 0.0) + vals["BOn1"]
-            self.summed_pw_bon2[w] = self.summed_pw_bon2.get(w, 0.0) + vals["BOn2"]
+        if self.streaming:
+            for w, slot in self.word_index.items():
+                self.summed_pw_bon1[w] = self.bon1_totals[slot]
+                self.summed_pw_bon2[w] = self.bon2_totals[slot]
+        else:
+            for (w, T1, T2), vals in self.pairwise_pw.items():
+                self.summed_pw_bon1[w] = self.summed_pw_bon1.get(w, 0.0) + vals["BOn1"]
+                self.summed_pw_bon2[w] = self.summed_pw_bon2.get(w, 0.0) + vals["BOn2"]
 
         debug(f" -> Aggregated BOn1 for {len(self.summed_pw_bon1)} words, "
               f"BOn2 for {len(self.summed_pw_bon2)} words.")
 
+    def explain_word(self, word):
+        """
+        Recompute one word's pairwise contributions on demand.
+
+        Only pairs of texts that both contain the word are visited. Requires
+        word sets and BO data, which are prepared on first use.
+
+        Returns a list of dicts sorted by BOn1, largest first:
+          [{"T1":..., "T2":..., "PW":..., "BOn1":..., "BOn2":...}, ...]
+        """
+        debug(f"explain_word({word!r}) invoked.")
+        if not self.word_sets:
+            self.create_word_sets_excluding_master()
+        if not self.word_freqs:
+            self.prepare_bo_data()
+
+        texts_with_word = [t for t, words in self.word_sets.items() if word in words]
+        contributions = []
+        for T1, T2 in combinations(texts_with_word, 2):
+            for w, pw, bon1_val, bon2_val in self.pair_contributions(T1, T2, words=(word,)):
+                contributions.append({
+                    "T1": T1,
+                    "T2": T2,
+                    "PW": pw,
+                    "BOn1": bon1_val,
+                    "BOn2": bon2_val
+                })
+
+        contributions.sort(key=lambda c: c["BOn1"], reverse=True)
+        debug(f" -> {word!r} appears in {len(texts_with_word)} texts, {len(contributions)} pairs.")
+        return contributions
+
     def compute_bo_scores(self):
         """
         1) create_word_sets_excluding_master()
@@ -267,14 +388,77 @@ class OverlapAnalyzer:
 ##############################################################################
 # External Helper
 ##############################################################################
-def compute_bo_scores(file_reports):
+def compute_bo_scores(file_reports, engine="matrix", workers=None, progress_callback=None):
     """
-    High-level convenience function. Instantiates OverlapAnalyzer,
-    calls compute_bo_scores(), and returns (bon1_dict, bon2_dict).
+    High-level convenience function returning (bon1_dict, bon2_dict).
+
+    engine:
+      "matrix"    -> vectorized block engine (analysis.bo_engine), default.
+      "pairwise"  -> reference implementation: instantiates OverlapAnalyzer
+                     and calls compute_bo_scores().
+      "streaming" -> OverlapAnalyzer in streaming mode (O(vocabulary) memory,
+                     same results as "pairwise").
+
+    workers/progress_callback only apply to the matrix engine: block pairs are
+    spread over `workers` processes (default: one per core) and
+    progress_callback(done, total) is called as blocks finish.
     """
+    if engine == "matrix":
+        debug("compute_bo_scores() called from outside. Using matrix engine.")
+        bon1, bon2 = compute_bo_scores_matrix(file_reports, workers=workers,
+                                              progress_callback=progress_callback)
+        debug(f" -> DONE. returning bo1(len={len(bon1)}), bo2(len={len(bon2)})")
+        return bon1, bon2
+    if engine not in ("pairwise", "streaming"):
+        raise ValueError(f"Unknown BO engine: {engine!r}")
+
     debug("compute_bo_scores() called from outside. Building OverlapAnalyzer.")
-    analyzer = OverlapAnalyzer(file_reports)
+    analyzer = OverlapAnalyzer(file_reports, streaming=(engine == "streaming"))
     analyzer.compute_bo_scores()
     bon1, bon2 = analyzer.get_bo_scores()
     debug(f" -> DONE. returning bo1(len={len(bon1)}), bo2(len={len(bon2)})")
     return bon1, bon2
+
+
+def calculate_overlap_assurance(file_reports):
+    """
+    Overlap assurance of file_reports (Master excluded) from one
+    document-frequency pass: words shared by two or more texts plus words
+    unique to a single text must add up to the corpus vocabulary.
+
+    Returns the dict of OverlapAnalyzer.calculate_assurance_metrics().
+    """
+    debug("calculate_overlap_assurance() called.")
+    analyzer = OverlapAnalyzer(file_reports)
+    analyzer.create_word_sets_excluding_master()
+    return analyzer.calculate_assurance_metrics()
+
+
+def calculate_jaccard_index(file_reports, method="auto", num_perm=DEFAULT_NUM_PERM):
+    """
+    Pairwise Jaccard index of the texts' word sets.
+
+    method: "exact" (bitsets), "minhash" (num_perm permutations) or "auto",
+    which switches to MinHash for large corpora.
+
+    Returns a JaccardResult(text_keys, matrix, method).
+    """
+    debug(f"calculate_jaccard_index() called with method={method!r}.")
+    result = compute_jaccard_matrix(file_reports, method=method, num_perm=num_perm)
+    debug(f" -> DONE. {result.method} matrix for {len(result.text_keys)} texts.")
+    return result
+
+
+def calculate_distribution_similarity(file_reports, metric, smoothing=DEFAULT_SMOOTHING):
+    """
+    Pairwise similarity of the texts' word distributions.
+
+    metric: "cosine", "kl", "js" or "bhattacharyya". The divergences use
+    additive smoothing of the relative frequencies.
+
+    Returns a SimilarityResult(text_keys, matrix, metric).
+    """
+    debug(f"calculate_distribution_similarity() called with metric={metric!r}.")
+    result = compute_similarity_matrix(file_reports, metric, smoothing=smoothing)
+    debug(f" -> DONE. {metric} matrix for {len(result.text_keys)} texts.")
+    return result
@@ -0,0 +1,558 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+##############################################################################
+# Debug helper and toggle for debug messages
+##############################################################################
+DEBUG_MODE = False  # Set to True to enable debug logs
+
+# Number of texts per row block. Each block pair is evaluated with dense
+# matrix products, so this bounds the size of the temporary matrices.
+DEFAULT_BLOCK_SIZE = 512
+
+# Number of shared vocabulary columns densified at once inside a block pair.
+DEFAULT_COLUMN_CHUNK = 4096
+
+# A shared word is summed over its explicit text pairs instead of through the
+# dense products when its pair count times this factor is below the block
+# area. Roughly the cost of one explicit pair relative to one dense multiply-add.
+SPARSE_PAIR_COST = 32
+
+# Upper bound on explicit text pairs materialized at once.
+MAX_PAIRS_PER_BATCH = 1 << 22
+
+MASTER_REPORT_KEY = "Master Report"
+
+# Worker processes used for block pairs. None means one per CPU core.
+DEFAULT_WORKERS = None
+
+# Corpora smaller than this are always computed in-process; starting the
+# pool costs more than it saves.
+PARALLEL_MIN_TEXTS = 500
+
+# When running in parallel, shrink the blocks until there are at least this
+# many block pairs per worker so the pool stays busy until the end.
+MIN_BLOCK_PAIRS_PER_WORKER = 4
+
+
+def debug(msg: str):
+    if DEBUG_MODE:
+        print(f"[DEBUG bo_engine] {msg}")
+
+
+class BOTextMatrix:
+    """
+    Sparse (CSR) relative-frequency matrix of texts x vocabulary.
+
+    Row i holds the relative frequencies count/total of every word in text i,
+    computed exactly like OverlapAnalyzer does (freq = count / total_count).
+    Alongside the matrix we keep the per-text quantities the BO normalizers
+    are built from:
+      - sizes[i]      number of distinct words in text i  (|V_i|)
+      - freq_sums[i]  sum of the relative frequencies of text i (~1.0)
+      - mean_freqs[i] mean relative frequency of text i (avg_f in the
+                      pairwise implementation)
+
+    Usage:
+      matrix = BOTextMatrix.from_file_reports(file_reports)
+      bon1, bon2 = compute_bo_score_arrays(matrix)
+    """
+
+    def __init__(self, text_keys, vocabulary, indptr, indices, freqs):
+        self.text_keys = list(text_keys)
+        self.vocabulary = list(vocabulary)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.freqs = np.asarray(freqs, dtype=np.float64)
+
+        n_texts = len(self.text_keys)
+        self.sizes = np.diff(self.indptr)
+        row_ids = np.repeat(np.arange(n_texts), self.sizes)
+        self.freq_sums = np.bincount(row_ids, weights=self.freqs, minlength=n_texts)
+        self.mean_freqs = np.zeros(n_texts, dtype=np.float64)
+        np.divide(self.freq_sums, self.sizes, out=self.mean_freqs, where=self.sizes > 0)
+        # document frequency of each vocabulary word
+        self.doc_freqs = np.bincount(self.indices, minlength=len(self.vocabulary))
+
+    @property
+    def n_texts(self):
+        return len(self.text_keys)
+
+    @property
+    def n_words(self):
+        return len(self.vocabulary)
+
+    @classmethod
+    def from_file_reports(cls, file_reports):
+        """
+        Build the matrix from the usual file_reports dict
+        ({text_key: {"data": {"word_stats": [...]}}}), skipping 'Master Report'.
+        """
+        text_keys = []
+        vocabulary = []
+        word_ids = {}
+        indptr = [0]
+        index_chunks = []
+        freq_chunks = []
+
+        for text_key, report in file_reports.items():
+            if text_key == MASTER_REPORT_KEY:
+                continue
+            word_stats = report["data"]["word_stats"]
+            counts = {ws[0]: ws[1] for ws in word_stats}
+            total_count = sum(counts.values())
+
+            ids = np.empty(len(counts), dtype=np.int64)
+            for pos, word in enumerate(counts):
+                word_id = word_ids.get(word)
+                if word_id is None:
+                    word_id = len(vocabulary)
+                    word_ids[word] = word_id
+                    vocabulary.append(word)
+                ids[pos] = word_id
+
+            if counts:
+                freqs = np.asarray(list(counts.values()), dtype=np.float64) / total_count
+            else:
+                freqs = np.empty(0, dtype=np.float64)
+
+            text_keys.append(text_key)
+            index_chunks.append(ids)
+            freq_chunks.append(freqs)
+            indptr.append(indptr[-1] + len(ids))
+
+        indices = np.concatenate(index_chunks) if index_chunks else np.empty(0, dtype=np.int64)
+        freqs = np.concatenate(freq_chunks) if freq_chunks else np.empty(0, dtype=np.float64)
+        debug(f"Built matrix for {len(text_keys)} texts, {len(vocabulary)} words, {len(indices)} entries.")
+        return cls(text_keys, vocabulary, indptr, indices, freqs)
+
+    def row_slice(self, start, stop):
+        """
+        Return (local_rows, columns, freqs) for the contiguous text range [start, stop).
+        """
+        lo, hi = self.indptr[start], self.indptr[stop]
+        local_rows = np.repeat(np.arange(stop - start), self.sizes[start:stop])
+        return local_rows, self.indices[lo:hi], self.freqs[lo:hi]
+
+
+##############################################################################
+# Block kernels
+##############################################################################
+def _pair_weights(mean_i, mean_j, sums_i, sums_j, sizes_i, sizes_j, shared_counts):
+    """
+    Per-pair multipliers for a block of text pairs.
+
+    BOn1 divides PW by norm_bon1 = (avg_f1 + avg_f2) / 2.
+    BOn2 divides PW by avg_union = (sum_f1 + sum_f2) / (2 * |V1 u V2|).
+    """
+    norm_bon1 = (mean_i[:, None] + mean_j[None, :]) / 2.0
+    weights1 = np.zeros_like(norm_bon1)
+    np.divide(1.0, norm_bon1, out=weights1, where=norm_bon1 > 0)
+
+    union_sizes = sizes_i[:, None] + sizes_j[None, :] - shared_counts
+    avg_union = np.zeros_like(norm_bon1)
+    np.divide((sums_i[:, None] + sums_j[None, :]) / 2.0, union_sizes, out=avg_union, where=union_sizes > 0)
+    weights2 = np.zeros_like(avg_union)
+    np.divide(1.0, avg_union, out=weights2, where=avg_union > 0)
+    return weights1, weights2
+
+
+def _block_entries(matrix, start, stop, column_pos):
+    """
+    CSR entries of the text range [start, stop) restricted to the shared
+    columns, as (local_rows, shared_positions, freqs) sorted by position.
+    """
+    local_rows, columns, freqs = matrix.row_slice(start, stop)
+    positions = column_pos[columns]
+    keep = positions >= 0
+    local_rows, positions, freqs = local_rows[keep], positions[keep], freqs[keep]
+    order = np.argsort(positions, kind="stable")
+    return local_rows[order], positions[order], freqs[order]
+
+
+def _dense_chunks(entries, dense_pos, n_rows, n_dense, column_chunk):
+    """
+    Yield (dense_ids_slice, dense) chunks holding the dense columns of a block.
+    """
+    local_rows, positions, freqs = entries
+    dense_positions = dense_pos[positions]
+    keep = dense_positions >= 0
+    rows, dense_positions, values = local_rows[keep], dense_positions[keep], freqs[keep]
+    for start in range(0, n_dense, column_chunk):
+        stop = min(start + column_chunk, n_dense)
+        in_chunk = (dense_positions >= start) & (dense_positions < stop)
+        dense = np.zeros((n_rows, stop - start), dtype=np.float64)
+        dense[rows[in_chunk], dense_positions[in_chunk] - start] = values[in_chunk]
+        yield slice(start, stop), dense
+
+
+def _sparse_pairs(entries_i, entries_j, sparse_mask, counts_j, starts_j, diagonal, max_pairs):
+    """
+    Enumerate the (T1, T2) pairs sharing each sparse column.
+
+    Yields batches of (rows_i, rows_j, positions, freq_products). For the
+    diagonal block only pairs with T1 < T2 are produced.
+    """
+    rows_i, positions_i, freqs_i = entries_i
+    rows_j, _, freqs_j = entries_j
+    selected = np.flatnonzero(sparse_mask[positions_i])
+    if len(selected) == 0:
+        return
+    repeats = counts_j[positions_i[selected]]
+    cumulative = np.cumsum(repeats)
+    batch_start = 0
+    while batch_start < len(selected):
+        offset = cumulative[batch_start - 1] if batch_start else 0
+        batch_stop = int(np.searchsorted(cumulative, offset + max_pairs, side="right"))
+        batch_stop = max(batch_stop, batch_start + 1)
+        entry_ids = selected[batch_start:batch_stop]
+        reps = repeats[batch_start:batch_stop]
+        batch_start = batch_stop
+
+        left = np.repeat(entry_ids, reps)
+        firsts = np.cumsum(reps) - reps
+        within = np.arange(len(left)) - np.repeat(firsts, reps)
+        right = np.repeat(starts_j[positions_i[entry_ids]], reps) + within
+
+        pair_rows_i, pair_rows_j = rows_i[left], rows_j[right]
+        if diagonal:
+            keep = pair_rows_i < pair_rows_j
+            left, right = left[keep], right[keep]
+            pair_rows_i, pair_rows_j = pair_rows_i[keep], pair_rows_j[keep]
+        yield pair_rows_i, pair_rows_j, positions_i[left], freqs_i[left] * freqs_j[right]
+
+
+def bo_block_scores(matrix, block_i, block_j, column_chunk=DEFAULT_COLUMN_CHUNK):
+    """
+    Sum the BOn1/BOn2 contributions of every text pair (T1 in block_i,
+    T2 in block_j) for the words both blocks share.
+
+    block_i/block_j are (start, stop) text ranges. When they are the same
+    block only pairs with T1 < T2 are counted, mirroring combinations().
+
+    Shared words that occur in many texts of the block pair go through dense
+    matrix products; rare words, which are most of a Zipfian vocabulary, are
+    summed over their few explicit text pairs instead.
+
+    Returns:
+      (word_ids, bon1_partial, bon2_partial) where the partial sums are
+      aligned with word_ids.
+    """
+    i0, i1 = block_i
+    j0, j1 = block_j
+    diagonal = (i0, i1) == (j0, j1)
+    n_i, n_j = i1 - i0, j1 - j0
+
+    _, cols_i, _ = matrix.row_slice(i0, i1)
+    present = np.zeros(matrix.n_words, dtype=np.int8)
+    present[cols_i] = 1
+    if diagonal:
+        shared_ids = np.flatnonzero(matrix.doc_freqs >= 2)
+        shared_ids = shared_ids[present[shared_ids] == 1]
+    else:
+        _, cols_j, _ = matrix.row_slice(j0, j1)
+        present_j = np.zeros(matrix.n_words, dtype=np.int8)
+        present_j[cols_j] = 1
+        shared_ids = np.flatnonzero(present & present_j)
+
+    n_shared = len(shared_ids)
+    if n_shared == 0:
+        return shared_ids, np.zeros(0), np.zeros(0)
+
+    column_pos = np.full(matrix.n_words, -1, dtype=np.int64)
+    column_pos[shared_ids] = np.arange(n_shared)
+    entries_i = _block_entries(matrix, i0, i1, column_pos)
+    entries_j = entries_i if diagonal else _block_entries(matrix, j0, j1, column_pos)
+
+    counts_i = np.bincount(entries_i[1], minlength=n_shared)
+    counts_j = counts_i if diagonal else np.bincount(entries_j[1], minlength=n_shared)
+    starts_j = np.cumsum(counts_j) - counts_j
+
+    # Split columns: dense products pay n_i * n_j per column, explicit pairs
+    # pay counts_i * counts_j with a much higher constant.
+    pair_counts = counts_i * counts_j
+    dense_mask = pair_counts * SPARSE_PAIR_COST >= n_i * n_j
+    dense_ids = np.flatnonzero(dense_mask)
+    n_dense = len(dense_ids)
+    dense_pos = np.full(n_shared, -1, dtype=np.int64)
+    dense_pos[dense_ids] = np.arange(n_dense)
+    sparse_mask = ~dense_mask & (pair_counts > 0)
+
+    def dense_pairs():
+        chunks_j = _dense_chunks(entries_j, dense_pos, n_j, n_dense, column_chunk)
+        for (chunk, dense_i), (_, dense_j) in zip(
+            _dense_chunks(entries_i, dense_pos, n_i, n_dense, column_chunk), chunks_j
+        ):
+            yield chunk, dense_i, dense_j
+
+    def sparse_pairs():
+        return _sparse_pairs(entries_i, entries_j, sparse_mask, counts_j, starts_j,
+                             diagonal, MAX_PAIRS_PER_BATCH)
+
+    # Pass 1: pairwise intersection sizes |V1 n V2| for the BOn2 union size.
+    shared_counts = np.zeros((n_i, n_j), dtype=np.float64)
+    for _, dense_i, dense_j in dense_pairs():
+        shared_counts += (dense_i > 0).astype(np.float64) @ (dense_j > 0).astype(np.float64).T
+    sparse_counts = np.zeros(n_i * n_j, dtype=np.float64)
+    for pair_rows_i, pair_rows_j, _, _ in sparse_pairs():
+        sparse_counts += np.bincount(pair_rows_i * n_j + pair_rows_j, minlength=n_i * n_j)
+    sparse_counts = sparse_counts.reshape(n_i, n_j)
+    if diagonal:
+        sparse_counts += sparse_counts.T
+    shared_counts += sparse_counts
+
+    weights1, weights2 = _pair_weights(
+        matrix.mean_freqs[i0:i1], matrix.mean_freqs[j0:j1],
+        matrix.freq_sums[i0:i1], matrix.freq_sums[j0:j1],
+        matrix.sizes[i0:i1], matrix.sizes[j0:j1],
+        shared_counts,
+    )
+
+    # Pass 2: sum F[T1, w] * W[T1, T2] * F[T2, w] over the pairs sharing w.
+    bon1 = np.zeros(n_shared, dtype=np.float64)
+    bon2 = np.zeros(n_shared, dtype=np.float64)
+    for pair_rows_i, pair_rows_j, positions, products in sparse_pairs():
+        bon1 += np.bincount(positions, weights=products * weights1[pair_rows_i, pair_rows_j], minlength=n_shared)
+        bon2 += np.bincount(positions, weights=products * weights2[pair_rows_i, pair_rows_j], minlength=n_shared)
+
+    if n_dense:
+        if diagonal:
+            # only T1 < T2: drop self pairs, then halve the symmetric sum
+            np.fill_diagonal(weights1, 0.0)
+            np.fill_diagonal(weights2, 0.0)
+            weights1 *= 0.5
+            weights2 *= 0.5
+        for chunk, dense_i, dense_j in dense_pairs():
+            bon1[dense_ids[chunk]] = np.einsum("ij,ij->j", dense_i, weights1 @ dense_j)
+            bon2[dense_ids[chunk]] = np.einsum("ij,ij->j", dense_i, weights2 @ dense_j)
+
+    return shared_ids, bon1, bon2
+
+
+def iter_block_pairs(n_texts, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Yield ((i0, i1), (j0, j1)) for every block pair of the upper triangle.
+    """
+    blocks = [(start, min(start + block_size, n_texts)) for start in range(0, n_texts, block_size)]
+    for a, block_i in enumerate(blocks):
+        for block_j in blocks[a:]:
+            yield block_i, block_j
+
+
+def iter_cross_block_pairs(n_texts, split, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Yield ((i0, i1), (j0, j1)) block pairs covering every text pair with
+    T1 < split <= T2, i.e. between the texts before and after split.
+    """
+    left = [(start, min(start + block_size, split)) for start in range(0, split, block_size)]
+    right = [(start, min(start + block_size, n_texts)) for start in range(split, n_texts, block_size)]
+    for block_i in left:
+        for block_j in right:
+            yield block_i, block_j
+
+
+##############################################################################
+# Shared memory
+##############################################################################
+class SharedBOTextMatrix:
+    """
+    Publishes the CSR arrays of a BOTextMatrix in shared memory so worker
+    processes can map them instead of unpickling a copy each.
+
+    Usage:
+      with SharedBOTextMatrix(matrix) as shared:
+          pool = ProcessPoolExecutor(initializer=_init_worker, initargs=(shared.spec,))
+    """
+
+    ARRAYS = ("indptr", "indices", "freqs")
+
+    def __init__(self, matrix):
+        self.segments = []
+        arrays = {}
+        try:
+            for name in self.ARRAYS:
+                array = getattr(matrix, name)
+                segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self.segments.append(segment)
+                view = np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)
+                view[:] = array
+                del view
+                arrays[name] = (segment.name, array.shape, array.dtype.str)
+        except Exception:
+            self.close()
+            raise
+        self.spec = {"arrays": arrays, "n_texts": matrix.n_texts, "n_words": matrix.n_words}
+        debug(f"Published {sum(s.size for s in self.segments)} bytes of CSR data to shared memory.")
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+            segment.unlink()
+        self.segments = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def attach_shared_matrix(spec):
+    """
+    Rebuild a BOTextMatrix over the shared CSR arrays described by spec.
+
+    Text keys and vocabulary are replaced by their indices; the kernels only
+    need positions. Returns (matrix, segments); keep the segments alive for as
+    long as the matrix is used.
+    """
+    segments = []
+    arrays = {}
+    for name, (segment_name, shape, dtype) in spec["arrays"].items():
+        segment = shared_memory.SharedMemory(name=segment_name)
+        segments.append(segment)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+    matrix = BOTextMatrix(range(spec["n_texts"]), range(spec["n_words"]),
+                          arrays["indptr"], arrays["indices"], arrays["freqs"])
+    return matrix, segments
+
+
+# Per-process state of pool workers, set by _init_worker.
+_worker_matrix = None
+_worker_segments = None
+
+
+def _init_worker(spec):
+    global _worker_matrix, _worker_segments
+    _worker_matrix, _worker_segments = attach_shared_matrix(spec)
+
+
+def _worker_block_scores(block_i, block_j, column_chunk):
+    return bo_block_scores(_worker_matrix, block_i, block_j, column_chunk)
+
+
+##############################################################################
+# Drivers
+##############################################################################
+def resolve_workers(workers=None):
+    """
+    Number of worker processes to use: workers, else DEFAULT_WORKERS, else
+    one per CPU core.
+    """
+    if workers is None:
+        workers = DEFAULT_WORKERS
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    return workers
+
+
+def parallel_block_size(n_texts, block_size, workers):
+    """
+    Largest block size <= block_size giving MIN_BLOCK_PAIRS_PER_WORKER block
+    pairs per worker (the upper triangle of k blocks has k*(k+1)/2 pairs).
+    """
+    n_blocks = 1
+    while n_blocks * (n_blocks + 1) // 2 < workers * MIN_BLOCK_PAIRS_PER_WORKER:
+        n_blocks += 1
+    return max(1, min(block_size, -(-n_texts // n_blocks)))
+
+
+def compute_bo_score_arrays(matrix, block_size=DEFAULT_BLOCK_SIZE, column_chunk=DEFAULT_COLUMN_CHUNK,
+                            workers=1, progress_callback=None, split=None):
+    """
+    Compute summed BOn1/BOn2 for every vocabulary word of the matrix.
+
+    With split set, only the pairs between the texts before split and the
+    texts from split on are summed (e.g. corpus A rows vs corpus B rows).
+
+    With workers > 1 (and at least PARALLEL_MIN_TEXTS texts) block pairs are
+    dispatched to a process pool that reads the matrix from shared memory.
+    Block results are reduced in block order, so the output does not depend
+    on which worker finishes first.
+
+    progress_callback(done, total), if given, is called in the calling
+    process after each block pair completes.
+
+    Returns:
+      (bon1, bon2) float arrays aligned with matrix.vocabulary. Words that
+      never appear in two texts have a score of 0.
+    """
+    workers = resolve_workers(workers)
+    bon1 = np.zeros(matrix.n_words, dtype=np.float64)
+    bon2 = np.zeros(matrix.n_words, dtype=np.float64)
+
+    def reduce_block(word_ids, part1, part2):
+        bon1[word_ids] += part1
+        bon2[word_ids] += part2
+
+    def block_pairs_for(size):
+        if split is None:
+            return list(iter_block_pairs(matrix.n_texts, size))
+        return list(iter_cross_block_pairs(matrix.n_texts, split, size))
+
+    if workers == 1 or matrix.n_texts < PARALLEL_MIN_TEXTS:
+        block_pairs = block_pairs_for(block_size)
+        for done, (block_i, block_j) in enumerate(block_pairs, start=1):
+            word_ids, part1, part2 = bo_block_scores(matrix, block_i, block_j, column_chunk)
+            reduce_block(word_ids, part1, part2)
+            debug(f"block {block_i} x {block_j}: {len(word_ids)} shared words")
+            if progress_callback:
+                progress_callback(done, len(block_pairs))
+        return bon1, bon2
+
+    block_size = parallel_block_size(matrix.n_texts, block_size, workers)
+    block_pairs = block_pairs_for(block_size)
+    debug(f"Dispatching {len(block_pairs)} block pairs (block_size={block_size}) to {workers} workers.")
+
+    # spawn rather than fork: the GUI process runs Qt threads.
+    context = multiprocessing.get_context("spawn")
+    with SharedBOTextMatrix(matrix) as shared, ProcessPoolExecutor(
+        max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(shared.spec,)
+    ) as pool:
+        futures = {
+            pool.submit(_worker_block_scores, block_i, block_j, column_chunk): index
+            for index, (block_i, block_j) in enumerate(block_pairs)
+        }
+        pending = {}
+        next_index = 0
+        for done, future in enumerate(as_completed(futures), start=1):
+            pending[futures[future]] = future.result()
+            while next_index in pending:
+                reduce_block(*pending.pop(next_index))
+                next_index += 1
+            if progress_callback:
+                progress_callback(done, len(block_pairs))
+    return bon1, bon2
+
+
+def bo_arrays_to_dicts(matrix, bon1, bon2):
+    """
+    Convert score arrays to the {word: score} dicts returned by get_bo_scores(),
+    keeping only words that occur in at least two texts.
+    """
+    word_ids = np.flatnonzero(matrix.doc_freqs >= 2)
+    words = [matrix.vocabulary[i] for i in word_ids]
+    return dict(zip(words, bon1[word_ids].tolist())), dict(zip(words, bon2[word_ids].tolist()))
+
+
+def compute_bo_scores_matrix(file_reports, block_size=DEFAULT_BLOCK_SIZE, column_chunk=DEFAULT_COLUMN_CHUNK,
+                             workers=None, progress_callback=None):
+    """
+    Matrix-product equivalent of OverlapAnalyzer.compute_bo_scores().
+
+    Summed BO scores are weighted quadratic forms over each word's column of
+    relative frequencies: BO(w) = sum_{T1<T2} F[T1, w] * F[T2, w] * W[T1, T2],
+    where W holds the per-pair normalizers. The pair space is walked in text
+    blocks so memory stays bounded for large corpora, and block pairs run on
+    `workers` processes (default: one per CPU core).
+
+    Returns (bon1_dict, bon2_dict).
+    """
+    matrix = BOTextMatrix.from_file_reports(file_reports)
+    bon1, bon2 = compute_bo_score_arrays(matrix, block_size, column_chunk, workers, progress_callback)
+    return bo_arrays_to_dicts(matrix, bon1, bon2)
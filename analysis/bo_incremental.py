@@ -0,0 +1,254 @@
+from collections import defaultdict
+
+from analysis.advanced_analysis import compute_bo_scores
+
+##############################################################################
+# Debug helper and toggle for debug messages
+##############################################################################
+DEBUG_MODE = False  # Set to True to enable debug logs
+
+MASTER_REPORT_KEY = "Master Report"
+
+# Number of incremental add/remove steps after which the totals are
+# recomputed from scratch to bound floating point drift.
+DEFAULT_FULL_RECOMPUTE_EVERY = 200
+
+
+def debug(msg: str):
+    if DEBUG_MODE:
+        print(f"[DEBUG bo_incremental] {msg}")
+
+
+def text_version(report):
+    """
+    What identifies the content of a file report, so it can be recognized
+    again without holding on to the report: its file signature and
+    tokenizer when recorded, otherwise a hash of its word_stats.
+    """
+    if report.get("signature") is not None:
+        return ("signature", tuple(report["signature"]), report.get("tokenizer"))
+    return ("word_stats", hash(tuple(tuple(ws) for ws in report["data"]["word_stats"])))
+
+
+class IncrementalBOScores:
+    """
+    Keeps summed BOn1/BOn2 scores up to date as texts are added or removed.
+
+    The BO normalizers of a pair (T1, T2) only depend on T1 and T2: each
+    text's own mean relative frequency, and the union of their two
+    vocabularies. Adding or removing a text therefore leaves every other
+    pair's contribution unchanged, and the update only needs the N pairs
+    involving that text. Those are found through an inverted index
+    (word -> {text_key: freq}), so an update costs O(sum of document
+    frequencies of the text's words) <= O(N * V_text).
+
+    Every full_recompute_every updates the totals are rebuilt from scratch
+    so additions and subtractions cannot accumulate rounding error.
+
+    Only each text's relative frequencies are kept, not its report, so a
+    corpus report evicted from memory can be freed. sync() recognizes texts
+    by text_version(), and skips comparing them at all when given the same
+    report revision as last time.
+
+    Usage:
+      scores = IncrementalBOScores()
+      scores.sync(corpus_report, revision)  # initial full computation
+      scores.add_text(path, report)  # or sync() again with the new report
+      bon1_dict, bon2_dict = scores.get_bo_scores()
+    """
+
+    def __init__(self, engine="matrix", full_recompute_every=DEFAULT_FULL_RECOMPUTE_EVERY, workers=None):
+        self.engine = engine
+        self.workers = workers  # processes of the matrix engine (None = one per core)
+        self.full_recompute_every = full_recompute_every
+
+        self.versions = {}       # text_key -> text_version() of its report
+        self.freqs = {}          # text_key -> {word: count / total}
+        self.mean_freqs = {}     # text_key -> mean relative frequency
+        self.freq_sums = {}      # text_key -> sum of relative frequencies
+        self.postings = {}       # word -> {text_key: freq}
+
+        self.bon1 = {}           # word -> BOn1 (words in >= 2 texts)
+        self.bon2 = {}           # word -> BOn2
+        self.updates_since_recompute = 0
+        self.revision = None     # report revision of the last sync
+
+    def get_bo_scores(self):
+        """
+        Return (bon1_dict, bon2_dict), like OverlapAnalyzer.get_bo_scores().
+        """
+        return self.bon1, self.bon2
+
+    ##########################################################################
+    # Text bookkeeping
+    ##########################################################################
+    def _index_text(self, text_key, report):
+        word_stats = report["data"]["word_stats"]
+        counts = {ws[0]: ws[1] for ws in word_stats}
+        total_count = sum(counts.values())
+        freqs = {w: (counts[w]/total_count) for w in counts}
+
+        self.versions[text_key] = text_version(report)
+        self.freqs[text_key] = freqs
+        self.freq_sums[text_key] = sum(freqs.values())
+        self.mean_freqs[text_key] = self.freq_sums[text_key] / len(freqs) if freqs else 0.0
+        for w, p in freqs.items():
+            self.postings.setdefault(w, {})[text_key] = p
+
+    def _unindex_text(self, text_key):
+        for w in self.freqs[text_key]:
+            texts = self.postings[w]
+            del texts[text_key]
+            if not texts:
+                del self.postings[w]
+        del self.versions[text_key]
+        del self.freqs[text_key]
+        del self.freq_sums[text_key]
+        del self.mean_freqs[text_key]
+
+    def _apply_pairs(self, text_key, sign):
+        """
+        Add (sign=1) or subtract (sign=-1) the contributions of every pair
+        (text_key, T) for T currently indexed, text_key itself excluded.
+        """
+        freqs = self.freqs[text_key]
+        mean_f = self.mean_freqs[text_key]
+        sum_f = self.freq_sums[text_key]
+        size = len(freqs)
+
+        # Pass 1: intersection sizes with every overlapping text
+        shared = defaultdict(int)
+        for w in freqs:
+            for other in self.postings.get(w, ()):
+                if other != text_key:
+                    shared[other] += 1
+
+        norm_bon1 = {}
+        avg_union = {}
+        for other, n_shared in shared.items():
+            other_mean = self.mean_freqs[other]
+            norm_bon1[other] = (mean_f + other_mean) / 2.0 if (mean_f + other_mean) else 0.0
+            union_size = size + len(self.freqs[other]) - n_shared
+            avg_union[other] = ((sum_f + self.freq_sums[other]) / 2.0) / union_size
+
+        # Pass 2: per-word contributions
+        for w, p1 in freqs.items():
+            texts = self.postings.get(w)
+            if not texts:
+                continue
+            delta1 = 0.0
+            delta2 = 0.0
+            for other, p2 in texts.items():
+                if other == text_key:
+                    continue
+                pw = p1 * p2
+                if norm_bon1[other]:
+                    delta1 += pw / norm_bon1[other]
+                if avg_union[other]:
+                    delta2 += pw / avg_union[other]
+            if len(texts) - (text_key in texts) == 0:
+                continue
+            self.bon1[w] = self.bon1.get(w, 0.0) + sign * delta1
+            self.bon2[w] = self.bon2.get(w, 0.0) + sign * delta2
+
+    ##########################################################################
+    # Updates
+    ##########################################################################
+    def add_text(self, text_key, report):
+        """
+        Add one text and the contributions of its pairs with every other text.
+        """
+        if text_key == MASTER_REPORT_KEY:
+            return
+        if text_key in self.versions:
+            self.remove_text(text_key)
+        self._index_text(text_key, report)
+        self._apply_pairs(text_key, 1)
+        self._count_update()
+        debug(f"Added {text_key!r}; {len(self.versions)} texts, {len(self.bon1)} scored words.")
+
+    def remove_text(self, text_key):
+        """
+        Remove one text and subtract the contributions of its pairs.
+        """
+        if text_key not in self.versions:
+            return
+        self._apply_pairs(text_key, -1)
+        words = list(self.freqs[text_key])
+        self._unindex_text(text_key)
+        # words left in fewer than two texts no longer have a score
+        for w in words:
+            if len(self.postings.get(w, ())) < 2:
+                self.bon1.pop(w, None)
+                self.bon2.pop(w, None)
+        self._count_update()
+        debug(f"Removed {text_key!r}; {len(self.versions)} texts, {len(self.bon1)} scored words.")
+
+    def _count_update(self):
+        self.updates_since_recompute += 1
+        if self.full_recompute_every and self.updates_since_recompute >= self.full_recompute_every:
+            debug(f"{self.updates_since_recompute} incremental updates; recomputing from scratch.")
+            self.recompute()
+
+    def recompute(self):
+        """
+        Recompute the totals from scratch for the texts currently held.
+        """
+        if len(self.freqs) >= 2:
+            # relative frequencies in place of counts give the same scores
+            frequency_reports = {k: {"data": {"word_stats": list(f.items())}} for k, f in self.freqs.items()}
+            bon1, bon2 = compute_bo_scores(frequency_reports, engine=self.engine, workers=self.workers)
+        else:
+            bon1, bon2 = {}, {}
+        self.bon1 = dict(bon1)
+        self.bon2 = dict(bon2)
+        self.updates_since_recompute = 0
+
+    def rebuild(self, file_reports):
+        """
+        Replace all texts with file_reports and recompute from scratch.
+        """
+        self.versions.clear()
+        self.freqs.clear()
+        self.mean_freqs.clear()
+        self.freq_sums.clear()
+        self.postings.clear()
+        for text_key, report in file_reports.items():
+            if text_key != MASTER_REPORT_KEY:
+                self._index_text(text_key, report)
+        self.recompute()
+        debug(f"Rebuilt from {len(self.versions)} texts.")
+
+    def sync(self, file_reports, revision=None):
+        """
+        Bring the scores in line with a corpus report.
+
+        Texts are matched by key and text_version(): entries that are new or
+        whose content changed are (re)added, missing ones are removed. When
+        most of the corpus changed a full rebuild is cheaper and is used
+        instead. With the report's revision (see CorpusReportManager), a
+        sync with the revision of the previous one returns right away; a
+        report reloaded after eviction keeps its revision.
+
+        Returns:
+          (added, removed) counts, or None if a full rebuild was done.
+        """
+        if revision is not None and revision == self.revision:
+            return (0, 0)
+        self.revision = revision
+        wanted = {k: r for k, r in file_reports.items() if k != MASTER_REPORT_KEY}
+        versions = {k: text_version(r) for k, r in wanted.items()}
+        removed = [k for k, v in self.versions.items() if versions.get(k) != v]
+        added = [k for k, v in versions.items() if self.versions.get(k) != v]
+        if not removed and not added:
+            return (0, 0)
+
+        if not self.versions or 2 * (len(removed) + len(added)) > len(wanted):
+            self.rebuild(wanted)
+            return None
+
+        for text_key in removed:
+            self.remove_text(text_key)
+        for text_key in added:
+            self.add_text(text_key, wanted[text_key])
+        return (len(added), len(removed))
@@ -0,0 +1,109 @@
+from itertools import combinations
+
+import numpy as np
+
+from analysis.advanced_analysis import compute_bo_scores
+from analysis.bo_engine import (
+    BOTextMatrix,
+    DEFAULT_BLOCK_SIZE,
+    DEFAULT_COLUMN_CHUNK,
+    compute_bo_score_arrays,
+)
+
+##############################################################################
+# Debug helper and toggle for debug messages
+##############################################################################
+DEBUG_MODE = False  # Set to True to enable debug logs
+
+MASTER_REPORT_KEY = "Master Report"
+
+
+def debug(msg: str):
+    if DEBUG_MODE:
+        print(f"[DEBUG bo_multi_corpus] {msg}")
+
+
+def qualify_corpus_reports(corpus_reports):
+    """
+    Merge {corpus_name: file_reports} into one dict keyed by
+    (corpus_name, file_key), dropping each corpus' Master Report.
+
+    A file that belongs to two corpora stays two texts instead of one
+    silently replacing the other.
+    """
+    qualified = {}
+    for corpus_name, file_reports in corpus_reports.items():
+        for file_key, file_report in file_reports.items():
+            if file_key != MASTER_REPORT_KEY:
+                qualified[(corpus_name, file_key)] = file_report
+    return qualified
+
+
+def add_bo_scores(parts):
+    """
+    Sum several (bon1_dict, bon2_dict) results word by word.
+
+    BO normalizers only depend on the two texts of a pair, so the scores of
+    disjoint sets of text pairs add up to the scores of their union.
+    """
+    bon1, bon2 = {}, {}
+    for part1, part2 in parts:
+        for w, score in part1.items():
+            bon1[w] = bon1.get(w, 0.0) + score
+        for w, score in part2.items():
+            bon2[w] = bon2.get(w, 0.0) + score
+    return bon1, bon2
+
+
+def compute_cross_bo_scores(name_a, reports_a, name_b, reports_b, block_size=DEFAULT_BLOCK_SIZE,
+                            column_chunk=DEFAULT_COLUMN_CHUNK, workers=None):
+    """
+    BO scores summed over the text pairs (T1 in corpus A, T2 in corpus B)
+    only, computed block by block with the matrix engine.
+
+    Returns (bon1_dict, bon2_dict) for the words found in both corpora.
+    """
+    qualified = qualify_corpus_reports({name_a: reports_a})
+    split = len(qualified)
+    qualified.update(qualify_corpus_reports({name_b: reports_b}))
+    matrix = BOTextMatrix.from_file_reports(qualified)
+    if split == 0 or split == matrix.n_texts:
+        return {}, {}
+
+    bon1, bon2 = compute_bo_score_arrays(matrix, block_size, column_chunk, workers, split=split)
+    boundary = matrix.indptr[split]
+    in_a = np.bincount(matrix.indices[:boundary], minlength=matrix.n_words) > 0
+    in_b = np.bincount(matrix.indices[boundary:], minlength=matrix.n_words) > 0
+    word_ids = np.flatnonzero(in_a & in_b)
+    words = [matrix.vocabulary[i] for i in word_ids]
+    debug(f"{name_a!r} x {name_b!r}: {split} x {matrix.n_texts - split} texts, {len(words)} shared words.")
+    return dict(zip(words, bon1[word_ids].tolist())), dict(zip(words, bon2[word_ids].tolist()))
+
+
+def compute_multi_corpus_bo_scores(corpus_reports, within=None, cross=None, engine="matrix"):
+    """
+    BO scores of the union of several corpora, texts keyed by (corpus, file).
+
+    The result is the sum of each corpus' within-corpus scores and of the
+    cross-corpus scores of every corpus pair. Parts already known can be
+    passed in and are not recomputed:
+      within: {corpus_name: (bon1_dict, bon2_dict)}
+      cross:  {(name_a, name_b): (bon1_dict, bon2_dict)} with name_a < name_b
+
+    Returns (bon1_dict, bon2_dict).
+    """
+    within = dict(within or {})
+    cross = dict(cross or {})
+    names = sorted(corpus_reports)
+    for name in names:
+        if name not in within:
+            texts = {k: r for k, r in corpus_reports[name].items() if k != MASTER_REPORT_KEY}
+            within[name] = compute_bo_scores(texts, engine=engine) if len(texts) >= 2 else ({}, {})
+    for name_a, name_b in combinations(names, 2):
+        if (name_a, name_b) not in cross:
+            cross[(name_a, name_b)] = compute_cross_bo_scores(
+                name_a, corpus_reports[name_a], name_b, corpus_reports[name_b]
+            )
+    return add_bo_scores(
+        [within[name] for name in names] + [cross[pair] for pair in combinations(names, 2)]
+    )
@@ -0,0 +1,283 @@
+import threading
+from collections import namedtuple
+
+from analysis.bo_engine import resolve_workers
+from analysis.bo_incremental import IncrementalBOScores
+from analysis.bo_multi_corpus import add_bo_scores, compute_cross_bo_scores, qualify_corpus_reports
+from analysis.bo_topk import TopKBOQuery
+
+##############################################################################
+# Debug helper and toggle for debug messages
+##############################################################################
+DEBUG_MODE = False  # Set to True to enable debug logs
+
+MASTER_REPORT_KEY = "Master Report"
+
+
+def debug(msg: str):
+    if DEBUG_MODE:
+        print(f"[DEBUG bo_service] {msg}")
+
+
+# bon1/bon2 are tuples of (word, score) sorted by descending score.
+BOResult = namedtuple("BOResult", ["bon1", "bon2"])
+
+EMPTY_RESULT = BOResult((), ())
+
+
+def merge_corpus_reports(corpus_reports):
+    """
+    Merge several corpus reports ({file_key: file_report}) into one dict,
+    dropping each corpus' Master Report.
+    """
+    merged = {}
+    for corpus_report in corpus_reports:
+        for file_key, file_report in corpus_report.items():
+            if file_key != MASTER_REPORT_KEY:
+                merged[file_key] = file_report
+    return merged
+
+
+class BOResultService:
+    """
+    Memoizes BO scores per selected corpus set so the bar, line and table
+    cells share one computation.
+
+    Results are keyed by the sorted corpus names plus the revision of each
+    corpus report in the CorpusReportManager. Storing a new report bumps its
+    revision, so a stale entry is simply never hit again and is replaced on
+    the next request for that corpus set.
+
+    Single-corpus scores are kept by an IncrementalBOScores per corpus, so
+    when a report changes by a few files only the pairs involving those
+    files are recomputed.
+
+    Several corpora are combined with texts keyed by (corpus, file): the
+    result is the sum of each corpus' own scores and the cross-corpus
+    scores of every corpus pair, which are cached by the revisions of the
+    two corpora. Changing one corpus only recomputes its own part and its
+    cross blocks.
+
+    Views that only show the best words can ask for get_top_results(),
+    which prunes the vocabulary with per-word upper bounds instead of
+    scoring every word, unless the full result is already cached.
+
+    The get_* methods may run on a job queue worker. They then take the
+    reports from `snapshots`, resolved with snapshot() on the GUI thread,
+    and never touch the report manager, which is not thread-safe; the
+    service's own caches are guarded by a lock.
+
+    Usage:
+      service = BOResultService(report_manager)  # workers=4 to cap BO processes
+      result = service.get_results(["Corpus A", "Corpus B"])
+      snapshots = service.snapshot(["Corpus A"])  # on the GUI thread
+      service.get_results(["Corpus A"], snapshots)  # then on any thread
+      result.bon1[:10]  # top ten (word, BOn1) pairs
+      service.get_top_results(["Corpus A"], 50, "bon1")
+      service.get_cross_results("Corpus A", "Corpus B")  # A vs B pairs only
+    """
+
+    def __init__(self, report_manager, engine="matrix", workers=None):
+        self.report_manager = report_manager
+        self.engine = engine
+        # processes the matrix engine spreads block pairs over (None = one per core)
+        self.workers = workers
+        # (corpus names...) -> (fingerprint, BOResult)
+        self.cache = {}
+        # corpus name -> IncrementalBOScores
+        self.maintainers = {}
+        # (corpus names...) -> (fingerprint, TopKBOQuery, {(k, kind): top tuple})
+        self.top_queries = {}
+        # (name_a, name_b) with name_a < name_b -> (fingerprint, (bon1_dict, bon2_dict))
+        self.cross_cache = {}
+        self.hits = 0
+        self.misses = 0
+        # reentrant: get_results takes it again through cross_scores
+        self.lock = threading.RLock()
+
+    def snapshot(self, corpus_ids):
+        """
+        {name: (revision, report)} of the given corpora, from the report
+        manager. Call on the thread that owns the manager.
+        """
+        return {
+            name: (self.report_manager.get_report_revision(name), self.report_manager.get_report_for_corpus(name))
+            for name in sorted(set(corpus_ids))
+        }
+
+    @staticmethod
+    def fingerprint(corpus_key, snapshots):
+        """
+        Revisions of every report in corpus_key, or None if one is missing.
+        """
+        revisions = tuple(snapshots[name][0] for name in corpus_key)
+        if None in revisions:
+            return None
+        return revisions
+
+    def get_results(self, corpus_ids, snapshots=None):
+        """
+        Return the BOResult for the union of the given corpora.
+
+        The returned tuples are shared between callers and must not be
+        modified. Returns EMPTY_RESULT if a report is missing or the corpora
+        contain no texts.
+        """
+        if snapshots is None:
+            snapshots = self.snapshot(corpus_ids)
+        with self.lock:
+            return self._get_results(tuple(sorted(set(corpus_ids))), snapshots)
+
+    def _get_results(self, corpus_key, snapshots):
+        fingerprint = self.fingerprint(corpus_key, snapshots)
+        if fingerprint is None:
+            debug(f"No report for some of {corpus_key}; returning empty result.")
+            return EMPTY_RESULT
+
+        cached = self.cache.get(corpus_key)
+        if cached is not None and cached[0] == fingerprint:
+            self.hits += 1
+            debug(f"Cache hit for {corpus_key} (revisions={fingerprint}).")
+            return cached[1]
+
+        self.misses += 1
+        debug(f"Cache miss for {corpus_key} (revisions={fingerprint}); computing.")
+        if len(corpus_key) == 1:
+            bon1_dict, bon2_dict = self.single_corpus_scores(corpus_key[0], *snapshots[corpus_key[0]])
+        else:
+            parts = [self.single_corpus_scores(name, *snapshots[name]) for name in corpus_key]
+            parts += [self.cross_scores(name_a, name_b, snapshots)
+                      for i, name_a in enumerate(corpus_key) for name_b in corpus_key[i + 1:]]
+            bon1_dict, bon2_dict = add_bo_scores(parts)
+        result = self.sorted_result(bon1_dict, bon2_dict)
+        self.cache[corpus_key] = (fingerprint, result)
+        return result
+
+    @staticmethod
+    def sorted_result(bon1_dict, bon2_dict):
+        if not bon1_dict and not bon2_dict:
+            return EMPTY_RESULT
+        return BOResult(
+            tuple(sorted(bon1_dict.items(), key=lambda x: x[1], reverse=True)),
+            tuple(sorted(bon2_dict.items(), key=lambda x: x[1], reverse=True)),
+        )
+
+    def cross_scores(self, name_a, name_b, snapshots):
+        """
+        (bon1_dict, bon2_dict) summed over the pairs between two corpora,
+        cached by the revisions of both reports.
+        """
+        pair = tuple(sorted((name_a, name_b)))
+        fingerprint = self.fingerprint(pair, snapshots)
+        with self.lock:
+            cached = self.cross_cache.get(pair)
+            if cached is not None and cached[0] == fingerprint:
+                return cached[1]
+            debug(f"Computing cross-corpus BO block {pair} (revisions={fingerprint}).")
+            scores = compute_cross_bo_scores(pair[0], snapshots[pair[0]][1], pair[1], snapshots[pair[1]][1],
+                                             workers=self.workers)
+            self.cross_cache[pair] = (fingerprint, scores)
+            return scores
+
+    def get_cross_results(self, name_a, name_b, snapshots=None):
+        """
+        Return the BOResult of corpus A vs corpus B: only pairs with one text
+        in each corpus are counted. EMPTY_RESULT if a report is missing.
+        """
+        if name_a == name_b:
+            return EMPTY_RESULT
+        if snapshots is None:
+            snapshots = self.snapshot((name_a, name_b))
+        if self.fingerprint((name_a, name_b), snapshots) is None:
+            return EMPTY_RESULT
+        return self.sorted_result(*self.cross_scores(name_a, name_b, snapshots))
+
+    def get_top_results(self, corpus_ids, k, kind="bon1", snapshots=None):
+        """
+        Return the k best (word, score) pairs of `kind` ("bon1"/"bon2") for
+        the union of the given corpora, best first.
+
+        Slices the full result when it is already cached for the current
+        revisions; otherwise runs a pruned top-k query, whose bounds are
+        kept for later calls with other k or kind.
+        """
+        if snapshots is None:
+            snapshots = self.snapshot(corpus_ids)
+        with self.lock:
+            return self._get_top_results(tuple(sorted(set(corpus_ids))), k, kind, snapshots)
+
+    def _get_top_results(self, corpus_key, k, kind, snapshots):
+        fingerprint = self.fingerprint(corpus_key, snapshots)
+        if fingerprint is None:
+            debug(f"No report for some of {corpus_key}; returning empty top list.")
+            return ()
+
+        cached = self.cache.get(corpus_key)
+        if cached is not None and cached[0] == fingerprint:
+            self.hits += 1
+            return getattr(cached[1], kind)[:k]
+
+        entry = self.top_queries.get(corpus_key)
+        if entry is None or entry[0] != fingerprint:
+            merged = qualify_corpus_reports({name: snapshots[name][1] for name in corpus_key})
+            entry = (fingerprint, TopKBOQuery.from_file_reports(merged) if merged else None, {})
+            self.top_queries[corpus_key] = entry
+        _, query, results = entry
+        if (k, kind) in results:
+            self.hits += 1
+            return results[(k, kind)]
+
+        self.misses += 1
+        debug(f"Top-{k} {kind} query for {corpus_key} (revisions={fingerprint}).")
+        top = tuple(query.top_k(k, kind)) if query is not None else ()
+        results[(k, kind)] = top
+        return top
+
+    def single_corpus_scores(self, corpus_name, revision, file_reports):
+        """
+        Bring the corpus' incremental maintainer in line with file_reports
+        (revision `revision` of its report) and return its (bon1_dict, bon2_dict).
+        """
+        maintainer = self.maintainers.get(corpus_name)
+        if maintainer is None:
+            maintainer = IncrementalBOScores(engine=self.engine, workers=self.workers)
+            self.maintainers[corpus_name] = maintainer
+        changes = maintainer.sync(file_reports, revision)
+        if changes is None:
+            debug(f"Rebuilt BO scores for {corpus_name!r}.")
+        else:
+            debug(f"Updated BO scores for {corpus_name!r}: {changes[0]} added, {changes[1]} removed.")
+        return maintainer.get_bo_scores()
+
+    def set_workers(self, workers):
+        """
+        Use `workers` processes (None = one per core) for later computations.
+        The scores do not depend on it, so cached results stay valid.
+        """
+        resolve_workers(workers)  # rejects counts below 1
+        with self.lock:
+            self.workers = workers
+            for maintainer in self.maintainers.values():
+                maintainer.workers = workers
+
+    def invalidate(self, corpus_name=None):
+        """
+        Drop cached results involving corpus_name, or everything if None.
+        """
+        with self.lock:
+            self._invalidate(corpus_name)
+
+    def _invalidate(self, corpus_name):
+        if corpus_name is None:
+            self.cache.clear()
+            self.maintainers.clear()
+            self.top_queries.clear()
+            self.cross_cache.clear()
+            return
+        for corpus_key in [key for key in self.cache if corpus_name in key]:
+            del self.cache[corpus_key]
+        for corpus_key in [key for key in self.top_queries if corpus_name in key]:
+            del self.top_queries[corpus_key]
+        for pair in [key for key in self.cross_cache if corpus_name in key]:
+            del self.cross_cache[pair]
+        self.maintainers.pop(corpus_name, None)
@@ -0,0 +1,215 @@
+import heapq
+
+import numpy as np
+
+from analysis.bo_engine import BOTextMatrix, _pair_weights
+
+##############################################################################
+# Debug helper and toggle for debug messages
+##############################################################################
+DEBUG_MODE = False  # Set to True to enable debug logs
+
+# Number of words the BO bar chart shows in its "top only" mode.
+DEFAULT_TOP_K = 50
+
+# Words scored together: they share one pass over the pair weights.
+SCORE_BATCH = 16
+
+# Upper bound on elements of the (rows, texts) pair-weight temporaries built
+# while scoring a batch of words.
+MAX_WEIGHT_ELEMENTS = 1 << 22
+
+# Relative slack added to the upper bounds so summation-order rounding can
+# never make an exact score exceed its bound.
+BOUND_SLACK = 1e-9
+
+
+def debug(msg: str):
+    if DEBUG_MODE:
+        print(f"[DEBUG bo_topk] {msg}")
+
+
+def _ranges(starts, lengths):
+    """
+    Concatenated index ranges [start, start + length) and, for every index,
+    the position of the range it came from.
+    """
+    owners = np.repeat(np.arange(len(starts)), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    return np.asarray(starts)[owners] + np.arange(len(owners)) - offsets[owners], owners
+
+
+class TopKBOQuery:
+    """
+    Exact top-K BOn1/BOn2 words without scoring the whole vocabulary.
+
+    A word's score sums p1 * p2 * W[T1, T2] over the pairs of texts that
+    contain it. Over those pairs sum(p1 * p2) = ((sum p)**2 - sum p**2) / 2
+    is known from the word's postings alone, and the pair weight is bounded
+    by the texts containing the word:
+
+      BOn1: W = 2 / (avg_f1 + avg_f2)        <= 1 / min avg_f
+      BOn2: W = 2 |V1 u V2| / (sum_f1 + sum_f2) <= (2 max |V| - 1) / min sum_f
+
+    Words are scored exactly in decreasing order of their bound, and the
+    search stops as soon as the next bound falls below the K-th best exact
+    score. The returned scores are exact; words never scored are skipped.
+
+    Usage:
+      query = TopKBOQuery.from_file_reports(file_reports)
+      query.top_k(50, "bon1")  # [(word, BOn1), ...] best first
+    """
+
+    def __init__(self, matrix):
+        self.matrix = matrix
+        # CSC view: for every word, the texts containing it and their freqs
+        row_ids = np.repeat(np.arange(matrix.n_texts), matrix.sizes)
+        order = np.argsort(matrix.indices, kind="stable")
+        self.posting_rows = row_ids[order]
+        self.posting_freqs = matrix.freqs[order]
+        self.posting_ptr = np.concatenate([[0], np.cumsum(matrix.doc_freqs)])
+        self.row_ptr = np.concatenate([[0], np.cumsum(matrix.sizes)])
+        self._bounds = {}
+        self.words_scored = 0
+
+    @classmethod
+    def from_file_reports(cls, file_reports):
+        return cls(BOTextMatrix.from_file_reports(file_reports))
+
+    ##########################################################################
+    # Bounds
+    ##########################################################################
+    def bounds(self, kind):
+        """Upper bound of the `kind` ("bon1"/"bon2") score of every word."""
+        if kind not in self._bounds:
+            m = self.matrix
+            columns = m.indices
+            row_ids = np.repeat(np.arange(m.n_texts), m.sizes)
+            sum_p = np.bincount(columns, weights=m.freqs, minlength=m.n_words)
+            sum_p2 = np.bincount(columns, weights=m.freqs ** 2, minlength=m.n_words)
+            pair_products = np.maximum((sum_p ** 2 - sum_p2) / 2.0, 0.0)
+
+            if kind == "bon1":
+                min_mean = np.full(m.n_words, np.inf)
+                np.minimum.at(min_mean, columns, m.mean_freqs[row_ids])
+                max_weight = np.zeros(m.n_words)
+                np.divide(1.0, min_mean, out=max_weight, where=min_mean > 0)
+            elif kind == "bon2":
+                max_size = np.zeros(m.n_words)
+                np.maximum.at(max_size, columns, m.sizes[row_ids].astype(np.float64))
+                min_sum = np.full(m.n_words, np.inf)
+                np.minimum.at(min_sum, columns, m.freq_sums[row_ids])
+                max_weight = np.zeros(m.n_words)
+                np.divide(2.0 * max_size - 1.0, min_sum, out=max_weight, where=min_sum > 0)
+            else:
+                raise ValueError(f"Unknown BO score kind: {kind!r}")
+
+            bounds = pair_products * max_weight * (1.0 + BOUND_SLACK)
+            bounds[m.doc_freqs < 2] = 0.0
+            self._bounds[kind] = bounds
+        return self._bounds[kind]
+
+    ##########################################################################
+    # Exact scores
+    ##########################################################################
+    def shared_counts(self, rows, texts):
+        """
+        (len(rows), len(texts)) matrix of |V1 n V2| for the given text pairs,
+        counted over the postings of the rows' words, so only the pairs a
+        batch scores are ever built. Only needed for BOn2.
+        """
+        m = self.matrix
+        n = len(texts)
+        local = np.full(m.n_texts, -1, dtype=np.int64)
+        local[texts] = np.arange(n)
+        entry_ids, entry_rows = _ranges(self.row_ptr[rows], m.sizes[rows])
+        words = m.indices[entry_ids]
+        shared = m.doc_freqs[words] >= 2  # other words can't be in two texts
+        words, entry_rows = words[shared], entry_rows[shared]
+
+        counts = np.zeros(len(rows) * n)
+        # postings are expanded a slice of words at a time to bound temporaries
+        cost = np.cumsum(m.doc_freqs[words])
+        start = 0
+        while start < len(words):
+            done = cost[start - 1] if start else 0
+            stop = max(start + 1, int(np.searchsorted(cost, done + MAX_WEIGHT_ELEMENTS, side="right")))
+            posting_ids, owners = _ranges(self.posting_ptr[words[start:stop]], m.doc_freqs[words[start:stop]])
+            columns = local[self.posting_rows[posting_ids]]
+            hit = columns >= 0
+            counts += np.bincount(entry_rows[start:stop][owners[hit]] * n + columns[hit], minlength=counts.size)
+            start = stop
+        return counts.reshape(len(rows), n)
+
+    def score_words(self, word_ids, kind):
+        """
+        Exact BOn1 or BOn2 of several words: for each, the sum over pairs of
+        texts containing it. Returns an array aligned with word_ids.
+        """
+        m = self.matrix
+        spans = [(self.posting_ptr[w], self.posting_ptr[w + 1]) for w in word_ids]
+        texts = np.unique(np.concatenate([self.posting_rows[lo:hi] for lo, hi in spans]))
+        local = np.full(m.n_texts, -1, dtype=np.int64)
+        local[texts] = np.arange(len(texts))
+
+        # (texts, words) relative frequencies of the batch
+        dense = np.zeros((len(texts), len(word_ids)))
+        for col, (lo, hi) in enumerate(spans):
+            dense[local[self.posting_rows[lo:hi]], col] = self.posting_freqs[lo:hi]
+
+        n = len(texts)
+        step = max(1, MAX_WEIGHT_ELEMENTS // n)
+        totals = np.zeros(len(word_ids))
+        for start in range(0, n, step):
+            rows = texts[start:start + step]
+            counts = self.shared_counts(rows, texts) if kind == "bon2" else np.zeros((len(rows), n))
+            weights1, weights2 = _pair_weights(
+                m.mean_freqs[rows], m.mean_freqs[texts], m.freq_sums[rows], m.freq_sums[texts],
+                m.sizes[rows], m.sizes[texts], counts,
+            )
+            weights = weights1 if kind == "bon1" else weights2
+            # only T1 < T2: drop self pairs, then halve the symmetric sum
+            weights[np.arange(len(rows)), start + np.arange(len(rows))] = 0.0
+            totals += np.einsum("ij,ij->j", dense[start:start + step], weights @ dense) / 2.0
+        self.words_scored += len(word_ids)
+        return totals
+
+    ##########################################################################
+    # Query
+    ##########################################################################
+    def top_k(self, k, kind="bon1"):
+        """
+        The k best words for `kind` as (word, score), highest score first,
+        ties in vocabulary order like a stable sort of the full scores.
+        """
+        bounds = self.bounds(kind)
+        candidates = np.flatnonzero(bounds > 0)
+        order = candidates[np.argsort(-bounds[candidates], kind="stable")]
+        best = []  # min-heap of (score, -word_id)
+        scored_before = self.words_scored
+        for start in range(0, len(order), SCORE_BATCH):
+            batch = order[start:start + SCORE_BATCH]
+            if len(best) == k:
+                batch = batch[bounds[batch] >= best[0][0]]
+                if not len(batch):
+                    break
+            for word_id, score in zip(batch, self.score_words(batch, kind)):
+                item = (float(score), -int(word_id))
+                if len(best) < k:
+                    heapq.heappush(best, item)
+                elif item > best[0]:
+                    heapq.heapreplace(best, item)
+        debug(f"top {k} {kind}: scored {self.words_scored - scored_before} of {len(candidates)} shared words.")
+        best.sort(reverse=True)
+        return [(self.matrix.vocabulary[-neg_id], score) for score, neg_id in best]
+
+
+def top_k_bo_scores(file_reports, k=DEFAULT_TOP_K):
+    """
+    The k highest BOn1 and BOn2 words of file_reports (Master excluded).
+
+    Returns (bon1_top, bon2_top): lists of (word, score) sorted by descending
+    score, with the same values compute_bo_scores() gives for those words.
+    """
+    query = TopKBOQuery.from_file_reports(file_reports)
+    return query.top_k(k, "bon1"), query.top_k(k, "bon2")
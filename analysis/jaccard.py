@@ -0,0 +1,254 @@
+import hashlib
+from collections import Counter, namedtuple
+
+import numpy as np
+
+##############################################################################
+# Debug helper and toggle for debug messages
+##############################################################################
+DEBUG_MODE = False  # Set to True to enable debug logs
+
+MASTER_REPORT_KEY = "Master Report"
+
+# Largest corpus for which the exact bitset engine is used by default.
+EXACT_MAX_TEXTS = 4000
+
+# Default number of MinHash permutations. The standard error of a MinHash
+# Jaccard estimate is about sqrt(J * (1 - J) / num_perm), i.e. <= 0.03 at 256.
+DEFAULT_NUM_PERM = 256
+
+# Upper bound on elements of the temporary (rows_i, rows_j, width) arrays
+# built while comparing two blocks of texts.
+MAX_BLOCK_ELEMENTS = 1 << 22
+
+# Mask for the 32-bit hash values kept in MinHash signatures.
+_HASH_MASK = np.uint64(0xFFFFFFFF)
+_SHIFT_32 = np.uint64(32)
+
+
+def debug(msg: str):
+    if DEBUG_MODE:
+        print(f"[DEBUG jaccard] {msg}")
+
+
+# text_keys: list of text keys; matrix: float32 (N, N) Jaccard indices;
+# method: "exact" or "minhash".
+JaccardResult = namedtuple("JaccardResult", ["text_keys", "matrix", "method"])
+
+
+def build_word_sets(file_reports):
+    """
+    Return (text_keys, word_sets) for every text except the Master Report.
+    """
+    text_keys = []
+    word_sets = []
+    for text_key, report in file_reports.items():
+        if text_key == MASTER_REPORT_KEY:
+            continue
+        text_keys.append(text_key)
+        word_sets.append({ws[0] for ws in report["data"]["word_stats"]})
+    return text_keys, word_sets
+
+
+##############################################################################
+# Exact engine: packed bitsets + popcount
+##############################################################################
+if hasattr(np, "bitwise_count"):
+    popcount = np.bitwise_count
+else:
+    _POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(words):
+        """Per-element popcount of a uint64 array (for numpy < 2.0)."""
+        words = np.ascontiguousarray(words, dtype=np.uint64)
+        counts = _POPCOUNT_TABLE[words.view(np.uint8)]
+        return counts.reshape(words.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+def pack_bitsets(word_sets):
+    """
+    Pack word sets into a (N, ceil(V / 64)) uint64 bit matrix.
+
+    Only words found in at least two texts get a bit: the others can never
+    be part of an intersection, and in a Zipfian corpus they are most of the
+    vocabulary. Set sizes are returned separately and count every word.
+
+    Returns:
+      (bits, sizes)
+    """
+    doc_freqs = Counter()
+    for words in word_sets:
+        doc_freqs.update(words)
+    shared_ids = {}
+    for word, df in doc_freqs.items():
+        if df >= 2:
+            shared_ids[word] = len(shared_ids)
+
+    n_blocks = max(1, -(-len(shared_ids) // 64))
+    bits = np.zeros((len(word_sets), n_blocks), dtype=np.uint64)
+    for row, words in enumerate(word_sets):
+        cols = np.fromiter((shared_ids[w] for w in words if w in shared_ids), dtype=np.int64)
+        if len(cols):
+            masks = np.left_shift(np.uint64(1), (cols & 63).astype(np.uint64))
+            np.bitwise_or.at(bits[row], cols >> 6, masks)
+    sizes = np.array([len(words) for words in word_sets], dtype=np.int64)
+    debug(f"Packed {len(word_sets)} sets over {len(shared_ids)} shared words ({n_blocks} words per row).")
+    return bits, sizes
+
+
+def _row_blocks(n_rows, width):
+    """Yield (start, stop) row ranges sized for MAX_BLOCK_ELEMENTS comparisons."""
+    block = max(1, int(np.sqrt(MAX_BLOCK_ELEMENTS / max(width, 1))))
+    for start in range(0, n_rows, block):
+        yield start, min(start + block, n_rows)
+
+
+def _jaccard_from_counts(intersections, sizes_i, sizes_j):
+    unions = sizes_i[:, None] + sizes_j[None, :] - intersections
+    result = np.zeros(intersections.shape, dtype=np.float32)
+    np.divide(intersections, unions, out=result, where=unions > 0, casting="unsafe")
+    return result
+
+
+def exact_jaccard_matrix(word_sets):
+    """
+    Exact pairwise Jaccard index |A n B| / |A u B| for every pair of sets.
+
+    Intersections are popcounts of AND-ed packed bitsets, computed block
+    against block so temporaries stay bounded. The Jaccard index of two
+    empty sets is 0.
+    """
+    bits, sizes = pack_bitsets(word_sets)
+    n_texts, width = bits.shape
+    matrix = np.zeros((n_texts, n_texts), dtype=np.float32)
+    blocks = list(_row_blocks(n_texts, width))
+    for a, (i0, i1) in enumerate(blocks):
+        for j0, j1 in blocks[a:]:
+            both = bits[i0:i1, None, :] & bits[None, j0:j1, :]
+            intersections = popcount(both).sum(axis=-1, dtype=np.int64)
+            block = _jaccard_from_counts(intersections, sizes[i0:i1], sizes[j0:j1])
+            matrix[i0:i1, j0:j1] = block
+            matrix[j0:j1, i0:i1] = block.T
+    # words unique to a text have no bit, so self-intersections are undercounted
+    np.fill_diagonal(matrix, (sizes > 0).astype(np.float32))
+    return matrix
+
+
+##############################################################################
+# MinHash engine
+##############################################################################
+def stable_word_hashes(words):
+    """
+    64-bit hashes of words that are stable across runs (unlike hash()).
+    """
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(w.encode("utf-8"), digest_size=8).digest(), "little") for w in words),
+        dtype=np.uint64,
+        count=len(words),
+    )
+
+
+class MinHasher:
+    """
+    MinHash signatures over word sets.
+
+    Each of num_perm permutations is a multiply-shift hash
+    h(x) = ((a * x + b) mod 2**64) >> 32 of a stable 64-bit word hash, with
+    a odd. A signature keeps the minimum of each hash over the set, and the
+    fraction of equal positions in two signatures estimates their Jaccard
+    index. Signatures depend only on the words and the seed, so they can be
+    compared across corpora and sessions.
+
+    Usage:
+      hasher = MinHasher(num_perm=256)
+      signatures = hasher.signatures(word_sets)
+    """
+
+    EMPTY = np.uint32(0xFFFFFFFF)
+
+    def __init__(self, num_perm=DEFAULT_NUM_PERM, seed=1):
+        if num_perm < 1:
+            raise ValueError(f"num_perm must be at least 1, got {num_perm}")
+        self.num_perm = num_perm
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(0, 2**63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+        self.word_hashes = {}  # word -> stable 64-bit hash
+
+    def hash_words(self, words):
+        missing = [w for w in words if w not in self.word_hashes]
+        if missing:
+            self.word_hashes.update(zip(missing, stable_word_hashes(missing).tolist()))
+        return np.fromiter((self.word_hashes[w] for w in words), dtype=np.uint64, count=len(words))
+
+    def signature(self, words):
+        """
+        Signature of one word set as a uint32 array of length num_perm.
+        An empty set gets all EMPTY values.
+        """
+        words = list(words)
+        if not words:
+            return np.full(self.num_perm, self.EMPTY, dtype=np.uint32)
+        hashes = self.hash_words(words)
+        permuted = (hashes[:, None] * self.a[None, :] + self.b[None, :]) >> _SHIFT_32
+        return (permuted.min(axis=0) & _HASH_MASK).astype(np.uint32)
+
+    def signatures(self, word_sets):
+        """(N, num_perm) signature matrix for a list of word sets."""
+        signatures = np.empty((len(word_sets), self.num_perm), dtype=np.uint32)
+        for row, words in enumerate(word_sets):
+            signatures[row] = self.signature(words)
+        return signatures
+
+
+def minhash_jaccard_matrix(signatures, empty=None):
+    """
+    Estimated pairwise Jaccard index from MinHash signatures.
+
+    empty, if given, flags empty sets; their rows and columns are set to 0.
+    """
+    n_texts, num_perm = signatures.shape
+    matrix = np.zeros((n_texts, n_texts), dtype=np.float32)
+    blocks = list(_row_blocks(n_texts, num_perm))
+    for a, (i0, i1) in enumerate(blocks):
+        for j0, j1 in blocks[a:]:
+            equal = signatures[i0:i1, None, :] == signatures[None, j0:j1, :]
+            block = (equal.sum(axis=-1) / num_perm).astype(np.float32)
+            matrix[i0:i1, j0:j1] = block
+            matrix[j0:j1, i0:i1] = block.T
+    if empty is not None and np.any(empty):
+        matrix[empty, :] = 0.0
+        matrix[:, empty] = 0.0
+    return matrix
+
+
+##############################################################################
+# Driver
+##############################################################################
+def compute_jaccard_matrix(file_reports, method="auto", num_perm=DEFAULT_NUM_PERM,
+                           exact_max_texts=EXACT_MAX_TEXTS):
+    """
+    Pairwise Jaccard index of the word sets of every text (Master excluded).
+
+    method:
+      "exact"   -> packed bitsets + popcount
+      "minhash" -> MinHash estimate with num_perm permutations
+      "auto"    -> exact up to exact_max_texts texts, MinHash beyond
+
+    Returns a JaccardResult(text_keys, matrix, method).
+    """
+    text_keys, word_sets = build_word_sets(file_reports)
+    if method == "auto":
+        method = "exact" if len(text_keys) <= exact_max_texts else "minhash"
+    debug(f"Computing {method} Jaccard matrix for {len(text_keys)} texts.")
+
+    if method == "exact":
+        matrix = exact_jaccard_matrix(word_sets)
+    elif method == "minhash":
+        signatures = MinHasher(num_perm).signatures(word_sets)
+        empty = np.array([not words for words in word_sets], dtype=bool)
+        matrix = minhash_jaccard_matrix(signatures, empty)
+    else:
+        raise ValueError(f"Unknown Jaccard method: {method!r}")
+    return JaccardResult(text_keys, matrix, method)
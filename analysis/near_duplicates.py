@@ -0,0 +1,174 @@
+import numpy as np
+
+from analysis.jaccard import MinHasher
+
+##############################################################################
+# Debug helper and toggle for debug messages
+##############################################################################
+DEBUG_MODE = False  # Set to True to enable debug logs
+
+DEFAULT_NUM_PERM = 128
+DEFAULT_THRESHOLD = 0.8
+
+
+def debug(msg: str):
+    if DEBUG_MODE:
+        print(f"[DEBUG near_duplicates] {msg}")
+
+
+def choose_bands(num_perm, threshold):
+    """
+    Pick (bands, rows) with bands * rows <= num_perm whose LSH S-curve
+    1 - (1 - s**rows)**bands crosses 0.5 closest to threshold.
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        # similarity at which a pair becomes a candidate with probability 1/2
+        midpoint = (1.0 - 0.5 ** (1.0 / bands)) ** (1.0 / rows)
+        score = abs(midpoint - threshold)
+        if best is None or score < best[0]:
+            best = (score, bands, rows)
+    return best[1], best[2]
+
+
+class NearDuplicateIndex:
+    """
+    Locality-sensitive hashing index over MinHash signatures of word sets.
+
+    Each signature is cut into `bands` bands of `rows` values; texts sharing
+    any band bucket become candidates, and candidates are confirmed by their
+    estimated Jaccard similarity. Texts can be added and removed one at a
+    time, so the index grows as files are imported.
+
+    Usage:
+      index = NearDuplicateIndex(threshold=0.8)
+      index.add("a.txt", words_a)
+      index.add("b.txt", words_b)
+      index.query("a.txt")             # [("b.txt", 0.93)]
+      index.clusters(keys=corpus_files) # [["a.txt", "b.txt"], ...]
+    """
+
+    def __init__(self, num_perm=DEFAULT_NUM_PERM, threshold=DEFAULT_THRESHOLD, seed=1):
+        self.hasher = MinHasher(num_perm=num_perm, seed=seed)
+        self.threshold = threshold
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+        self.signatures = {}                               # key -> uint32 signature
+        self.buckets = [dict() for _ in range(self.bands)]  # band -> {band bytes: set(keys)}
+        debug(f"LSH index with {self.bands} bands x {self.rows} rows for threshold {threshold}.")
+
+    def __contains__(self, key):
+        return key in self.signatures
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, key, words):
+        """Index (or re-index) key under the word set `words`."""
+        self.add_signature(key, self.hasher.signature(words))
+
+    def add_signature(self, key, signature):
+        if key in self.signatures:
+            self.remove(key)
+        self.signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self.buckets[band].setdefault(band_key, set()).add(key)
+
+    def remove(self, key):
+        signature = self.signatures.pop(key, None)
+        if signature is None:
+            return
+        for band, band_key in self._band_keys(signature):
+            bucket = self.buckets[band].get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self.buckets[band][band_key]
+
+    def similarity(self, key_a, key_b):
+        """Estimated Jaccard similarity of two indexed texts."""
+        return float(np.mean(self.signatures[key_a] == self.signatures[key_b]))
+
+    def candidates(self, signature):
+        """Keys sharing at least one band bucket with signature."""
+        found = set()
+        for band, band_key in self._band_keys(signature):
+            found.update(self.buckets[band].get(band_key, ()))
+        return found
+
+    def query(self, key=None, words=None, threshold=None):
+        """
+        Near duplicates of an indexed key, or of an arbitrary word set.
+
+        Returns a list of (key, estimated_similarity) at or above threshold,
+        most similar first.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        signature = self.signatures[key] if key is not None else self.hasher.signature(words)
+        results = []
+        for other in self.candidates(signature):
+            if other == key:
+                continue
+            similarity = float(np.mean(signature == self.signatures[other]))
+            if similarity >= threshold:
+                results.append((other, similarity))
+        results.sort(key=lambda x: (-x[1], x[0]))
+        return results
+
+    def clusters(self, threshold=None, keys=None):
+        """
+        Groups of near-duplicate texts: connected components of the pairs at
+        or above threshold. Only buckets are scanned, never all pairs.
+
+        keys restricts the search to a subset (e.g. one corpus). Returns a
+        list of clusters (sorted key lists, size >= 2), largest first.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        allowed = set(self.signatures) if keys is None else set(keys) & set(self.signatures)
+        parent = {}
+
+        def find(key):
+            root = key
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while key != root:
+                parent[key], key = root, parent.get(key, key)
+            return root
+
+        checked = set()
+        for band_buckets in self.buckets:
+            for bucket in band_buckets.values():
+                members = sorted(k for k in bucket if k in allowed)
+                for i, key_a in enumerate(members):
+                    for key_b in members[i + 1:]:
+                        if (key_a, key_b) in checked:
+                            continue
+                        checked.add((key_a, key_b))
+                        root_a, root_b = find(key_a), find(key_b)
+                        if root_a != root_b and self.similarity(key_a, key_b) >= threshold:
+                            parent.setdefault(root_b, root_b)
+                            parent[root_a] = root_b
+
+        groups = {}
+        for key in parent:
+            groups.setdefault(find(key), []).append(key)
+        result = [sorted(group) for group in groups.values() if len(group) >= 2]
+        result.sort(key=lambda group: (-len(group), group[0]))
+        debug(f"Found {len(result)} clusters among {len(allowed)} texts (threshold={threshold}).")
+        return result
+
+    def representatives(self, keys, threshold=None):
+        """
+        Filter keys (in order) so that only the first text of each
+        near-duplicate cluster is kept. Unindexed keys are always kept.
+        """
+        drop = set()
+        order = {key: pos for pos, key in enumerate(keys)}
+        for group in self.clusters(threshold=threshold, keys=keys):
+            keep = min(group, key=order.get)
+            drop.update(k for k in group if k != keep)
+        return [key for key in keys if key not in drop]
@@ -0,0 +1,414 @@
+import multiprocessing
+import os
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from analysis.advanced_analysis import calculate_overlap_assurance
+from analysis.bo_engine import resolve_workers
+from analysis.near_duplicates import NearDuplicateIndex
+from model.file_report_pool import MASTER_REPORT_KEY
+from model.report_codec import encode_report, decode_report
+from model.report_fingerprint import file_signature, file_signatures, tokenizer_fingerprint, analysis_config_fingerprint
+from model.report_snapshot import freeze_report
+from model.word_analyzer import read_and_preprocess_file, calculate_word_frequencies, get_text_statistics
+from tests.assurance_tests import (
+    independent_total_word_count,
+    independent_unique_word_count,
+    independent_percentage_sum,
+    independent_rank_count,
+    independent_total_from_counts
+)
+
+##############################################################################
+# Debug helper and toggle for debug messages
+##############################################################################
+DEBUG_MODE = False  # Set to True to enable debug logs
+
+# Fewer files than this are analyzed in-process by analyze_corpora; starting
+# worker processes costs more than it saves.
+PARALLEL_MIN_FILES = 400
+
+# How worker processes send file reports back (model.report_codec method,
+# level): the parent decodes them faster than it unpickles word_stats tuples.
+IPC_CODEC = ("zlib", 1)
+
+
+def debug(msg: str):
+    if DEBUG_MODE:
+        print(f"[DEBUG report_engine] {msg}")
+
+
+# Settings, besides the files, that shape a corpus report.
+# near_duplicate_threshold: keep one file per near-duplicate cluster at this
+# similarity (None = keep all files).
+AnalysisConfig = namedtuple("AnalysisConfig", ["near_duplicate_threshold"], defaults=(None,))
+
+
+class AnalysisCancelled(Exception):
+    """Raised by analyze_corpus when is_cancelled() turns true between files."""
+
+    def __init__(self, files_done):
+        super().__init__(f"Analysis cancelled after {files_done} files")
+        self.files_done = files_done
+
+
+def config_fingerprint(config):
+    """Fingerprint of an AnalysisConfig, stored in the Master Report."""
+    return analysis_config_fingerprint(config.near_duplicate_threshold)
+
+
+##############################################################################
+# Assurance tests
+##############################################################################
+def run_assurance_tests(stats, file_reports=None):
+    """
+    Runs independent assurance tests and returns the results.
+
+    With file_reports (the Master Report's case) the corpus vocabulary is
+    also checked against the per-text overlap: words shared by several
+    texts plus words unique to one text.
+
+    Returns:
+        tuple: (assurance_results, all_tests_passed)
+    """
+    # Extract data needed for assurance tests from stats
+    total_word_count = stats['total_word_count']
+    unique_word_count = stats['unique_word_count']
+    word_stats = stats['word_stats']
+
+    # Prepare data for assurance functions
+    word_counts = {word: count for word, count, _, _, _ in word_stats}
+    words_list = [word for word, count in word_counts.items() for _ in range(count)]
+
+    # Perform independent assurance calculations
+    ind_total_word_count = independent_total_word_count(words_list)
+    ind_unique_word_count = independent_unique_word_count(words_list)
+    ind_percentage_sum = independent_percentage_sum(word_counts)
+    ind_rank_count = independent_rank_count(word_stats)
+    ind_total_from_counts = independent_total_from_counts(word_counts)
+
+    # Prepare assurance results
+    assurance_results = {
+        'Total Word Count': {
+            'Expected': total_word_count,
+            'Actual': ind_total_word_count,
+            'Passed': total_word_count == ind_total_word_count
+        },
+        'Unique Word Count': {
+            'Expected': unique_word_count,
+            'Actual': ind_unique_word_count,
+            'Passed': unique_word_count == ind_unique_word_count
+        },
+        'Sum of Percentages': {
+            'Expected': 100.0,
+            'Actual': ind_percentage_sum,
+            'Passed': abs(ind_percentage_sum - 100.0) < 0.01  # Allow for small floating point errors
+        },
+        'Number of Ranks': {
+            'Expected': unique_word_count,
+            'Actual': ind_rank_count,
+            'Passed': unique_word_count == ind_rank_count
+        },
+        'Total from Counts': {
+            'Expected': total_word_count,
+            'Actual': ind_total_from_counts,
+            'Passed': total_word_count == ind_total_from_counts
+        }
+    }
+
+    if file_reports is not None:
+        overlap = calculate_overlap_assurance(file_reports)
+        overlap_total = overlap['total_intersection_words'] + overlap['total_unique_to_single_text']
+        assurance_results['Shared + Single-Text Words'] = {
+            'Expected': unique_word_count,
+            'Actual': overlap_total,
+            'Passed': overlap['assurance_passed'] and unique_word_count == overlap_total
+        }
+
+    # Determine overall pass/fail status
+    all_tests_passed = all(result['Passed'] for result in assurance_results.values())
+
+    return assurance_results, all_tests_passed
+
+
+##############################################################################
+# File and corpus reports
+##############################################################################
+def analyze_file(file, shared_report=None):
+    """
+    Analyze one file and run its assurance tests.
+
+    Args:
+        shared_report (dict): A report made earlier for this file, e.g. for
+            another corpus. It is reused if the file and tokenizer settings
+            have not changed since.
+
+    Returns:
+        tuple: (file_report, word_counts)
+    """
+    signature = file_signature(file)
+    tokenizer = tokenizer_fingerprint()
+    if (shared_report is not None and shared_report.get('signature') == signature
+            and shared_report.get('tokenizer') == tokenizer):
+        debug(f"Reusing shared report for {file}")
+        return shared_report, {ws[0]: ws[1] for ws in shared_report['data']['word_stats']}
+
+    words, _ = read_and_preprocess_file(file)
+    word_counts = calculate_word_frequencies(words)
+    stats = get_text_statistics(word_counts)
+    assurance_results, all_tests_passed = run_assurance_tests(stats)
+    file_report = {
+        'data': stats,
+        'title': f"Report for {os.path.basename(file)}",
+        'signature': signature,
+        'tokenizer': tokenizer,
+        'assurance': {
+            'results': assurance_results,
+            'all_passed': all_tests_passed
+        }
+    }
+    return file_report, word_counts
+
+
+def master_report(file_reports, master_word_counts, signatures, config):
+    """
+    The Master Report of a corpus from its files' combined word counts, or
+    None if the corpus has no words.
+    """
+    if not master_word_counts:
+        return None
+    master_stats = get_text_statistics(master_word_counts)
+    assurance_results, all_tests_passed = run_assurance_tests(master_stats, file_reports)
+    return {
+        'data': master_stats,
+        'title': MASTER_REPORT_KEY,
+        'file_signatures': signatures,
+        'analysis_config': config_fingerprint(config),
+        'assurance': {
+            'results': assurance_results,
+            'all_passed': all_tests_passed
+        }
+    }
+
+
+def near_duplicate_representatives(files, words_of, threshold, duplicate_index=None):
+    """
+    files, in order, after keeping the first file of each near-duplicate
+    cluster. words_of(file) gives the words of a file not indexed yet.
+    """
+    index = duplicate_index if duplicate_index is not None else NearDuplicateIndex()
+    for file in files:
+        if file not in index:
+            index.add(file, words_of(file))
+    kept = index.representatives(list(files), threshold)
+    if len(kept) < len(files):
+        debug(f"Near-duplicate filter skipped {len(files) - len(kept)} of {len(files)} files")
+    return kept
+
+
+def analyze_corpus(files, config=None, known=None, duplicate_index=None, progress=None, is_cancelled=None):
+    """
+    Analyze a corpus' files into a report. Keeps no state and touches no
+    GUI, so it can run on any thread and for several corpora at once.
+
+    Args:
+        files (list): The corpus' files, in order
+        config (AnalysisConfig): Analysis settings (defaults if None)
+        known (dict): {file: file report} made earlier, reused when still fresh
+        duplicate_index (NearDuplicateIndex): Index to reuse and extend for
+            the near-duplicate filter; a private one is used if None. Only
+            pass an index no other thread uses.
+        progress (callable): Called after each file with {'files_done',
+            'files_total', 'bytes_done', 'bytes_total', 'elapsed', 'eta', 'file'}
+        is_cancelled (callable): Checked before each file; when it returns
+            True, AnalysisCancelled is raised
+
+    Returns:
+        ReportSnapshot: {file: file report, "Master Report": ...}; without a
+        Master Report if no file had any words. Files that cannot be read
+        are left out.
+    """
+    config = config or AnalysisConfig()
+    known = known or {}
+    # Signatures of every corpus file, taken before reading any of them, so
+    # an edit during the analysis marks the report stale.
+    signatures = file_signatures(files)
+    bytes_total = sum(signature[0] for signature in signatures.values() if signature)
+    bytes_done = 0
+    start = time.perf_counter()
+
+    results = {}
+    for files_done, file in enumerate(files, 1):
+        if is_cancelled is not None and is_cancelled():
+            raise AnalysisCancelled(files_done - 1)
+        try:
+            results[file] = analyze_file(file, known.get(file))
+        except Exception as e:
+            print(f"[ERROR] Error processing file {file}: {str(e)}")
+        if progress is not None:
+            bytes_done += (signatures.get(file) or (0,))[0]
+            elapsed = time.perf_counter() - start
+            if bytes_total and bytes_done:
+                eta = elapsed * (bytes_total - bytes_done) / bytes_done
+            else:
+                eta = elapsed * (len(files) - files_done) / files_done
+            progress({
+                'files_done': files_done,
+                'files_total': len(files),
+                'bytes_done': bytes_done,
+                'bytes_total': bytes_total,
+                'elapsed': elapsed,
+                'eta': eta,
+                'file': file,
+            })
+
+    kept = list(results)
+    if config.near_duplicate_threshold is not None:
+        kept = near_duplicate_representatives(kept, lambda file: results[file][1].keys(),
+                                              config.near_duplicate_threshold, duplicate_index)
+
+    report = {}
+    master_word_counts = Counter()
+    for file in kept:
+        report[file], word_counts = results[file]
+        master_word_counts.update(word_counts)
+    master = master_report(report, master_word_counts, signatures, config)
+    if master is not None:
+        report[MASTER_REPORT_KEY] = master
+    debug(f"Analyzed {len(files)} files, {len(kept)} in the report")
+    return freeze_report(report)
+
+
+def update_corpus(report, added_files=(), removed_files=(), config=None, known=None, duplicate_index=None):
+    """
+    A corpus report with files added and removed, analyzing only the added
+    files. Unchanged file reports are carried over as they are.
+
+    Args:
+        report (dict): The corpus' current report
+        added_files, removed_files (list): Files to analyze and add, to drop
+        config, known, duplicate_index: As for analyze_corpus
+
+    Returns:
+        ReportSnapshot: The updated report
+    """
+    config = config or AnalysisConfig()
+    known = known or {}
+    files = {k: v for k, v in report.items() if k != MASTER_REPORT_KEY}
+    master_word_counts = Counter()
+    master = report.get(MASTER_REPORT_KEY)
+    if master:
+        master_word_counts.update({ws[0]: ws[1] for ws in master['data']['word_stats']})
+    signatures = dict((master or {}).get('file_signatures') or {})
+    for file in removed_files:
+        signatures.pop(file, None)
+    signatures.update(file_signatures(added_files))
+
+    for file in removed_files:
+        file_report = files.pop(file, None)
+        if file_report:
+            master_word_counts.subtract({ws[0]: ws[1] for ws in file_report['data']['word_stats']})
+
+    added = {}
+    for file in added_files:
+        if file in files or file in added:
+            continue
+        try:
+            added[file] = analyze_file(file, known.get(file))
+        except Exception as e:
+            print(f"[ERROR] Error processing file {file}: {str(e)}")
+    if config.near_duplicate_threshold is not None:
+        def words_of(file):
+            if file in added:
+                return added[file][1].keys()
+            return [ws[0] for ws in files[file]['data']['word_stats']]
+
+        kept = set(near_duplicate_representatives(list(files) + list(added), words_of,
+                                                  config.near_duplicate_threshold, duplicate_index))
+        added = {file: result for file, result in added.items() if file in kept}
+    for file, (file_report, word_counts) in added.items():
+        files[file] = file_report
+        master_word_counts.update(word_counts)
+    master_word_counts = +master_word_counts  # drop words no file has left
+
+    master = master_report(files, master_word_counts, signatures, config)
+    if master is not None:
+        files[MASTER_REPORT_KEY] = master
+    debug(f"Updated report: +{len(added)} / -{len(removed_files)} files")
+    return freeze_report(files)
+
+
+##############################################################################
+# Several corpora at once
+##############################################################################
+def _analyze_file_report(file):
+    """
+    Process pool entry point: the file report alone, word counts are
+    rebuilt from it. Returned encoded with IPC_CODEC.
+    """
+    return encode_report({file: analyze_file(file)[0]}, *IPC_CODEC)
+
+
+def analyze_files(files, known=None, workers=None):
+    """
+    {file: file report} for files, reusing the fresh reports of known.
+
+    With workers > 1 and at least PARALLEL_MIN_FILES files to read, files
+    are analyzed in a process pool. Files that cannot be read are left out.
+    """
+    known = known or {}
+    tokenizer = tokenizer_fingerprint()
+    reports = {}
+    pending = []
+    for file in dict.fromkeys(files):
+        shared_report = known.get(file)
+        if shared_report is not None and shared_report.get('tokenizer') == tokenizer \
+                and shared_report.get('signature') == file_signature(file):
+            reports[file] = shared_report
+        else:
+            pending.append(file)
+
+    workers = min(resolve_workers(workers), len(pending))
+    if workers <= 1 or len(pending) < PARALLEL_MIN_FILES:
+        for file in pending:
+            try:
+                reports[file] = analyze_file(file)[0]
+            except Exception as e:
+                print(f"[ERROR] Error processing file {file}: {str(e)}")
+        return reports
+
+    debug(f"Analyzing {len(pending)} files in {workers} processes")
+    # spawn rather than fork: the GUI process runs Qt threads.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {file: pool.submit(_analyze_file_report, file) for file in pending}
+        for file, future in futures.items():
+            try:
+                reports[file] = decode_report(future.result())[file]
+            except Exception as e:
+                print(f"[ERROR] Error processing file {file}: {str(e)}")
+    return reports
+
+
+def analyze_corpora(corpora, config=None, known=None, duplicate_index=None, workers=None):
+    """
+    Reports of several corpora, each file read once even when several
+    corpora list it. The files of all corpora are analyzed together (in
+    parallel when there are enough, see analyze_files), then each corpus'
+    report is assembled from them.
+
+    Args:
+        corpora (dict): {corpus name: its files}
+        config, known, duplicate_index: As for analyze_corpus
+
+    Returns:
+        dict: {corpus name: ReportSnapshot}
+    """
+    all_files = [file for files in corpora.values() for file in files]
+    file_reports = dict(known or {})
+    file_reports.update(analyze_files(all_files, known, workers))
+    return {
+        name: analyze_corpus(files, config, known=file_reports, duplicate_index=duplicate_index)
+        for name, files in corpora.items()
+    }
@@ -0,0 +1,298 @@
+from collections import namedtuple
+
+import numpy as np
+
+from analysis.bo_engine import BOTextMatrix, _dense_chunks, iter_block_pairs
+
+##############################################################################
+# Debug helper and toggle for debug messages
+##############################################################################
+DEBUG_MODE = False  # Set to True to enable debug logs
+
+# Additive smoothing applied to relative frequencies before the divergences:
+# p(w) = (f(w) + alpha) / (sum(f) + alpha * V). Same epsilon the old per-pair
+# implementations added to avoid log(0).
+DEFAULT_SMOOTHING = 1e-10
+
+# Texts per row tile and vocabulary columns per dense chunk. A 128 x 2048
+# float64 chunk is 2 MB, so both operands of a tile product stay in cache.
+DEFAULT_BLOCK_SIZE = 128
+DEFAULT_COLUMN_CHUNK = 2048
+
+# Upper bound on elements of the (rows_i, rows_j, columns) temporaries used
+# by the Jensen-Shannon kernel, which cannot be written as a matrix product.
+MAX_TILE_ELEMENTS = 1 << 20
+
+# metric -> (label, higher values mean more similar, symmetric)
+METRIC_INFO = {
+    "cosine": ("Cosine Similarity", True, True),
+    "kl": ("KL Divergence", False, False),
+    "js": ("Jensen-Shannon Divergence", False, True),
+    "bhattacharyya": ("Bhattacharyya Distance", False, True),
+}
+
+# Value given to pairs involving an empty text.
+_DISSIMILAR = {"cosine": 0.0, "kl": np.inf, "js": np.log(2.0), "bhattacharyya": np.inf}
+
+
+def debug(msg: str):
+    if DEBUG_MODE:
+        print(f"[DEBUG similarity] {msg}")
+
+
+# text_keys: list of text keys; matrix: float64 (N, N), matrix[i, j] is the
+# metric of text i against text j (KL: D(p_i || p_j)); metric: metric name.
+SimilarityResult = namedtuple("SimilarityResult", ["text_keys", "matrix", "metric"])
+
+
+def _xlogx(x):
+    """Elementwise x * log(x), with 0 where x == 0."""
+    logs = np.zeros_like(x)
+    np.log(x, out=logs, where=x > 0)
+    return x * logs
+
+
+class DistributionSimilarity:
+    """
+    Blocked pairwise similarity/divergence matrices over the per-text
+    relative-frequency matrix.
+
+    Pairs of text tiles are densified only over the columns they need, in
+    column chunks small enough to stay in cache. Every non-empty text's
+    relative frequencies sum to 1, so after smoothing all absent words sit
+    at the same floor alpha / (1 + alpha * V) and their contribution is
+    added in closed form:
+
+      cosine         dot products over the words both tiles share
+      KL             sum p log p - P @ log(Q).T over the tiles' vocabulary
+      Bhattacharyya  -log(sqrt(P) @ sqrt(Q).T) over the tiles' vocabulary
+      Jensen-Shannon (E_p + E_q) / 2 - sum m log m with m = (p + q) / 2;
+                     only words present in both texts make sum m log m
+                     differ from a per-text term, so the broadcast tiles
+                     span the shared words only.
+
+    Usage:
+      similarity = DistributionSimilarity.from_file_reports(file_reports)
+      result = similarity.compute("js")
+    """
+
+    def __init__(self, matrix, smoothing=DEFAULT_SMOOTHING, block_size=DEFAULT_BLOCK_SIZE,
+                 column_chunk=DEFAULT_COLUMN_CHUNK):
+        if smoothing < 0:
+            raise ValueError(f"smoothing must be non-negative, got {smoothing}")
+        self.matrix = matrix
+        self.smoothing = smoothing
+        self.block_size = block_size
+        self.column_chunk = column_chunk
+
+        n_texts = matrix.n_texts
+        self.row_ids = np.repeat(np.arange(n_texts), matrix.sizes)
+        self.norms = np.sqrt(np.bincount(self.row_ids, weights=matrix.freqs ** 2, minlength=n_texts))
+        # smoothed distribution p = (f + alpha) / total, floor = alpha / total
+        self.total = 1.0 + smoothing * matrix.n_words
+        self.floor = smoothing / self.total
+        self.floor_xlogx = float(_xlogx(np.array([self.floor]))[0])
+        self.empty = matrix.sizes == 0
+        self._row_sums = {}
+
+    @classmethod
+    def from_file_reports(cls, file_reports, **kwargs):
+        return cls(BOTextMatrix.from_file_reports(file_reports), **kwargs)
+
+    ##########################################################################
+    # Helpers
+    ##########################################################################
+    def smoothed(self, freqs):
+        """Smoothed probabilities for relative frequencies (absent words: 0)."""
+        return (freqs + self.smoothing) / self.total
+
+    def half_floor_xlogx(self, p):
+        """m log m for the mixture of p with an absent word, m = (p + floor) / 2."""
+        return _xlogx((p + self.floor) / 2.0)
+
+    def row_sums(self, name, func):
+        """
+        Cached sum over the full vocabulary of func(p_i(w)) for every text,
+        with absent words at the smoothing floor.
+        """
+        if name not in self._row_sums:
+            m = self.matrix
+            present = np.bincount(self.row_ids, weights=func(self.smoothed(m.freqs)), minlength=m.n_texts)
+            absent = (m.n_words - m.sizes) * func(np.array([self.floor]))[0]
+            self._row_sums[name] = present + absent
+        return self._row_sums[name]
+
+    def tile_chunks(self, block_i, block_j, shared_only=False):
+        """
+        Return (n_columns, chunks) for a tile pair. Columns are the union of
+        the two tiles' vocabularies, or only the words found in both tiles
+        if shared_only; chunks yields (dense_i, dense_j) relative-frequency
+        chunks over them.
+        """
+        i0, i1 = block_i
+        j0, j1 = block_j
+        rows_i, cols_i, vals_i = self.matrix.row_slice(i0, i1)
+        rows_j, cols_j, vals_j = self.matrix.row_slice(j0, j1)
+        union = np.unique(np.concatenate([cols_i, cols_j]))
+        if shared_only:
+            keep = np.isin(union, cols_i) & np.isin(union, cols_j)
+        else:
+            keep = np.ones(len(union), dtype=bool)
+        dense_pos = np.where(keep, np.cumsum(keep) - 1, -1)
+        n_columns = int(keep.sum())
+        entries_i = (rows_i, np.searchsorted(union, cols_i), vals_i)
+        entries_j = (rows_j, np.searchsorted(union, cols_j), vals_j)
+
+        def chunks():
+            for (_, dense_i), (_, dense_j) in zip(
+                _dense_chunks(entries_i, dense_pos, i1 - i0, n_columns, self.column_chunk),
+                _dense_chunks(entries_j, dense_pos, j1 - j0, n_columns, self.column_chunk),
+            ):
+                yield dense_i, dense_j
+
+        return n_columns, chunks()
+
+    ##########################################################################
+    # Tile kernels: return the (|I|, |J|) block of the metric
+    ##########################################################################
+    def cosine_tile(self, block_i, block_j):
+        _, chunks = self.tile_chunks(block_i, block_j, shared_only=True)
+        dots = np.zeros((block_i[1] - block_i[0], block_j[1] - block_j[0]))
+        for dense_i, dense_j in chunks:
+            dots += dense_i @ dense_j.T
+        norms = np.outer(self.norms[block_i[0]:block_i[1]], self.norms[block_j[0]:block_j[1]])
+        result = np.zeros_like(dots)
+        np.divide(dots, norms, out=result, where=norms > 0)
+        return np.clip(result, 0.0, 1.0)
+
+    def bhattacharyya_tile(self, block_i, block_j):
+        n_columns, chunks = self.tile_chunks(block_i, block_j)
+        outside = self.matrix.n_words - n_columns
+        coefficient = np.full((block_i[1] - block_i[0], block_j[1] - block_j[0]), outside * self.floor)
+        for dense_i, dense_j in chunks:
+            coefficient += np.sqrt(self.smoothed(dense_i)) @ np.sqrt(self.smoothed(dense_j)).T
+        coefficient = np.clip(coefficient, 0.0, 1.0)
+        with np.errstate(divide="ignore"):
+            return -np.log(coefficient)
+
+    def kl_tiles(self, block_i, block_j):
+        """Return (KL(I || J), KL(J || I)) blocks."""
+        rows_i, rows_j = slice(*block_i), slice(*block_j)
+        n_columns, chunks = self.tile_chunks(block_i, block_j)
+        outside = self.matrix.n_words - n_columns
+        floor_term = outside * self.floor_xlogx
+        cross_ij = np.full((block_i[1] - block_i[0], block_j[1] - block_j[0]), floor_term)
+        cross_ji = np.full(cross_ij.shape[::-1], floor_term)
+        # without smoothing, D(p || q) is infinite wherever q misses a word of p
+        missing_ij = np.zeros(cross_ij.shape, dtype=bool)
+        missing_ji = np.zeros(cross_ji.shape, dtype=bool)
+        for dense_i, dense_j in chunks:
+            p_i = self.smoothed(dense_i)
+            p_j = self.smoothed(dense_j)
+            log_i = np.log(np.where(p_i > 0, p_i, 1.0))
+            log_j = np.log(np.where(p_j > 0, p_j, 1.0))
+            cross_ij += p_i @ log_j.T
+            cross_ji += p_j @ log_i.T
+            if self.smoothing == 0:
+                present_i, present_j = (p_i > 0).astype(np.float64), (p_j > 0).astype(np.float64)
+                missing_ij |= present_i @ (1.0 - present_j).T > 0
+                missing_ji |= present_j @ (1.0 - present_i).T > 0
+        entropy = self.row_sums("plogp", _xlogx)
+        kl_ij = np.maximum(entropy[rows_i][:, None] - cross_ij, 0.0)
+        kl_ji = np.maximum(entropy[rows_j][:, None] - cross_ji, 0.0)
+        kl_ij[missing_ij] = np.inf
+        kl_ji[missing_ji] = np.inf
+        return kl_ij, kl_ji
+
+    def js_tile(self, block_i, block_j):
+        rows_i, rows_j = slice(*block_i), slice(*block_j)
+        half_floor = self.half_floor_xlogx
+        entropy = self.row_sums("plogp", _xlogx)
+        # sum_w m log m if the two texts shared no word
+        mixed = self.row_sums("mlogm", half_floor)
+        mix_term = (mixed[rows_i][:, None] + mixed[rows_j][None, :]
+                    - self.matrix.n_words * self.floor_xlogx)
+
+        _, chunks = self.tile_chunks(block_i, block_j, shared_only=True)
+        for dense_i, dense_j in chunks:
+            p_i = self.smoothed(dense_i)
+            p_j = self.smoothed(dense_j)
+            # replace the per-text terms of the shared words by the pair's own
+            mix_term -= half_floor(p_i).sum(axis=1)[:, None]
+            mix_term -= half_floor(p_j).sum(axis=1)[None, :]
+            mix_term += p_i.shape[1] * self.floor_xlogx
+            step = max(1, MAX_TILE_ELEMENTS // max(1, p_j.size))
+            for start in range(0, len(p_i), step):
+                mix = (p_i[start:start + step, None, :] + p_j[None, :, :]) / 2.0
+                mix_term[start:start + step] += _xlogx(mix).sum(axis=-1)
+
+        result = (entropy[rows_i][:, None] + entropy[rows_j][None, :]) / 2.0 - mix_term
+        return np.clip(result, 0.0, np.log(2.0))
+
+    ##########################################################################
+    # Driver
+    ##########################################################################
+    def compute(self, metric):
+        """
+        Full N x N matrix for one of METRIC_INFO's metrics.
+
+        Returns a SimilarityResult(text_keys, matrix, metric).
+        """
+        if metric not in METRIC_INFO:
+            raise ValueError(f"Unknown similarity metric: {metric!r}")
+        n_texts = self.matrix.n_texts
+        result = np.zeros((n_texts, n_texts), dtype=np.float64)
+        for block_i, block_j in iter_block_pairs(n_texts, self.block_size):
+            (i0, i1), (j0, j1) = block_i, block_j
+            if metric == "kl":
+                forward, backward = self.kl_tiles(block_i, block_j)
+                result[i0:i1, j0:j1] = forward
+                result[j0:j1, i0:i1] = backward
+                continue
+            kernel = {"cosine": self.cosine_tile, "js": self.js_tile,
+                      "bhattacharyya": self.bhattacharyya_tile}[metric]
+            tile = kernel(block_i, block_j)
+            result[i0:i1, j0:j1] = tile
+            result[j0:j1, i0:i1] = tile.T
+        # an empty text has no distribution: least similar to everything
+        if np.any(self.empty):
+            result[self.empty, :] = _DISSIMILAR[metric]
+            result[:, self.empty] = _DISSIMILAR[metric]
+        # exact self-comparisons, free of rounding
+        np.fill_diagonal(result, (self.norms > 0).astype(np.float64) if metric == "cosine" else 0.0)
+        debug(f"Computed {metric} matrix for {n_texts} texts.")
+        return SimilarityResult(list(self.matrix.text_keys), result, metric)
+
+
+def compute_similarity_matrix(file_reports, metric, smoothing=DEFAULT_SMOOTHING,
+                              block_size=DEFAULT_BLOCK_SIZE, column_chunk=DEFAULT_COLUMN_CHUNK):
+    """
+    Pairwise cosine similarity, KL divergence, Jensen-Shannon divergence or
+    Bhattacharyya distance between the word distributions of every text
+    (Master Report excluded).
+
+    Returns a SimilarityResult(text_keys, matrix, metric).
+    """
+    similarity = DistributionSimilarity.from_file_reports(
+        file_reports, smoothing=smoothing, block_size=block_size, column_chunk=column_chunk
+    )
+    return similarity.compute(metric)
+
+
+def ranked_pairs(result, limit=None):
+    """
+    Text pairs ordered from most to least similar, as (key_a, key_b, value).
+
+    Symmetric metrics list each unordered pair once; KL lists both directions.
+    """
+    _, higher_is_similar, symmetric = METRIC_INFO[result.metric]
+    n_texts = len(result.text_keys)
+    if symmetric:
+        rows, cols = np.triu_indices(n_texts, 1)
+    else:
+        rows, cols = np.nonzero(~np.eye(n_texts, dtype=bool))
+    values = result.matrix[rows, cols]
+    order = np.argsort(-values if higher_is_similar else values, kind="stable")
+    if limit is not None:
+        order = order[:limit]
+    return [(result.text_keys[rows[k]], result.text_keys[cols[k]], float(values[k])) for k in order]
@@ -65,8 +65,96 @@ METRICS = {
                     },
                 },
             },
-            
-            
+            "near_duplicates": {
+                "name": "Near-Duplicate Clusters",
+                "description": "Groups of texts with near-identical word sets (MinHash LSH).",
+                "calculation_function": "near_duplicates.NearDuplicateIndex.clusters",
+                "visualization_type": "near_duplicates",
+            },
+            "cosine_similarity": {
+                "name": "Cosine Similarity",
+                "description": "Cosine of the angle between relative-frequency vectors.",
+                "visualization_type": None,  # parent node
+                "sub_metrics": {
+                    "cosine_table": {
+                        "name": "Cosine Similarity Table",
+                        "description": "Lists text pairs from most to least similar by cosine similarity",
+                        "calculation_function": "advanced_analysis.calculate_distribution_similarity",
+                        "visualization_type": "similarity_table",
+                        "initial_mode": "cosine",
+                    },
+                    "cosine_heatmap": {
+                        "name": "Cosine Similarity Heatmap",
+                        "description": "Displays the cosine similarity of every pair of texts",
+                        "calculation_function": "advanced_analysis.calculate_distribution_similarity",
+                        "visualization_type": "similarity_heatmap",
+                        "initial_mode": "cosine",
+                    },
+                },
+            },
+            "kl_divergence": {
+                "name": "KL Divergence",
+                "description": "Kullback-Leibler divergence between smoothed word distributions.",
+                "visualization_type": None,  # parent node
+                "sub_metrics": {
+                    "kl_table": {
+                        "name": "KL Divergence Table",
+                        "description": "Lists KL divergence in both directions for each text pair, lowest first",
+                        "calculation_function": "advanced_analysis.calculate_distribution_similarity",
+                        "visualization_type": "similarity_table",
+                        "initial_mode": "kl",
+                    },
+                    "kl_heatmap": {
+                        "name": "KL Divergence Heatmap",
+                        "description": "Displays KL divergence from each row text to each column text (asymmetric)",
+                        "calculation_function": "advanced_analysis.calculate_distribution_similarity",
+                        "visualization_type": "similarity_heatmap",
+                        "initial_mode": "kl",
+                    },
+                },
+            },
+            "js_divergence": {
+                "name": "Jensen-Shannon Divergence",
+                "description": "Symmetric, bounded divergence between smoothed word distributions.",
+                "visualization_type": None,  # parent node
+                "sub_metrics": {
+                    "js_table": {
+                        "name": "Jensen-Shannon Divergence Table",
+                        "description": "Lists text pairs from lowest to highest Jensen-Shannon divergence",
+                        "calculation_function": "advanced_analysis.calculate_distribution_similarity",
+                        "visualization_type": "similarity_table",
+                        "initial_mode": "js",
+                    },
+                    "js_heatmap": {
+                        "name": "Jensen-Shannon Divergence Heatmap",
+                        "description": "Displays Jensen-Shannon divergence (0 to ln 2) for every pair of texts",
+                        "calculation_function": "advanced_analysis.calculate_distribution_similarity",
+                        "visualization_type": "similarity_heatmap",
+                        "initial_mode": "js",
+                    },
+                },
+            },
+            "bhattacharyya_distance": {
+                "name": "Bhattacharyya Distance",
+                "description": "Negative log of the Bhattacharyya coefficient between word distributions.",
+                "visualization_type": None,  # parent node
+                "sub_metrics": {
+                    "bhattacharyya_table": {
+                        "name": "Bhattacharyya Distance Table",
+                        "description": "Lists text pairs from lowest to highest Bhattacharyya distance",
+                        "calculation_function": "advanced_analysis.calculate_distribution_similarity",
+                        "visualization_type": "similarity_table",
+                        "initial_mode": "bhattacharyya",
+                    },
+                    "bhattacharyya_heatmap": {
+                        "name": "Bhattacharyya Distance Heatmap",
+                        "description": "Displays the Bhattacharyya distance of every pair of texts",
+                        "calculation_function": "advanced_analysis.calculate_distribution_similarity",
+                        "visualization_type": "similarity_heatmap",
+                        "initial_mode": "bhattacharyya",
+                    },
+                },
+            },
         },
     },
 }
@@ -0,0 +1,63 @@
+import threading
+import traceback
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+from analysis.report_engine import analyze_corpus, AnalysisCancelled
+
+
+class AnalysisSignals(QObject):
+    """
+    Signals of an AnalysisTask. They are emitted from the worker thread and,
+    as this object lives on the GUI thread, delivered to connected slots on
+    the GUI thread.
+    """
+    # {'files_done', 'files_total', 'bytes_done', 'bytes_total', 'elapsed', 'eta', 'file'}
+    progress = pyqtSignal(dict)
+    # the corpus report, a ReportSnapshot
+    finished = pyqtSignal(object)
+    # files done before the cancel was noticed
+    cancelled = pyqtSignal(int)
+    failed = pyqtSignal(str)
+
+
+class AnalysisTask(QRunnable):
+    """
+    Runs report_engine.analyze_corpus on a QThreadPool thread.
+
+    cancel() (from any thread) stops the task between two files.
+
+    Usage:
+      task = AnalysisTask(files, AnalysisConfig(), known_file_reports)
+      task.signals.finished.connect(on_finished)
+      QThreadPool.globalInstance().start(task)
+    """
+
+    def __init__(self, files, config=None, known=None):
+        super().__init__()
+        self.files = list(files)
+        self.config = config
+        self.known = known
+        self.signals = AnalysisSignals()
+        self._cancel = threading.Event()
+        # The pool must not delete the task while the controller holds it
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        self._cancel.set()
+
+    def is_cancelled(self):
+        return self._cancel.is_set()
+
+    def run(self):
+        try:
+            report = analyze_corpus(self.files, self.config, known=self.known,
+                                    progress=self.signals.progress.emit, is_cancelled=self._cancel.is_set)
+        except AnalysisCancelled as e:
+            print(f"[DEBUG] Analysis cancelled after {e.files_done} of {len(self.files)} files")
+            self.signals.cancelled.emit(e.files_done)
+        except Exception as e:
+            traceback.print_exc()
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(report)
@@ -4,16 +4,20 @@ from ui.dashboard_ui import DashboardWindow
 from config.metric_registry import get_metric, METRICS
 from visualizations.cell_factory import create_cell
 from model.corpora import Corpus  # Add this import
+from model.dependency_graph import Node, CORPUS, FILE, REPORT
+from controller.refresh_scheduler import RefreshScheduler
 
 class DashboardController:
     def __init__(self, main_controller=None):
         self.main_controller = main_controller
         self.view = None
         self.cell_data_map = {}
+        self.refresh_scheduler = None
 
     def show(self):
         if not self.view:
             self.view = DashboardWindow(controller=self)
+            self.refresh_scheduler = RefreshScheduler(self, parent=self.view)
             # Ensure the view has access to main_controller
             self.view.main_controller = self.main_controller
         
@@ -177,10 +181,10 @@ class DashboardController:
             print("[ERROR] No single active corpus is set. Cannot create visualization.")
             return
             
-        # Check if report exists for this corpus - compute only if needed (lazy loading)
-        if hasattr(self.main_controller, 'report_manager') and not self.main_controller.report_manager.has_report_for_corpus(corpus_id):
+        # Check if a fresh report exists for this corpus - compute only stale files if needed (lazy loading)
+        if hasattr(self.main_controller, 'report_manager') and not self.main_controller.has_report_for_corpus(corpus_id):
             print(f"[DEBUG] Generating initial report for {corpus_id}")
-            success = self.main_controller.generate_report_for_corpus(corpus_id)
+            success = self.main_controller.ensure_fresh_report(corpus_id)
             if not success:
                 print(f"[ERROR] Failed to generate report for corpus: {corpus_id}")
                 return
@@ -238,7 +242,7 @@ class DashboardController:
                 # Check if report exists before generating - lazy refresh
                 if hasattr(self.main_controller, 'has_report_for_corpus') and not self.main_controller.has_report_for_corpus(corpus_id):
                     print(f"[DEBUG] Generating fresh report for {corpus_id} during refresh")
-                    self.main_controller.generate_report_for_corpus(corpus_id)
+                    self.main_controller.ensure_fresh_report(corpus_id)
                 else:
                     print(f"[DEBUG] Using existing report for {corpus_id} during refresh")
                 
@@ -282,6 +286,23 @@ class DashboardController:
         else:
             print("[ERROR] Cell not found in data map")
 
+    def refresh_cells_for_corpus(self, corpus_name):
+        """
+        Schedule a refresh of the cells showing a corpus whose report
+        changed. Cells showing other corpora are left alone.
+        """
+        if self.refresh_scheduler:
+            self.refresh_scheduler.invalidate([Node(REPORT, corpus_name)])
+
+    def corpus_files_changed(self, corpus_name, files=()):
+        """
+        Schedule a refresh after a corpus' file list changed, or the given
+        files' contents did. Every corpus listing one of those files has
+        its report rebuilt if stale, then the cells showing it refresh.
+        """
+        if self.refresh_scheduler:
+            self.refresh_scheduler.invalidate([Node(CORPUS, corpus_name)] + [Node(FILE, f) for f in files])
+
     def remove_metric_cell(self, metric_name):
         """
         Remove the specified metric cell by its name.
@@ -388,53 +409,130 @@ class DashboardController:
             cell.setParent(None)  # Detach from the parent
             cell.deleteLater()  # Schedule for deletion
 
-    def refresh_visualizations(self):
-        """Refresh all visualization cells with their anchored corpus data."""
-        if self.view:
-            # Store current cell configurations
-            cell_configs = []
-            for i in range(self.view.notebook_layout.count()):
-                cell = self.view.notebook_layout.itemAt(i).widget()
-                if cell and cell in self.cell_data_map:
-                    cell_configs.append(self.cell_data_map[cell])
-            
-            # Clear existing cells
-            while self.view.notebook_layout.count():
-                item = self.view.notebook_layout.takeAt(0)
-                if item.widget():
-                    item.widget().deleteLater()
-            
-            # Recreate cells with new data, respecting their corpus anchors
-            for config in cell_configs:
-                # Get corpus_id from the cell metadata
-                corpus_id = config.get("corpus_id")
-                
-                # If this cell has a corpus_id, ensure we have fresh data for it
-                if corpus_id and hasattr(self.main_controller, 'generate_report_for_corpus'):
-                    self.main_controller.generate_report_for_corpus(corpus_id)
-                
-                cell_widget = create_cell(
-                    self.main_controller,
-                    config["category_key"],
-                    config["sub_key"],
-                    sub_sub_key=config.get("sub_sub_key"),
-                    initial_mode=config.get("initial_mode", "nominal"),
-                    corpus_id=corpus_id  # Pass corpus_id when recreating the cell
-                )
-                if cell_widget:
-                    cell = self.view.add_cell(config.get("name", "Metric"), cell_widget)
-                    self.cell_data_map[cell] = config
-                    
-                    # Connect all signals for the recreated cell
-                    if hasattr(cell, 'refresh_requested'):
-                        cell.refresh_requested.connect(lambda c=cell: self.refresh_cell(c))
-                    cell.remove_requested.connect(lambda title: self.remove_metric_cell(title))
-                    cell.move_up_requested.connect(lambda title: self.move_cell_up_by_name(title))
-                    cell.move_down_requested.connect(lambda title: self.move_cell_down_by_name(title))
-                    cell.duplicate_requested.connect(lambda title: self.duplicate_metric_cell_by_name(title))
-                    
-                    print(f"[DEBUG] Recreated cell for {config.get('name')} anchored to corpus: {corpus_id}")
-                else:
-                    print(f"[ERROR] Failed to recreate cell for {config.get('name')}")
+    def workspace_cells(self):
+        """
+        Configurations of the cells in notebook order, each with the
+        settings of its visualization, for saving in a workspace.
+        """
+        cells = []
+        if not self.view:
+            return cells
+        for i in range(self.view.notebook_layout.count()):
+            cell = self.view.notebook_layout.itemAt(i).widget()
+            if cell not in self.cell_data_map:
+                continue
+            config = {key: value for key, value in self.cell_data_map[cell].items() if key != "settings"}
+            vis_instance = getattr(getattr(cell, 'stored_content', None), 'vis', None)
+            if hasattr(vis_instance, 'get_settings'):
+                config["settings"] = vis_instance.get_settings()
+            cells.append(config)
+        return cells
 
+    def restore_cells(self, cell_configs):
+        """
+        Replace the dashboard's cells with the given configurations (as
+        returned by workspace_cells). Reports are only computed for corpora
+        whose stored report is missing or stale.
+        """
+        if not self.view:
+            return
+        while self.view.notebook_layout.count():
+            item = self.view.notebook_layout.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
+        self.cell_data_map.clear()
 
+        restored = 0
+        for config in cell_configs:
+            corpus_id = config.get("corpus_id")
+            if corpus_id and corpus_id not in self.main_controller.corpora:
+                print(f"[ERROR] Skipping cell {config.get('name')}: corpus '{corpus_id}' not in workspace")
+                continue
+            if get_metric(config.get("category_key"), config.get("sub_key"), config.get("sub_sub_key")) is None:
+                print(f"[ERROR] Skipping cell {config.get('name')}: unknown metric")
+                continue
+            cell_widget = create_cell(
+                self.main_controller,
+                config["category_key"],
+                config["sub_key"],
+                sub_sub_key=config.get("sub_sub_key"),
+                initial_mode=config.get("initial_mode", "nominal"),
+                corpus_id=corpus_id,
+                settings=config.get("settings")
+            )
+            if not cell_widget:
+                print(f"[ERROR] Failed to restore cell for {config.get('name')}")
+                continue
+            cell = self.view.add_cell(config.get("name", "Metric"), cell_widget)
+            self.cell_data_map[cell] = {key: value for key, value in config.items() if key != "settings"}
+
+            if hasattr(cell, 'refresh_requested'):
+                cell.refresh_requested.connect(lambda c=cell: self.refresh_cell(c))
+            cell.remove_requested.connect(lambda title: self.remove_metric_cell(title))
+            cell.move_up_requested.connect(lambda title: self.move_cell_up_by_name(title))
+            cell.move_down_requested.connect(lambda title: self.move_cell_down_by_name(title))
+            cell.duplicate_requested.connect(lambda title: self.duplicate_metric_cell_by_name(title))
+            restored += 1
+        print(f"[DEBUG] Restored {restored} of {len(cell_configs)} cells")
+
+    def notebook_cells(self):
+        """The dashboard's cells in notebook order."""
+        cells = []
+        for i in range(self.view.notebook_layout.count()):
+            cell = self.view.notebook_layout.itemAt(i).widget()
+            if cell and cell in self.cell_data_map:
+                cells.append(cell)
+        return cells
+
+    def cell_corpora(self, cell):
+        """Names of the corpora a cell shows: its anchor and any compared corpora."""
+        vis_instance = getattr(getattr(cell, 'stored_content', None), 'vis', None)
+        corpus_ids = list(getattr(vis_instance, 'corpus_ids', None) or [])
+        corpus_id = self.cell_data_map[cell].get("corpus_id")
+        return ([corpus_id] if corpus_id else []) + [c for c in corpus_ids if c != corpus_id]
+
+    def drop_outdated_reports(self, cell):
+        """
+        Forget the reports a cell's visualization fetched that are no longer
+        the stored ones.
+
+        Reports are compared by revision: a report evicted from memory and
+        loaded again keeps its revision, only an update bumps it.
+
+        Returns:
+            bool: False if the cell shows the current report of every corpus
+            it shows and needs no refresh
+        """
+        vis_instance = getattr(getattr(cell, 'stored_content', None), 'vis', None)
+        loaded = getattr(vis_instance, 'loaded_revisions', None)
+        corpus_ids = getattr(vis_instance, 'corpus_ids', None)
+        if not isinstance(loaded, dict) or not corpus_ids:
+            return True
+        report_manager = self.main_controller.report_manager
+        outdated = False
+        for corpus_id in corpus_ids:
+            if corpus_id not in loaded or loaded[corpus_id] != report_manager.get_report_revision(corpus_id):
+                loaded.pop(corpus_id, None)
+                outdated = True
+        return outdated
+
+    def update_cell(self, cell):
+        """Refresh a cell unless it already shows the current reports."""
+        if self.drop_outdated_reports(cell):
+            self.refresh_cell(cell)
+
+    def refresh_visualizations(self):
+        """
+        Refresh all visualization cells with their anchored corpus data.
+
+        Every corpus a cell shows is marked changed and handled at once (see
+        RefreshScheduler.flush): each stale corpus is analyzed once on the
+        analysis queue, however many cells use it, and cells are updated in
+        place, those on screen first, as their reports become current. A
+        cell already showing the current reports is left alone.
+        """
+        if not self.view:
+            return
+        cells = self.notebook_cells()
+        self.refresh_scheduler.invalidate([Node(REPORT, name) for cell in cells for name in self.cell_corpora(cell)])
+        self.refresh_scheduler.flush()
@@ -0,0 +1,216 @@
+import heapq
+import itertools
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+# Job priorities, most urgent first
+INTERACTIVE, NORMAL, BULK = 0, 1, 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", NORMAL: "normal", BULK: "bulk"}
+
+# Finished jobs the latency statistics are taken over
+LATENCY_WINDOW = 200
+
+
+class JobFuture(QObject):
+    """
+    The pending result of a queued job. finished(result) or failed(message)
+    is emitted once, on the GUI thread.
+    """
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, key, priority):
+        super().__init__()
+        self.key = key
+        self.priority = priority
+        self.done = False
+        self.result = None
+        self.error = None
+        self.submitted_at = time.perf_counter()
+        self.started_at = None
+
+    def when_done(self, on_result, on_error=None):
+        """Call on_result(result) once the job finishes, right away if it has."""
+        if not self.done:
+            self.finished.connect(on_result)
+            if on_error is not None:
+                self.failed.connect(on_error)
+        elif self.error is None:
+            on_result(self.result)
+        elif on_error is not None:
+            on_error(self.error)
+
+
+class JobSignals(QObject):
+    # (future, result, error message or None), emitted from the worker thread
+    done = pyqtSignal(object, object, object)
+
+
+class Job(QRunnable):
+    def __init__(self, future, fn, args, kwargs, signals):
+        super().__init__()
+        self.future = future
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = signals
+        # The queue holds the job until it is done
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            traceback.print_exc()
+            self.signals.done.emit(self.future, None, str(e) or type(e).__name__)
+        else:
+            self.signals.done.emit(self.future, result, None)
+
+
+class JobQueue(QObject):
+    """
+    Runs expensive computations (BO scores, similarity matrices) on a
+    bounded pool of worker threads, most urgent first.
+
+    Jobs are identified by a cache key: submitting a key that is already
+    waiting or running returns the existing JobFuture instead of queuing
+    the work twice, and raises its priority if the new request is more
+    urgent. Waiting jobs start by priority, then in submission order, so an
+    INTERACTIVE job (a cell the user just opened) starts before any BULK
+    job (a background refresh) still waiting; a job already running is
+    not interrupted.
+
+    Jobs must only read their arguments and thread-safe state: objects
+    owned by the GUI thread, such as the CorpusReportManager, are resolved
+    before submitting (e.g. into report snapshots) and passed in. Results
+    are delivered on the GUI thread; stats() gives the queue depth and
+    wait/run latencies.
+
+    Usage:
+      queue = JobQueue(max_workers=1)
+      snapshots = service.snapshot(["2023"])
+      future = queue.submit(("bo", "2023", revision), service.get_results, ["2023"], snapshots)
+      future.when_done(show_result)
+      with queue.submitting(BULK):
+          refresh_all_cells()  # their jobs wait behind interactive ones
+    """
+    stats_changed = pyqtSignal(dict)
+
+    def __init__(self, max_workers=1, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_workers)
+        self.max_workers = max_workers
+        self.default_priority = INTERACTIVE
+        self.heap = []      # (priority, sequence, key); entries of started or re-prioritized jobs are skipped
+        self.waiting = {}   # key -> (future, fn, args, kwargs)
+        self.running = {}   # key -> Job
+        self.sequence = itertools.count()
+        self.signals = JobSignals()
+        self.signals.done.connect(self.on_job_done)
+
+        self.submitted = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.failures = 0
+        self.max_depth = 0
+        self.waits = deque(maxlen=LATENCY_WINDOW)  # seconds from submit to start
+        self.runs = deque(maxlen=LATENCY_WINDOW)   # seconds from start to done
+
+    def __len__(self):
+        return len(self.waiting) + len(self.running)
+
+    @contextmanager
+    def submitting(self, priority):
+        """Jobs submitted in this block without an explicit priority get this one."""
+        previous, self.default_priority = self.default_priority, priority
+        try:
+            yield self
+        finally:
+            self.default_priority = previous
+
+    def submit(self, key, fn, *args, priority=None, **kwargs):
+        """
+        Queue fn(*args, **kwargs) under key.
+
+        Returns:
+            JobFuture: The job's future, shared with earlier submissions of
+            the same key that have not finished yet
+        """
+        priority = self.default_priority if priority is None else priority
+        if key in self.running:
+            self.deduplicated += 1
+            return self.running[key].future
+        if key in self.waiting:
+            self.deduplicated += 1
+            future = self.waiting[key][0]
+            if priority < future.priority:
+                future.priority = priority
+                heapq.heappush(self.heap, (priority, next(self.sequence), key))
+                self.dispatch()
+            return future
+
+        future = JobFuture(key, priority)
+        self.waiting[key] = (future, fn, args, kwargs)
+        heapq.heappush(self.heap, (priority, next(self.sequence), key))
+        self.submitted += 1
+        self.max_depth = max(self.max_depth, len(self.waiting))
+        self.dispatch()
+        return future
+
+    def dispatch(self):
+        """Start waiting jobs, most urgent first, while workers are free."""
+        while self.heap and len(self.running) < self.max_workers:
+            priority, _, key = heapq.heappop(self.heap)
+            entry = self.waiting.get(key)
+            if entry is None or entry[0].priority != priority:
+                continue  # started already, or queued again with a higher priority
+            del self.waiting[key]
+            future, fn, args, kwargs = entry
+            future.started_at = time.perf_counter()
+            job = Job(future, fn, args, kwargs, self.signals)
+            self.running[key] = job
+            self.pool.start(job)
+        self.stats_changed.emit(self.stats())
+
+    def on_job_done(self, future, result, error):
+        now = time.perf_counter()
+        self.running.pop(future.key, None)
+        self.waits.append(future.started_at - future.submitted_at)
+        self.runs.append(now - future.started_at)
+        future.done = True
+        future.result = result
+        future.error = error
+        if error is None:
+            self.completed += 1
+            future.finished.emit(result)
+        else:
+            self.failures += 1
+            print(f"[ERROR] Job {future.key} failed: {error}")
+            future.failed.emit(error)
+        self.dispatch()
+
+    def wait_for_done(self, msecs=-1):
+        """Block until running jobs finish (their results are delivered by the event loop)."""
+        return self.pool.waitForDone(msecs)
+
+    def stats(self):
+        def mean_ms(values):
+            return 1000 * sum(values) / len(values) if values else 0.0
+        return {
+            'queued': len(self.waiting),
+            'running': len(self.running),
+            'workers': self.max_workers,
+            'max_depth': self.max_depth,
+            'submitted': self.submitted,
+            'deduplicated': self.deduplicated,
+            'completed': self.completed,
+            'failed': self.failures,
+            'mean_wait_ms': mean_ms(self.waits),
+            'max_wait_ms': 1000 * max(self.waits, default=0.0),
+            'mean_run_ms': mean_ms(self.runs),
+        }
@@ -1,30 +1,36 @@
 import os
 from PyQt5.QtWidgets import QFileDialog, QMessageBox, QTextEdit, QScrollBar
-from PyQt5.QtCore import QObject, Qt, QEvent
+from PyQt5.QtCore import QObject, Qt, QEvent, QThreadPool
 from PyQt5.QtGui import QTextCharFormat, QColor, QTextCursor, QPalette, QTextFormat
-from model.word_analyzer import read_and_preprocess_file, calculate_word_frequencies, get_text_statistics, get_sorted_word_frequencies
-from collections import Counter
+from model.word_analyzer import read_and_preprocess_file, get_sorted_word_frequencies
 import pandas as pd
 from tabulate import tabulate
 from controller.dashboard_controller import DashboardController
+from controller.job_queue import JobQueue, NORMAL
 import logging
-from tests.assurance_tests import (
-    independent_total_word_count,
-    independent_unique_word_count,
-    independent_percentage_sum,
-    independent_rank_count,
-    independent_total_from_counts
-)
 from model.corpora import Corpus  # Add this import
-from model.corpus_report_manager import CorpusReportManager  # Add this import
+from model.corpus_report_manager import CorpusReportManager, DEFAULT_MEMORY_BUDGET
+from model.report_store import open_default_store
+from model import report_export
+from model.workspace import save_workspace, load_workspace, default_workspace_path
+from model.report_fingerprint import (
+    file_signatures,
+    corpus_fingerprint,
+    stale_files,
+)
+from analysis.bo_service import BOResultService
+from analysis.near_duplicates import NearDuplicateIndex
+from analysis import report_engine
+from controller.analysis_worker import AnalysisTask
 
 
 class MainController(QObject):
-    def __init__(self, view):
+    def __init__(self, view, bo_workers=None):
         super().__init__()
         self.view = view
         self.imported_files = set()
-        self.file_reports = {}
+        # Corpus whose report the main window shows (see file_reports)
+        self.shown_corpus = None
         self.connect_signals()
         self.current_report_index = -1  # Track the current report
         self.reports_list = []  # Store the order of reports (master + individual)
@@ -35,8 +41,29 @@ class MainController(QObject):
         # New multi-corpus structure
         self.corpora = {}
         self.active_corpus = None
-        # Add the report manager
-        self.report_manager = CorpusReportManager()
+        # Add the report manager, persisted across sessions
+        self.report_manager = CorpusReportManager(store=open_default_store(),
+                                                  memory_budget=DEFAULT_MEMORY_BUDGET)
+        # Shared BO results for the bar/line/table cells
+        # bo_workers: processes for BO computations (None = one per CPU core)
+        self.bo_service = BOResultService(self.report_manager, workers=bo_workers)
+        # MinHash LSH index of every analyzed file's word set
+        self.duplicate_index = NearDuplicateIndex()
+        # Similarity threshold for skipping near-duplicates in run_analysis (None = off)
+        self.near_duplicate_threshold = None
+        # Background analysis started from the main window (see start_analysis)
+        self.analysis_pool = QThreadPool()
+        self.analysis_pool.setMaxThreadCount(1)
+        self.analysis_task = None
+        # BO scores and similarity matrices for the dashboard cells. One worker:
+        # BO jobs take BOResultService's lock anyway.
+        self.job_queue = JobQueue(max_workers=1, parent=self)
+        # Whole-corpus re-analysis (refresh_corpus_reports) has its own worker:
+        # a running job is never interrupted, so it would hold up the
+        # interactive jobs of cells the user opens in the meantime.
+        self.analysis_queue = JobQueue(max_workers=1, parent=self)
+        # Corpora whose stale report refresh_corpus_reports is rebuilding on the analysis queue
+        self.refreshing_corpora = set()
         # Corpus state tracking
         self.single_active_corpus = None   # Name of the single active corpus
         self.multi_active_corpora = set()  # Set of multi-active corpus names
@@ -51,7 +78,8 @@ class MainController(QObject):
     def connect_signals(self):
         self.view.import_files_signal.connect(self.import_files)
         self.view.remove_files_signal.connect(self.remove_files)
-        self.view.run_analysis_signal.connect(self.run_analysis)
+        self.view.run_analysis_signal.connect(self.start_analysis)
+        self.view.cancel_analysis_signal.connect(self.cancel_analysis)
         self.view.next_report_signal.connect(self.next_report)
         self.view.previous_report_signal.connect(self.previous_report)
         self.view.dashboard_signal.connect(self.launch_dashboard)
@@ -134,140 +162,284 @@ class MainController(QObject):
         self.import_files(sample_corpus=True)  # Call the import method with the sample_corpus flag
 
     def run_analysis(self):
-        """Run analysis on files from the active corpus."""
+        """Run analysis on files from the active corpus, on the calling thread."""
         try:
-            logging.info("Starting analysis...")
-            
-            # Use the active corpus's files if available; otherwise fallback.
-            if self.active_corpus is not None:
-                files_to_analyze = self.active_corpus.get_files()
-                corpus_name = self.active_corpus.name
-                logging.info(f"Active corpus: {corpus_name}")
-                print(f"[DEBUG] Running analysis for corpus: {corpus_name} with {len(files_to_analyze)} files")
-            else:
-                files_to_analyze = list(self.imported_files)
-                corpus_name = "Default Corpus"
-                logging.info("No active corpus; using all imported files.")
-                print(f"[DEBUG] Running analysis for Default Corpus with {len(files_to_analyze)} files")
-            
-            if not files_to_analyze:
-                self.view.display_report("No files available for analysis.")
-                print(f"[ERROR] No files available for analysis in corpus: {corpus_name}")
+            job = self.prepare_analysis()
+            if job is None:
                 return False
-            
-            # Clear previous analysis data.
-            self.file_reports.clear()
-            self.reports_list = []
-            self.word_frequencies.clear()
-            self.percentage_frequencies.clear()
-            self.z_scores.clear()
-            master_word_counts = Counter()
-            
-            # Process each file in the active corpus.
-            for file in files_to_analyze:
-                try:
-                    words, _ = read_and_preprocess_file(file)
-                    word_counts = calculate_word_frequencies(words)
-                    stats = get_text_statistics(word_counts)
-                    logging.debug(f"Word Stats for {file}: {stats['word_stats']}")
-                    
-                    self.file_reports[file] = {
-                        'data': stats,
-                        'title': f"Report for {os.path.basename(file)}"
-                    }
-                    self.word_frequencies[file] = [count for _, count, _, _, _ in stats['word_stats']]
-                    self.percentage_frequencies[file] = [perc for _, _, perc, _, _ in stats['word_stats']]
-                    self.z_scores[file] = [z for _, _, _, z, _ in stats['word_stats']]
-                    master_word_counts.update(word_counts)
-                    
-                    # Run assurance tests for each file.
-                    assurance_results, all_tests_passed = self.run_assurance_tests(stats)
-                    self.file_reports[file]['assurance'] = {
-                        'results': assurance_results,
-                        'all_passed': all_tests_passed
-                    }
-                    
-                    logging.debug(f"Processed file: {file}")
-                except Exception as e:
-                    logging.error(f"Error processing file {file}: {str(e)}")
-                    continue
-            
-            # Build the master report.
-            if master_word_counts:
-                master_stats = get_text_statistics(master_word_counts)
-                self.file_reports["Master Report"] = {
-                    'data': master_stats,
-                    'title': "Master Report"
-                }
-                logging.debug(f"Master Word Stats: {master_stats['word_stats']}")
-                assurance_results, all_tests_passed = self.run_assurance_tests(master_stats)
-                self.file_reports["Master Report"]['assurance'] = {
-                    'results': assurance_results,
-                    'all_passed': all_tests_passed
-                }
-                
-                # Update the reports list.
-                self.reports_list = ["Master Report"] + files_to_analyze
-                self.current_report_index = 0
-                self.generate_report(master_stats, "Master Report")
-                self.view.display_assurance_results(assurance_results, all_tests_passed, "Master Report")
-            else:
-                logging.warning("No data to analyze")
-                self.view.display_report("No data available for analysis")
-                print(f"[ERROR] No data to analyze for corpus: {corpus_name}")
-                return False
-                
-            # Store the report in the report manager
-            print(f"[DEBUG] Storing report for corpus: {corpus_name} with {len(self.file_reports)} entries")
-            self.report_manager.update_report_for_corpus(corpus_name, self.file_reports)
-            
-            # Verify the report was stored
-            stored_report = self.report_manager.get_report_for_corpus(corpus_name)
-            if stored_report:
-                print(f"[DEBUG] Verified report stored for corpus: {corpus_name}, keys: {list(stored_report.keys())}")
-            else:
-                print(f"[ERROR] Failed to store report for corpus: {corpus_name}")
-                
-            # Update any open dashboard
-            if hasattr(self, 'dashboard_controller'):
-                self.dashboard_controller.refresh_visualizations()
-            
-            logging.info("Analysis completed successfully")
-            return True
-            
+            report = report_engine.analyze_corpus(job['files'], self.analysis_config(),
+                                                  known=self.known_file_reports(job['files']),
+                                                  duplicate_index=self.duplicate_index)
+            return self.finish_analysis(job['corpus_name'], report)
+
         except Exception as e:
             logging.error(f"Analysis failed: {str(e)}")
             self.view.display_report(f"Analysis error: {str(e)}")
-            print(f"[ERROR] Analysis failed for corpus: {corpus_name}: {str(e)}")
+            print(f"[ERROR] Analysis failed: {str(e)}")
+            return False
+
+    def start_analysis(self):
+        """
+        Analyze the active corpus on a worker thread, keeping the window
+        responsive. The view shows progress and can cancel; the report is
+        stored and the dashboard refreshed on the GUI thread when done.
+
+        Returns:
+            bool: True if an analysis was started
+        """
+        if self.analysis_task is not None:
+            print("[DEBUG] An analysis is already running")
+            return False
+        job = self.prepare_analysis()
+        if job is None:
             return False
+        # No duplicate_index: NearDuplicateIndex is not thread-safe, the
+        # worker filters with a private one.
+        task = AnalysisTask(job['files'], self.analysis_config(), self.known_file_reports(job['files']))
+        task.signals.progress.connect(self.view.show_analysis_progress)
+        # the "Default Corpus" of imported files is only a corpus once renamed
+        registered = job['corpus_name'] in self.corpora
+        task.signals.finished.connect(lambda report: self._on_analysis_finished(job['corpus_name'], report, registered))
+        task.signals.cancelled.connect(self._on_analysis_cancelled)
+        task.signals.failed.connect(self._on_analysis_failed)
+        self.analysis_task = task
+        self.view.analysis_started(len(job['files']))
+        self.analysis_pool.start(task)
+        return True
+
+    def cancel_analysis(self):
+        """Stop the running background analysis before its next file."""
+        if self.analysis_task is not None:
+            self.analysis_task.cancel()
+
+    def _on_analysis_finished(self, corpus_name, report, registered=True):
+        self.analysis_task = None
+        if registered and corpus_name not in self.corpora:
+            # removed or renamed while it was analyzed: storing the report
+            # would leave an orphan in the report store
+            self.view.analysis_stopped(f"Corpus {corpus_name} was removed during analysis")
+            print(f"[DEBUG] Discarded report of removed corpus: {corpus_name}")
+            return
+        self.view.analysis_stopped()
+        try:
+            self.finish_analysis(corpus_name, report)
+        except Exception as e:
+            self._on_analysis_failed(str(e))
+
+    def _on_analysis_cancelled(self, files_done):
+        self.analysis_task = None
+        self.view.analysis_stopped(f"Analysis cancelled after {files_done} files")
+        logging.info("Analysis cancelled")
+
+    def _on_analysis_failed(self, message):
+        self.analysis_task = None
+        self.view.analysis_stopped(f"Analysis failed: {message}")
+        logging.error(f"Analysis failed: {message}")
+
+    def prepare_analysis(self):
+        """
+        Pick the corpus an analysis of the active corpus covers.
+
+        Returns:
+            dict: {'corpus_name', 'files'}, or None if there is nothing to analyze
+        """
+        logging.info("Starting analysis...")
+
+        # Use the active corpus's files if available; otherwise fallback.
+        if self.active_corpus is not None:
+            files_to_analyze = self.active_corpus.get_files()
+            corpus_name = self.active_corpus.name
+            logging.info(f"Active corpus: {corpus_name}")
+            print(f"[DEBUG] Running analysis for corpus: {corpus_name} with {len(files_to_analyze)} files")
+        else:
+            files_to_analyze = list(self.imported_files)
+            corpus_name = "Default Corpus"
+            logging.info("No active corpus; using all imported files.")
+            print(f"[DEBUG] Running analysis for Default Corpus with {len(files_to_analyze)} files")
+
+        if not files_to_analyze:
+            self.view.display_report("No files available for analysis.")
+            print(f"[ERROR] No files available for analysis in corpus: {corpus_name}")
+            return None
+        return {'corpus_name': corpus_name, 'files': files_to_analyze}
+
+    def analysis_config(self):
+        """The current analysis settings for report_engine."""
+        return report_engine.AnalysisConfig(near_duplicate_threshold=self.near_duplicate_threshold)
+
+    def known_file_reports(self, files):
+        """{file: shared report} of files already analyzed for a loaded corpus."""
+        known = {}
+        for file in files:
+            file_report = self.report_manager.get_file_report(file)
+            if file_report is not None:
+                known[file] = file_report
+        return known
+
+    def finish_analysis(self, corpus_name, report):
+        """
+        Store a new corpus report, index its files for near-duplicates, show
+        it and refresh the dashboard cells that show the corpus. Runs on the
+        GUI thread.
+
+        Returns:
+            bool: True if the report has data
+        """
+        if "Master Report" not in report:
+            logging.warning("No data to analyze")
+            self.view.display_report("No data available for analysis")
+            print(f"[ERROR] No data to analyze for corpus: {corpus_name}")
+            return False
+
+        # Store the report in the report manager; the snapshot it keeps is
+        # what views hold, without copying.
+        print(f"[DEBUG] Storing report for corpus: {corpus_name} with {len(report)} entries")
+        report = self.report_manager.update_report_for_corpus(corpus_name, report)
+        self.index_report_for_duplicates(report)
+        self.show_corpus_report(corpus_name, report)
+
+        # Update the dashboard cells showing this corpus
+        if hasattr(self, 'dashboard_controller'):
+            self.dashboard_controller.refresh_cells_for_corpus(corpus_name)
+
+        logging.info("Analysis completed successfully")
+        return True
+
+    @property
+    def file_reports(self):
+        """
+        The report the main window shows, looked up by corpus name rather
+        than held, so the report manager can free it when evicted.
+        """
+        if self.shown_corpus is None:
+            return {}
+        return self.report_manager.get_report_for_corpus(self.shown_corpus)
+
+    def show_corpus_report(self, corpus_name, report):
+        """Make a corpus' report the one the main window shows, starting at its Master Report."""
+        self.shown_corpus = corpus_name
+        files = [k for k in report if k != "Master Report"]
+        self.reports_list = ["Master Report"] + files
+        self.current_report_index = 0
+        self.word_frequencies.clear()
+        self.percentage_frequencies.clear()
+        self.z_scores.clear()
+        for file in files:
+            word_stats = report[file]['data']['word_stats']
+            self.word_frequencies[file] = [count for _, count, _, _, _ in word_stats]
+            self.percentage_frequencies[file] = [perc for _, _, perc, _, _ in word_stats]
+            self.z_scores[file] = [z for _, _, _, z, _ in word_stats]
+
+        if "Master Report" in report:
+            master_data = report["Master Report"]
+            logging.debug(f"Master Word Stats: {master_data['data']['word_stats']}")
+            self.generate_report(master_data['data'], "Master Report")
+            self.view.display_assurance_results(master_data['assurance']['results'],
+                                                master_data['assurance']['all_passed'], "Master Report")
+        else:
+            self.view.display_report("No data available for analysis")
+
+    def index_report_for_duplicates(self, report):
+        """Add a report's files that are not indexed yet to the near-duplicate index."""
+        for file, file_report in report.items():
+            if file != "Master Report" and file not in self.duplicate_index:
+                self.duplicate_index.add(file, [ws[0] for ws in file_report['data']['word_stats']])
+
+    def update_corpus_report_files(self, corpus_name, added_files=(), removed_files=()):
+        """
+        Update a stored corpus report after files were added to or removed
+        from the corpus, analyzing only the added files.
+
+        Unchanged file reports are carried over as-is, so the BO result
+        service only recomputes pairs involving the changed files. Falls
+        back to a full analysis when the corpus has no report yet.
+
+        Returns:
+            bool: True on success, False otherwise
+        """
+        old_report = self.report_manager.get_report_for_corpus(corpus_name)
+        if not old_report:
+            if not self.generate_report_for_corpus(corpus_name):
+                return False
+        else:
+            report = report_engine.update_corpus(old_report, added_files, removed_files, self.analysis_config(),
+                                                 known=self.known_file_reports(added_files),
+                                                 duplicate_index=self.duplicate_index)
+            print(f"[DEBUG] Updated report for corpus {corpus_name}: +{len(added_files)} / -{len(removed_files)} files")
+            report = self.report_manager.update_report_for_corpus(corpus_name, report)
+            self.index_report_for_duplicates(report)
+            if self.active_corpus and self.active_corpus.name == corpus_name:
+                self.show_corpus_report(corpus_name, report)
+
+        if hasattr(self, 'dashboard_controller'):
+            # files both removed and added were re-read: their contents changed
+            changed = [file for file in added_files if file in removed_files]
+            self.dashboard_controller.corpus_files_changed(corpus_name, changed)
+        return True
+
+    def index_files_for_duplicates(self, files):
+        """
+        Add files that are not indexed yet to the near-duplicate index. Words
+        come from the file's analyzed report when one is loaded; only files
+        never analyzed are read here.
+        """
+        for file in files:
+            if file in self.duplicate_index:
+                continue
+            file_report = self.report_manager.get_file_report(file)
+            if file_report is not None:
+                self.duplicate_index.add(file, [ws[0] for ws in file_report['data']['word_stats']])
+                continue
+            try:
+                words, _ = read_and_preprocess_file(file)
+                self.duplicate_index.add(file, set(words))
+            except Exception as e:
+                logging.error(f"Error indexing file {file} for near-duplicates: {str(e)}")
+
+    def find_near_duplicates(self, file, threshold=None):
+        """List (file, similarity) pairs of indexed near duplicates of a file."""
+        self.index_files_for_duplicates([file])
+        return self.duplicate_index.query(file, threshold=threshold)
+
+    def set_near_duplicate_filter(self, threshold):
+        """Skip near-duplicate files in run_analysis at this similarity (None disables)."""
+        self.near_duplicate_threshold = threshold
+        logging.info(f"Near-duplicate filter threshold set to {threshold}")
+
+    def set_bo_workers(self, workers):
+        """Compute BO scores with this many processes (None = one per CPU core)."""
+        self.bo_service.set_workers(workers)
+        logging.info(f"BO worker processes set to {workers or 'one per CPU core'}")
 
     def generate_report(self, stats, report_title):
         """Generates a report including title, total word count, and formatted table."""
         total_word_count = stats['total_word_count']
         word_stats = stats['word_stats']
-        # Sort word_stats by count in descending order (frequency rank)
-        word_stats.sort(key=lambda x: x[1], reverse=True)
+        # Sort word_stats by count in descending order (frequency rank); sorted
+        # copy, stored word_stats may be read-only memory-mapped columns
+        word_stats = sorted(word_stats, key=lambda x: x[1], reverse=True)
 
         # Pass the formatted report details to the view
         self.view.display_report(word_stats, report_title, total_word_count)
 
     def next_report(self):
         try:
-            if not self.file_reports:
+            file_reports = self.file_reports
+            if not file_reports:
                 self.view.display_report("No reports available.")
                 return
 
             # Move to the next report
             self.current_report_index = (self.current_report_index + 1) % len(self.reports_list)
             current_report_key = self.reports_list[self.current_report_index]
-            report_data = self.file_reports[current_report_key]['data']
-            report_title = self.file_reports[current_report_key]['title']
+            report_data = file_reports[current_report_key]['data']
+            report_title = file_reports[current_report_key]['title']
 
             # Generate the report for the new context (the current file or master report)
             self.generate_report(report_data, report_title)
 
             # Display the corresponding assurance results
-            assurance_info = self.file_reports[current_report_key]['assurance']
+            assurance_info = file_reports[current_report_key]['assurance']
             self.view.display_assurance_results(
                 assurance_info['results'],
                 assurance_info['all_passed'],
@@ -280,21 +452,22 @@ class MainController(QObject):
 
     def previous_report(self):
         try:
-            if not self.file_reports:
+            file_reports = self.file_reports
+            if not file_reports:
                 self.view.display_report("No reports available.")
                 return
 
             # Move to the previous report (circularly)
             self.current_report_index = (self.current_report_index - 1) % len(self.reports_list)
             current_report_key = self.reports_list[self.current_report_index]
-            report_data = self.file_reports[current_report_key]['data']
-            report_title = self.file_reports[current_report_key]['title']
+            report_data = file_reports[current_report_key]['data']
+            report_title = file_reports[current_report_key]['title']
 
             # Generate the report for the new context (the current file or master report)
             self.generate_report(report_data, report_title)
 
             # Display the corresponding assurance results
-            assurance_info = self.file_reports[current_report_key]['assurance']
+            assurance_info = file_reports[current_report_key]['assurance']
             self.view.display_assurance_results(
                 assurance_info['results'],
                 assurance_info['all_passed'],
@@ -305,57 +478,132 @@ class MainController(QObject):
             logging.error(f"An error occurred while moving to the previous report: {str(e)}")
             self.view.display_report(f"An error occurred: {str(e)}")
 
-    def run_assurance_tests(self, stats):
-        """Runs independent assurance tests and returns the results."""
-        # Extract data needed for assurance tests from stats
-        total_word_count = stats['total_word_count']
-        unique_word_count = stats['unique_word_count']
-        word_stats = stats['word_stats']
+    def export_reports(self, path, corpus_names=None):
+        """
+        Export corpus reports (all stored ones by default) to Parquet, Arrow
+        or CSV, chosen by the path's extension.
 
-        # Prepare data for assurance functions
-        word_counts = {word: count for word, count, _, _, _ in word_stats}
-        words_list = [word for word, count in word_counts.items() for _ in range(count)]
-
-        # Perform independent assurance calculations
-        ind_total_word_count = independent_total_word_count(words_list)
-        ind_unique_word_count = independent_unique_word_count(words_list)
-        ind_percentage_sum = independent_percentage_sum(word_counts)
-        ind_rank_count = independent_rank_count(word_stats)
-        ind_total_from_counts = independent_total_from_counts(word_counts)
-
-        # Prepare assurance results
-        assurance_results = {
-            'Total Word Count': {
-                'Expected': total_word_count,
-                'Actual': ind_total_word_count,
-                'Passed': total_word_count == ind_total_word_count
-            },
-            'Unique Word Count': {
-                'Expected': unique_word_count,
-                'Actual': ind_unique_word_count,
-                'Passed': unique_word_count == ind_unique_word_count
-            },
-            'Sum of Percentages': {
-                'Expected': 100.0,
-                'Actual': ind_percentage_sum,
-                'Passed': abs(ind_percentage_sum - 100.0) < 0.01  # Allow for small floating point errors
+        Returns:
+            int: Number of word rows written
+        """
+        corpus_names = corpus_names or self.report_manager.list_available_reports()
+        corpus_reports = {name: self.report_manager.get_report_for_corpus(name) for name in corpus_names}
+        rows = report_export.export_reports(path, corpus_reports)
+        print(f"[DEBUG] Exported {rows} rows of {len(corpus_reports)} corpora to {path}")
+        return rows
+
+    def import_reports(self, path):
+        """
+        Load corpus reports from an export into the report manager without
+        re-tokenizing. Corpora that do not exist yet are created with the
+        files the report was analyzed from.
+
+        Returns:
+            list: Names of the imported corpora
+        """
+        imported = report_export.import_reports(path)
+        for corpus_name, report in imported.items():
+            for file_key, file_report in report.items():
+                is_master = file_key == "Master Report"
+                assurance_results, all_tests_passed = report_engine.run_assurance_tests(
+                    file_report['data'], report if is_master else None
+                )
+                file_report['assurance'] = {
+                    'results': assurance_results,
+                    'all_passed': all_tests_passed
+                }
+            if corpus_name not in self.corpora:
+                corpus = self.add_corpus(corpus_name)
+                master = report.get("Master Report") or {}
+                for file in master.get('file_signatures') or [k for k in report if k != "Master Report"]:
+                    corpus.add_file(file)
+            self.report_manager.update_report_for_corpus(corpus_name, report)
+            print(f"[DEBUG] Imported report for corpus {corpus_name} with {len(report)} entries")
+            if hasattr(self, 'dashboard_controller'):
+                # the export may hold other versions of files other corpora list
+                self.dashboard_controller.corpus_files_changed(
+                    corpus_name, [file for file in report if file != "Master Report"])
+        if hasattr(self, 'dashboard_controller') and self.dashboard_controller.view:
+            self.dashboard_controller.view.populate_corpora_tree()
+        return list(imported)
+
+    def save_workspace(self, path=None):
+        """
+        Save corpora, active corpus selection, analysis settings, dashboard
+        cells and references to the corpora's stored reports as JSON
+        (the user's default workspace if no path is given).
+
+        Returns:
+            str: The path written
+        """
+        path = path or default_workspace_path()
+        cells = self.dashboard_controller.workspace_cells() if hasattr(self, 'dashboard_controller') else []
+        workspace = {
+            'corpora': [corpus.to_dict() for corpus in self.corpora.values()],
+            'single_active_corpus': self.single_active_corpus,
+            'multi_active_corpora': sorted(self.multi_active_corpora),
+            'imported_files': sorted(self.imported_files),
+            'settings': {
+                'near_duplicate_threshold': self.near_duplicate_threshold,
+                'memory_budget': self.report_manager.memory_budget,
+                'bo_workers': self.bo_service.workers,
             },
-            'Number of Ranks': {
-                'Expected': unique_word_count,
-                'Actual': ind_rank_count,
-                'Passed': unique_word_count == ind_rank_count
+            'reports': {
+                name: self.report_manager.get_report_fingerprint(name)
+                for name in self.corpora if self.report_manager.has_report_for_corpus(name)
             },
-            'Total from Counts': {
-                'Expected': total_word_count,
-                'Actual': ind_total_from_counts,
-                'Passed': total_word_count == ind_total_from_counts
-            }
+            'cells': cells,
         }
+        save_workspace(path, workspace)
+        print(f"[DEBUG] Saved workspace with {len(self.corpora)} corpora and {len(cells)} cells to {path}")
+        return path
+
+    def restore_workspace(self, path=None):
+        """
+        Replace the current corpora and dashboard cells with a saved
+        workspace. Reports still matching their corpus' files are used from
+        the report store as they are; only missing or stale ones are
+        computed, when a cell first needs them.
+
+        Returns:
+            dict: The loaded workspace
+        """
+        workspace = load_workspace(path or default_workspace_path())
+
+        self.corpora = {}
+        self.bo_service.invalidate()
+        for data in workspace['corpora']:
+            corpus = Corpus.from_dict(data)
+            self.corpora[corpus.name] = corpus
+        single = workspace.get('single_active_corpus')
+        if single not in self.corpora:
+            single = next(iter(self.corpora), None)
+        self.single_active_corpus = single
+        self.active_corpus = self.corpora.get(single)
+        self.multi_active_corpora = {name for name in workspace['multi_active_corpora'] if name in self.corpora}
+        self.imported_files = set(workspace['imported_files'])
+        self.view.update_file_list(list(self.imported_files))
 
-        # Determine overall pass/fail status
-        all_tests_passed = all(result['Passed'] for result in assurance_results.values())
+        settings = workspace['settings']
+        self.set_near_duplicate_filter(settings.get('near_duplicate_threshold'))
+        if 'memory_budget' in settings:
+            self.report_manager.set_memory_budget(settings['memory_budget'])
+        if 'bo_workers' in settings:
+            self.set_bo_workers(settings['bo_workers'])
 
-        return assurance_results, all_tests_passed
+        fresh = [name for name in self.corpora if self.has_report_for_corpus(name)]
+        changed = [name for name, fingerprint in workspace['reports'].items()
+                   if name in self.corpora and name not in fresh and fingerprint]
+        print(f"[DEBUG] Workspace has {len(fresh)} fresh reports; "
+              f"{len(self.corpora) - len(fresh)} will be computed on demand"
+              + (f" (files changed since save: {changed})" if changed else ""))
+
+        if workspace['cells'] or hasattr(self, 'dashboard_controller'):
+            self.launch_dashboard()
+            self.dashboard_controller.restore_cells(workspace['cells'])
+            self.dashboard_controller.view.populate_corpora_tree()
+            self.dashboard_controller.view.update_corpus_indicators()
+        return workspace
 
     def launch_dashboard(self):
         # Initialize the dashboard controller if it doesn't exist
@@ -430,6 +678,11 @@ class MainController(QObject):
                 # Remove the old report
                 self.report_manager.remove_corpus_report(old_name)
                 logging.info(f"Updated report reference from '{old_name}' to '{new_name}'")
+            if self.shown_corpus == old_name:
+                self.shown_corpus = new_name
+        # BO results are cached by corpus name
+        self.bo_service.invalidate(old_name)
+        self.bo_service.invalidate(new_name)
         
         logging.info(f"Successfully renamed corpus from '{old_name}' to '{new_name}'")
         return True
@@ -473,15 +726,27 @@ class MainController(QObject):
             )
             if files:
                 corpus = self.corpora[corpus_name]
+                added_files = [file for file in files if file not in corpus.get_files()]
                 for file in files:
                     corpus.add_file(file)
                 print(f"[DEBUG] Added files to corpus {corpus_name}: {files}")
                 
-                # Check if this is the active corpus
-                if self.active_corpus and self.active_corpus.name == corpus_name:
+                # Update an existing report with just the new files. A report
+                # kept from an earlier session may also list files this
+                # corpus no longer has.
+                if added_files and self.report_manager.has_report_for_corpus(corpus_name):
+                    print(f"[DEBUG] Updating report after adding files to corpus")
+                    report = self.report_manager.get_report_for_corpus(corpus_name)
+                    removed_files = [f for f in report if f != "Master Report" and f not in corpus.get_files()]
+                    self.update_corpus_report_files(corpus_name, added_files=added_files,
+                                                    removed_files=removed_files)
+                elif self.active_corpus and self.active_corpus.name == corpus_name:
                     # Re-run analysis to update reports with new files
                     print(f"[DEBUG] Running analysis after adding files to active corpus")
                     self.run_analysis()
+                elif hasattr(self, 'dashboard_controller'):
+                    # cells showing the corpus have its report built in the background
+                    self.dashboard_controller.corpus_files_changed(corpus_name)
                 
                 # If we have a dashboard open, refresh its tree
                 if hasattr(self, 'dashboard_controller') and \
@@ -498,6 +763,9 @@ class MainController(QObject):
             del self.corpora[corpus_name]
             # Also remove its report data
             self.report_manager.remove_corpus_report(corpus_name)
+            self.bo_service.invalidate(corpus_name)
+            if self.shown_corpus == corpus_name:
+                self.shown_corpus = None
             print(f"[DEBUG] Removed corpus: {corpus_name}")
         else:
             print(f"[DEBUG] Corpus {corpus_name} not found.")
@@ -561,65 +829,165 @@ class MainController(QObject):
         """Get the analysis report for a specific corpus."""
         return self.report_manager.get_report_for_corpus(corpus_name)
     
+    def snapshot_bo_reports(self, corpus_ids):
+        """
+        Revisions and reports of a set of corpora for a BO job, taken on the
+        GUI thread; pass them to get_bo_* on the job queue.
+        """
+        return self.bo_service.snapshot(corpus_ids)
+
+    def get_bo_results(self, corpus_ids, snapshots=None):
+        """Get the shared BOResult (sorted BOn1/BOn2 tuples) for a set of corpora."""
+        return self.bo_service.get_results(corpus_ids, snapshots)
+
+    def get_bo_cross_results(self, corpus_a, corpus_b, snapshots=None):
+        """Get the BOResult of corpus A vs corpus B (cross-corpus text pairs only)."""
+        return self.bo_service.get_cross_results(corpus_a, corpus_b, snapshots)
+
+    def get_bo_top_results(self, corpus_ids, k, kind="bon1", snapshots=None):
+        """Get the k best (word, score) pairs of BOn1 or BOn2 for a set of corpora."""
+        return self.bo_service.get_top_results(corpus_ids, k, kind, snapshots)
+
     def generate_report_for_corpus(self, corpus_name):
         """
         Run analysis for a specific corpus and store its report.
         
         This allows generating reports without changing the active corpus.
+        The main window switches to the new report only if it is the
+        active corpus'; open cells are left to the caller to update.
         """
         if corpus_name not in self.corpora:
             logging.error(f"Cannot generate report: corpus '{corpus_name}' not found")
             return False
-            
-        # Store the current active corpus
-        previous_active = self.active_corpus
-        previous_reports = self.file_reports.copy() if hasattr(self, 'file_reports') else {}
-        
-        # Temporarily set the requested corpus as active
-        self.active_corpus = self.corpora[corpus_name]
-        
-        # Run the analysis - this will update file_reports and store in report_manager
+
         print(f"[DEBUG] Generating report for corpus: {corpus_name}")
-        success = self.run_analysis()
-        
-        if success:
-            # Explicitly ensure the report is stored in the report manager
-            # This is redundant with run_analysis but ensures it's definitely stored
-            if hasattr(self, 'report_manager'):
-                print(f"[DEBUG] Explicitly storing report for corpus: {corpus_name}")
-                self.report_manager.update_report_for_corpus(corpus_name, self.file_reports)
-                
-                # Verify the report was stored
-                stored_report = self.report_manager.get_report_for_corpus(corpus_name)
-                if stored_report:
-                    print(f"[DEBUG] Verified report stored for corpus: {corpus_name}, keys: {list(stored_report.keys())}")
-                else:
-                    print(f"[ERROR] Failed to store report for corpus: {corpus_name}")
-        
-        # Restore the original active corpus
-        self.active_corpus = previous_active
-        
-        # Restore the previous file_reports to avoid confusion
-        if previous_active:
-            print(f"[DEBUG] Restoring previous active corpus: {previous_active.name}")
-            self.file_reports = previous_reports
-            
-        return success
+        files = self.corpora[corpus_name].get_files()
+        report = report_engine.analyze_corpus(files, self.analysis_config(), known=self.known_file_reports(files),
+                                              duplicate_index=self.duplicate_index)
+        if "Master Report" not in report:
+            print(f"[ERROR] No data to analyze for corpus: {corpus_name}")
+            return False
+        report = self.report_manager.update_report_for_corpus(corpus_name, report)
+        self.index_report_for_duplicates(report)
+        if self.active_corpus and self.active_corpus.name == corpus_name:
+            self.show_corpus_report(corpus_name, report)
+        return True
+
+    def refresh_corpus_reports(self, corpus_names):
+        """
+        Start rebuilding the stale reports among the named corpora on the
+        analysis queue, all together (report_engine.analyze_corpora): a file
+        listed by several corpora is read once, unchanged files of a stale
+        report are reused, and many files are analyzed in parallel. Once
+        the reports are stored, on the GUI thread, the dashboard cells
+        showing them are refreshed.
+
+        Returns:
+            list: Names of the corpora whose report is being rebuilt,
+            including those started by an earlier call
+        """
+        names = [name for name in dict.fromkeys(corpus_names) if name in self.corpora]
+        stale = [name for name in names
+                 if name not in self.refreshing_corpora and not self.has_report_for_corpus(name)]
+        if stale:
+            corpora = {name: self.corpora[name].get_files() for name in stale}
+            known = {}
+            for name in stale:
+                known.update((k, v) for k, v in self.report_manager.get_report_for_corpus(name).items()
+                             if k != "Master Report")
+            known.update(self.known_file_reports([file for files in corpora.values() for file in files]))
+            print(f"[DEBUG] Analyzing {len(stale)} stale corpora: {stale}")
+            # No duplicate_index: NearDuplicateIndex is not thread-safe, the
+            # job filters with a private one.
+            future = self.analysis_queue.submit(("analyze", tuple(stale)), report_engine.analyze_corpora,
+                                           corpora, self.analysis_config(), known=known, priority=NORMAL)
+            self.refreshing_corpora.update(stale)
+            future.when_done(lambda reports: self._on_corpus_reports_refreshed(stale, reports),
+                             lambda message: self._on_corpus_reports_failed(stale, message))
+        return [name for name in names if name in self.refreshing_corpora]
+
+    def _on_corpus_reports_refreshed(self, corpus_names, reports):
+        self.refreshing_corpora.difference_update(corpus_names)
+        for name, report in reports.items():
+            if name not in self.corpora:
+                continue  # removed or renamed while it was analyzed
+            if "Master Report" not in report:
+                print(f"[ERROR] No data to analyze for corpus: {name}")
+                continue
+            report = self.report_manager.update_report_for_corpus(name, report)
+            self.index_report_for_duplicates(report)
+            if self.active_corpus and self.active_corpus.name == name:
+                self.show_corpus_report(name, report)
+            if hasattr(self, 'dashboard_controller'):
+                self.dashboard_controller.refresh_cells_for_corpus(name)
+
+    def _on_corpus_reports_failed(self, corpus_names, message):
+        self.refreshing_corpora.difference_update(corpus_names)
+        logging.error(f"Refreshing reports of {corpus_names} failed: {message}")
+
+    def analysis_config_fingerprint(self):
+        """Fingerprint of the settings, besides the files, that shape a corpus report."""
+        return report_engine.config_fingerprint(self.analysis_config())
+
+    def current_corpus_fingerprint(self, corpus_name):
+        """
+        Fingerprint of a corpus as it is now on disk: its file list, the
+        files' sizes and mtimes and the analysis settings. Costs one stat()
+        per file.
+        """
+        corpus = self.corpora.get(corpus_name)
+        if corpus is None:
+            return None
+        return corpus_fingerprint(file_signatures(corpus.get_files()), self.analysis_config_fingerprint())
 
     def has_report_for_corpus(self, corpus_name):
         """
-        Check if a report already exists for the specified corpus.
+        Check if an up-to-date report exists for the specified corpus.
         
+        A stored report only counts if it was analyzed from the corpus'
+        current files (same list, sizes and mtimes) with the current settings.
+
         Args:
             corpus_name (str): The name of the corpus to check
             
         Returns:
-            bool: True if a report exists, False otherwise
+            bool: True if a fresh report exists, False otherwise
         """
         if hasattr(self, 'report_manager'):
-            return self.report_manager.has_report_for_corpus(corpus_name)
+            return self.report_manager.has_report_for_corpus(
+                corpus_name, fingerprint=self.current_corpus_fingerprint(corpus_name)
+            )
         return False
 
+    def ensure_fresh_report(self, corpus_name):
+        """
+        Make sure the stored report of a corpus matches its files on disk.
+
+        Fresh reports are left alone. A stale report with recorded file
+        signatures is updated for just the added, removed and changed
+        files; otherwise the corpus is analyzed again as a whole.
+
+        Returns:
+            bool: True if a fresh report is available afterwards
+        """
+        if corpus_name not in self.corpora:
+            return self.report_manager.has_report_for_corpus(corpus_name)
+        if self.has_report_for_corpus(corpus_name):
+            return True
+        report = self.report_manager.get_report_for_corpus(corpus_name)
+        master = report.get("Master Report") or {}
+        stale = None
+        if report and master.get('analysis_config') == self.analysis_config_fingerprint():
+            stale = stale_files(report, file_signatures(self.corpora[corpus_name].get_files()))
+        if stale is None:
+            print(f"[DEBUG] Report for corpus {corpus_name} is stale, analyzing it again")
+            return self.generate_report_for_corpus(corpus_name)
+        added, removed, changed = stale
+        print(f"[DEBUG] Report for corpus {corpus_name} is stale: "
+              f"{len(added)} added, {len(removed)} removed, {len(changed)} changed files")
+        return self.update_corpus_report_files(corpus_name, added_files=added + changed,
+                                               removed_files=removed + changed)
+
     def debug_report_status(self, corpus_name=None):
         """
         Print debug information about report status for a corpus or all corpora.
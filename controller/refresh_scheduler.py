@@ -0,0 +1,153 @@
+from PyQt5.QtCore import QObject, QTimer
+
+from controller.job_queue import NORMAL, BULK
+from model.dependency_graph import DependencyGraph, Node, CORPUS, FILE, REPORT, DERIVED, CELL
+
+# Changes arriving within this many milliseconds are handled in one pass
+DEBOUNCE_MS = 50
+
+# Refresh order: cells on screen, then expanded cells scrolled out of view,
+# then collapsed cells
+VISIBLE, OFF_SCREEN, COLLAPSED = 0, 1, 2
+
+
+class RefreshScheduler(QObject):
+    """
+    Refreshes only the dashboard cells that depend on changed data.
+
+    invalidate() records changed nodes (see model.dependency_graph): a
+    corpus whose file list was edited, files whose contents changed, or a
+    corpus report stored anew. It (re)starts a short single-shot timer, so a
+    burst of changes, e.g. one per imported corpus, is handled once. When
+    the timer fires, the graph is brought in line with the dashboard's
+    cells, the stale corpus reports among the affected nodes are rebuilt
+    together on the analysis queue and the affected cells are queued. Cells
+    showing a report being rebuilt wait for it: storing the new report
+    invalidates them again. Cells on screen are refreshed right away; the
+    others follow one per event-loop pass, so the window stays responsive
+    and a cell the user scrolls to or expands in the meantime moves to the
+    front. Jobs the refreshed cells queue (see JobQueue) get NORMAL priority
+    on screen and BULK otherwise.
+
+    Usage:
+      scheduler = RefreshScheduler(dashboard_controller)
+      scheduler.invalidate([Node(REPORT, "2023")])  # refreshed ~50 ms later
+      scheduler.flush()                             # or now
+    """
+
+    def __init__(self, dashboard, parent=None):
+        super().__init__(parent)
+        self.dashboard = dashboard
+        self.graph = DependencyGraph()
+        self.pending = {}  # changed nodes not handled yet, in arrival order
+        self.queue = {}    # cells waiting for a refresh, in arrival order
+        self.requests = 0
+        self.flushes = 0
+        self.cells_refreshed = 0
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(DEBOUNCE_MS)
+        self.debounce_timer.timeout.connect(self.flush)
+
+        self.drain_timer = QTimer(self)
+        self.drain_timer.setSingleShot(True)
+        self.drain_timer.setInterval(0)
+        self.drain_timer.timeout.connect(self.refresh_next)
+
+    def invalidate(self, nodes):
+        """Mark nodes as changed; their dependent cells are refreshed shortly."""
+        self.pending.update(dict.fromkeys(nodes))
+        self.requests += 1
+        self.debounce_timer.start()
+
+    def sync_graph(self):
+        """Rebuild the cells' edges: cell <- derived result <- reports <- corpus and files."""
+        cells = self.dashboard.notebook_cells()
+        for node in self.graph.nodes(CELL) - {Node(CELL, cell) for cell in cells}:
+            self.graph.remove(node)
+            self.queue.pop(node.key, None)
+
+        corpora = self.dashboard.main_controller.corpora
+        shown = set()
+        for cell in cells:
+            metadata = self.dashboard.cell_data_map[cell]
+            corpus_names = self.dashboard.cell_corpora(cell)
+            derived = Node(DERIVED, ((metadata.get("category_key"), metadata.get("sub_key")),
+                                     tuple(sorted(corpus_names))))
+            self.graph.set_sources(derived, [Node(REPORT, name) for name in corpus_names])
+            self.graph.set_sources(Node(CELL, cell), [derived])
+            shown.update(corpus_names)
+
+        for name in shown:
+            files = corpora[name].get_files() if name in corpora else []
+            self.graph.set_sources(Node(REPORT, name), [Node(CORPUS, name)] + [Node(FILE, f) for f in files])
+        # results and reports no cell shows any more
+        for kind in (DERIVED, REPORT):
+            for node in self.graph.nodes(kind):
+                if not self.graph.dependents.get(node):
+                    self.graph.remove(node)
+
+    def flush(self):
+        """Handle the pending changes now."""
+        self.debounce_timer.stop()
+        if not self.pending or not self.dashboard.view:
+            return
+        changed, self.pending = list(self.pending), {}
+        self.flushes += 1
+        self.sync_graph()
+        affected = self.graph.affected(changed)
+
+        corpus_names = [node.key for node in affected if node.kind == REPORT]
+        rebuilding = set()
+        if corpus_names and hasattr(self.dashboard.main_controller, 'refresh_corpus_reports'):
+            rebuilding.update(self.dashboard.main_controller.refresh_corpus_reports(corpus_names) or ())
+
+        cells = [node.key for node in affected if node.kind == CELL]
+        self.queue.update(dict.fromkeys(cells))
+        for cell in [cell for cell in self.queue if not rebuilding.isdisjoint(self.dashboard.cell_corpora(cell))]:
+            del self.queue[cell]
+        visible = [cell for cell in self.queue if self.priority(cell) == VISIBLE]
+        print(f"[DEBUG] {len(changed)} changes affect {len(cells)} cells; "
+              f"{len(visible)} visible refreshed now, {len(self.queue) - len(visible)} queued")
+        for cell in visible:
+            self.refresh(cell)
+        if self.queue:
+            self.drain_timer.start()
+
+    def refresh_next(self):
+        """Refresh the queued cell that matters most, one per event-loop pass."""
+        if not self.queue:
+            return
+        self.refresh(min(self.queue, key=self.priority))
+        if self.queue:
+            self.drain_timer.start()
+
+    def refresh(self, cell):
+        self.queue.pop(cell, None)
+        if cell not in self.dashboard.cell_data_map:
+            return
+        # the cells' jobs wait behind those of cells the user is opening
+        job_queue = getattr(self.dashboard.main_controller, 'job_queue', None)
+        if job_queue is None:
+            self.dashboard.update_cell(cell)
+        else:
+            with job_queue.submitting(NORMAL if self.priority(cell) == VISIBLE else BULK):
+                self.dashboard.update_cell(cell)
+        self.cells_refreshed += 1
+
+    @staticmethod
+    def priority(cell):
+        if not getattr(cell, 'expanded', True):
+            return COLLAPSED
+        if cell.visibleRegion().isEmpty():
+            return OFF_SCREEN
+        return VISIBLE
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'flushes': self.flushes,
+            'cells_refreshed': self.cells_refreshed,
+            'queued': len(self.queue),
+        }
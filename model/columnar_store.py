@@ -0,0 +1,318 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+import uuid
+import weakref
+from collections.abc import Sequence
+
+import numpy as np
+
+from model.file_report_pool import MASTER_REPORT_KEY
+from model.report_fingerprint import report_fingerprint
+
+##############################################################################
+# Debug helper and toggle for debug messages
+##############################################################################
+DEBUG_MODE = False  # Set to True to enable debug logs
+
+INDEX_FILE = "index.json"
+META_FILE = "meta.pkl"
+
+# word_stats tuple positions stored as numeric columns
+NUMERIC_COLUMNS = {1: ("count", np.int64), 2: ("pct", np.float64), 3: ("z", np.float64), 4: ("logz", np.float64)}
+
+# What a lazily mapped word_stats sequence counts against the memory budget:
+# its pages belong to the OS page cache, not to the process' own objects.
+MAPPED_WORD_STATS_BYTES = 128
+
+
+def debug(msg: str):
+    if DEBUG_MODE:
+        print(f"[DEBUG columnar_store] {msg}")
+
+
+class ColumnSet:
+    """
+    The columns of one stored corpus report, opened with np.load(mmap_mode="r")
+    on first use. Rows of all its file reports are stored back to back.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._columns = {}
+        self.lock = threading.Lock()
+
+    def column(self, name):
+        if name not in self._columns:
+            with self.lock:
+                if name not in self._columns:
+                    path = os.path.join(self.directory, f"{name}.npy")
+                    try:
+                        self._columns[name] = np.load(path, mmap_mode="r")
+                    except ValueError:  # empty arrays cannot be mapped
+                        self._columns[name] = np.load(path)
+        return self._columns[name]
+
+    def words(self, start, stop):
+        offsets = self.column("word_offsets")
+        if start == stop:
+            return []
+        data = bytes(self.column("words")[offsets[start]:offsets[stop]])
+        # every word is stored followed by a newline; \w tokens never contain one
+        return data.decode("utf-8").split("\n")[:-1]
+
+
+class ColumnarWordStats(Sequence):
+    """
+    Read-only word_stats of a stored report, backed by memory-mapped columns.
+
+    Behaves like the usual list of (word, count, pct, z, logz) tuples, but
+    nothing is deserialized until rows are accessed, and column(i) returns
+    the numeric column i (1 = count, 2 = pct, 3 = z, 4 = logz) as a mapped
+    numpy slice without building any tuples.
+    """
+
+    __hash__ = None
+
+    def __init__(self, columns, start, stop):
+        self.columns = columns
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def column(self, index):
+        if index == 0:
+            return self.words()
+        name, _ = NUMERIC_COLUMNS[index]
+        return self.columns.column(name)[self.start:self.stop]
+
+    def words(self):
+        return self.columns.words(self.start, self.stop)
+
+    def __iter__(self):
+        return zip(self.words(), *(self.column(i).tolist() for i in NUMERIC_COLUMNS))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("word_stats index out of range")
+        row = self.start + index
+        word = self.columns.words(row, row + 1)[0]
+        # .item(): Python ints and floats, as iteration and in-memory tuples give
+        return (word,) + tuple(self.columns.column(NUMERIC_COLUMNS[i][0])[row].item() for i in NUMERIC_COLUMNS)
+
+    def __eq__(self, other):
+        if isinstance(other, ColumnarWordStats):
+            if len(self) != len(other):
+                return False
+            if all(np.array_equal(self.column(i), other.column(i)) for i in NUMERIC_COLUMNS):
+                return self.words() == other.words()
+            return False
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def estimated_bytes(self):
+        return MAPPED_WORD_STATS_BYTES
+
+    def __repr__(self):
+        return f"ColumnarWordStats({len(self)} rows)"
+
+
+def word_stats_column(word_stats, index):
+    """
+    Column `index` of word_stats (1 = count, 2 = pct, 3 = z): a mapped numpy
+    slice for stored columnar reports, a plain list otherwise.
+    """
+    if hasattr(word_stats, "column"):
+        return word_stats.column(index)
+    return [s[index] for s in word_stats]
+
+
+class ColumnarReportStore:
+    """
+    Corpus reports stored as memory-mappable .npy columns, one directory
+    per saved version of a corpus report:
+
+      index.json            {name: {"dir": ..., "fingerprint": ...}}
+      <dir>/meta.pkl        report order, titles, assurance, fingerprints
+      <dir>/count.npy, pct.npy, z.npy, logz.npy
+      <dir>/words.npy, word_offsets.npy   newline-terminated UTF-8 words
+
+    load() reads only meta.pkl; the word_stats of the returned report are
+    ColumnarWordStats whose columns are mapped on first access, so opening a
+    workspace costs neither deserialization time nor resident memory in
+    proportion to the stored reports. A save writes a new version directory
+    and then atomically replaces index.json, so a crash leaves the previous
+    version in place.
+
+    A replaced or deleted version is only removed once no report loaded from
+    it is alive any more, since its columns may not have been mapped yet.
+    Versions left behind when the app exits are removed on the next start.
+    """
+
+    persistent = True
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        # reentrant: a reader's finalizer may run while the lock is held
+        self.lock = threading.RLock()
+        self.index = self._read_index()
+        # Loaded ColumnSets still alive per version directory, and versions
+        # no longer in the index that are waiting for their readers to go
+        self.readers = {}
+        self.retired = set()
+        self._remove_unused_versions()
+        debug(f"Opened columnar store {root!r} with {len(self.index)} reports.")
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.root, INDEX_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write_index(self):
+        path = os.path.join(self.root, INDEX_FILE)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _remove_unused_versions(self):
+        """Remove version directories the index no longer points to."""
+        current = {entry["dir"] for entry in self.index.values()}
+        for entry in os.scandir(self.root):
+            if entry.is_dir() and entry.name not in current:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                debug(f"Removed unused version {entry.name}.")
+
+    def _open_columns(self, version_dir):
+        columns = ColumnSet(os.path.join(self.root, version_dir))
+        with self.lock:
+            self.readers[version_dir] = self.readers.get(version_dir, 0) + 1
+        weakref.finalize(columns, self._release_columns, version_dir)
+        return columns
+
+    def _release_columns(self, version_dir):
+        with self.lock:
+            self.readers[version_dir] -= 1
+            if self.readers[version_dir]:
+                return
+            del self.readers[version_dir]
+            if version_dir not in self.retired:
+                return
+            self.retired.discard(version_dir)
+        shutil.rmtree(os.path.join(self.root, version_dir), ignore_errors=True)
+        debug(f"Removed version {version_dir} after its last reader.")
+
+    def _retire(self, version_dir):
+        """Remove a version now, or when its last loaded report goes away."""
+        with self.lock:
+            if self.readers.get(version_dir):
+                self.retired.add(version_dir)
+                return
+        shutil.rmtree(os.path.join(self.root, version_dir), ignore_errors=True)
+
+    def names(self):
+        return list(self.index.keys())
+
+    def contains(self, name):
+        return name in self.index
+
+    def fingerprints(self):
+        return {name: entry.get("fingerprint") for name, entry in self.index.items()}
+
+    def load(self, name, known=None):
+        """
+        The report stored under name with lazily mapped word_stats, or None.
+        File reports found in `known` ({path: file_report}) at the stored
+        file signature are reused.
+        """
+        entry = self.index.get(name)
+        if entry is None:
+            return None
+        known = known or {}
+        directory = os.path.join(self.root, entry["dir"])
+        with open(os.path.join(directory, META_FILE), "rb") as f:
+            meta = pickle.load(f)
+        columns = self._open_columns(entry["dir"])
+        report = {}
+        for file_key, start, stop, fields, data in meta["entries"]:
+            if (file_key != MASTER_REPORT_KEY and file_key in known
+                    and known[file_key].get('signature') == fields.get('signature')):
+                report[file_key] = known[file_key]
+                continue
+            file_report = dict(fields)
+            file_report['data'] = dict(data, word_stats=ColumnarWordStats(columns, start, stop))
+            report[file_key] = file_report
+        debug(f"Loaded report {name!r}: {len(report)} entries, columns not mapped yet.")
+        return report
+
+    def save(self, name, report):
+        entries = []
+        numeric = {i: [] for i in NUMERIC_COLUMNS}
+        words = []
+        rows = 0
+        for file_key, file_report in report.items():
+            data = file_report.get('data', {})
+            word_stats = data.get('word_stats', [])
+            if isinstance(word_stats, ColumnarWordStats):
+                words.extend(word_stats.words())
+                for i in NUMERIC_COLUMNS:
+                    numeric[i].append(np.asarray(word_stats.column(i)))
+            else:
+                words.extend(ws[0] for ws in word_stats)
+                for i, (_, dtype) in NUMERIC_COLUMNS.items():
+                    numeric[i].append(np.fromiter((ws[i] for ws in word_stats), dtype=dtype, count=len(word_stats)))
+            entries.append((
+                file_key, rows, rows + len(word_stats),
+                {k: v for k, v in file_report.items() if k != 'data'},
+                {k: v for k, v in data.items() if k != 'word_stats'},
+            ))
+            rows += len(word_stats)
+
+        slug = hashlib.sha1(name.encode("utf-8")).hexdigest()[:16]
+        version_dir = f"{slug}-{uuid.uuid4().hex[:12]}"
+        directory = os.path.join(self.root, version_dir)
+        os.makedirs(directory)
+        for i, (column_name, dtype) in NUMERIC_COLUMNS.items():
+            values = np.concatenate(numeric[i]) if numeric[i] else np.empty(0, dtype=dtype)
+            np.save(os.path.join(directory, f"{column_name}.npy"), values.astype(dtype, copy=False))
+        encoded = [w.encode("utf-8") + b"\n" for w in words]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(w) for w in encoded], out=offsets[1:])
+        np.save(os.path.join(directory, "words.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+        np.save(os.path.join(directory, "word_offsets.npy"), offsets)
+        with open(os.path.join(directory, META_FILE), "wb") as f:
+            pickle.dump({"name": name, "entries": entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        with self.lock:
+            old = self.index.get(name)
+            self.index[name] = {"dir": version_dir, "fingerprint": report_fingerprint(report)}
+            self._write_index()
+        if old:
+            self._retire(old["dir"])
+        debug(f"Saved report {name!r}: {rows} rows in {version_dir}.")
+
+    def delete(self, name):
+        with self.lock:
+            old = self.index.pop(name, None)
+            if old is None:
+                return
+            self._write_index()
+        self._retire(old["dir"])
+
+    def close(self):
+        pass
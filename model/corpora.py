@@ -50,6 +50,25 @@ class Corpus:
         """
         self.name = new_name
 
+    def to_dict(self):
+        """
+        JSON-serializable definition of the corpus, as saved in workspaces.
+        
+        Returns:
+            dict: {"name": ..., "files": [...]}
+        """
+        return {"name": self.name, "files": list(self.file_paths)}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Recreate a corpus from to_dict() output.
+        
+        Args:
+            data (dict): {"name": ..., "files": [...]}
+        """
+        return cls(name=data["name"], file_paths=list(data.get("files", [])))
+
     def __str__(self):
         """String representation showing name and number of files."""
         return f"{self.name} ({len(self.file_paths)} files)"
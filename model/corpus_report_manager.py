@@ -1,13 +1,136 @@
+from collections import OrderedDict
+
+from model.report_store import MemoryReportStore
+from model.file_report_pool import FileReportPool, MASTER_REPORT_KEY, estimate_file_report_bytes
+from model.report_fingerprint import report_fingerprint
+from model.report_snapshot import freeze_report
+
+# Memory budget the app gives loaded corpus reports.
+DEFAULT_MEMORY_BUDGET = 512 * 1024 * 1024
+
+
+def estimate_report_bytes(report):
+    """
+    Approximate memory held by a corpus report, dominated by the word_stats
+    lists of its file reports and Master Report.
+    """
+    return sum(estimate_file_report_bytes(file_report) for file_report in report.values())
+
+
 class CorpusReportManager:
     """
     Manages analysis reports for multiple corpora, allowing each visualization
     to access data for its specific corpus regardless of which corpus is currently active.
+
+    Reports are written through to a report store (see model.report_store).
+    With a persistent store, reports from earlier sessions are listed right
+    away but only loaded on first access.
+
+    memory_budget (bytes, None = unlimited) caps the loaded reports: the least
+    recently used ones are evicted and reloaded from the store when asked for
+    again. Eviction needs a persistent store; an in-memory store holds every
+    report anyway, so nothing would be freed.
+
+    File reports are shared through a FileReportPool: a file listed by
+    several loaded corpora is held, and counted against the budget, once.
+    Eviction works on whole corpus reports only. A file report is an entry
+    of the snapshots that list it, so it is freed when the last loaded
+    report using it is evicted; file reports are not evicted one by one.
+
+    Reports are kept as immutable ReportSnapshots (model.report_snapshot).
+    An update publishes a new snapshot rather than changing the old one, so
+    a caller holding a report keeps a consistent view without copying it.
     """
     
-    def __init__(self):
-        # Main storage structure - a dictionary mapping corpus names to their report data
+    def __init__(self, store=None, memory_budget=None):
+        # Backend every report is written to
+        self.store = store if store is not None else MemoryReportStore()
+        self.memory_budget = memory_budget
+        # Reports loaded so far, least recently used first - mapping corpus names to their report data
         # {corpus_name: {file_path: {'data': {...}}}}
-        self.corpus_reports = {}
+        self.corpus_reports = OrderedDict()
+        # Per-file reports shared by the loaded corpus reports
+        self.file_pool = FileReportPool()
+        # Estimated size of each loaded report's own entries (its Master
+        # Report; file reports are counted by the pool): {corpus_name: bytes}
+        self.report_sizes = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Revision of each stored report, bumped on every update. Caches key
+        # derived results on these to notice when a report changes.
+        # {corpus_name: int}
+        self.revisions = {}
+        self._next_revision = 1
+        # Fingerprint each report was analyzed with (files, their sizes and
+        # mtimes, tokenizer settings), see model.report_fingerprint.
+        # {corpus_name: str or None}
+        self.fingerprints = self.store.fingerprints()
+        for corpus_name in self.fingerprints:
+            self._bump_revision(corpus_name)
+
+    def _bump_revision(self, corpus_name):
+        self.revisions[corpus_name] = self._next_revision
+        self._next_revision += 1
+
+    def _cache_report(self, corpus_name, report):
+        report = self.file_pool.intern(corpus_name, report)
+        self.corpus_reports[corpus_name] = report
+        self.corpus_reports.move_to_end(corpus_name)
+        self.report_sizes[corpus_name] = estimate_report_bytes(
+            {k: v for k, v in report.items() if k == MASTER_REPORT_KEY}
+        )
+        self._evict(keep=corpus_name)
+        return report
+
+    def _evict(self, keep=None):
+        """Drop least recently used reports until the loaded ones fit the budget."""
+        if self.memory_budget is None or not getattr(self.store, 'persistent', False):
+            return
+        for corpus_name in list(self.corpus_reports):
+            if self.loaded_bytes() <= self.memory_budget:
+                break
+            if corpus_name == keep:
+                continue
+            del self.corpus_reports[corpus_name]
+            del self.report_sizes[corpus_name]
+            self.file_pool.release(corpus_name)
+            self.evictions += 1
+            print(f"[DEBUG] Evicted report for corpus '{corpus_name}' from memory")
+
+    def loaded_bytes(self):
+        """Estimated memory held by the loaded reports, shared files counted once."""
+        return sum(self.report_sizes.values()) + self.file_pool.total_bytes
+
+    def set_memory_budget(self, memory_budget):
+        """
+        Change the memory budget and evict right away if it is exceeded.
+
+        Args:
+            memory_budget (int): Budget in bytes, or None for no limit
+        """
+        self.memory_budget = memory_budget
+        self._evict()
+
+    def cache_stats(self):
+        """
+        Counters of the loaded-report cache.
+
+        Returns:
+            dict: loaded, stored, loaded_bytes, memory_budget, hits, misses,
+            evictions, pooled_files, shared_files
+        """
+        return {
+            'loaded': len(self.corpus_reports),
+            'stored': len(self.revisions),
+            'loaded_bytes': self.loaded_bytes(),
+            'memory_budget': self.memory_budget,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'pooled_files': len(self.file_pool),
+            'shared_files': self.file_pool.shared_count(),
+        }
         
     def get_report_for_corpus(self, corpus_name):
         """
@@ -17,10 +140,18 @@ class CorpusReportManager:
             corpus_name (str): The name of the corpus
             
         Returns:
-            dict: The report data for this corpus, or an empty dict if not found
+            ReportSnapshot: The report data for this corpus, or an empty dict if not found
         """
         if corpus_name in self.corpus_reports:
+            self.hits += 1
+            self.corpus_reports.move_to_end(corpus_name)
             return self.corpus_reports[corpus_name]
+        if corpus_name in self.revisions:
+            self.misses += 1
+            # file reports already in the pool are not deserialized again
+            report = self.store.load(corpus_name, known=self.file_pool.file_reports)
+            if report is not None:
+                return self._cache_report(corpus_name, freeze_report(report))
         return {}
         
     def update_report_for_corpus(self, corpus_name, report_data):
@@ -30,8 +161,15 @@ class CorpusReportManager:
         Args:
             corpus_name (str): The name of the corpus
             report_data (dict): The analysis results to store
+
+        Returns:
+            ReportSnapshot: The stored, immutable report
         """
-        self.corpus_reports[corpus_name] = report_data
+        report = freeze_report(report_data)
+        self.store.save(corpus_name, report)
+        self.fingerprints[corpus_name] = report_fingerprint(report)
+        self._bump_revision(corpus_name)
+        return self._cache_report(corpus_name, report)
         
     def remove_corpus_report(self, corpus_name):
         """
@@ -40,20 +178,51 @@ class CorpusReportManager:
         Args:
             corpus_name (str): The name of the corpus to remove
         """
-        if corpus_name in self.corpus_reports:
-            del self.corpus_reports[corpus_name]
+        if corpus_name in self.revisions:
+            self.store.delete(corpus_name)
+            self.corpus_reports.pop(corpus_name, None)
+            self.report_sizes.pop(corpus_name, None)
+            self.file_pool.release(corpus_name)
+            self.fingerprints.pop(corpus_name, None)
+            del self.revisions[corpus_name]
             
-    def has_report_for_corpus(self, corpus_name):
+    def get_file_report(self, file_path):
+        """
+        The shared report of a file already analyzed for a loaded corpus.
+
+        Args:
+            file_path (str): Path of the file
+
+        Returns:
+            dict: The file report, or None if no loaded corpus has it
+        """
+        return self.file_pool.get(file_path)
+
+    def has_report_for_corpus(self, corpus_name, fingerprint=None):
         """
         Check if a report exists for the specified corpus.
         
         Args:
             corpus_name (str): The name of the corpus to check
+            fingerprint (str, optional): The corpus' current fingerprint. When
+                given, a report analyzed from other files or settings does
+                not count.
             
         Returns:
-            bool: True if a report exists, False otherwise
+            bool: True if a (matching) report exists, False otherwise
+        """
+        if corpus_name not in self.revisions:
+            return False
+        return fingerprint is None or self.fingerprints.get(corpus_name) == fingerprint
+
+    def get_report_fingerprint(self, corpus_name):
+        """
+        Get the fingerprint a corpus report was analyzed with.
+
+        Returns:
+            str: The fingerprint, or None if unknown
         """
-        return corpus_name in self.corpus_reports
+        return self.fingerprints.get(corpus_name)
     
     def list_available_reports(self):
         """
@@ -62,4 +231,17 @@ class CorpusReportManager:
         Returns:
             list: Names of corpora with reports
         """
-        return list(self.corpus_reports.keys())
+        return list(self.revisions.keys())
+
+    def get_report_revision(self, corpus_name):
+        """
+        Get the revision of a corpus report.
+
+        Args:
+            corpus_name (str): The name of the corpus
+
+        Returns:
+            int: Revision number, increasing with every update, or None if
+            no report exists
+        """
+        return self.revisions.get(corpus_name)
@@ -0,0 +1,98 @@
+from collections import namedtuple
+
+##############################################################################
+# Debug helper and toggle for debug messages
+##############################################################################
+DEBUG_MODE = False  # Set to True to enable debug logs
+
+
+def debug(msg: str):
+    if DEBUG_MODE:
+        print(f"[DEBUG dependency_graph] {msg}")
+
+
+# kind is one of the kinds below; key identifies the node within its kind:
+#   corpus:  corpus name          (its file list)
+#   file:    file path            (its contents)
+#   report:  corpus name          (the corpus report)
+#   derived: (metric, corpora)    (BO scores, averages, bands... of those corpora)
+#   cell:    the dashboard cell
+Node = namedtuple("Node", ["kind", "key"])
+
+CORPUS, FILE, REPORT, DERIVED, CELL = "corpus", "file", "report", "derived", "cell"
+
+
+class DependencyGraph:
+    """
+    Which data is computed from which: corpora and files -> corpus reports
+    -> derived results -> dashboard cells.
+
+    Edges point from a source to what depends on it. A change to a node
+    affects only the nodes reachable from it, so a new report of one corpus
+    refreshes the cells showing that corpus and no others.
+
+    Usage:
+      graph = DependencyGraph()
+      graph.set_sources(Node(REPORT, "2023"), [Node(CORPUS, "2023"), Node(FILE, "a.txt")])
+      graph.set_sources(Node(CELL, cell), [Node(REPORT, "2023")])
+      graph.affected([Node(FILE, "a.txt")])  # the report and the cell
+    """
+
+    def __init__(self):
+        self.sources = {}     # node -> set of nodes it is computed from
+        self.dependents = {}  # node -> set of nodes computed from it
+
+    def __contains__(self, node):
+        return node in self.sources or node in self.dependents
+
+    def __len__(self):
+        return len(set(self.sources) | set(self.dependents))
+
+    def set_sources(self, node, sources):
+        """Make node depend on exactly the given sources, replacing its old edges."""
+        sources = set(sources)
+        old = self.sources.get(node, set())
+        for source in old - sources:
+            self._unlink(source, node)
+        for source in sources - old:
+            self.dependents.setdefault(source, set()).add(node)
+        if sources:
+            self.sources[node] = sources
+        else:
+            self.sources.pop(node, None)
+
+    def _unlink(self, source, node):
+        dependents = self.dependents.get(source)
+        if dependents is not None:
+            dependents.discard(node)
+            if not dependents:
+                del self.dependents[source]
+
+    def remove(self, node):
+        """Forget node and its edges, e.g. for a removed cell."""
+        self.set_sources(node, ())
+        for dependent in self.dependents.pop(node, set()):
+            sources = self.sources.get(dependent)
+            if sources is not None:
+                sources.discard(node)
+                if not sources:
+                    del self.sources[dependent]
+
+    def nodes(self, kind):
+        """All nodes of one kind."""
+        return {node for node in set(self.sources) | set(self.dependents) if node.kind == kind}
+
+    def affected(self, changed):
+        """
+        The changed nodes and everything computed from them, directly or
+        not, in breadth-first order.
+        """
+        order = list(dict.fromkeys(changed))
+        seen = set(order)
+        for node in order:  # order grows while it is walked
+            for dependent in self.dependents.get(node, ()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    order.append(dependent)
+        debug(f"{len(changed)} changed nodes affect {len(order)} nodes")
+        return order
@@ -0,0 +1,118 @@
+MASTER_REPORT_KEY = "Master Report"
+
+# Rough resident size of one word_stats entry, a (word, count, pct, z, logz)
+# tuple, not counting the word's characters.
+WORD_STAT_BYTES = 240
+
+
+def estimate_file_report_bytes(file_report):
+    """Approximate memory held by one file (or Master) report's word_stats."""
+    word_stats = file_report.get('data', {}).get('word_stats', ())
+    if hasattr(word_stats, 'estimated_bytes'):  # memory-mapped columns
+        return word_stats.estimated_bytes()
+    return WORD_STAT_BYTES * len(word_stats) + sum(len(ws[0]) for ws in word_stats)
+
+
+class FileReportPool:
+    """
+    Per-file reports shared by every loaded corpus report that lists the file.
+
+    A file belonging to several corpora is analyzed once and its report dict
+    is the same object in each corpus report. When one corpus re-analyzes a
+    file that changed, the other corpora keep the version they were loaded
+    with: the pool holds every version some loaded corpus uses, counts each
+    in total_bytes once, and forgets a version once no corpus uses it.
+
+    Usage:
+      pool = FileReportPool()
+      report = pool.intern("2023", report)  # file entries now shared
+      pool.get("path/to/file.txt")          # latest shared report or None
+      pool.release("2023")                  # corpus unloaded or removed
+    """
+
+    def __init__(self):
+        # path -> versions in use: [{'report', 'owners', 'bytes'}, ...]
+        self.versions = {}
+        self.file_reports = {}  # path -> its most recently interned report
+        self.corpus_files = {}  # corpus name -> {path: version it uses}
+        self.total_bytes = 0
+
+    def __contains__(self, path):
+        return path in self.file_reports
+
+    def __len__(self):
+        return sum(len(versions) for versions in self.versions.values())
+
+    def get(self, path):
+        return self.file_reports.get(path)
+
+    def _version(self, path, file_report):
+        """The pooled version equal to file_report, added if there is none."""
+        versions = self.versions.setdefault(path, [])
+        for version in versions:
+            pooled = version['report']
+            if pooled is file_report or (pooled.get('signature') == file_report.get('signature')
+                                         and pooled == file_report):
+                break
+        else:
+            version = {'report': file_report, 'owners': set(),
+                       'bytes': estimate_file_report_bytes(file_report)}
+            versions.append(version)
+            self.total_bytes += version['bytes']
+        self.file_reports[path] = version['report']
+        return version
+
+    def intern(self, corpus_name, report):
+        """
+        Point report's file entries at the pooled reports and record
+        corpus_name as a user of those files.
+
+        A pooled report with the same content replaces the entry; a
+        different one (the file was analyzed again) is pooled as a new
+        version next to the one other corpora still use. Files the corpus
+        no longer lists are released.
+
+        Returns the report with shared entries: a new snapshot for a
+        ReportSnapshot, otherwise the report itself, changed in place.
+        """
+        used = {}
+        shared = {}
+        for path, file_report in report.items():
+            if path == MASTER_REPORT_KEY:
+                continue
+            version = self._version(path, file_report)
+            if version['report'] is not file_report:
+                shared[path] = version['report']
+            version['owners'].add(corpus_name)
+            used[path] = version
+        self.release(corpus_name, keep=used)
+        self.corpus_files[corpus_name] = used
+        if shared and hasattr(report, 'with_entries'):
+            return report.with_entries(shared)
+        for path, pooled in shared.items():
+            report[path] = pooled
+        return report
+
+    def release(self, corpus_name, keep=None):
+        """Stop counting corpus_name as a user of its files (except the versions in keep)."""
+        keep = keep or {}
+        for path, version in self.corpus_files.pop(corpus_name, {}).items():
+            if keep.get(path) is version:
+                continue
+            version['owners'].discard(corpus_name)
+            if version['owners']:
+                continue
+            versions = [v for v in self.versions[path] if v is not version]
+            self.total_bytes -= version['bytes']
+            if not versions:
+                del self.versions[path]
+                del self.file_reports[path]
+                continue
+            self.versions[path] = versions
+            if self.file_reports[path] is version['report']:
+                self.file_reports[path] = versions[-1]['report']
+
+    def shared_count(self):
+        """Number of pooled file versions used by more than one loaded corpus."""
+        return sum(1 for versions in self.versions.values() for version in versions
+                   if len(version['owners']) > 1)
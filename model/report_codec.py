@@ -0,0 +1,178 @@
+import lzma
+import pickle
+import zlib
+
+import numpy as np
+
+##############################################################################
+# Debug helper and toggle for debug messages
+##############################################################################
+DEBUG_MODE = False  # Set to True to enable debug logs
+
+MAGIC = b"SRC"
+CODEC_VERSION = 1
+METHODS = {"none": 0, "zlib": 1, "lzma": 2}
+DEFAULT_METHOD = "zlib"
+DEFAULT_LEVEL = 6
+
+# Float columns of word_stats: (word, count, pct, z, logz)
+DERIVED_COLUMNS = ("pct", "z", "logz")
+
+
+def debug(msg: str):
+    if DEBUG_MODE:
+        print(f"[DEBUG report_codec] {msg}")
+
+
+##############################################################################
+# Column transforms
+##############################################################################
+def derived_columns(counts):
+    """
+    pct, z and logz of a file's counts, computed as get_text_statistics does.
+    Used to predict the stored float columns from the counts alone.
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    if not len(counts):
+        return tuple(np.empty(0, dtype=np.float64) for _ in DERIVED_COLUMNS)
+    total = counts.sum()
+    percentages = (counts / total) * 100
+    z_scores = log_z_scores = np.zeros(len(counts))
+    if len(counts) < 2:  # sample std undefined, get_text_statistics gives zeros
+        return percentages, z_scores, log_z_scores
+    with np.errstate(divide="ignore", invalid="ignore"):
+        std = np.std(counts, ddof=1)
+        if std > 0:
+            z_scores = (counts - np.mean(counts)) / std
+        log_counts = np.log(counts)
+        std_log = np.std(log_counts, ddof=1)
+        if std_log > 0:
+            log_z_scores = (log_counts - np.mean(log_counts)) / std_log
+    return percentages, z_scores, log_z_scores
+
+
+def zigzag_deltas(counts):
+    """
+    Differences of consecutive counts, zigzag-mapped to unsigned integers.
+    Counts sorted in descending order give small, mostly zero values.
+    """
+    deltas = np.diff(np.asarray(counts, dtype=np.int64), prepend=np.int64(0))
+    return ((deltas << 1) ^ (deltas >> 63)).astype(np.uint64)
+
+
+def undo_zigzag_deltas(values):
+    values = np.asarray(values, dtype=np.uint64)
+    deltas = (values >> np.uint64(1)).astype(np.int64) ^ -(values & np.uint64(1)).astype(np.int64)
+    return np.cumsum(deltas, dtype=np.int64)
+
+
+def smallest_uint(values):
+    """values as the narrowest unsigned integer dtype that holds them."""
+    values = np.asarray(values)
+    top = int(values.max()) if len(values) else 0
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if top <= np.iinfo(dtype).max:
+            return values.astype(dtype)
+    return values.astype(np.uint64)
+
+
+def _word_stats_columns(word_stats):
+    if hasattr(word_stats, "column"):  # memory-mapped columnar word_stats
+        return (word_stats.words(),) + tuple(np.asarray(word_stats.column(i)) for i in range(1, 5))
+    if not len(word_stats):
+        return [], np.empty(0, np.int64), np.empty(0), np.empty(0), np.empty(0)
+    words, counts, pct, z, logz = zip(*word_stats)
+    return (list(words), np.asarray(counts, dtype=np.int64),
+            np.asarray(pct, dtype=np.float64), np.asarray(z, dtype=np.float64), np.asarray(logz, dtype=np.float64))
+
+
+##############################################################################
+# Encode / decode
+##############################################################################
+def encode_report(report, method=DEFAULT_METHOD, level=DEFAULT_LEVEL):
+    """
+    Serialize a report ({key: {'data': {..., 'word_stats': [...]}, ...}})
+    into compact bytes.
+
+    Word strings are replaced by IDs into one vocabulary shared by all
+    entries. Counts are stored as zigzag deltas (word_stats are sorted by
+    count). pct, z and logz are recomputed from the counts on decode and
+    only the XOR of the stored and recomputed bits is kept, which is zero
+    except for rounding differences, so decoding is exact. Columns of all
+    entries are concatenated and compressed together with zlib or lzma.
+
+    Args:
+        method (str): "zlib", "lzma" or "none"
+        level (int): Compression level (zlib 0-9, lzma 0-9)
+    """
+    vocabulary = {}
+    entries = []
+    ids, deltas = [], []
+    residuals = {name: [] for name in DERIVED_COLUMNS}
+    for key, entry in report.items():
+        data = entry.get('data', {})
+        words, counts, pct, z, logz = _word_stats_columns(data.get('word_stats', []))
+        ids.append(np.fromiter((vocabulary.setdefault(w, len(vocabulary)) for w in words),
+                               dtype=np.int64, count=len(words)))
+        deltas.append(zigzag_deltas(counts))
+        for name, stored, predicted in zip(DERIVED_COLUMNS, (pct, z, logz), derived_columns(counts)):
+            residuals[name].append(stored.view(np.uint64) ^ np.asarray(predicted, dtype=np.float64).view(np.uint64))
+        entries.append((
+            key, len(words),
+            {k: v for k, v in entry.items() if k != 'data'},
+            {k: v for k, v in data.items() if k != 'word_stats'},
+        ))
+
+    def joined(chunks, dtype):
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+
+    payload = pickle.dumps({
+        "entries": entries,
+        "vocabulary": "\n".join(vocabulary).encode("utf-8"),
+        "ids": smallest_uint(joined(ids, np.int64)),
+        "deltas": smallest_uint(joined(deltas, np.uint64)),
+        # all-zero residual columns compress to almost nothing
+        "residuals": {name: joined(chunks, np.uint64) for name, chunks in residuals.items()},
+    }, protocol=pickle.HIGHEST_PROTOCOL)
+    if method == "zlib":
+        body = zlib.compress(payload, level)
+    elif method == "lzma":
+        body = lzma.compress(payload, preset=level)
+    elif method == "none":
+        body = payload
+    else:
+        raise ValueError(f"Unknown compression method: {method!r}")
+    debug(f"Encoded {len(entries)} entries, {len(vocabulary)} words: {len(payload)} -> {len(body)} bytes ({method})")
+    return MAGIC + bytes([CODEC_VERSION, METHODS[method]]) + body
+
+
+def decode_report(blob):
+    """Rebuild the report encode_report() serialized, with identical values."""
+    if blob[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not an encoded report")
+    version, method = blob[len(MAGIC)], blob[len(MAGIC) + 1]
+    if version > CODEC_VERSION:
+        raise ValueError(f"Encoded report needs a newer version (format {version})")
+    body = memoryview(blob)[len(MAGIC) + 2:]
+    if method == METHODS["zlib"]:
+        body = zlib.decompress(body)
+    elif method == METHODS["lzma"]:
+        body = lzma.decompress(body)
+    payload = pickle.loads(body)
+
+    vocabulary = payload["vocabulary"].decode("utf-8").split("\n") if payload["vocabulary"] else []
+    vocabulary = np.array(vocabulary, dtype=object)
+    report = {}
+    start = 0
+    for key, size, fields, data in payload["entries"]:
+        stop = start + size
+        counts = undo_zigzag_deltas(payload["deltas"][start:stop])
+        columns = [counts]
+        for name, predicted in zip(DERIVED_COLUMNS, derived_columns(counts)):
+            bits = np.asarray(predicted, dtype=np.float64).view(np.uint64) ^ payload["residuals"][name][start:stop]
+            columns.append(bits.view(np.float64))
+        entry = dict(fields)
+        entry['data'] = dict(data, word_stats=list(zip(vocabulary[payload["ids"][start:stop]].tolist(), *columns)))
+        report[key] = entry
+        start = stop
+    return report
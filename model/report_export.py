@@ -0,0 +1,208 @@
+import json
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # Parquet/Arrow export is optional, CSV always works
+    pa = None
+
+##############################################################################
+# Debug helper and toggle for debug messages
+##############################################################################
+DEBUG_MODE = False  # Set to True to enable debug logs
+
+EXPORT_COLUMNS = ("corpus", "file", "word", "count", "pct", "z", "logz")
+
+# Rows per Parquet row group / Arrow record batch / CSV chunk
+DEFAULT_BATCH_ROWS = 65536
+
+# Key of the report metadata (titles, file signatures) in Parquet/Arrow
+# schema metadata; CSV exports write it to a <path>.meta.json sidecar.
+METADATA_KEY = b"scriptara"
+CSV_METADATA_SUFFIX = ".meta.json"
+
+FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow", ".csv": "csv"}
+
+
+def debug(msg: str):
+    if DEBUG_MODE:
+        print(f"[DEBUG report_export] {msg}")
+
+
+def available_formats():
+    """The export formats usable here: CSV, plus Parquet and Arrow with pyarrow."""
+    return ["csv"] if pa is None else ["csv", "parquet", "arrow"]
+
+
+def export_format(path, format=None):
+    """The export format for path: explicit, or from its extension."""
+    format = format or FORMATS.get(os.path.splitext(path)[1].lower())
+    if format not in ("parquet", "arrow", "csv"):
+        raise ValueError(f"Unknown report export format for {path!r}: {format!r}")
+    if format != "csv" and pa is None:
+        raise ImportError(f"Exporting {format} needs pyarrow; use a .csv path instead.")
+    return format
+
+
+##############################################################################
+# Export
+##############################################################################
+def report_metadata(corpus_reports):
+    """
+    Everything but the word rows: per corpus the order of its reports, their
+    titles and the fingerprint fields, so an import needs no re-analysis.
+    """
+    metadata = {}
+    for corpus_name, report in corpus_reports.items():
+        entries = {}
+        for file_key, file_report in report.items():
+            entry = {k: v for k, v in file_report.items() if k not in ('data', 'assurance')}
+            entries[file_key] = entry
+        metadata[corpus_name] = {"order": list(report.keys()), "entries": entries}
+    return metadata
+
+
+def iter_row_batches(corpus_reports, batch_rows=DEFAULT_BATCH_ROWS):
+    """
+    Yield the word rows of every report as {column: list} batches of at most
+    batch_rows rows, so no more than one batch is ever materialized.
+    """
+    batch = {column: [] for column in EXPORT_COLUMNS}
+    size = 0
+    for corpus_name, report in corpus_reports.items():
+        for file_key, file_report in report.items():
+            for word, count, pct, z, logz in file_report['data']['word_stats']:
+                batch["corpus"].append(corpus_name)
+                batch["file"].append(file_key)
+                batch["word"].append(word)
+                batch["count"].append(int(count))
+                batch["pct"].append(float(pct))
+                batch["z"].append(float(z))
+                batch["logz"].append(float(logz))
+                size += 1
+                if size == batch_rows:
+                    yield batch
+                    batch = {column: [] for column in EXPORT_COLUMNS}
+                    size = 0
+    if size:
+        yield batch
+
+
+def export_reports(path, corpus_reports, format=None, batch_rows=DEFAULT_BATCH_ROWS):
+    """
+    Write {corpus_name: report} to path as Parquet, Arrow IPC or CSV, one
+    row group/record batch/chunk of batch_rows rows at a time.
+
+    Columns: corpus, file, word, count, pct, z, logz. The Master Report of a
+    corpus is exported like a file named "Master Report".
+
+    Returns:
+        int: Number of rows written
+    """
+    format = export_format(path, format)
+    metadata = json.dumps(report_metadata(corpus_reports))
+    rows = 0
+    if format == "csv":
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            header = True
+            for batch in iter_row_batches(corpus_reports, batch_rows):
+                pd.DataFrame(batch, columns=list(EXPORT_COLUMNS)).to_csv(f, header=header, index=False)
+                header = False
+                rows += len(batch["word"])
+            if header:
+                pd.DataFrame(columns=list(EXPORT_COLUMNS)).to_csv(f, index=False)
+        with open(path + CSV_METADATA_SUFFIX, "w", encoding="utf-8") as f:
+            f.write(metadata)
+    else:
+        schema = pa.schema([
+            ("corpus", pa.string()), ("file", pa.string()), ("word", pa.string()),
+            ("count", pa.int64()), ("pct", pa.float64()), ("z", pa.float64()), ("logz", pa.float64()),
+        ], metadata={METADATA_KEY: metadata.encode("utf-8")})
+        if format == "parquet":
+            writer = pyarrow.parquet.ParquetWriter(path, schema)
+        else:
+            writer = pyarrow.ipc.new_file(path, schema)
+        try:
+            for batch in iter_row_batches(corpus_reports, batch_rows):
+                table = pa.Table.from_pydict(batch, schema=schema)
+                writer.write_table(table)
+                rows += table.num_rows
+        finally:
+            writer.close()
+    debug(f"Exported {rows} rows of {len(corpus_reports)} corpora to {path!r} ({format}).")
+    return rows
+
+
+##############################################################################
+# Import
+##############################################################################
+def iter_imported_batches(path, format, batch_rows=DEFAULT_BATCH_ROWS):
+    """Yield ({column: list} batch, ...) from an export, plus its metadata first."""
+    if format == "csv":
+        with open(path + CSV_METADATA_SUFFIX, encoding="utf-8") as f:
+            yield json.load(f)
+        # keep_default_na=False: words such as "nan" or "null" stay words
+        for chunk in pd.read_csv(path, chunksize=batch_rows, keep_default_na=False,
+                                 dtype={"corpus": str, "file": str, "word": str},
+                                 float_precision="round_trip"):
+            yield {column: chunk[column].tolist() for column in EXPORT_COLUMNS}
+    elif format == "parquet":
+        parquet_file = pyarrow.parquet.ParquetFile(path)
+        yield json.loads(parquet_file.schema_arrow.metadata[METADATA_KEY])
+        for record_batch in parquet_file.iter_batches(batch_size=batch_rows):
+            yield record_batch.to_pydict()
+    else:
+        with pa.memory_map(path) as source:
+            reader = pyarrow.ipc.open_file(source)
+            yield json.loads(reader.schema.metadata[METADATA_KEY])
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i).to_pydict()
+
+
+def _restore_entry(entry):
+    """JSON turns tuples into lists; signatures are compared as tuples."""
+    entry = dict(entry)
+    if entry.get('signature') is not None:
+        entry['signature'] = tuple(entry['signature'])
+    if entry.get('file_signatures') is not None:
+        entry['file_signatures'] = {
+            path: tuple(sig) if sig is not None else None for path, sig in entry['file_signatures'].items()
+        }
+    return entry
+
+
+def import_reports(path, format=None, batch_rows=DEFAULT_BATCH_ROWS):
+    """
+    Read an export back into {corpus_name: report} without re-tokenizing.
+
+    word_stats, total and unique word counts come from the rows; titles and
+    fingerprint fields from the export's metadata. Assurance results are not
+    exported and have to be recomputed by the caller.
+    """
+    format = export_format(path, format)
+    batches = iter_imported_batches(path, format, batch_rows)
+    metadata = next(batches)
+    word_stats = {}  # (corpus, file) -> [(word, count, pct, z, logz), ...]
+    for batch in batches:
+        for corpus_name, file_key, word, count, pct, z, logz in zip(*(batch[c] for c in EXPORT_COLUMNS)):
+            word_stats.setdefault((corpus_name, file_key), []).append((word, int(count), pct, z, logz))
+
+    corpus_reports = {}
+    for corpus_name, corpus_meta in metadata.items():
+        report = {}
+        for file_key in corpus_meta["order"]:
+            stats = word_stats.get((corpus_name, file_key), [])
+            file_report = _restore_entry(corpus_meta["entries"].get(file_key, {}))
+            file_report['data'] = {
+                'total_word_count': sum(ws[1] for ws in stats),
+                'unique_word_count': len(stats),
+                'word_stats': stats,
+            }
+            report[file_key] = file_report
+        corpus_reports[corpus_name] = report
+    debug(f"Imported {len(corpus_reports)} corpora from {path!r} ({format}).")
+    return corpus_reports
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+
+from model.file_report_pool import MASTER_REPORT_KEY
+from model.word_analyzer import tokenizer_config
+
+
+def file_signature(path):
+    """
+    (size, mtime_ns) of a file as stored in reports, or None if it cannot
+    be read. A file edited or replaced gets a different signature.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def file_signatures(paths):
+    """{path: file_signature(path)} for a corpus' files."""
+    return {path: file_signature(path) for path in paths}
+
+
+def _digest(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def tokenizer_fingerprint():
+    """Short hash of the tokenizer settings a file report was built with."""
+    return _digest(tokenizer_config())[:16]
+
+
+def analysis_config_fingerprint(near_duplicate_threshold=None):
+    """Hash of everything besides the files that shapes a corpus report."""
+    return _digest({
+        'tokenizer': tokenizer_fingerprint(),
+        'near_duplicate_threshold': near_duplicate_threshold,
+    })[:16]
+
+
+def corpus_fingerprint(signatures, config):
+    """
+    Fingerprint of a corpus report: its file list, each file's signature
+    and the analysis configuration.
+    """
+    return _digest([config, sorted((path, list(sig) if sig else None) for path, sig in signatures.items())])
+
+
+def report_fingerprint(report):
+    """
+    The fingerprint recorded in a report's Master Report when it was
+    analyzed, or None for reports without one (always treated as stale).
+    """
+    master = report.get(MASTER_REPORT_KEY) or {}
+    signatures = master.get('file_signatures')
+    config = master.get('analysis_config')
+    if signatures is None or config is None:
+        return None
+    return corpus_fingerprint(signatures, config)
+
+
+def stale_files(report, signatures):
+    """
+    Compare the file signatures recorded in a report with the current ones.
+
+    Returns:
+        tuple: (added, removed, changed) lists of paths, or None when the
+        report records no signatures and has to be rebuilt as a whole
+    """
+    master = report.get(MASTER_REPORT_KEY) or {}
+    recorded = master.get('file_signatures')
+    if recorded is None:
+        return None
+    added = [path for path in signatures if path not in recorded]
+    removed = [path for path in recorded if path not in signatures]
+    changed = [path for path, sig in signatures.items()
+               if path in recorded and (sig is None or tuple(recorded[path] or ()) != sig)]
+    return added, removed, changed
@@ -0,0 +1,125 @@
+from model.file_report_pool import MASTER_REPORT_KEY
+
+
+def _immutable(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} is a read-only snapshot; build a new one instead")
+
+
+class FrozenDict(dict):
+    """
+    A dict that cannot be changed once built. Reads, iteration, equality,
+    JSON encoding and dict(...)/.copy() (which give a mutable copy) work as
+    for a dict; every mutating method raises TypeError.
+
+    set() and without() return a new FrozenDict sharing all other values.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def set(self, key, value):
+        items = dict(self)
+        items[key] = value
+        return type(self)(items)
+
+    def without(self, *keys):
+        return type(self)({k: v for k, v in self.items() if k not in keys})
+
+
+class FrozenList(list):
+    """A list that cannot be changed once built; compares equal to lists."""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+    append = extend = insert = pop = remove = clear = sort = reverse = _immutable
+
+    def __reduce__(self):
+        return (type(self), (list(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def freeze(value):
+    """value with dicts, lists and sets (recursively) made read-only."""
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return FrozenList(freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def freeze_entry(entry):
+    """A read-only copy of one file (or Master) report; frozen ones are reused."""
+    if isinstance(entry, FrozenDict):
+        return entry
+    frozen = {}
+    for key, value in entry.items():
+        if key == 'data':
+            data = {k: freeze(v) for k, v in value.items() if k != 'word_stats'}
+            word_stats = value.get('word_stats')
+            if isinstance(word_stats, list) and not isinstance(word_stats, FrozenList):
+                # rows are (word, count, pct, z, logz) tuples, already immutable
+                word_stats = FrozenList(word_stats)
+            if 'word_stats' in value:
+                data['word_stats'] = word_stats
+            frozen[key] = FrozenDict(data)
+        else:
+            frozen[key] = freeze(value)
+    return FrozenDict(frozen)
+
+
+class ReportSnapshot(FrozenDict):
+    """
+    An immutable corpus report: {file path or "Master Report": file report}.
+
+    Analyses publish a new snapshot instead of changing a report, so a
+    reader holding a snapshot always sees one consistent report, with no
+    copying. Snapshots share structure: with_entries() builds a new snapshot
+    that reuses every file report it does not replace.
+    """
+
+    __slots__ = ()
+
+    def with_entries(self, updates=None, removed=()):
+        """
+        A new snapshot with the given entries added or replaced and the
+        removed ones dropped; all other entries are the same objects.
+        """
+        entries = {k: v for k, v in self.items() if k not in removed}
+        for key, entry in (updates or {}).items():
+            entries[key] = freeze_entry(entry)
+        return ReportSnapshot(entries)
+
+    @property
+    def master(self):
+        return self.get(MASTER_REPORT_KEY)
+
+    def file_keys(self):
+        return [key for key in self if key != MASTER_REPORT_KEY]
+
+
+def freeze_report(report):
+    """A report as a ReportSnapshot; snapshots are returned as they are."""
+    if isinstance(report, ReportSnapshot):
+        return report
+    return ReportSnapshot({key: freeze_entry(entry) for key, entry in report.items()})
@@ -0,0 +1,269 @@
+import json
+import os
+import pickle
+import sqlite3
+import threading
+
+from model.columnar_store import ColumnarReportStore
+from model.file_report_pool import MASTER_REPORT_KEY
+from model.report_codec import MAGIC as CODEC_MAGIC, encode_report, decode_report
+from model.report_fingerprint import report_fingerprint
+
+##############################################################################
+# Debug helper and toggle for debug messages
+##############################################################################
+DEBUG_MODE = False  # Set to True to enable debug logs
+
+# Where the app keeps its persistent state (report database, workspaces).
+DEFAULT_STORE_DIR = os.path.join(os.path.expanduser("~"), ".scriptara")
+DEFAULT_STORE_FILE = "reports.sqlite3"
+DEFAULT_COLUMNAR_DIR = "reports"
+
+
+def debug(msg: str):
+    if DEBUG_MODE:
+        print(f"[DEBUG report_store] {msg}")
+
+
+def default_store_path():
+    """Path of the report database in the user's Scriptara directory."""
+    return os.path.join(DEFAULT_STORE_DIR, DEFAULT_STORE_FILE)
+
+
+class MemoryReportStore:
+    """
+    Report store that keeps nothing beyond the running process. Used when no
+    persistent store is configured.
+
+    Every store offers the same small API, keyed by corpus name:
+      names() -> list, contains(name), load(name, known) -> report or None,
+      fingerprints() -> {name: fingerprint}, save(name, report),
+      delete(name), close()
+    and a `persistent` flag telling whether a report can be dropped from
+    memory and loaded back later.
+    """
+
+    persistent = False
+
+    def __init__(self):
+        self.reports = {}
+
+    def names(self):
+        return list(self.reports.keys())
+
+    def contains(self, name):
+        return name in self.reports
+
+    def load(self, name, known=None):
+        return self.reports.get(name)
+
+    def fingerprints(self):
+        return {name: report_fingerprint(report) for name, report in self.reports.items()}
+
+    def save(self, name, report):
+        self.reports[name] = report
+
+    def delete(self, name):
+        self.reports.pop(name, None)
+
+    def close(self):
+        pass
+
+
+class SQLiteReportStore:
+    """
+    Corpus reports persisted in one SQLite file.
+
+    Reports are stored in the compact encoding of model.report_codec;
+    pickled payloads of older stores are still read.
+
+    File reports live in their own table keyed by path and file signature,
+    so a file listed by several corpora is stored once per version: a
+    corpus re-analyzing an edited file never changes the report another
+    corpus stored for it. Each corpus row keeps its Master Report and the
+    ordered list of its files' versions. A report is written in a single
+    transaction, so a crash mid-write leaves the previous version of that
+    report (and all others) intact. Only the corpus names are read up front;
+    reports are deserialized when load() asks for them.
+    """
+
+    persistent = True
+
+    def __init__(self, path=None):
+        self.path = path or default_store_path()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Reports may be saved from analysis worker threads
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self.conn:
+            # payload: the report without its file entries
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS reports ("
+                " name TEXT PRIMARY KEY,"
+                " payload BLOB NOT NULL,"
+                " fingerprint TEXT)"
+            )
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(reports)")]
+            if "fingerprint" not in columns:
+                self.conn.execute("ALTER TABLE reports ADD COLUMN fingerprint TEXT")
+            # signature: see signature_key(); '' for rows of older stores
+            file_columns = [row[1] for row in self.conn.execute("PRAGMA table_info(file_reports)")]
+            if file_columns and "signature" not in file_columns:
+                self.conn.execute("ALTER TABLE file_reports RENAME TO file_reports_by_path")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS file_reports ("
+                " path TEXT NOT NULL,"
+                " signature TEXT NOT NULL,"
+                " payload BLOB NOT NULL,"
+                " PRIMARY KEY (path, signature))"
+            )
+            if file_columns and "signature" not in file_columns:
+                self.conn.execute(
+                    "INSERT INTO file_reports (path, signature, payload) "
+                    "SELECT path, '', payload FROM file_reports_by_path"
+                )
+                self.conn.execute("DROP TABLE file_reports_by_path")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS report_files ("
+                " name TEXT NOT NULL,"
+                " position INTEGER NOT NULL,"
+                " path TEXT NOT NULL,"
+                " signature TEXT NOT NULL DEFAULT '',"
+                " PRIMARY KEY (name, position))"
+            )
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(report_files)")]
+            if "signature" not in columns:
+                self.conn.execute("ALTER TABLE report_files ADD COLUMN signature TEXT NOT NULL DEFAULT ''")
+        debug(f"Opened report store {self.path!r} with {len(self.names())} reports.")
+
+    @staticmethod
+    def encode(report):
+        """Compact encoding of a (partial) report: {key: entry}."""
+        return encode_report(report)
+
+    @staticmethod
+    def decode(payload):
+        if bytes(payload[:len(CODEC_MAGIC)]) == CODEC_MAGIC:
+            return decode_report(payload)
+        return pickle.loads(payload)  # written before the compact codec
+
+    @staticmethod
+    def signature_key(file_report):
+        """The file signature a file report was analyzed at, as stored."""
+        signature = file_report.get('signature')
+        return json.dumps(list(signature)) if signature is not None else ''
+
+    def decode_file(self, path, payload):
+        """A file report, stored as {path: file_report} or (older stores) bare."""
+        if bytes(payload[:len(CODEC_MAGIC)]) == CODEC_MAGIC:
+            return self.decode(payload)[path]
+        return self.decode(payload)
+
+    def names(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT name FROM reports ORDER BY rowid").fetchall()
+        return [name for (name,) in rows]
+
+    def contains(self, name):
+        with self.lock:
+            row = self.conn.execute("SELECT 1 FROM reports WHERE name = ?", (name,)).fetchone()
+        return row is not None
+
+    def fingerprints(self):
+        """{name: fingerprint} of every stored report, without loading any."""
+        with self.lock:
+            rows = self.conn.execute("SELECT name, fingerprint FROM reports ORDER BY rowid").fetchall()
+        return dict(rows)
+
+    def load(self, name, known=None):
+        """
+        The report stored under name, or None. File reports found in
+        `known` ({path: file_report}) at the stored signature are reused
+        instead of deserialized.
+        """
+        known = known or {}
+        with self.lock:
+            row = self.conn.execute("SELECT payload FROM reports WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                return None
+            files = self.conn.execute(
+                "SELECT path, signature FROM report_files WHERE name = ? ORDER BY position", (name,)
+            ).fetchall()
+            paths = [path for path, _ in files]
+            reused = {path: known[path] for path, signature in files
+                      if path in known and self.signature_key(known[path]) == signature}
+            payloads = {}
+            for path, signature in files:
+                if path not in reused:
+                    (payloads[path],) = self.conn.execute(
+                        "SELECT payload FROM file_reports WHERE path = ? AND signature = ?", (path, signature)
+                    ).fetchone()
+        report = {path: reused[path] if path in reused else self.decode_file(path, payloads[path]) for path in paths}
+        report.update(self.decode(row[0]))
+        debug(f"Loaded report {name!r}: {len(paths)} files, {len(payloads)} read from disk.")
+        return report
+
+    def save(self, name, report):
+        files = [(path, r) for path, r in report.items() if path != MASTER_REPORT_KEY]
+        payload = self.encode({k: v for k, v in report.items() if k == MASTER_REPORT_KEY})
+        file_payloads = [(path, self.signature_key(r), self.encode({path: r})) for path, r in files]
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO reports (name, payload, fingerprint) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET payload = excluded.payload, fingerprint = excluded.fingerprint",
+                (name, payload, report_fingerprint(report)),
+            )
+            self.conn.executemany(
+                "INSERT INTO file_reports (path, signature, payload) VALUES (?, ?, ?) "
+                "ON CONFLICT(path, signature) DO UPDATE SET payload = excluded.payload",
+                file_payloads,
+            )
+            self.conn.execute("DELETE FROM report_files WHERE name = ?", (name,))
+            self.conn.executemany(
+                "INSERT INTO report_files (name, position, path, signature) VALUES (?, ?, ?, ?)",
+                [(name, position, path, signature) for position, (path, signature, _) in enumerate(file_payloads)],
+            )
+            self._delete_unused_files()
+        debug(f"Saved report {name!r}: {len(files)} files.")
+
+    def delete(self, name):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM reports WHERE name = ?", (name,))
+            self.conn.execute("DELETE FROM report_files WHERE name = ?", (name,))
+            self._delete_unused_files()
+
+    def _delete_unused_files(self):
+        self.conn.execute(
+            "DELETE FROM file_reports WHERE NOT EXISTS (SELECT 1 FROM report_files"
+            " WHERE report_files.path = file_reports.path AND report_files.signature = file_reports.signature)"
+        )
+
+    def file_count(self):
+        """Number of distinct file reports (file versions) stored."""
+        with self.lock:
+            (count,) = self.conn.execute("SELECT COUNT(*) FROM file_reports").fetchone()
+        return count
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def open_default_store(kind="columnar"):
+    """
+    The persistent report store in the user's Scriptara directory, or an
+    in-memory store if that cannot be opened (read-only home, locked file).
+
+    kind: "columnar" (memory-mapped .npy columns, see model.columnar_store)
+    or "sqlite" (reports in the compact encoding of model.report_codec, in
+    one database file).
+    """
+    try:
+        if kind == "sqlite":
+            return SQLiteReportStore(default_store_path())
+        return ColumnarReportStore(os.path.join(DEFAULT_STORE_DIR, DEFAULT_COLUMNAR_DIR))
+    except (OSError, sqlite3.Error) as e:
+        print(f"[ERROR] Could not open report store, reports will not persist: {e}")
+        return MemoryReportStore()
@@ -5,6 +5,23 @@ from collections import Counter
 # Define stopword list containing only 's'
 stop_words = {"s"}  # Only 's' is a stopword
 
+# Words, including those with apostrophes within them
+TOKEN_PATTERN = r"\b\w+(?:'\w+)*\b"
+
+# Bump when tokenization changes in a way the settings above do not show,
+# so reports analyzed with the old tokenizer are recomputed.
+TOKENIZER_VERSION = 1
+
+
+def tokenizer_config():
+    """Settings that determine how a file is turned into words."""
+    return {
+        'version': TOKENIZER_VERSION,
+        'pattern': TOKEN_PATTERN,
+        'lowercase': True,
+        'stop_words': sorted(stop_words),
+    }
+
 
 def read_and_preprocess_file(file_path):
     """
@@ -13,13 +30,12 @@ def read_and_preprocess_file(file_path):
     """
     words = []
     punctuation = []
-    stop_words = {'s'}  # Define the stopwords (only 's')
 
     with open(file_path, 'r', encoding='utf-8') as file:
         text = file.read().lower()
 
         # Updated regex to include apostrophes within words
-        tokens = re.findall(r"\b\w+(?:'\w+)*\b", text)
+        tokens = re.findall(TOKEN_PATTERN, text)
 
         for token in tokens:
             if re.match(r"\w+(?:'\w+)*", token):
@@ -0,0 +1,81 @@
+import json
+import os
+import uuid
+
+from model.report_store import DEFAULT_STORE_DIR
+
+##############################################################################
+# Debug helper and toggle for debug messages
+##############################################################################
+DEBUG_MODE = False  # Set to True to enable debug logs
+
+WORKSPACE_VERSION = 1
+DEFAULT_WORKSPACE_FILE = "workspace.json"
+
+
+def debug(msg: str):
+    if DEBUG_MODE:
+        print(f"[DEBUG workspace] {msg}")
+
+
+def default_workspace_path():
+    """Path of the workspace saved in the user's Scriptara directory."""
+    return os.path.join(DEFAULT_STORE_DIR, DEFAULT_WORKSPACE_FILE)
+
+
+def save_workspace(path, workspace):
+    """
+    Write a workspace dict as JSON. The file is written next to path and
+    then renamed over it, so an interrupted save keeps the previous one.
+
+    A workspace holds:
+      corpora               [{"name": ..., "files": [...]}, ...] in order
+      single_active_corpus  name or None
+      multi_active_corpora  [names]
+      imported_files        [paths]
+      settings              {"near_duplicate_threshold": ..., "memory_budget": ...,
+                             "bo_workers": ...}
+      reports               {corpus name: fingerprint of its stored report}
+      cells                 [cell config with "settings" of its visualization]
+    Reports themselves stay in the report store and are only referenced.
+    """
+    workspace = dict(workspace, version=WORKSPACE_VERSION)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(workspace, f, indent=1)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    debug(f"Saved workspace {path!r}: {len(workspace.get('corpora', []))} corpora, "
+          f"{len(workspace.get('cells', []))} cells.")
+
+
+def load_workspace(path):
+    """
+    Read a workspace written by save_workspace.
+
+    Raises:
+        ValueError: The file is not a workspace or from a newer version
+    """
+    with open(path, encoding="utf-8") as f:
+        try:
+            workspace = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path!r} is not a workspace file: {e}") from e
+    if not isinstance(workspace, dict) or "corpora" not in workspace:
+        raise ValueError(f"{path!r} is not a workspace file")
+    version = workspace.get("version", 0)
+    if version > WORKSPACE_VERSION:
+        raise ValueError(f"Workspace {path!r} needs a newer version (format {version})")
+    workspace.setdefault("multi_active_corpora", [])
+    workspace.setdefault("imported_files", [])
+    workspace.setdefault("settings", {})
+    workspace.setdefault("reports", {})
+    workspace.setdefault("cells", [])
+    debug(f"Loaded workspace {path!r} (format {version}).")
+    return workspace
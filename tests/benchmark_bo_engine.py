@@ -0,0 +1,101 @@
+"""
+Benchmark and validation script for the BO score engines.
+
+Usage (from the project root):
+  python -m tests.benchmark_bo_engine --validate
+  python -m tests.benchmark_bo_engine --texts 1000 10000
+  python -m tests.benchmark_bo_engine --texts 10000 --workers 1 2 4 8
+
+--validate compares the matrix engine against the pairwise OverlapAnalyzer on
+the full sample corpus. The benchmark runs on synthetic Zipf-distributed
+corpora; the pairwise engine is only timed up to --pairwise-limit texts.
+--workers times the matrix engine once per worker count to check scaling.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from collections import Counter
+from model.word_analyzer import get_text_statistics
+from analysis.advanced_analysis import compute_bo_scores
+from analysis.bo_engine import compute_bo_scores_matrix
+from tests.test_bo_engine import build_file_reports
+
+
+def synthetic_file_reports(n_texts, vocab_size=50000, text_length=800, zipf_a=1.1, seed=0):
+    """Generate n_texts reports whose words follow a Zipf distribution."""
+    rng = np.random.default_rng(seed)
+    ranks = np.arange(1, vocab_size + 1)
+    probs = 1.0 / ranks ** zipf_a
+    probs /= probs.sum()
+    file_reports = {}
+    for i in range(n_texts):
+        length = int(rng.integers(text_length // 2, text_length * 2))
+        word_ids = rng.choice(vocab_size, size=length, p=probs)
+        counts = Counter(f"w{w}" for w in word_ids.tolist())
+        file_reports[f"synthetic_{i:05d}.txt"] = {'data': get_text_statistics(counts)}
+    return file_reports
+
+
+def validate_sample_corpus():
+    sample_dir = os.path.join(os.path.dirname(__file__), '..', 'sample_corpus')
+    files = sorted(glob.glob(os.path.join(sample_dir, '*.txt')))
+    file_reports = build_file_reports(files)
+
+    start = time.perf_counter()
+    expected = compute_bo_scores(file_reports, engine="pairwise")
+    pairwise_time = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = compute_bo_scores_matrix(file_reports)
+    matrix_time = time.perf_counter() - start
+
+    print(f"Sample corpus: {len(files)} texts")
+    print(f"  pairwise: {pairwise_time:.3f}s   matrix: {matrix_time:.3f}s")
+    for name, exp, act in zip(("BOn1", "BOn2"), expected, actual):
+        same_words = set(exp) == set(act)
+        words = list(exp)
+        exp_vals = np.array([exp[w] for w in words])
+        act_vals = np.array([act[w] for w in words]) if same_words else exp_vals
+        identical = int(np.sum(exp_vals == act_vals))
+        max_rel = float(np.max(np.abs(exp_vals - act_vals) / exp_vals)) if words else 0.0
+        exp_rank = sorted(words, key=lambda w: exp[w], reverse=True)
+        act_rank = sorted(words, key=lambda w: act[w], reverse=True)
+        print(f"  {name}: words={len(words)} same_words={same_words} "
+              f"bit_identical={identical}/{len(words)} max_rel_diff={max_rel:.2e} "
+              f"same_ranking={exp_rank == act_rank}")
+
+
+def benchmark(text_counts, pairwise_limit, worker_counts):
+    for n_texts in text_counts:
+        file_reports = synthetic_file_reports(n_texts)
+        line = f"{n_texts:>6} texts:"
+        for workers in worker_counts:
+            start = time.perf_counter()
+            bon1, _ = compute_bo_scores_matrix(file_reports, workers=workers)
+            line += f" matrix[{workers or 'all'}] {time.perf_counter() - start:8.2f}s"
+        line += f" ({len(bon1)} words)"
+        if n_texts <= pairwise_limit:
+            start = time.perf_counter()
+            compute_bo_scores(file_reports, engine="pairwise")
+            line += f"   pairwise {time.perf_counter() - start:8.2f}s"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--validate", action="store_true", help="validate against the pairwise engine on the sample corpus")
+    parser.add_argument("--texts", type=int, nargs="*", default=[1000, 10000], help="synthetic corpus sizes to time")
+    parser.add_argument("--workers", type=int, nargs="*", default=[None], help="worker counts to time the matrix engine with (default: all cores)")
+    parser.add_argument("--pairwise-limit", type=int, default=200, help="largest corpus to also time with the pairwise engine")
+    args = parser.parse_args()
+
+    if args.validate:
+        validate_sample_corpus()
+    if args.texts:
+        benchmark(args.texts, args.pairwise_limit, args.workers or [None])
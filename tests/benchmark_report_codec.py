@@ -0,0 +1,150 @@
+"""
+Size and throughput of the compact report codec against pickle.
+
+Usage (from the project root):
+  python -m tests.benchmark_report_codec
+  python -m tests.benchmark_report_codec --synthetic-mb 1024
+
+The sample corpus is encoded as one report (its files plus Master Report).
+The synthetic corpus has --synthetic-mb of Zipf-distributed text, split into
+files of about --file-kb; its file reports are generated, encoded and
+decoded --files-per-report at a time, so memory stays flat for any size.
+Throughput is in MB of pickled report per second, the size the reports had
+before the codec; every decode is checked against its input.
+"""
+import argparse
+import glob
+import os
+import pickle
+import sys
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from model.word_analyzer import get_text_statistics
+from model.report_codec import encode_report, decode_report
+from tests.test_bo_engine import build_file_reports
+
+CODECS = [("pickle", None), ("pickle+zlib", 6), ("zlib", 1), ("zlib", 6), ("zlib", 9), ("lzma", 0), ("lzma", 6)]
+
+
+def sample_corpus_report():
+    sample_dir = os.path.join(os.path.dirname(__file__), '..', 'sample_corpus')
+    files = sorted(glob.glob(os.path.join(sample_dir, '*.txt')))
+    report = build_file_reports(files)
+    master = Counter()
+    for file in files:
+        master.update({ws[0]: ws[1] for ws in report[file]['data']['word_stats']})
+    report["Master Report"] = {'data': get_text_statistics(master), 'title': "Master Report"}
+    text_bytes = sum(os.path.getsize(file) for file in files)
+    return report, text_bytes
+
+
+def encode(report, codec, level):
+    if codec == "pickle":
+        return pickle.dumps(report, protocol=pickle.HIGHEST_PROTOCOL)
+    if codec == "pickle+zlib":
+        return zlib.compress(pickle.dumps(report, protocol=pickle.HIGHEST_PROTOCOL), level)
+    return encode_report(report, codec, level)
+
+
+def decode(blob, codec):
+    if codec == "pickle":
+        return pickle.loads(blob)
+    if codec == "pickle+zlib":
+        return pickle.loads(zlib.decompress(blob))
+    return decode_report(blob)
+
+
+class Totals:
+    def __init__(self):
+        self.raw = self.size = 0
+        self.encode_time = self.decode_time = 0.0
+        self.exact = True
+
+    def add(self, report, codec, level, raw):
+        start = time.perf_counter()
+        blob = encode(report, codec, level)
+        self.encode_time += time.perf_counter() - start
+        start = time.perf_counter()
+        decoded = decode(blob, codec)
+        self.decode_time += time.perf_counter() - start
+        self.exact &= decoded == report
+        self.raw += raw
+        self.size += len(blob)
+
+    def line(self, name):
+        mb = self.raw / 1e6
+        return (f"  {name:<12} {self.size / 1e6:10.2f} MB  ratio {self.raw / max(self.size, 1):6.1f}x  "
+                f"encode {mb / max(self.encode_time, 1e-9):7.1f} MB/s  decode {mb / max(self.decode_time, 1e-9):7.1f} MB/s  "
+                f"exact={self.exact}")
+
+
+def benchmark_sample_corpus():
+    report, text_bytes = sample_corpus_report()
+    raw = len(pickle.dumps(report, protocol=pickle.HIGHEST_PROTOCOL))
+    print(f"Sample corpus: {len(report) - 1} files, {text_bytes / 1e6:.2f} MB text, {raw / 1e6:.2f} MB pickled report")
+    for codec, level in CODECS:
+        totals = Totals()
+        for _ in range(3):
+            totals.add(report, codec, level, raw)
+        totals.size //= 3
+        totals.raw //= 3
+        totals.encode_time /= 3
+        totals.decode_time /= 3
+        print(totals.line(f"{codec}-{level}" if level is not None else codec))
+
+
+def synthetic_word_list(vocab_size, rng):
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    lengths = np.clip(rng.poisson(6, vocab_size), 1, 20)
+    words = {"".join(rng.choice(letters, n)) for n in lengths.tolist()}
+    return sorted(words, key=len)
+
+
+def benchmark_synthetic(total_mb, file_kb, files_per_report, vocab_size=200000, zipf_a=1.1, seed=0):
+    rng = np.random.default_rng(seed)
+    vocabulary = synthetic_word_list(vocab_size, rng)
+    ranks = np.arange(1, len(vocabulary) + 1)
+    probs = 1.0 / ranks ** zipf_a
+    probs /= probs.sum()
+    mean_word_bytes = float(np.dot(probs, [len(w) + 1 for w in vocabulary]))
+    tokens_per_file = int(file_kb * 1024 / mean_word_bytes)
+    n_files = max(1, int(total_mb * 1024 * 1024 / (tokens_per_file * mean_word_bytes)))
+
+    totals = {codec: Totals() for codec in CODECS}
+    start = time.perf_counter()
+    for first in range(0, n_files, files_per_report):
+        report = {}
+        for i in range(first, min(first + files_per_report, n_files)):
+            counts = rng.multinomial(tokens_per_file, probs)
+            nonzero = np.flatnonzero(counts)
+            word_counts = Counter(dict(zip((vocabulary[j] for j in nonzero.tolist()), counts[nonzero].tolist())))
+            path = f"synthetic/file_{i:06d}.txt"
+            report[path] = {'data': get_text_statistics(word_counts), 'title': os.path.basename(path)}
+        raw = len(pickle.dumps(report, protocol=pickle.HIGHEST_PROTOCOL))
+        for codec, level in CODECS:
+            totals[(codec, level)].add(report, codec, level, raw)
+        done = min(first + files_per_report, n_files)
+        print(f"  ... {done}/{n_files} files, {time.perf_counter() - start:.0f}s", flush=True)
+    raw_mb = totals[CODECS[0]].raw / 1e6
+    print(f"Synthetic corpus: {n_files} files of ~{file_kb} KB ({n_files * tokens_per_file * mean_word_bytes / 1e9:.2f} GB text) "
+          f"in reports of {files_per_report} files, {raw_mb:.1f} MB pickled reports")
+    for codec, level in CODECS:
+        print(totals[(codec, level)].line(f"{codec}-{level}" if level is not None else codec))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--synthetic-mb", type=float, default=64, help="text size of the synthetic corpus in MB (0 = skip)")
+    parser.add_argument("--file-kb", type=int, default=64, help="text size of one synthetic file in KB")
+    parser.add_argument("--files-per-report", type=int, default=64, help="synthetic files encoded together, like one corpus report")
+    args = parser.parse_args()
+
+    benchmark_sample_corpus()
+    if args.synthetic_mb:
+        benchmark_synthetic(args.synthetic_mb, args.file_kb, args.files_per_report)
@@ -0,0 +1,78 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest import mock
+from PyQt5.QtCore import QCoreApplication, QThreadPool
+from controller.analysis_worker import AnalysisTask
+from controller.main_controller import MainController
+
+
+class TestAnalysisTask(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.files = []
+        for name, text in (("a.txt", "one two two"), ("b.txt", "two three"), ("c.txt", "four")):
+            path = os.path.join(self.tmpdir.name, name)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            self.files.append(path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def record(self, task):
+        events = {"progress": [], "finished": [], "cancelled": [], "failed": []}
+        for name, values in events.items():
+            getattr(task.signals, name).connect(values.append)
+        return events
+
+    def test_progress_and_report(self):
+        task = AnalysisTask(self.files)
+        events = self.record(task)
+        task.run()
+        self.assertEqual([p["files_done"] for p in events["progress"]], [1, 2, 3])
+        self.assertEqual([p["bytes_done"] for p in events["progress"]], [11, 20, 24])
+        report = events["finished"][0]
+        self.assertEqual(list(report), self.files + ["Master Report"])
+        self.assertEqual(report["Master Report"]["data"]["total_word_count"], 6)
+        self.assertEqual(events["cancelled"], [])
+
+    def test_cancel_stops_between_files(self):
+        task = AnalysisTask(self.files)
+        events = self.record(task)
+        task.signals.progress.connect(lambda progress: task.cancel())
+        task.run()
+        self.assertEqual(len(events["progress"]), 1)
+        self.assertEqual(events["cancelled"], [1])
+        self.assertEqual(events["finished"], [])
+
+    def test_signals_reach_the_thread_of_the_listener(self):
+        task = AnalysisTask(self.files[:2])
+        events = self.record(task)
+        pool = QThreadPool()
+        pool.start(task)
+        pool.waitForDone()
+        self.app.processEvents()  # queued signals are delivered here
+        self.assertEqual(len(events["progress"]), 2)
+        self.assertEqual(list(events["finished"][0]), self.files[:2] + ["Master Report"])
+
+
+class TestAnalysisFinished(unittest.TestCase):
+    def test_report_of_removed_corpus_is_discarded(self):
+        controller = mock.Mock(corpora={})
+        MainController._on_analysis_finished(controller, "gone", {"Master Report": {}})
+        controller.finish_analysis.assert_not_called()
+
+        controller.corpora = {"kept": object()}
+        MainController._on_analysis_finished(controller, "kept", {"Master Report": {}})
+        MainController._on_analysis_finished(controller, "Default Corpus", {"Master Report": {}}, registered=False)
+        self.assertEqual([c.args[0] for c in controller.finish_analysis.call_args_list], ["kept", "Default Corpus"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import os
+import glob
+from unittest import mock
+from model.word_analyzer import read_and_preprocess_file, calculate_word_frequencies, get_text_statistics
+from analysis.advanced_analysis import OverlapAnalyzer, compute_bo_scores
+from analysis import bo_engine
+from analysis.bo_engine import compute_bo_scores_matrix
+
+
+def build_file_reports(file_paths):
+    """Build the same file_reports dict MainController.run_analysis produces."""
+    file_reports = {}
+    for file_path in file_paths:
+        words, _ = read_and_preprocess_file(file_path)
+        stats = get_text_statistics(calculate_word_frequencies(words))
+        file_reports[file_path] = {'data': stats, 'title': os.path.basename(file_path)}
+    return file_reports
+
+
+def pairwise_bo_scores(file_reports):
+    analyzer = OverlapAnalyzer(file_reports)
+    analyzer.compute_bo_scores()
+    return analyzer.get_bo_scores()
+
+
+class TestBOEngine(unittest.TestCase):
+    # Summation order differs from the pairwise loop, so values agree to
+    # floating point rounding rather than bit for bit.
+    RTOL = 1e-12
+
+    @classmethod
+    def setUpClass(cls):
+        sample_dir = os.path.join(os.path.dirname(__file__), '..', 'sample_corpus')
+        cls.sample_files = sorted(glob.glob(os.path.join(sample_dir, '*.txt')))[:12]
+        cls.file_reports = build_file_reports(cls.sample_files)
+        cls.expected_bon1, cls.expected_bon2 = pairwise_bo_scores(cls.file_reports)
+
+    def assertScoresMatch(self, expected, actual):
+        self.assertEqual(set(expected), set(actual), "BO word sets differ.")
+        for word, value in expected.items():
+            self.assertLessEqual(abs(actual[word] - value), self.RTOL * abs(value),
+                                 f"Score mismatch for {word!r}: {actual[word]} vs {value}")
+
+    def test_matrix_engine_matches_pairwise(self):
+        bon1, bon2 = compute_bo_scores_matrix(self.file_reports)
+        self.assertScoresMatch(self.expected_bon1, bon1)
+        self.assertScoresMatch(self.expected_bon2, bon2)
+
+    def test_small_blocks_and_chunks_match_pairwise(self):
+        # Forces off-diagonal block pairs and several column chunks per block.
+        bon1, bon2 = compute_bo_scores_matrix(self.file_reports, block_size=5, column_chunk=64)
+        self.assertScoresMatch(self.expected_bon1, bon1)
+        self.assertScoresMatch(self.expected_bon2, bon2)
+
+    def test_parallel_workers_match_pairwise(self):
+        progress = []
+        with mock.patch.object(bo_engine, "PARALLEL_MIN_TEXTS", 0):
+            bon1, bon2 = compute_bo_scores_matrix(self.file_reports, workers=2,
+                                                  progress_callback=lambda done, total: progress.append((done, total)))
+        self.assertScoresMatch(self.expected_bon1, bon1)
+        self.assertScoresMatch(self.expected_bon2, bon2)
+        total = progress[-1][1]
+        self.assertEqual(progress, [(done, total) for done in range(1, total + 1)])
+        self.assertGreaterEqual(total, 2 * bo_engine.MIN_BLOCK_PAIRS_PER_WORKER)
+
+    def test_ranking_matches_pairwise(self):
+        bon1, _ = compute_bo_scores(self.file_reports)
+        expected_rank = [w for w, _ in sorted(self.expected_bon1.items(), key=lambda x: x[1], reverse=True)]
+        actual_rank = [w for w, _ in sorted(bon1.items(), key=lambda x: x[1], reverse=True)]
+        self.assertEqual(expected_rank[:100], actual_rank[:100])
+
+    def test_master_report_and_empty_texts_are_ignored(self):
+        reports = dict(list(self.file_reports.items())[:3])
+        reports["empty.txt"] = {'data': get_text_statistics(calculate_word_frequencies([]))}
+        reports["Master Report"] = {'data': get_text_statistics(calculate_word_frequencies(["x", "y", "x"]))}
+        expected_bon1, expected_bon2 = pairwise_bo_scores(reports)
+        bon1, bon2 = compute_bo_scores_matrix(reports)
+        self.assertScoresMatch(expected_bon1, bon1)
+        self.assertScoresMatch(expected_bon2, bon2)
+
+    def test_streaming_matches_pairwise_exactly(self):
+        analyzer = OverlapAnalyzer(self.file_reports, streaming=True)
+        analyzer.compute_bo_scores()
+        bon1, bon2 = analyzer.get_bo_scores()
+        # Same pair and word order as the pairwise loop, so sums are identical.
+        self.assertEqual(self.expected_bon1, bon1)
+        self.assertEqual(self.expected_bon2, bon2)
+        self.assertEqual(analyzer.pairwise_pw, {})
+
+    def test_explain_word_sums_to_score(self):
+        analyzer = OverlapAnalyzer(self.file_reports, streaming=True)
+        analyzer.compute_bo_scores()
+        word = max(self.expected_bon1, key=self.expected_bon1.get)
+        contributions = analyzer.explain_word(word)
+        self.assertTrue(contributions)
+        self.assertAlmostEqual(sum(c["BOn1"] for c in contributions), self.expected_bon1[word])
+        self.assertAlmostEqual(sum(c["BOn2"] for c in contributions), self.expected_bon2[word])
+        self.assertEqual(OverlapAnalyzer(self.file_reports).explain_word("no-such-word"), [])
+
+    def test_single_text_has_no_scores(self):
+        reports = dict(list(self.file_reports.items())[:1])
+        self.assertEqual(compute_bo_scores_matrix(reports), ({}, {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import copy
+import os
+import glob
+from unittest import mock
+from analysis.bo_incremental import IncrementalBOScores
+from analysis.bo_engine import compute_bo_scores_matrix
+from tests.test_bo_engine import build_file_reports
+
+
+class TestIncrementalBOScores(unittest.TestCase):
+    RTOL = 1e-12
+
+    @classmethod
+    def setUpClass(cls):
+        sample_dir = os.path.join(os.path.dirname(__file__), '..', 'sample_corpus')
+        sample_files = sorted(glob.glob(os.path.join(sample_dir, '*.txt')))[:10]
+        cls.file_reports = build_file_reports(sample_files)
+        cls.keys = list(cls.file_reports)
+
+    def assertMatchesFull(self, scores, file_reports):
+        expected_bon1, expected_bon2 = compute_bo_scores_matrix(file_reports)
+        bon1, bon2 = scores.get_bo_scores()
+        for expected, actual in ((expected_bon1, bon1), (expected_bon2, bon2)):
+            self.assertEqual(set(expected), set(actual))
+            for word, value in expected.items():
+                self.assertLessEqual(abs(actual[word] - value), self.RTOL * abs(value), word)
+
+    def test_adding_texts_one_by_one(self):
+        scores = IncrementalBOScores(full_recompute_every=0)
+        for key in self.keys:
+            scores.add_text(key, self.file_reports[key])
+        self.assertEqual(scores.updates_since_recompute, len(self.keys))
+        self.assertMatchesFull(scores, self.file_reports)
+
+    def test_removing_texts(self):
+        scores = IncrementalBOScores(full_recompute_every=0)
+        scores.sync(self.file_reports)
+        remaining = dict(self.file_reports)
+        for key in self.keys[:4]:
+            scores.remove_text(key)
+            del remaining[key]
+        self.assertMatchesFull(scores, remaining)
+
+    def test_sync_applies_only_the_difference(self):
+        scores = IncrementalBOScores()
+        self.assertIsNone(scores.sync(dict(list(self.file_reports.items())[:8])))
+        self.assertEqual(scores.sync(self.file_reports), (2, 0))
+        smaller = dict(self.file_reports)
+        del smaller[self.keys[0]]
+        smaller["Master Report"] = self.file_reports[self.keys[1]]
+        self.assertEqual(scores.sync(smaller), (0, 1))
+        self.assertMatchesFull(scores, smaller)
+
+    def test_periodic_full_recompute(self):
+        scores = IncrementalBOScores(full_recompute_every=3)
+        scores.sync(dict(list(self.file_reports.items())[:6]))
+        for key in self.keys[6:9]:
+            scores.add_text(key, self.file_reports[key])
+        self.assertEqual(scores.updates_since_recompute, 0)
+        self.assertMatchesFull(scores, dict(list(self.file_reports.items())[:9]))
+
+    def test_reloaded_reports_are_not_changes(self):
+        scores = IncrementalBOScores()
+        scores.sync(self.file_reports, revision=1)
+        reloaded = copy.deepcopy(self.file_reports)
+        with mock.patch.object(scores, "rebuild") as rebuild:
+            self.assertEqual(scores.sync(reloaded, revision=1), (0, 0))
+            self.assertEqual(scores.sync(reloaded, revision=2), (0, 0))  # same content
+        rebuild.assert_not_called()
+        self.assertFalse(hasattr(scores, "reports"))  # no report objects kept
+
+
+if __name__ == '__main__':
+    unittest.main()
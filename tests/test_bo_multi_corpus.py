@@ -0,0 +1,63 @@
+import unittest
+import os
+import glob
+from analysis.advanced_analysis import compute_bo_scores
+from analysis.bo_multi_corpus import (
+    compute_cross_bo_scores,
+    compute_multi_corpus_bo_scores,
+    qualify_corpus_reports,
+)
+from tests.test_bo_engine import build_file_reports
+
+
+class TestMultiCorpusBO(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        sample_dir = os.path.join(os.path.dirname(__file__), '..', 'sample_corpus')
+        sample_files = sorted(glob.glob(os.path.join(sample_dir, '*.txt')))[:9]
+        cls.corpora = {
+            "A": build_file_reports(sample_files[:4]),
+            "B": build_file_reports(sample_files[4:7]),
+            # shares a file with A: it must count as a separate text
+            "C": build_file_reports(sample_files[6:9] + sample_files[:1]),
+        }
+
+    def assertDictsClose(self, actual, expected):
+        self.assertEqual(set(actual), set(expected))
+        for word, score in expected.items():
+            self.assertAlmostEqual(actual[word], score, delta=1e-9 * max(1.0, abs(score)))
+
+    def test_qualified_keys(self):
+        qualified = qualify_corpus_reports(self.corpora)
+        self.assertEqual(len(qualified), 4 + 3 + 4)
+        self.assertTrue(all(isinstance(key, tuple) and len(key) == 2 for key in qualified))
+
+    def test_cross_is_union_minus_within(self):
+        both = qualify_corpus_reports({"A": self.corpora["A"], "C": self.corpora["C"]})
+        bon1_all, bon2_all = compute_bo_scores(both)
+        bon1_a, bon2_a = compute_bo_scores(self.corpora["A"])
+        bon1_c, bon2_c = compute_bo_scores(self.corpora["C"])
+        # tiny blocks so several cross block pairs are summed
+        bon1_x, bon2_x = compute_cross_bo_scores("A", self.corpora["A"], "C", self.corpora["C"], block_size=2)
+        for word, score in bon1_x.items():
+            self.assertAlmostEqual(score, bon1_all[word] - bon1_a.get(word, 0.0) - bon1_c.get(word, 0.0),
+                                   delta=1e-9 * max(1.0, score))
+            self.assertAlmostEqual(bon2_x[word], bon2_all[word] - bon2_a.get(word, 0.0) - bon2_c.get(word, 0.0),
+                                   delta=1e-9 * max(1.0, bon2_x[word]))
+
+    def test_multi_corpus_matches_single_computation(self):
+        bon1, bon2 = compute_multi_corpus_bo_scores(self.corpora)
+        expected1, expected2 = compute_bo_scores(qualify_corpus_reports(self.corpora))
+        self.assertDictsClose(bon1, expected1)
+        self.assertDictsClose(bon2, expected2)
+
+    def test_known_parts_are_not_recomputed(self):
+        within = {"A": ({"marker": 1.0}, {"marker": 2.0})}
+        cross = {("A", "B"): ({"marker": 10.0}, {}), ("A", "C"): ({}, {}), ("B", "C"): ({}, {})}
+        bon1, bon2 = compute_multi_corpus_bo_scores(self.corpora, within=within, cross=cross)
+        self.assertEqual(bon1["marker"], 11.0)
+        self.assertEqual(bon2["marker"], 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+import os
+import glob
+import tempfile
+from unittest import mock
+from model.corpus_report_manager import CorpusReportManager
+from model.report_store import SQLiteReportStore
+from analysis import bo_incremental, bo_service
+from analysis.bo_service import BOResultService, EMPTY_RESULT
+from analysis.advanced_analysis import compute_bo_scores
+from tests.test_bo_engine import build_file_reports
+
+
+class TestBOResultService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        sample_dir = os.path.join(os.path.dirname(__file__), '..', 'sample_corpus')
+        sample_files = sorted(glob.glob(os.path.join(sample_dir, '*.txt')))[:6]
+        cls.reports_a = build_file_reports(sample_files[:3])
+        cls.reports_b = build_file_reports(sample_files[3:])
+
+    def setUp(self):
+        self.manager = CorpusReportManager()
+        self.manager.update_report_for_corpus("A", dict(self.reports_a))
+        self.manager.update_report_for_corpus("B", dict(self.reports_b))
+        self.service = BOResultService(self.manager)
+
+    def assertScoresEqual(self, result_scores, expected_dict):
+        self.assertEqual(len(result_scores), len(expected_dict))
+        for word, score in result_scores:
+            self.assertAlmostEqual(score, expected_dict[word], delta=1e-9 * max(1.0, abs(score)))
+
+    def test_results_match_compute_bo_scores(self):
+        result = self.service.get_results(["B", "A"])
+        bon1, bon2 = compute_bo_scores({**self.reports_a, **self.reports_b})
+        self.assertScoresEqual(result.bon1, bon1)
+        self.assertScoresEqual(result.bon2, bon2)
+        scores = [score for _, score in result.bon1]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_same_corpus_set_is_computed_once(self):
+        with mock.patch.object(bo_service, "compute_cross_bo_scores",
+                               wraps=bo_service.compute_cross_bo_scores) as compute:
+            first = self.service.get_results(["A", "B"])
+            second = self.service.get_results(["B", "A", "A"])
+        self.assertIs(first, second)
+        self.assertEqual(compute.call_count, 1)
+        self.assertEqual((self.service.hits, self.service.misses), (1, 1))
+
+    def test_cross_results_and_reuse(self):
+        bon1_all, bon2_all = compute_bo_scores({**self.reports_a, **self.reports_b})
+        bon1_a, bon2_a = compute_bo_scores(self.reports_a)
+        bon1_b, bon2_b = compute_bo_scores(self.reports_b)
+        cross = self.service.get_cross_results("B", "A")
+        expected = {w: s - bon1_a.get(w, 0.0) - bon1_b.get(w, 0.0) for w, s in bon1_all.items()}
+        for word, score in cross.bon1:
+            self.assertAlmostEqual(score, expected[word], delta=1e-9 * max(1.0, score))
+        # the union reuses the cached cross block
+        with mock.patch.object(bo_service, "compute_cross_bo_scores") as compute:
+            self.service.get_results(["A", "B"])
+        compute.assert_not_called()
+        self.assertEqual(self.service.get_cross_results("A", "A"), EMPTY_RESULT)
+
+    def test_same_file_in_two_corpora(self):
+        self.manager.update_report_for_corpus("C", dict(self.reports_a))
+        result = self.service.get_results(["A", "C"])
+        doubled = {("A", k): r for k, r in self.reports_a.items()}
+        doubled.update({("C", k): r for k, r in self.reports_a.items()})
+        bon1, _ = compute_bo_scores(doubled)
+        self.assertScoresEqual(result.bon1, bon1)
+
+    def test_report_update_invalidates(self):
+        before = self.service.get_results(["A"])
+        self.manager.update_report_for_corpus("A", dict(self.reports_b))
+        after = self.service.get_results(["A"])
+        self.assertIsNot(before, after)
+        self.assertEqual(after, self.service.get_results(["B"]))
+
+    def test_top_results(self):
+        with mock.patch.object(bo_service.TopKBOQuery, "top_k", autospec=True,
+                               side_effect=bo_service.TopKBOQuery.top_k) as top_k:
+            top = self.service.get_top_results(["A", "B"], 10, "bon2")
+            self.assertEqual(self.service.get_top_results(["B", "A"], 10, "bon2"), top)
+            self.assertEqual(top_k.call_count, 1)
+            # once the full result is cached, top lists are sliced from it
+            full = self.service.get_results(["A", "B"])
+            self.assertEqual(self.service.get_top_results(["A", "B"], 5, "bon1"), full.bon1[:5])
+            self.assertEqual(top_k.call_count, 1)
+        self.assertEqual([w for w, _ in top], [w for w, _ in full.bon2[:10]])
+
+    def test_missing_report_gives_empty_result(self):
+        self.manager.remove_corpus_report("B")
+        self.assertEqual(self.service.get_results(["A", "B"]), EMPTY_RESULT)
+        self.assertIsNone(self.manager.get_report_revision("B"))
+
+    def test_snapshots_keep_jobs_off_the_manager(self):
+        snapshots = self.service.snapshot(["A", "B"])
+        expected = self.service.get_results(["A", "B"])
+        self.service.invalidate()
+        with mock.patch.object(self.manager, "get_report_for_corpus") as get_report, \
+                mock.patch.object(self.manager, "get_report_revision") as get_revision:
+            self.assertEqual(self.service.get_results(["A", "B"], snapshots), expected)
+            self.service.get_cross_results("A", "B", snapshots)
+            self.service.get_top_results(["A"], 5, "bon1", snapshots)
+        get_report.assert_not_called()
+        get_revision.assert_not_called()
+
+    def test_worker_count_reaches_the_engine(self):
+        service = BOResultService(self.manager, workers=2)
+        with mock.patch.object(bo_incremental, "compute_bo_scores", wraps=compute_bo_scores) as single, \
+                mock.patch.object(bo_service, "compute_cross_bo_scores",
+                                  wraps=bo_service.compute_cross_bo_scores) as cross:
+            service.get_results(["A", "B"])
+            self.assertEqual([c.kwargs["workers"] for c in single.call_args_list], [2, 2])
+            self.assertEqual(cross.call_args.kwargs["workers"], 2)
+
+            # changing it keeps the cached results and reaches existing maintainers
+            service.set_workers(None)
+            self.assertIs(service.maintainers["A"].workers, None)
+            service.get_results(["A", "B"])
+            self.assertEqual(single.call_count, 2)
+        with self.assertRaises(ValueError):
+            service.set_workers(0)
+
+    def test_evicted_report_is_not_a_change(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manager = CorpusReportManager(store=SQLiteReportStore(os.path.join(tmpdir, "reports.sqlite3")),
+                                          memory_budget=1)  # keeps only the last report used
+            manager.update_report_for_corpus("A", dict(self.reports_a))
+            manager.update_report_for_corpus("B", dict(self.reports_b))
+            service = BOResultService(manager)
+            expected = service.get_results(["A"])
+            service.get_results(["B"])  # evicts A
+            service.cache.clear()
+            with mock.patch.object(service.maintainers["A"], "rebuild") as rebuild:
+                self.assertEqual(service.get_results(["A"]), expected)
+            rebuild.assert_not_called()
+            self.assertGreater(manager.evictions, 0)
+            manager.store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
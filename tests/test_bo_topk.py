@@ -0,0 +1,66 @@
+import unittest
+import os
+import glob
+from analysis.bo_topk import TopKBOQuery, top_k_bo_scores
+from analysis.advanced_analysis import compute_bo_scores
+from tests.test_bo_engine import build_file_reports
+
+
+class TestTopKBO(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        sample_dir = os.path.join(os.path.dirname(__file__), '..', 'sample_corpus')
+        sample_files = sorted(glob.glob(os.path.join(sample_dir, '*.txt')))[:12]
+        cls.file_reports = build_file_reports(sample_files)
+        bon1, bon2 = compute_bo_scores(cls.file_reports)
+        cls.full = {
+            "bon1": sorted(bon1.items(), key=lambda x: x[1], reverse=True),
+            "bon2": sorted(bon2.items(), key=lambda x: x[1], reverse=True),
+        }
+
+    def assertMatchesFull(self, top, kind, k):
+        expected = self.full[kind][:k]
+        self.assertEqual([w for w, _ in top], [w for w, _ in expected])
+        for (_, score), (_, expected_score) in zip(top, expected):
+            self.assertAlmostEqual(score, expected_score, delta=1e-12 * expected_score)
+
+    def test_top_k_matches_full_ranking(self):
+        query = TopKBOQuery.from_file_reports(self.file_reports)
+        for kind in ("bon1", "bon2"):
+            for k in (1, 10, 50):
+                self.assertMatchesFull(query.top_k(k, kind), kind, k)
+
+    def test_bounds_hold_and_prune(self):
+        query = TopKBOQuery.from_file_reports(self.file_reports)
+        for kind in ("bon1", "bon2"):
+            bounds = dict(zip(query.matrix.vocabulary, query.bounds(kind)))
+            for word, score in self.full[kind]:
+                self.assertGreaterEqual(bounds[word], score)
+        query.top_k(50, "bon1")
+        self.assertLess(query.words_scored, len(self.full["bon1"]) // 4)
+
+    def test_shared_counts_of_requested_pairs(self):
+        query = TopKBOQuery.from_file_reports(self.file_reports)
+        vocab = {key: {ws[0] for ws in report['data']['word_stats']}
+                 for key, report in self.file_reports.items() if key != "Master Report"}
+        keys = list(vocab)
+        rows, texts = [1, 4, 7], [0, 4, 5, 11]
+        counts = query.shared_counts(rows, texts)
+        self.assertEqual(counts.shape, (3, 4))
+        for i, r in enumerate(rows):
+            for j, t in enumerate(texts):
+                if r != t:
+                    self.assertEqual(counts[i, j], len(vocab[keys[r]] & vocab[keys[t]]))
+
+    def test_k_larger_than_vocabulary(self):
+        bon1_top, bon2_top = top_k_bo_scores(self.file_reports, k=len(self.full["bon1"]) + 10)
+        self.assertMatchesFull(bon1_top, "bon1", len(bon1_top))
+        self.assertEqual(len(bon2_top), len(self.full["bon2"]))
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            TopKBOQuery.from_file_reports(self.file_reports).top_k(5, "bon3")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from model.columnar_store import ColumnarReportStore, ColumnarWordStats, word_stats_column
+from model.corpus_report_manager import CorpusReportManager
+from model.file_report_pool import estimate_file_report_bytes
+
+
+def sample_report(word):
+    return {
+        f"{word}.txt": {
+            "data": {"total_word_count": 3, "unique_word_count": 2,
+                     "word_stats": [(word, 2, 66.7, 1.0, 0.5), ("naïve", 1, 33.3, -1.0, 0.0)]},
+            "title": word, "signature": (3, 1),
+        },
+        "empty.txt": {"data": {"total_word_count": 0, "unique_word_count": 0, "word_stats": []}},
+        "Master Report": {"data": {"word_stats": [(word, 2, 66.7, 1.0, 0.5)]}, "title": "Master Report",
+                          "file_signatures": {f"{word}.txt": (3, 1)}, "analysis_config": "cfg"},
+    }
+
+
+class TestColumnarReportStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmpdir.name, "reports")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip_is_lazy_and_mapped(self):
+        store = ColumnarReportStore(self.root)
+        store.save("A", sample_report("cat"))
+
+        loaded = ColumnarReportStore(self.root).load("A")
+        self.assertEqual(list(loaded), ["cat.txt", "empty.txt", "Master Report"])
+        word_stats = loaded["cat.txt"]["data"]["word_stats"]
+        self.assertIsInstance(word_stats, ColumnarWordStats)
+        self.assertEqual(word_stats.columns._columns, {})  # nothing mapped yet
+        self.assertEqual(loaded, sample_report("cat"))
+
+        counts = word_stats_column(word_stats, 1)
+        self.assertIsInstance(counts, np.memmap)
+        self.assertEqual(counts.tolist(), [2, 1])
+        self.assertEqual(word_stats[-1], ("naïve", 1, 33.3, -1.0, 0.0))
+        self.assertEqual([type(v) for v in word_stats[0]], [str, int, float, float, float])
+        self.assertEqual([type(v) for v in word_stats[0]], [type(v) for v in list(word_stats)[0]])
+        self.assertEqual(len(loaded["empty.txt"]["data"]["word_stats"]), 0)
+        self.assertLess(estimate_file_report_bytes(loaded["cat.txt"]), 1024)
+
+    def test_resave_replaces_version_and_delete_cleans_up(self):
+        store = ColumnarReportStore(self.root)
+        store.save("A", sample_report("cat"))
+        store.save("A", store.load("A"))  # saving mapped word_stats back
+        store.save("B", sample_report("dog"))
+        self.assertEqual(len(os.listdir(self.root)), 3)  # index + two versions
+        store.delete("B")
+
+        reopened = ColumnarReportStore(self.root)
+        self.assertEqual(reopened.names(), ["A"])
+        self.assertIsNone(reopened.load("B"))
+        self.assertEqual(reopened.load("A"), sample_report("cat"))
+        self.assertIsNotNone(reopened.fingerprints()["A"])
+
+    def test_manager_reuses_pooled_file_reports(self):
+        store = ColumnarReportStore(self.root)
+        store.save("A", sample_report("cat"))
+        store.save("B", sample_report("cat"))
+
+        manager = CorpusReportManager(store=ColumnarReportStore(self.root))
+        a = manager.get_report_for_corpus("A")
+        b = manager.get_report_for_corpus("B")
+        self.assertIs(a["cat.txt"], b["cat.txt"])
+
+    def test_held_report_survives_resave(self):
+        store = ColumnarReportStore(self.root)
+        store.save("A", sample_report("cat"))
+        old = store.load("A")
+        store.save("A", sample_report("dog"))
+
+        self.assertEqual(old, sample_report("cat"))  # columns mapped only now
+        self.assertEqual(store.load("A"), sample_report("dog"))
+        del old
+        self.assertEqual(len(os.listdir(self.root)), 2)  # index + current version
+
+    def test_removing_corpus_keeps_shared_files_readable(self):
+        store = ColumnarReportStore(self.root)
+        store.save("A", sample_report("cat"))
+        store.save("B", sample_report("cat"))
+
+        manager = CorpusReportManager(store=ColumnarReportStore(self.root))
+        manager.get_report_for_corpus("A")
+        b = manager.get_report_for_corpus("B")  # reuses A's cat.txt
+        manager.remove_corpus_report("A")
+
+        self.assertEqual(list(b["cat.txt"]["data"]["word_stats"]), sample_report("cat")["cat.txt"]["data"]["word_stats"])
+
+    def test_unused_versions_removed_on_open(self):
+        store = ColumnarReportStore(self.root)
+        store.save("A", sample_report("cat"))
+        held = store.load("A")
+        store.delete("A")
+        self.assertEqual(len(os.listdir(self.root)), 2)  # still read by held
+
+        ColumnarReportStore(self.root)
+        self.assertEqual(os.listdir(self.root), ["index.json"])
+        del held
+
+
+if __name__ == "__main__":
+    unittest.main()
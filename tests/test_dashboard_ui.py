@@ -0,0 +1,51 @@
+import unittest
+from unittest import mock
+from model.corpora import Corpus
+from model.corpus_report_manager import CorpusReportManager
+from ui import dashboard_ui
+from ui.dashboard_ui import DashboardWindow
+
+
+class FakeItem:
+    def __init__(self, path):
+        self.path = path
+
+    def toolTip(self, column):
+        return self.path
+
+
+class FakeFileList:
+    def __init__(self, paths):
+        self.paths = paths
+
+    def selectedItems(self):
+        return [FakeItem(path) for path in self.paths]
+
+
+class TestRemoveSelectedFiles(unittest.TestCase):
+    def setUp(self):
+        self.main_controller = mock.Mock()
+        self.main_controller.corpora = {"A": Corpus("A", ["a.txt", "b.txt"])}
+        self.main_controller.report_manager = CorpusReportManager()
+        self.main_controller.report_manager.update_report_for_corpus("A", {
+            "a.txt": {"data": {"word_stats": [("cat", 1, 100.0, 0.0, 0.0)]}},
+            "b.txt": {"data": {"word_stats": [("dog", 1, 100.0, 0.0, 0.0)]}},
+            "Master Report": {"data": {"word_stats": []}},
+        })
+        # the fingerprint-aware check fails once the file list has changed
+        self.main_controller.has_report_for_corpus.return_value = False
+        self.view = mock.Mock(main_controller=self.main_controller)
+
+    def remove(self, paths):
+        with mock.patch.object(dashboard_ui.QMessageBox, "question", return_value=dashboard_ui.QMessageBox.Yes):
+            DashboardWindow.remove_selected_files(self.view, "A", FakeFileList(paths), mock.Mock())
+
+    def test_stored_report_is_updated_incrementally(self):
+        self.remove(["b.txt"])
+        self.assertEqual(self.main_controller.corpora["A"].get_files(), ["a.txt"])
+        self.main_controller.update_corpus_report_files.assert_called_once_with("A", removed_files=["b.txt"])
+        self.main_controller.run_analysis.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
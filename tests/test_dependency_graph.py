@@ -0,0 +1,37 @@
+import unittest
+from model.dependency_graph import DependencyGraph, Node, CORPUS, FILE, REPORT, DERIVED, CELL
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = DependencyGraph()
+        for name, files in (("A", ["a.txt", "shared.txt"]), ("B", ["b.txt", "shared.txt"])):
+            self.graph.set_sources(Node(REPORT, name), [Node(CORPUS, name)] + [Node(FILE, f) for f in files])
+        self.graph.set_sources(Node(DERIVED, "bo A"), [Node(REPORT, "A")])
+        self.graph.set_sources(Node(DERIVED, "bo A+B"), [Node(REPORT, "A"), Node(REPORT, "B")])
+        self.graph.set_sources(Node(CELL, "bar A"), [Node(DERIVED, "bo A")])
+        self.graph.set_sources(Node(CELL, "table A"), [Node(DERIVED, "bo A")])
+        self.graph.set_sources(Node(CELL, "bar A+B"), [Node(DERIVED, "bo A+B")])
+
+    def cells(self, changed):
+        return {node.key for node in self.graph.affected(changed) if node.kind == CELL}
+
+    def test_changes_reach_only_dependents(self):
+        self.assertEqual(self.cells([Node(FILE, "b.txt")]), {"bar A+B"})
+        self.assertEqual(self.cells([Node(CORPUS, "A")]), {"bar A", "table A", "bar A+B"})
+        self.assertEqual(self.cells([Node(FILE, "shared.txt")]), {"bar A", "table A", "bar A+B"})
+        self.assertEqual(self.cells([Node(FILE, "unknown.txt")]), set())
+        affected = self.graph.affected([Node(REPORT, "B"), Node(REPORT, "B")])
+        self.assertEqual(affected, [Node(REPORT, "B"), Node(DERIVED, "bo A+B"), Node(CELL, "bar A+B")])
+
+    def test_edges_are_replaced_and_removed(self):
+        self.graph.set_sources(Node(CELL, "bar A+B"), [Node(DERIVED, "bo A")])
+        self.assertEqual(self.cells([Node(REPORT, "B")]), set())
+        self.graph.remove(Node(DERIVED, "bo A"))
+        self.assertEqual(self.cells([Node(REPORT, "A")]), set())
+        self.assertNotIn(Node(CELL, "bar A"), self.graph)
+        self.assertEqual(self.graph.nodes(DERIVED), {Node(DERIVED, "bo A+B")})
+
+
+if __name__ == "__main__":
+    unittest.main()
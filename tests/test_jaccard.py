@@ -0,0 +1,74 @@
+import unittest
+import os
+import glob
+import numpy as np
+from analysis import jaccard
+from analysis.jaccard import MinHasher, compute_jaccard_matrix, exact_jaccard_matrix, build_word_sets
+from analysis.advanced_analysis import calculate_jaccard_index
+from visualizations.cell_layout import downsample_heatmap
+from tests.test_bo_engine import build_file_reports
+
+
+class TestJaccard(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        sample_dir = os.path.join(os.path.dirname(__file__), '..', 'sample_corpus')
+        sample_files = sorted(glob.glob(os.path.join(sample_dir, '*.txt')))[:15]
+        cls.file_reports = build_file_reports(sample_files)
+        cls.text_keys, cls.word_sets = build_word_sets(cls.file_reports)
+
+    def test_exact_matches_python_sets(self):
+        result = calculate_jaccard_index(self.file_reports, method="exact")
+        self.assertEqual(result.text_keys, self.text_keys)
+        for i, a in enumerate(self.word_sets):
+            for j, b in enumerate(self.word_sets):
+                self.assertAlmostEqual(result.matrix[i, j], len(a & b) / len(a | b), places=6)
+
+    def test_small_blocks_and_empty_sets(self):
+        word_sets = [{"a", "b"}, set(), {"b", "c", "d"}, {"a", "b"}, {"z"}]
+        original = jaccard.MAX_BLOCK_ELEMENTS
+        jaccard.MAX_BLOCK_ELEMENTS = 1
+        try:
+            matrix = exact_jaccard_matrix(word_sets)
+        finally:
+            jaccard.MAX_BLOCK_ELEMENTS = original
+        self.assertAlmostEqual(matrix[0, 2], 0.25)
+        self.assertEqual(matrix[0, 3], 1.0)
+        self.assertEqual(matrix[1, 1], 0.0)
+        self.assertEqual(matrix[4, 4], 1.0)
+        self.assertTrue(np.array_equal(matrix, matrix.T))
+
+    def test_popcount(self):
+        values = np.array([0, 1, 0xFF, 2**63, 2**64 - 1, 0x5555], dtype=np.uint64)
+        self.assertEqual(jaccard.popcount(values).tolist(), [0, 1, 8, 1, 64, 8])
+
+    def test_minhash_estimates_exact(self):
+        exact = compute_jaccard_matrix(self.file_reports, method="exact").matrix
+        estimate = compute_jaccard_matrix(self.file_reports, method="minhash", num_perm=512).matrix
+        self.assertLess(float(np.abs(exact - estimate).max()), 0.1)
+        self.assertTrue(np.allclose(np.diag(estimate), 1.0))
+
+    def test_minhash_signatures_are_stable(self):
+        words = sorted(self.word_sets[0])
+        first = MinHasher(num_perm=64, seed=7).signature(words)
+        second = MinHasher(num_perm=64, seed=7).signature(reversed(words))
+        self.assertTrue(np.array_equal(first, second))
+
+    def test_auto_switches_to_minhash(self):
+        result = compute_jaccard_matrix(self.file_reports, exact_max_texts=5)
+        self.assertEqual(result.method, "minhash")
+
+    def test_downsample_heatmap(self):
+        matrix = np.arange(25, dtype=np.float32).reshape(5, 5)
+        image, factor = downsample_heatmap(matrix, max_size=2)
+        self.assertEqual(factor, 3)
+        self.assertEqual(image.shape, (2, 2))
+        self.assertAlmostEqual(image[0, 0], matrix[:3, :3].mean())
+        self.assertAlmostEqual(image[1, 1], matrix[3:, 3:].mean())
+        region, factor = downsample_heatmap(matrix, (1, 3), (2, 5), max_size=10)
+        self.assertEqual(factor, 1)
+        self.assertTrue(np.array_equal(region, matrix[1:3, 2:5]))
+
+
+if __name__ == '__main__':
+    unittest.main()
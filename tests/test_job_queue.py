@@ -0,0 +1,83 @@
+import unittest
+import sys
+import threading
+import time
+from PyQt5.QtCore import QCoreApplication
+from controller.job_queue import JobQueue, INTERACTIVE, NORMAL, BULK
+
+
+class TestJobQueue(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+    def setUp(self):
+        self.queue = JobQueue(max_workers=1)
+        self.order = []
+        self.gate = threading.Event()
+
+    def tearDown(self):
+        self.gate.set()
+        self.queue.wait_for_done()
+
+    def job(self, name):
+        self.order.append(name)
+        return name.upper()
+
+    def blocked(self):
+        self.gate.wait(5)
+        return "first"
+
+    def wait_until_idle(self):
+        deadline = time.time() + 5
+        while len(self.queue) and time.time() < deadline:
+            self.app.processEvents()
+            time.sleep(0.001)
+
+    def test_interactive_jobs_go_first(self):
+        self.queue.submit("running", self.blocked, priority=BULK)
+        with self.queue.submitting(BULK):
+            self.queue.submit("bulk 1", self.job, "bulk 1")
+            self.queue.submit("bulk 2", self.job, "bulk 2")
+        self.queue.submit("normal", self.job, "normal", priority=NORMAL)
+        self.queue.submit("interactive", self.job, "interactive")
+        # asking again for a waiting bulk job moves it up
+        self.queue.submit("bulk 2", self.job, "bulk 2", priority=INTERACTIVE)
+        self.assertEqual(self.queue.stats()["queued"], 4)
+        self.gate.set()
+        self.wait_until_idle()
+        self.assertEqual(self.order, ["interactive", "bulk 2", "normal", "bulk 1"])
+
+    def test_duplicate_jobs_share_a_future(self):
+        first = self.queue.submit("running", self.blocked)
+        waiting = self.queue.submit(("bo", "A", 1), self.job, "bo")
+        self.assertIs(self.queue.submit("running", self.blocked), first)
+        self.assertIs(self.queue.submit(("bo", "A", 1), self.job, "bo"), waiting)
+        results = []
+        waiting.when_done(results.append)
+        self.gate.set()
+        self.wait_until_idle()
+        self.assertEqual(results, ["BO"])
+        self.assertEqual(self.order, ["bo"])
+        stats = self.queue.stats()
+        self.assertEqual((stats["submitted"], stats["deduplicated"], stats["completed"]), (2, 2, 2))
+        # a finished future hands over its result right away
+        waiting.when_done(results.append)
+        self.assertEqual(results, ["BO", "BO"])
+
+    def test_failures_and_latencies(self):
+        errors = []
+        future = self.queue.submit("bad", lambda: 1 / 0)
+        future.when_done(self.fail, errors.append)
+        self.queue.submit("good", self.job, "good")
+        self.wait_until_idle()
+        self.assertEqual(errors, ["division by zero"])
+        self.assertEqual(self.order, ["good"])
+        stats = self.queue.stats()
+        self.assertEqual((stats["failed"], stats["completed"], stats["queued"], stats["running"]), (1, 1, 0, 0))
+        self.assertGreaterEqual(stats["max_wait_ms"], stats["mean_wait_ms"])
+        self.assertGreaterEqual(stats["mean_run_ms"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import os
+import glob
+from analysis.near_duplicates import NearDuplicateIndex, choose_bands
+from model.word_analyzer import read_and_preprocess_file
+
+
+class TestNearDuplicateIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        sample_dir = os.path.join(os.path.dirname(__file__), '..', 'sample_corpus')
+        sample_files = sorted(glob.glob(os.path.join(sample_dir, '*.txt')))[:8]
+        cls.word_sets = {}
+        for file_path in sample_files:
+            words, _ = read_and_preprocess_file(file_path)
+            cls.word_sets[os.path.basename(file_path)] = set(words)
+
+    def build_index(self):
+        index = NearDuplicateIndex(threshold=0.8)
+        for key, words in self.word_sets.items():
+            index.add(key, words)
+        # near duplicates: drop a few words from the first two texts
+        first, second = list(self.word_sets)[:2]
+        index.add("copy_a1", sorted(self.word_sets[first])[5:])
+        index.add("copy_a2", sorted(self.word_sets[first])[:-5])
+        index.add("copy_b", sorted(self.word_sets[second])[3:])
+        return index, first, second
+
+    def test_choose_bands(self):
+        bands, rows = choose_bands(128, 0.8)
+        self.assertLessEqual(bands * rows, 128)
+        self.assertAlmostEqual((1 - 0.5 ** (1 / bands)) ** (1 / rows), 0.8, delta=0.05)
+
+    def test_query_finds_near_duplicates(self):
+        index, first, second = self.build_index()
+        self.assertEqual({key for key, _ in index.query(first)}, {"copy_a1", "copy_a2"})
+        self.assertEqual([key for key, _ in index.query(words=self.word_sets[second])], [second, "copy_b"])
+        for _, similarity in index.query(first):
+            self.assertGreaterEqual(similarity, 0.8)
+
+    def test_clusters_and_representatives(self):
+        index, first, second = self.build_index()
+        clusters = index.clusters()
+        self.assertEqual(clusters, [sorted([first, "copy_a1", "copy_a2"]), sorted([second, "copy_b"])])
+        keys = list(self.word_sets) + ["copy_a1", "copy_a2", "copy_b"]
+        self.assertEqual(index.representatives(keys), list(self.word_sets))
+        self.assertEqual(index.clusters(keys=[first, "copy_b"]), [])
+
+    def test_remove(self):
+        index, first, _ = self.build_index()
+        index.remove("copy_a1")
+        index.remove("copy_a2")
+        self.assertEqual(index.query(first), [])
+        self.assertNotIn("copy_a1", index)
+        self.assertEqual(len(index), len(self.word_sets) + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
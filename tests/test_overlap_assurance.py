@@ -0,0 +1,55 @@
+import unittest
+import os
+import glob
+from analysis.advanced_analysis import OverlapAnalyzer, calculate_overlap_assurance
+from tests.test_bo_engine import build_file_reports
+
+
+class TestOverlapAssurance(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        sample_dir = os.path.join(os.path.dirname(__file__), '..', 'sample_corpus')
+        sample_files = sorted(glob.glob(os.path.join(sample_dir, '*.txt')))[:6]
+        cls.file_reports = build_file_reports(sample_files)
+        cls.file_reports["Master Report"] = {"data": {"word_stats": [("only_in_master", 1)]}}
+
+    def test_matches_pairwise_intersections(self):
+        analyzer = OverlapAnalyzer(self.file_reports)
+        analyzer.create_word_sets_excluding_master()
+        intersections = analyzer.generate_pairwise_intersections()
+        self.assertEqual(len(intersections), 15)
+        for (t1, t2), shared in intersections.items():
+            self.assertEqual(shared, analyzer.word_sets[t1] & analyzer.word_sets[t2])
+
+        metrics = analyzer.calculate_assurance_metrics()
+        self.assertEqual(metrics, analyzer.calculate_assurance_metrics(intersections))
+        self.assertTrue(metrics["assurance_passed"])
+
+        # brute force: a word is unique to a text if no other text has it
+        sets = analyzer.word_sets
+        unique = set()
+        for text, words in sets.items():
+            others = set().union(*(s for t, s in sets.items() if t != text))
+            unique |= words - others
+        self.assertEqual(metrics["total_unique_to_single_text"], len(unique))
+        self.assertEqual(metrics["total_unique_words_in_corpus"], len(set().union(*sets.values())))
+
+    def test_small_corpus(self):
+        reports = {
+            "a": {"data": {"word_stats": [("x", 2), ("y", 1)]}},
+            "b": {"data": {"word_stats": [("x", 1), ("z", 3)]}},
+            "c": {"data": {"word_stats": [("y", 1)]}},
+        }
+        self.assertEqual(calculate_overlap_assurance(reports), {
+            "total_unique_words_in_corpus": 3,
+            "total_intersection_words": 2,
+            "total_unique_to_single_text": 1,
+            "assurance_passed": True,
+        })
+        empty = calculate_overlap_assurance({})
+        self.assertEqual(empty["total_unique_words_in_corpus"], 0)
+        self.assertTrue(empty["assurance_passed"])
+
+
+if __name__ == '__main__':
+    unittest.main()
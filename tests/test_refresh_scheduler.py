@@ -0,0 +1,156 @@
+import unittest
+import sys
+import time
+from unittest import mock
+from PyQt5.QtCore import QCoreApplication
+from controller import refresh_scheduler
+from controller.dashboard_controller import DashboardController
+from controller.refresh_scheduler import RefreshScheduler
+from model.dependency_graph import Node, CORPUS, FILE, REPORT
+
+
+class FakeRegion:
+    def __init__(self, empty):
+        self.empty = empty
+
+    def isEmpty(self):
+        return self.empty
+
+
+class FakeCell:
+    def __init__(self, name, corpora, on_screen=True, expanded=True):
+        self.name = name
+        self.corpora = corpora
+        self.on_screen = on_screen
+        self.expanded = expanded
+
+    def visibleRegion(self):
+        return FakeRegion(not self.on_screen)
+
+    def __repr__(self):
+        return self.name
+
+
+class FakeCorpus:
+    def __init__(self, files):
+        self.files = files
+
+    def get_files(self):
+        return self.files
+
+
+class FakeMainController:
+    def __init__(self):
+        self.corpora = {"A": FakeCorpus(["a.txt", "shared.txt"]), "B": FakeCorpus(["b.txt", "shared.txt"])}
+        self.refreshed_reports = []
+        self.rebuilding = []
+
+    def refresh_corpus_reports(self, corpus_names):
+        self.refreshed_reports.append(sorted(corpus_names))
+        return [name for name in corpus_names if name in self.rebuilding]
+
+
+class FakeDashboard:
+    def __init__(self, cells):
+        self.view = True
+        self.main_controller = FakeMainController()
+        self.cells = cells
+        self.cell_data_map = {cell: {"category_key": "bo", "sub_key": cell.name} for cell in cells}
+        self.updated = []
+
+    def notebook_cells(self):
+        return [cell for cell in self.cells if cell in self.cell_data_map]
+
+    def cell_corpora(self, cell):
+        return cell.corpora
+
+    def update_cell(self, cell):
+        self.updated.append(cell.name)
+
+
+class TestRefreshScheduler(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+    def setUp(self):
+        self.cells = [
+            FakeCell("collapsed A", ["A"], expanded=False),
+            FakeCell("below A", ["A"], on_screen=False),
+            FakeCell("A", ["A"]),
+            FakeCell("B", ["B"]),
+            FakeCell("A+B", ["A", "B"]),
+        ]
+        self.dashboard = FakeDashboard(self.cells)
+        self.scheduler = RefreshScheduler(self.dashboard)
+
+    def run_events(self, seconds=0.2):
+        deadline = time.time() + seconds
+        while time.time() < deadline:
+            self.app.processEvents()
+
+    def test_only_dependent_cells_refresh_visible_first(self):
+        self.scheduler.invalidate([Node(REPORT, "A")])
+        self.scheduler.flush()
+        self.assertEqual(self.dashboard.main_controller.refreshed_reports, [["A"]])
+        # cells on screen right away, the others on later event-loop passes
+        self.assertEqual(sorted(self.dashboard.updated), ["A", "A+B"])
+        self.assertEqual(self.scheduler.stats()["queued"], 2)
+        self.run_events()
+        self.assertEqual(self.dashboard.updated[2:], ["below A", "collapsed A"])
+
+    def test_changed_file_refreshes_only_its_corpora(self):
+        self.scheduler.invalidate([Node(FILE, "a.txt")])
+        self.scheduler.flush()
+        self.run_events()
+        self.assertEqual(self.dashboard.main_controller.refreshed_reports, [["A"]])
+        self.assertEqual(sorted(self.dashboard.updated), ["A", "A+B", "below A", "collapsed A"])
+
+    def test_file_list_edit_refreshes_only_that_corpus(self):
+        controller = DashboardController()
+        controller.refresh_scheduler = mock.Mock()
+        controller.corpus_files_changed("B", ["b.txt"])
+        controller.refresh_scheduler.invalidate.assert_called_once_with([Node(CORPUS, "B"), Node(FILE, "b.txt")])
+
+        self.scheduler.invalidate([Node(CORPUS, "B")])
+        self.scheduler.flush()
+        self.run_events()
+        self.assertEqual(self.dashboard.main_controller.refreshed_reports, [["B"]])
+        self.assertEqual(sorted(self.dashboard.updated), ["A+B", "B"])
+
+    def test_changes_are_coalesced_and_debounced(self):
+        for node in (Node(FILE, "b.txt"), Node(REPORT, "B"), Node(FILE, "b.txt")):
+            self.scheduler.invalidate([node])
+        self.assertEqual(self.dashboard.updated, [])
+        self.run_events(refresh_scheduler.DEBOUNCE_MS / 1000 + 0.2)
+        self.assertEqual(sorted(self.dashboard.updated), ["A+B", "B"])
+        self.assertEqual(self.scheduler.stats()["flushes"], 1)
+        self.assertEqual(self.dashboard.main_controller.refreshed_reports, [["B"]])
+
+    def test_removed_cells_are_dropped(self):
+        self.scheduler.invalidate([Node(FILE, "shared.txt")])
+        self.scheduler.flush()
+        del self.dashboard.cell_data_map[self.cells[1]]
+        self.run_events()
+        self.assertNotIn("below A", self.dashboard.updated)
+        self.scheduler.invalidate([Node(REPORT, "A")])
+        self.scheduler.flush()
+        self.assertEqual(len(self.scheduler.graph.nodes("cell")), 4)
+
+    def test_cells_wait_for_reports_being_rebuilt(self):
+        self.dashboard.main_controller.rebuilding = ["A"]
+        self.scheduler.invalidate([Node(FILE, "shared.txt")])
+        self.scheduler.flush()
+        self.run_events()
+        self.assertEqual(self.dashboard.updated, ["B"])
+
+        # the rebuilt report is stored and invalidates its cells again
+        self.dashboard.main_controller.rebuilding = []
+        self.scheduler.invalidate([Node(REPORT, "A")])
+        self.scheduler.flush()
+        self.run_events()
+        self.assertEqual(sorted(self.dashboard.updated[1:]), ["A", "A+B", "below A", "collapsed A"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import os
+import pickle
+import tempfile
+from collections import Counter
+import numpy as np
+from model.word_analyzer import get_text_statistics
+from model.report_codec import encode_report, decode_report, zigzag_deltas, undo_zigzag_deltas
+from model.report_store import SQLiteReportStore
+
+
+def sample_report():
+    report = {}
+    for i, text in enumerate(["the cat sat on the mat the end", "a dog and a cat", "one"]):
+        report[f"{i}.txt"] = {"data": get_text_statistics(Counter(text.split())), "title": f"{i}.txt",
+                              "signature": (len(text), i)}
+    report["empty.txt"] = {"data": get_text_statistics(Counter())}
+    master = Counter()
+    for entry in report.values():
+        master.update({ws[0]: ws[1] for ws in entry["data"]["word_stats"]})
+    report["Master Report"] = {"data": get_text_statistics(master), "title": "Master Report",
+                               "assurance": {"all_passed": True, "results": []}}
+    return report
+
+
+def float_bits(report):
+    return [np.asarray([ws[1:] for ws in entry["data"]["word_stats"]], dtype=np.float64).view(np.uint64).tolist()
+            for entry in report.values()]
+
+
+class TestReportCodec(unittest.TestCase):
+    def test_round_trip_is_exact(self):
+        report = sample_report()
+        for method, level in (("zlib", 1), ("zlib", 9), ("lzma", 6), ("none", 0)):
+            decoded = decode_report(encode_report(report, method, level))
+            self.assertEqual(decoded, report)
+            self.assertEqual(list(decoded), list(report))
+            self.assertEqual(float_bits(decoded), float_bits(report))
+
+    def test_smaller_than_pickle(self):
+        report = sample_report()
+        self.assertLess(len(encode_report(report)), len(pickle.dumps(report)) / 3)
+
+    def test_unsorted_counts_and_foreign_values(self):
+        report = {"x.txt": {"data": {"word_stats": [("b", 1, 10.0, -0.5, 0.25), ("ä", 7, 70.0, 1.5, float("nan"))]}}}
+        decoded = decode_report(encode_report(report))["x.txt"]["data"]["word_stats"]
+        self.assertEqual(decoded[0], ("b", 1, 10.0, -0.5, 0.25))
+        self.assertEqual(decoded[1][:4], ("ä", 7, 70.0, 1.5))
+        self.assertTrue(np.isnan(decoded[1][4]))
+        self.assertEqual(undo_zigzag_deltas(zigzag_deltas([5, 9, 0])).tolist(), [5, 9, 0])
+
+    def test_rejects_other_payloads(self):
+        with self.assertRaises(ValueError):
+            decode_report(b"not a report")
+
+
+class TestSQLiteStoreCodec(unittest.TestCase):
+    def test_reads_pickled_payloads_of_older_stores(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "reports.sqlite3")
+            report = sample_report()
+            store = SQLiteReportStore(path)
+            store.save("A", report)
+            with store.conn:  # rewrite as an older version of the store did
+                store.conn.execute("UPDATE file_reports SET payload = ? WHERE path = ?",
+                                   (pickle.dumps(report["0.txt"]), "0.txt"))
+                store.conn.execute("UPDATE reports SET payload = ? WHERE name = ?",
+                                   (pickle.dumps({"Master Report": report["Master Report"]}), "A"))
+            self.assertEqual(store.load("A"), report)
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
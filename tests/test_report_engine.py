@@ -0,0 +1,123 @@
+import unittest
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from analysis import report_engine
+from analysis.report_engine import (
+    analyze_corpus,
+    analyze_corpora,
+    analyze_files,
+    update_corpus,
+    AnalysisConfig,
+    AnalysisCancelled,
+    config_fingerprint,
+)
+from model.report_fingerprint import file_signatures
+from model.report_snapshot import ReportSnapshot
+
+TEXTS = {
+    "a.txt": "the cat sat on the mat",
+    "b.txt": "the dog sat on the log",
+    "c.txt": "the cat sat on the mat",  # duplicate of a.txt
+    "d.txt": "a bird flew over the sea",
+    "empty.txt": "",
+}
+
+
+class TestReportEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.paths = {}
+        for name, text in TEXTS.items():
+            path = os.path.join(self.tmpdir.name, name)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            self.paths[name] = path
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def files(self, *names):
+        return [self.paths[name] for name in names]
+
+    def test_analyze_corpus(self):
+        files = self.files("a.txt", "b.txt", "empty.txt")
+        report = analyze_corpus(files + [os.path.join(self.tmpdir.name, "missing.txt")])
+        self.assertIsInstance(report, ReportSnapshot)
+        self.assertEqual(list(report), files + ["Master Report"])
+        master = report["Master Report"]
+        self.assertEqual(master["data"]["total_word_count"], 12)
+        self.assertEqual(master["data"]["word_stats"][0][:2], ("the", 4))
+        self.assertTrue(master["assurance"]["all_passed"])
+        self.assertEqual(master["analysis_config"], config_fingerprint(AnalysisConfig()))
+        # the missing file is left out of the report but listed as analyzed
+        self.assertEqual(len(master["file_signatures"]), 4)
+        self.assertNotIn("Master Report", analyze_corpus(self.files("empty.txt")))
+
+    def test_known_reports_are_reused_while_fresh(self):
+        files = self.files("a.txt", "b.txt")
+        first = analyze_corpus(files)
+        second = analyze_corpus(files, known=first)
+        self.assertIs(second[files[0]], first[files[0]])
+        with open(files[0], "a", encoding="utf-8") as f:
+            f.write(" again")
+        third = analyze_corpus(files, known=first)
+        self.assertIsNot(third[files[0]], first[files[0]])
+        self.assertEqual(third[files[0]]["data"]["total_word_count"], 7)
+
+    def test_near_duplicate_filter(self):
+        files = self.files("a.txt", "b.txt", "c.txt")
+        report = analyze_corpus(files, AnalysisConfig(near_duplicate_threshold=0.9))
+        self.assertEqual(list(report), self.files("a.txt", "b.txt") + ["Master Report"])
+        self.assertEqual(set(report["Master Report"]["file_signatures"]), set(files))
+
+    def test_update_matches_full_analysis(self):
+        old = analyze_corpus(self.files("a.txt", "b.txt"))
+        updated = update_corpus(old, added_files=self.files("d.txt"), removed_files=self.files("a.txt"))
+        expected = analyze_corpus(self.files("b.txt", "d.txt"))
+        self.assertEqual(list(updated), list(expected))
+        self.assertEqual(updated[self.paths["d.txt"]], expected[self.paths["d.txt"]])
+        # words with equal counts may come in another order in the Master Report
+        self.assertEqual(sorted(updated["Master Report"]["data"]["word_stats"]),
+                         sorted(expected["Master Report"]["data"]["word_stats"]))
+        self.assertTrue(updated["Master Report"]["assurance"]["all_passed"])
+        self.assertIs(updated[self.paths["b.txt"]], old[self.paths["b.txt"]])
+        self.assertEqual(updated["Master Report"]["file_signatures"], file_signatures(self.files("b.txt", "d.txt")))
+
+    def test_progress_and_cancel(self):
+        files = self.files("a.txt", "b.txt", "d.txt")
+        events = []
+        analyze_corpus(files, progress=events.append)
+        self.assertEqual([e["files_done"] for e in events], [1, 2, 3])
+        self.assertEqual(events[-1]["bytes_done"], events[-1]["bytes_total"])
+        self.assertEqual(events[-1]["eta"], 0)
+        with self.assertRaises(AnalysisCancelled) as raised:
+            analyze_corpus(files, progress=events.append, is_cancelled=lambda: len(events) >= 5)
+        self.assertEqual(raised.exception.files_done, 2)
+
+    def test_corpora_analyzed_concurrently(self):
+        corpora = [self.files("a.txt", "b.txt"), self.files("b.txt", "d.txt"), self.files("c.txt", "d.txt")]
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            reports = list(pool.map(analyze_corpus, corpora))
+        self.assertEqual(reports, [analyze_corpus(files) for files in corpora])
+
+    def test_corpora_share_file_analysis(self):
+        corpora = {"A": self.files("a.txt", "b.txt"), "B": self.files("b.txt", "d.txt")}
+        with mock.patch.object(report_engine, "read_and_preprocess_file",
+                               wraps=report_engine.read_and_preprocess_file) as read:
+            reports = analyze_corpora(corpora)
+        self.assertEqual(sorted(call.args[0] for call in read.call_args_list),
+                         self.files("a.txt", "b.txt", "d.txt"))
+        self.assertEqual(reports, {name: analyze_corpus(files) for name, files in corpora.items()})
+
+    def test_files_analyzed_in_processes(self):
+        files = self.files("a.txt", "b.txt", "d.txt", "empty.txt")
+        with mock.patch.object(report_engine, "PARALLEL_MIN_FILES", 2):
+            reports = analyze_files(files + [os.path.join(self.tmpdir.name, "missing.txt")], workers=2)
+        self.assertEqual(reports, analyze_files(files, workers=1))
+        self.assertEqual(list(reports), files)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import os
+import glob
+import tempfile
+from unittest import mock
+from model import report_export
+from model.report_export import export_reports, import_reports, iter_row_batches
+from model.report_fingerprint import file_signatures, analysis_config_fingerprint
+from model.word_analyzer import get_text_statistics
+from tests.test_bo_engine import build_file_reports
+
+
+class TestReportExport(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        sample_dir = os.path.join(os.path.dirname(__file__), '..', 'sample_corpus')
+        sample_files = sorted(glob.glob(os.path.join(sample_dir, '*.txt')))[:4]
+        cls.corpus_reports = {}
+        for name, files in (("A", sample_files[:3]), ("B", sample_files[2:])):
+            report = build_file_reports(files)
+            report[files[0]]['signature'] = (10, 20)
+            report["Master Report"] = {
+                'data': get_text_statistics({"nan": 2, "null": 1, "the": 5}),
+                'title': "Master Report",
+                'file_signatures': file_signatures(files),
+                'analysis_config': analysis_config_fingerprint(),
+            }
+            cls.corpus_reports[name] = report
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_batches_are_bounded(self):
+        batches = list(iter_row_batches(self.corpus_reports, batch_rows=500))
+        total = sum(len(r['data']['word_stats']) for report in self.corpus_reports.values() for r in report.values())
+        self.assertEqual(sum(len(b["word"]) for b in batches), total)
+        self.assertTrue(all(len(b["word"]) <= 500 for b in batches))
+
+    def test_csv_round_trip(self):
+        path = os.path.join(self.tmpdir.name, "reports.csv")
+        with mock.patch.object(report_export.pd, "DataFrame", wraps=report_export.pd.DataFrame) as frame:
+            rows = export_reports(path, self.corpus_reports, batch_rows=1000)
+        self.assertGreater(frame.call_count, 2)  # one chunk at a time
+        imported = import_reports(path, batch_rows=333)
+        self.assertEqual(imported, self.corpus_reports)
+        self.assertEqual(list(imported["A"]), list(self.corpus_reports["A"]))
+        self.assertIsInstance(imported["A"][next(iter(imported["A"]))]['signature'], tuple)
+        self.assertEqual(rows, sum(len(r['data']['word_stats']) for report in imported.values() for r in report.values()))
+
+    @unittest.skipIf(report_export.pa is None, "pyarrow is not installed")
+    def test_parquet_and_arrow_round_trip(self):
+        for name in ("reports.parquet", "reports.arrow"):
+            path = os.path.join(self.tmpdir.name, name)
+            export_reports(path, self.corpus_reports, batch_rows=1000)
+            self.assertEqual(import_reports(path), self.corpus_reports)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            export_reports(os.path.join(self.tmpdir.name, "reports.xlsx"), self.corpus_reports)
+        if report_export.pa is None:
+            with self.assertRaises(ImportError):
+                export_reports(os.path.join(self.tmpdir.name, "reports.parquet"), self.corpus_reports)
+
+
+    def test_available_formats_follow_pyarrow(self):
+        with mock.patch.object(report_export, "pa", None):
+            self.assertEqual(report_export.available_formats(), ["csv"])
+            with self.assertRaises(ImportError):
+                report_export.export_format("reports.arrow")
+        with mock.patch.object(report_export, "pa", object()):
+            self.assertEqual(report_export.available_formats(), ["csv", "parquet", "arrow"])
+
+
+if __name__ == '__main__':
+    unittest.main()
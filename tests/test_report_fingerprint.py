@@ -0,0 +1,82 @@
+import unittest
+import os
+import tempfile
+from unittest import mock
+from model import word_analyzer
+from model.corpus_report_manager import CorpusReportManager
+from model.report_store import SQLiteReportStore
+from model.report_fingerprint import (
+    file_signature,
+    file_signatures,
+    analysis_config_fingerprint,
+    corpus_fingerprint,
+    report_fingerprint,
+    stale_files,
+)
+
+
+class TestReportFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.files = []
+        for name, text in (("a.txt", "one two"), ("b.txt", "two three"), ("c.txt", "four")):
+            path = os.path.join(self.tmpdir.name, name)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            self.files.append(path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def report_for(self, paths):
+        report = {path: {"data": {"word_stats": []}} for path in paths}
+        report["Master Report"] = {
+            "data": {"word_stats": []},
+            "file_signatures": file_signatures(paths),
+            "analysis_config": analysis_config_fingerprint(),
+        }
+        return report
+
+    def current(self, paths):
+        return corpus_fingerprint(file_signatures(paths), analysis_config_fingerprint())
+
+    def test_fingerprint_tracks_files(self):
+        a, b, c = self.files
+        report = self.report_for([a, b])
+        self.assertEqual(report_fingerprint(report), self.current([a, b]))
+        self.assertEqual(stale_files(report, file_signatures([a, b])), ([], [], []))
+
+        with open(a, "a", encoding="utf-8") as f:
+            f.write(" five")
+        self.assertNotEqual(file_signature(a), report["Master Report"]["file_signatures"][a])
+        self.assertNotEqual(report_fingerprint(report), self.current([a, b]))
+        self.assertEqual(stale_files(report, file_signatures([b, c, a])), ([c], [], [a]))
+        self.assertEqual(stale_files(report, file_signatures([b])), ([], [a], []))
+        self.assertIsNone(stale_files({"Master Report": {}}, file_signatures([a])))
+        self.assertIsNone(report_fingerprint({"x.txt": {}}))
+
+    def test_tokenizer_and_settings_change_fingerprint(self):
+        report = self.report_for(self.files)
+        with mock.patch.object(word_analyzer, "stop_words", {"s", "the"}):
+            self.assertNotEqual(report_fingerprint(report), self.current(self.files))
+        self.assertNotEqual(analysis_config_fingerprint(0.8), analysis_config_fingerprint())
+
+    def test_manager_compares_fingerprints(self):
+        a, b, c = self.files
+        store = SQLiteReportStore(os.path.join(self.tmpdir.name, "reports.sqlite3"))
+        manager = CorpusReportManager(store=store)
+        manager.update_report_for_corpus("A", self.report_for([a, b]))
+        self.assertTrue(manager.has_report_for_corpus("A"))
+        self.assertTrue(manager.has_report_for_corpus("A", fingerprint=self.current([a, b])))
+        self.assertFalse(manager.has_report_for_corpus("A", fingerprint=self.current([a, b, c])))
+
+        # fingerprints are read back without loading any report
+        with mock.patch.object(store, "load") as load:
+            reopened = CorpusReportManager(store=store)
+            self.assertTrue(reopened.has_report_for_corpus("A", fingerprint=self.current([a, b])))
+        load.assert_not_called()
+        store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import copy
+import json
+import pickle
+from model.corpus_report_manager import CorpusReportManager
+from model.report_snapshot import ReportSnapshot, FrozenList, freeze_report
+
+
+def sample_report():
+    return {
+        "a.txt": {"data": {"total_word_count": 3, "word_stats": [("cat", 2, 66.7, 1.0, 0.5), ("the", 1, 33.3, -1.0, 0.0)]},
+                  "signature": (10, 1.0)},
+        "Master Report": {"data": {"word_stats": [("cat", 2, 66.7, 1.0, 0.5)]}, "title": "Master Report",
+                          "file_signatures": {"a.txt": [10, 1.0]}},
+    }
+
+
+class TestReportSnapshot(unittest.TestCase):
+    def test_snapshot_is_read_only(self):
+        report = freeze_report(sample_report())
+        self.assertEqual(report, sample_report())
+        with self.assertRaises(TypeError):
+            report["b.txt"] = {}
+        with self.assertRaises(TypeError):
+            report["a.txt"]["data"]["word_stats"].sort()
+        with self.assertRaises(TypeError):
+            report["Master Report"]["file_signatures"]["a.txt"].append(1)
+        with self.assertRaises(TypeError):
+            report.pop("a.txt")
+        self.assertEqual(sorted(report["a.txt"]["data"]["word_stats"])[0][0], "cat")
+
+    def test_new_snapshots_share_unchanged_entries(self):
+        report = freeze_report(sample_report())
+        self.assertIs(freeze_report(report), report)
+        self.assertIs(copy.deepcopy(report), report)
+        updated = report.with_entries({"b.txt": {"data": {"word_stats": [("dog", 1, 100.0, 0.0, 0.0)]}}},
+                                      removed=["Master Report"])
+        self.assertIsInstance(updated, ReportSnapshot)
+        self.assertEqual(list(updated), ["a.txt", "b.txt"])
+        self.assertIs(updated["a.txt"], report["a.txt"])
+        self.assertIsInstance(updated["b.txt"]["data"]["word_stats"], FrozenList)
+        self.assertIn("Master Report", report)
+
+    def test_pickle_and_json(self):
+        report = freeze_report(sample_report())
+        restored = pickle.loads(pickle.dumps(report))
+        self.assertIsInstance(restored, ReportSnapshot)
+        self.assertEqual(restored, report)
+        self.assertEqual(json.loads(json.dumps(report)), json.loads(json.dumps(sample_report())))
+
+    def test_manager_publishes_snapshots(self):
+        manager = CorpusReportManager()
+        report = sample_report()
+        stored = manager.update_report_for_corpus("A", report)
+        self.assertIsInstance(stored, ReportSnapshot)
+        self.assertIs(manager.get_report_for_corpus("A"), stored)
+        # the caller's dict is not taken over, and a reader's snapshot stays as it was
+        report["a.txt"]["data"]["word_stats"].clear()
+        self.assertEqual(len(stored["a.txt"]["data"]["word_stats"]), 2)
+        newer = manager.update_report_for_corpus("A", stored.with_entries(removed=["a.txt"]))
+        self.assertIn("a.txt", stored)
+        self.assertNotIn("a.txt", newer)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import unittest
+import os
+import sqlite3
+import tempfile
+from unittest import mock
+from model.corpus_report_manager import CorpusReportManager, estimate_report_bytes
+from model.file_report_pool import estimate_file_report_bytes
+from model.report_store import SQLiteReportStore, MemoryReportStore
+
+
+def sample_report(word):
+    return {
+        f"{word}.txt": {"data": {"word_stats": [(word, 2, 66.7, 1.0, 0.5), ("the", 1, 33.3, -1.0, 0.0)]}},
+        "Master Report": {"data": {"word_stats": [(word, 2, 66.7, 1.0, 0.5)]}, "title": "Master Report"},
+    }
+
+
+class TestSQLiteReportStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "nested", "reports.sqlite3")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_reports_survive_restart(self):
+        manager = CorpusReportManager(store=SQLiteReportStore(self.path))
+        manager.update_report_for_corpus("A", sample_report("cat"))
+        manager.update_report_for_corpus("B", sample_report("dog"))
+        manager.remove_corpus_report("B")
+        manager.store.close()
+
+        store = SQLiteReportStore(self.path)
+        with mock.patch.object(store, "load", wraps=store.load) as load:
+            reopened = CorpusReportManager(store=store)
+            self.assertEqual(reopened.list_available_reports(), ["A"])
+            self.assertTrue(reopened.has_report_for_corpus("A"))
+            self.assertIsNotNone(reopened.get_report_revision("A"))
+            load.assert_not_called()  # loaded lazily
+            self.assertEqual(reopened.get_report_for_corpus("A"), sample_report("cat"))
+            reopened.get_report_for_corpus("A")
+            self.assertEqual(load.call_count, 1)
+        self.assertEqual(reopened.get_report_for_corpus("B"), {})
+        store.close()
+
+    def test_failed_write_keeps_previous_report(self):
+        store = SQLiteReportStore(self.path)
+        store.save("A", sample_report("cat"))
+        # a NULL payload violates the schema halfway through the write
+        with mock.patch.object(SQLiteReportStore, "encode", return_value=None):
+            with self.assertRaises(sqlite3.IntegrityError):
+                store.save("A", sample_report("dog"))
+        self.assertEqual(store.load("A"), sample_report("cat"))
+        store.close()
+
+    def test_lru_eviction_within_budget(self):
+        size = estimate_report_bytes(sample_report("cat"))
+        manager = CorpusReportManager(store=SQLiteReportStore(self.path), memory_budget=2 * size)
+        manager.update_report_for_corpus("A", sample_report("cat"))
+        manager.update_report_for_corpus("B", sample_report("dog"))
+        manager.get_report_for_corpus("A")  # B is now least recently used
+        manager.update_report_for_corpus("C", sample_report("eel"))
+        self.assertEqual(list(manager.corpus_reports), ["A", "C"])
+        self.assertLessEqual(manager.loaded_bytes(), 2 * size)
+
+        # evicted reports are still available, reloaded from the store
+        self.assertTrue(manager.has_report_for_corpus("B"))
+        self.assertEqual(manager.get_report_for_corpus("B"), sample_report("dog"))
+        stats = manager.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (1, 1, 2))
+        self.assertEqual(stats["stored"], 3)
+
+        manager.set_memory_budget(size)
+        self.assertEqual(list(manager.corpus_reports), ["B"])
+        manager.store.close()
+
+    def test_file_reports_shared_across_corpora(self):
+        store = SQLiteReportStore(self.path)
+        manager = CorpusReportManager(store=store)
+        first = sample_report("cat")
+        second = sample_report("cat")
+        second["b.txt"] = {"data": {"word_stats": [("dog", 1, 100.0, 0.0, 0.0)]}}
+        first = manager.update_report_for_corpus("2023", first)
+        second = manager.update_report_for_corpus("All", second)
+        # equal file reports are interned into one object
+        self.assertIs(second["cat.txt"], first["cat.txt"])
+        self.assertIs(manager.get_file_report("cat.txt"), first["cat.txt"])
+        self.assertEqual(manager.cache_stats()["shared_files"], 1)
+        self.assertEqual(store.file_count(), 2)
+
+        reopened = CorpusReportManager(store=store)
+        with mock.patch.object(SQLiteReportStore, "decode", wraps=store.decode) as decode:
+            loaded_all = reopened.get_report_for_corpus("All")
+            loaded_2023 = reopened.get_report_for_corpus("2023")
+        self.assertEqual(loaded_all, second)
+        self.assertEqual(list(loaded_all), ["cat.txt", "b.txt", "Master Report"])
+        self.assertIs(loaded_2023["cat.txt"], loaded_all["cat.txt"])
+        # two Master payloads + cat.txt + b.txt; cat.txt is not decoded twice
+        self.assertEqual(decode.call_count, 4)
+
+        reopened.remove_corpus_report("All")
+        self.assertEqual(store.file_count(), 1)
+        self.assertIsNone(reopened.get_file_report("b.txt"))
+        reopened.remove_corpus_report("2023")
+        self.assertEqual((store.file_count(), len(reopened.file_pool)), (0, 0))
+        store.close()
+
+    def test_reanalyzed_file_keeps_other_corpora_reports(self):
+        store = SQLiteReportStore(self.path)
+        manager = CorpusReportManager(store=store)
+        old = sample_report("cat")
+        old["cat.txt"]["signature"] = (10, 1)
+        manager.update_report_for_corpus("2023", old)
+        manager.update_report_for_corpus("All", old)
+        size = manager.file_pool.total_bytes
+
+        edited = sample_report("cat")
+        edited["cat.txt"] = {"data": {"word_stats": [("cat", 3, 100.0, 0.0, 0.0)]}, "signature": (12, 2)}
+        manager.update_report_for_corpus("All", edited)
+        # both versions are loaded, each counted once
+        self.assertEqual(manager.get_report_for_corpus("2023")["cat.txt"], old["cat.txt"])
+        self.assertEqual(manager.file_pool.total_bytes, size + estimate_file_report_bytes(edited["cat.txt"]))
+        self.assertEqual(store.file_count(), 2)
+
+        reopened = CorpusReportManager(store=store)
+        self.assertEqual(reopened.get_report_for_corpus("All")["cat.txt"], edited["cat.txt"])
+        self.assertEqual(reopened.get_report_for_corpus("2023")["cat.txt"], old["cat.txt"])
+
+        manager.remove_corpus_report("All")
+        self.assertEqual(manager.file_pool.total_bytes, size)
+        self.assertEqual(store.file_count(), 1)
+        store.close()
+
+    def test_reads_stores_keyed_by_path_only(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        with conn:
+            conn.execute("CREATE TABLE reports (name TEXT PRIMARY KEY, payload BLOB NOT NULL, fingerprint TEXT)")
+            conn.execute("CREATE TABLE file_reports (path TEXT PRIMARY KEY, payload BLOB NOT NULL)")
+            conn.execute("CREATE TABLE report_files (name TEXT NOT NULL, position INTEGER NOT NULL,"
+                         " path TEXT NOT NULL, PRIMARY KEY (name, position))")
+            report = sample_report("cat")
+            conn.execute("INSERT INTO reports VALUES (?, ?, NULL)",
+                         ("A", SQLiteReportStore.encode({"Master Report": report["Master Report"]})))
+            conn.execute("INSERT INTO file_reports VALUES (?, ?)",
+                         ("cat.txt", SQLiteReportStore.encode({"cat.txt": report["cat.txt"]})))
+            conn.execute("INSERT INTO report_files VALUES ('A', 0, 'cat.txt')")
+        conn.close()
+
+        store = SQLiteReportStore(self.path)
+        self.assertEqual(store.load("A"), sample_report("cat"))
+        store.save("B", sample_report("cat"))
+        self.assertEqual(store.file_count(), 1)
+        store.close()
+
+    def test_memory_store_is_default(self):
+        manager = CorpusReportManager()
+        self.assertIsInstance(manager.store, MemoryReportStore)
+        manager.update_report_for_corpus("A", sample_report("cat"))
+        self.assertEqual(manager.store.names(), ["A"])
+        # nothing is evicted when the store cannot give reports back
+        manager.set_memory_budget(1)
+        self.assertEqual(list(manager.corpus_reports), ["A"])
+
+
+if __name__ == '__main__':
+    unittest.main()
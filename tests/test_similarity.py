@@ -0,0 +1,95 @@
+import unittest
+import os
+import glob
+import numpy as np
+from analysis import similarity
+from analysis.similarity import DistributionSimilarity, compute_similarity_matrix, ranked_pairs
+from analysis.bo_engine import BOTextMatrix
+from tests.test_bo_engine import build_file_reports
+
+
+def reference_distributions(file_reports, smoothing):
+    """Dense smoothed distributions over the shared vocabulary, one text at a time."""
+    matrix = BOTextMatrix.from_file_reports(file_reports)
+    raw = np.zeros((matrix.n_texts, matrix.n_words))
+    for row in range(matrix.n_texts):
+        lo, hi = matrix.indptr[row], matrix.indptr[row + 1]
+        raw[row, matrix.indices[lo:hi]] = matrix.freqs[lo:hi]
+    smoothed = (raw + smoothing) / (raw.sum(axis=1, keepdims=True) + smoothing * matrix.n_words)
+    return raw, smoothed
+
+
+def kl(p, q):
+    return float(np.sum(p * np.log(p / q)))
+
+
+class TestDistributionSimilarity(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        sample_dir = os.path.join(os.path.dirname(__file__), '..', 'sample_corpus')
+        sample_files = sorted(glob.glob(os.path.join(sample_dir, '*.txt')))[:8]
+        cls.file_reports = build_file_reports(sample_files)
+        cls.smoothing = 1e-6
+        cls.raw, cls.smoothed = reference_distributions(cls.file_reports, cls.smoothing)
+
+    def compute(self, metric, **kwargs):
+        # small tiles and chunks so several tile pairs and column chunks are exercised
+        return compute_similarity_matrix(self.file_reports, metric, smoothing=self.smoothing,
+                                         block_size=3, column_chunk=500, **kwargs).matrix
+
+    def test_cosine_matches_pairwise(self):
+        matrix = self.compute("cosine")
+        for i, a in enumerate(self.raw):
+            for j, b in enumerate(self.raw):
+                expected = np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+                self.assertAlmostEqual(matrix[i, j], expected, places=9)
+
+    def test_divergences_match_pairwise(self):
+        kl_matrix = self.compute("kl")
+        js_matrix = self.compute("js")
+        bh_matrix = self.compute("bhattacharyya")
+        for i, p in enumerate(self.smoothed):
+            for j, q in enumerate(self.smoothed):
+                m = (p + q) / 2
+                self.assertAlmostEqual(kl_matrix[i, j], kl(p, q), places=6)
+                self.assertAlmostEqual(js_matrix[i, j], 0.5 * kl(p, m) + 0.5 * kl(q, m), places=9)
+                coefficient = min(np.sum(np.sqrt(p * q)), 1.0)
+                self.assertAlmostEqual(bh_matrix[i, j], -np.log(coefficient), places=9)
+        self.assertFalse(np.allclose(kl_matrix, kl_matrix.T))
+        self.assertTrue(np.allclose(js_matrix, js_matrix.T))
+        self.assertTrue(np.all(np.diag(kl_matrix) == 0))
+
+    def test_js_sub_tiles(self):
+        original = similarity.MAX_TILE_ELEMENTS
+        similarity.MAX_TILE_ELEMENTS = 1
+        try:
+            tiny = self.compute("js")
+        finally:
+            similarity.MAX_TILE_ELEMENTS = original
+        self.assertTrue(np.allclose(tiny, self.compute("js")))
+
+    def test_without_smoothing(self):
+        reports = {
+            "a": {"data": {"word_stats": [("x", 2), ("y", 2)]}},
+            "b": {"data": {"word_stats": [("x", 1), ("y", 1), ("z", 2)]}},
+        }
+        result = DistributionSimilarity.from_file_reports(reports, smoothing=0).compute("kl")
+        self.assertAlmostEqual(result.matrix[0, 1], np.log(2))
+        self.assertEqual(result.matrix[1, 0], np.inf)
+        with self.assertRaises(ValueError):
+            compute_similarity_matrix(reports, "euclidean")
+
+    def test_ranked_pairs(self):
+        result = compute_similarity_matrix(self.file_reports, "cosine")
+        pairs = ranked_pairs(result)
+        n = len(result.text_keys)
+        self.assertEqual(len(pairs), n * (n - 1) // 2)
+        values = [v for _, _, v in pairs]
+        self.assertEqual(values, sorted(values, reverse=True))
+        kl_pairs = ranked_pairs(compute_similarity_matrix(self.file_reports, "kl"), limit=5)
+        self.assertEqual(len(kl_pairs), 5)
+        self.assertEqual([v for _, _, v in kl_pairs], sorted(v for _, _, v in kl_pairs))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import json
+import os
+import tempfile
+from model.corpora import Corpus
+from model.workspace import save_workspace, load_workspace, WORKSPACE_VERSION
+
+
+class TestWorkspace(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "nested", "workspace.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        corpus = Corpus("A", ["a.txt", "b.txt"])
+        cells = [{"category_key": "frequency_distribution", "sub_key": "nominal", "sub_sub_key": None,
+                  "name": "Frequency", "initial_mode": "nominal", "corpus_id": "A",
+                  "settings": {"corpus_ids": ["A"], "mode": "z_score", "colors": {"A": "#ff0000"}}}]
+        save_workspace(self.path, {
+            "corpora": [corpus.to_dict()],
+            "single_active_corpus": "A",
+            "reports": {"A": "abc"},
+            "cells": cells,
+        })
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["workspace.json"])
+
+        workspace = load_workspace(self.path)
+        self.assertEqual(workspace["version"], WORKSPACE_VERSION)
+        self.assertEqual(workspace["cells"], cells)
+        self.assertEqual(workspace["reports"], {"A": "abc"})
+        self.assertEqual(workspace["multi_active_corpora"], [])
+        restored = Corpus.from_dict(workspace["corpora"][0])
+        self.assertEqual((restored.name, restored.get_files()), ("A", ["a.txt", "b.txt"]))
+
+    def test_rejects_other_files(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as f:
+            f.write("not json")
+        with self.assertRaises(ValueError):
+            load_workspace(self.path)
+        with open(self.path, "w") as f:
+            json.dump({"corpora": [], "version": WORKSPACE_VERSION + 1}, f)
+        with self.assertRaises(ValueError):
+            load_workspace(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
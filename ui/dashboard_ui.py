@@ -4,15 +4,23 @@ from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QScrollArea,
     QTreeWidget, QTreeWidgetItem, QPushButton, QLabel, QMenuBar, 
     QMenu, QAction, QFrame, QTableWidget, QTableWidgetItem, QSizePolicy, QToolButton, QSizeGrip, QHeaderView, 
-    QSplitter, QInputDialog, QDialog, QMessageBox, QApplication
+    QSplitter, QInputDialog, QDialog, QMessageBox, QApplication, QFileDialog
 )
 from PyQt5.QtGui import QGuiApplication, QFont, QPixmap, QPainter, QBrush, QPen, QIcon, QColor, QWheelEvent
-from PyQt5.QtCore import Qt, pyqtSignal, QPoint, QEvent, QRect
+from PyQt5.QtCore import Qt, pyqtSignal, QPoint, QEvent, QRect, QTimer
 from ui.styles import dark_mode_stylesheet, light_mode_stylesheet, dim_mode_stylesheet
 from config.metric_registry import METRICS, get_metric
 from visualizations.cell_factory import create_cell
+from model.workspace import default_workspace_path
+from model.report_export import available_formats
 import os
 
+# File types offered by Export/Import Reports, when the format is available
+REPORT_FILE_TYPES = {"csv": "CSV (*.csv)", "parquet": "Parquet (*.parquet)", "arrow": "Arrow (*.arrow)"}
+REPORT_FILE_FILTER = ";;".join(REPORT_FILE_TYPES[f] for f in available_formats())
+# File types offered by Save/Open Workspace
+WORKSPACE_FILE_FILTER = "Scriptara Workspace (*.json);;All Files (*)"
+
 
 
 
@@ -421,6 +429,14 @@ class DashboardWindow(QMainWindow):
         self.corpora_tree.setContextMenuPolicy(Qt.CustomContextMenu)
         self.corpora_tree.customContextMenuRequested.connect(self.show_corpus_context_menu)
 
+        # Report cache counters in the status bar
+        self.cache_stats_label = QLabel()
+        self.statusBar().addPermanentWidget(self.cache_stats_label)
+        self.cache_stats_timer = QTimer(self)
+        self.cache_stats_timer.timeout.connect(self.update_cache_stats)
+        self.cache_stats_timer.start(1000)
+        self.update_cache_stats()
+
     def resize_to_screen(self):
         screen_size = QGuiApplication.primaryScreen().availableGeometry()
         self.resize(int(screen_size.width() * 0.8), int(screen_size.height() * 0.8))
@@ -434,6 +450,21 @@ class DashboardWindow(QMainWindow):
     def create_menus(self):
         menubar = self.menuBar()
         menubar.setContentsMargins(0,0,0,0)
+        file_menu = menubar.addMenu('File')
+        open_workspace_action = QAction('Open Workspace...', self)
+        open_workspace_action.triggered.connect(self.open_workspace)
+        save_workspace_action = QAction('Save Workspace...', self)
+        save_workspace_action.triggered.connect(self.save_workspace)
+        file_menu.addAction(open_workspace_action)
+        file_menu.addAction(save_workspace_action)
+        file_menu.addSeparator()
+        export_action = QAction('Export Reports...', self)
+        export_action.triggered.connect(self.export_reports)
+        import_action = QAction('Import Reports...', self)
+        import_action.triggered.connect(self.import_reports)
+        file_menu.addAction(export_action)
+        file_menu.addAction(import_action)
+
         view_menu = menubar.addMenu('View')
 
         dark_mode_action = QAction('Dark Mode', self)
@@ -447,6 +478,138 @@ class DashboardWindow(QMainWindow):
         view_menu.addAction(dark_mode_action)
         view_menu.addAction(dim_mode_action)
 
+        analysis_menu = menubar.addMenu('Analysis')
+        self.skip_duplicates_action = QAction('Skip Near-Duplicate Files', self)
+        self.skip_duplicates_action.setCheckable(True)
+        self.skip_duplicates_action.setToolTip("Analyze only one file per near-duplicate cluster")
+        self.skip_duplicates_action.toggled.connect(self.set_near_duplicate_filter)
+        analysis_menu.addAction(self.skip_duplicates_action)
+
+        memory_budget_action = QAction('Report Memory Budget...', self)
+        memory_budget_action.setToolTip("Memory kept for loaded corpus reports before the least recently used are evicted")
+        memory_budget_action.triggered.connect(self.edit_memory_budget)
+        analysis_menu.addAction(memory_budget_action)
+
+        bo_workers_action = QAction('BO Worker Processes...', self)
+        bo_workers_action.setToolTip("Processes used to compute BO scores of large corpora")
+        bo_workers_action.triggered.connect(self.edit_bo_workers)
+        analysis_menu.addAction(bo_workers_action)
+
+    def set_near_duplicate_filter(self, enabled):
+        """Turn the near-duplicate filter of run_analysis on or off."""
+        main_controller = getattr(self, 'main_controller', None)
+        if hasattr(main_controller, 'set_near_duplicate_filter'):
+            threshold = main_controller.duplicate_index.threshold if enabled else None
+            main_controller.set_near_duplicate_filter(threshold)
+
+    def save_workspace(self):
+        """Save corpora, cells and settings to a workspace file chosen by the user."""
+        main_controller = getattr(self, 'main_controller', None)
+        if main_controller is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Save Workspace", default_workspace_path(), WORKSPACE_FILE_FILTER)
+        if not path:
+            return
+        try:
+            main_controller.save_workspace(path)
+            self.statusBar().showMessage(f"Saved workspace to {path}", 5000)
+        except (OSError, TypeError, ValueError) as e:
+            QMessageBox.warning(self, "Save Workspace", str(e))
+
+    def open_workspace(self):
+        """Replace corpora and cells with a workspace file chosen by the user."""
+        main_controller = getattr(self, 'main_controller', None)
+        if main_controller is None:
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Open Workspace", default_workspace_path(), WORKSPACE_FILE_FILTER)
+        if not path:
+            return
+        try:
+            workspace = main_controller.restore_workspace(path)
+            self.statusBar().showMessage(f"Opened workspace with {len(workspace['cells'])} cells from {path}", 5000)
+        except (OSError, ValueError, KeyError) as e:
+            QMessageBox.warning(self, "Open Workspace", str(e))
+
+    def export_reports(self):
+        """Export every stored corpus report to a file chosen by the user."""
+        main_controller = getattr(self, 'main_controller', None)
+        if main_controller is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export Reports", "", REPORT_FILE_FILTER)
+        if not path:
+            return
+        try:
+            rows = main_controller.export_reports(path)
+            self.statusBar().showMessage(f"Exported {rows} rows to {path}", 5000)
+        except (ImportError, ValueError, OSError) as e:
+            QMessageBox.warning(self, "Export Reports", str(e))
+
+    def import_reports(self):
+        """Import corpus reports from an export chosen by the user."""
+        main_controller = getattr(self, 'main_controller', None)
+        if main_controller is None:
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Import Reports", "", REPORT_FILE_FILTER)
+        if not path:
+            return
+        try:
+            names = main_controller.import_reports(path)
+            self.statusBar().showMessage(f"Imported {len(names)} corpora from {path}", 5000)
+        except (ImportError, ValueError, OSError, KeyError) as e:
+            QMessageBox.warning(self, "Import Reports", str(e))
+
+    def edit_memory_budget(self):
+        """Ask for a new report memory budget in MB (0 = no limit)."""
+        report_manager = getattr(getattr(self, 'main_controller', None), 'report_manager', None)
+        if report_manager is None:
+            return
+        current = report_manager.memory_budget
+        current_mb = current // (1024 * 1024) if current else 0
+        value, ok = QInputDialog.getInt(self, "Report Memory Budget",
+                                        "Memory for loaded reports in MB (0 = no limit):",
+                                        current_mb, 0, 1024 * 1024)
+        if ok:
+            report_manager.set_memory_budget(value * 1024 * 1024 if value else None)
+            self.update_cache_stats()
+
+    def edit_bo_workers(self):
+        """Ask for the number of BO worker processes (0 = one per CPU core)."""
+        main_controller = getattr(self, 'main_controller', None)
+        if main_controller is None:
+            return
+        value, ok = QInputDialog.getInt(self, "BO Worker Processes",
+                                        "Processes for BO computations (0 = one per CPU core):",
+                                        main_controller.bo_service.workers or 0, 0, 256)
+        if ok:
+            main_controller.set_bo_workers(value or None)
+
+    def update_cache_stats(self):
+        """Show the report cache, BO result cache and job queue counters in the status bar."""
+        main_controller = getattr(self, 'main_controller', None)
+        report_manager = getattr(main_controller, 'report_manager', None)
+        if report_manager is None or not hasattr(report_manager, 'cache_stats'):
+            return
+        stats = report_manager.cache_stats()
+        budget = stats['memory_budget']
+        budget_text = f"{budget / 2**20:.0f} MB" if budget else "no limit"
+        text = (f"Reports: {stats['loaded']}/{stats['stored']} loaded, "
+                f"{stats['loaded_bytes'] / 2**20:.1f} MB of {budget_text}, "
+                f"{stats['pooled_files']} files ({stats['shared_files']} shared) | "
+                f"hits {stats['hits']}, misses {stats['misses']}, evictions {stats['evictions']}")
+        bo_service = getattr(main_controller, 'bo_service', None)
+        if bo_service is not None:
+            text += f" | BO cache: hits {bo_service.hits}, misses {bo_service.misses}"
+        job_queue = getattr(main_controller, 'job_queue', None)
+        if job_queue is not None:
+            jobs = job_queue.stats()
+            text += (f" | Jobs: {jobs['queued']} queued, {jobs['running']} running, "
+                     f"wait {jobs['mean_wait_ms']:.0f}/{jobs['max_wait_ms']:.0f} ms avg/max, "
+                     f"run {jobs['mean_run_ms']:.0f} ms avg")
+        analysis_queue = getattr(main_controller, 'analysis_queue', None)
+        if analysis_queue is not None:
+            text += f" | Analyses: {len(analysis_queue)} pending"
+        self.cache_stats_label.setText(text)
+
     def set_dark_mode(self):
         self.setStyleSheet(dark_mode_stylesheet)
 
@@ -852,13 +1015,21 @@ class DashboardWindow(QMainWindow):
                 for file_path in selected_files:
                     corpus.remove_file(file_path)
                 
+                # Drop the files from an existing report without re-analyzing the rest.
+                # Any stored report counts: it no longer matches the file list.
+                if hasattr(self.main_controller, 'update_corpus_report_files') and \
+                   self.main_controller.report_manager.has_report_for_corpus(corpus_name):
+                    self.main_controller.update_corpus_report_files(corpus_name, removed_files=selected_files)
                 # Add this code to re-run analysis if modifying the active corpus
-                if hasattr(self.main_controller, 'active_corpus') and \
+                elif hasattr(self.main_controller, 'active_corpus') and \
                    self.main_controller.active_corpus and \
                    self.main_controller.active_corpus.name == corpus_name:
                     # Re-run analysis to update reports with the modified corpus
                     print(f"[DEBUG] Running analysis after removing files from active corpus")
                     self.main_controller.run_analysis()
+                elif hasattr(self.controller, 'corpus_files_changed'):
+                    # cells showing the corpus have its report built in the background
+                    self.controller.corpus_files_changed(corpus_name)
                 
                 self.populate_corpora_tree()
                 dialog.close()
@@ -5,7 +5,7 @@ from PyQt5.QtWidgets import (
     QPushButton, QHBoxLayout, QTextEdit, QAction, 
     QMessageBox, QTableWidget, QTableWidgetItem, 
     QAbstractItemView, QHeaderView, QLabel, QListWidgetItem,
-    QInputDialog
+    QInputDialog, QProgressBar
 )
 from PyQt5.QtCore import Qt, pyqtSignal, QEvent
 from PyQt5.QtGui import QIcon, QColor, QBrush
@@ -28,6 +28,7 @@ class MainWindow(QMainWindow):
     dashboard_signal = pyqtSignal()
     load_sample_corpus_signal = pyqtSignal()
     rename_corpus_signal = pyqtSignal(str)  # New signal for renaming corpus
+    cancel_analysis_signal = pyqtSignal()
 
     def __init__(self):
         super().__init__()
@@ -43,6 +44,8 @@ class MainWindow(QMainWindow):
         self.remove_button.clicked.connect(self.remove_files_signal.emit)
         self.sample_corpus_button.clicked.connect(self.load_sample_corpus_signal.emit)
         self.run_button.clicked.connect(self.run_analysis_signal.emit)
+        self.cancel_analysis_button.clicked.connect(self.cancel_analysis_signal.emit)
+        self.cancel_analysis_button.clicked.connect(lambda: self.cancel_analysis_button.setEnabled(False))
         self.dashboard_button.clicked.connect(self.dashboard_signal.emit)
         self.next_report_button.clicked.connect(self.next_report_signal.emit)
         self.previous_report_button.clicked.connect(self.previous_report_signal.emit)
@@ -159,6 +162,18 @@ class MainWindow(QMainWindow):
         report_button_layout.addWidget(self.dashboard_button)
         report_layout.addLayout(report_button_layout)
 
+        # Progress of a running analysis, hidden while idle
+        progress_layout = QHBoxLayout()
+        self.analysis_progress = QProgressBar()
+        self.analysis_progress.setVisible(False)
+        self.analysis_status_label = QLabel()
+        self.cancel_analysis_button = QPushButton('Cancel')
+        self.cancel_analysis_button.setVisible(False)
+        progress_layout.addWidget(self.analysis_progress)
+        progress_layout.addWidget(self.cancel_analysis_button)
+        report_layout.addLayout(progress_layout)
+        report_layout.addWidget(self.analysis_status_label)
+
         # Add layouts to the main layout
         main_layout.addLayout(file_layout)
         main_layout.addLayout(report_layout)
@@ -275,6 +290,33 @@ class MainWindow(QMainWindow):
         self.report_table.viewport().installEventFilter(self)
 
 
+    def analysis_started(self, files_total):
+        """Show the progress bar and Cancel button of a background analysis."""
+        self.run_button.setEnabled(False)
+        self.analysis_progress.setRange(0, max(files_total, 1))
+        self.analysis_progress.setValue(0)
+        self.analysis_progress.setVisible(True)
+        self.cancel_analysis_button.setEnabled(True)
+        self.cancel_analysis_button.setVisible(True)
+        self.analysis_status_label.setText(f"Analyzing {files_total} files...")
+
+    def show_analysis_progress(self, progress):
+        """Update the progress bar from an AnalysisTask progress dict."""
+        self.analysis_progress.setValue(progress['files_done'])
+        text = f"{progress['files_done']}/{progress['files_total']} files"
+        if progress['bytes_total']:
+            text += f", {progress['bytes_done'] / 1e6:.1f}/{progress['bytes_total'] / 1e6:.1f} MB"
+        if progress['files_done'] < progress['files_total']:
+            text += f", about {progress['eta']:.0f}s left"
+        self.analysis_status_label.setText(text)
+
+    def analysis_stopped(self, message=""):
+        """Hide the progress widgets once an analysis finished, failed or was cancelled."""
+        self.run_button.setEnabled(True)
+        self.analysis_progress.setVisible(False)
+        self.cancel_analysis_button.setVisible(False)
+        self.analysis_status_label.setText(message)
+
     def display_assurance_results(self, assurance_results, all_tests_passed, report_title):
         """Displays the assurance results in the assurance box above the report table."""
         # Build the HTML content for the assurance box
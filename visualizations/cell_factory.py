@@ -12,7 +12,8 @@ from visualizations.visualization_registry import (
 )
 
 
-def create_cell(controller, category_key, sub_key, sub_sub_key=None, initial_mode=None, corpus_id=None):
+def create_cell(controller, category_key, sub_key, sub_sub_key=None, initial_mode=None, corpus_id=None,
+                settings=None):
     """
     Creates a visualization cell with the specified parameters.
     
@@ -21,6 +22,7 @@ def create_cell(controller, category_key, sub_key, sub_sub_key=None, initial_mod
         category_key, sub_key, sub_sub_key: Metric identifiers
         initial_mode: Initial visualization mode
         corpus_id: The corpus this cell should be anchored to
+        settings: Visualization settings to restore (from a saved workspace)
         
     Returns:
         A visualization layout widget configured for the specified corpus
@@ -48,6 +50,8 @@ def create_cell(controller, category_key, sub_key, sub_sub_key=None, initial_mod
                     corpus_ids=corpus_ids  # Pass as list
                 )
                 print(f"[DEBUG] Created vis_class {vis_type} with corpus_ids: {corpus_ids}")
+                if settings and hasattr(vis, 'apply_settings'):
+                    vis.apply_settings(settings)
                 
                 # Create layout with visualization
                 layout = layout_class(vis)
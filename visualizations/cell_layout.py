@@ -6,7 +6,7 @@ import pyqtgraph as pg
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
                             QHBoxLayout, QPushButton, QHeaderView, QComboBox, QToolButton, QDialog, QListWidget, QListWidgetItem, QScrollArea, QCheckBox, QFrame, QSizePolicy, QApplication
                             )
-from PyQt5.QtCore import Qt, pyqtSignal, QSize, QPropertyAnimation, QPoint, QRect
+from PyQt5.QtCore import Qt, pyqtSignal, QSize, QPropertyAnimation, QPoint, QRect, QRectF, QTimer
 from PyQt5.QtGui import QColor, QBrush, QPalette, QIcon
 from pyqtgraph import PlotWidget, BarGraphItem, mkPen
 import numpy as np
@@ -530,7 +530,10 @@ class FrequencyReportsLayout(QWidget):
             # Generate report if needed
             if not has_report and hasattr(self.controller, 'generate_report_for_corpus'):
                 print(f"[DEBUG] FrequencyReportsLayout generating report for corpus: {self.corpus_id}")
-                success = self.controller.generate_report_for_corpus(self.corpus_id)
+                if hasattr(self.controller, 'ensure_fresh_report'):
+                    success = self.controller.ensure_fresh_report(self.corpus_id)
+                else:
+                    success = self.controller.generate_report_for_corpus(self.corpus_id)
                 if not success:
                     print(f"[ERROR] FrequencyReportsLayout failed to generate report")
                     return
@@ -639,8 +642,9 @@ class FrequencyReportsLayout(QWidget):
             unique_words = report_data.get('unique_word_count', 0)
             self.stats_label.setText(f"Total Words: {total_words} | Unique Words: {unique_words}")
             
-            # Sort word stats by count in descending order (if not already sorted)
-            word_stats.sort(key=lambda x: x[1], reverse=True)
+            # Sort word stats by count in descending order (if not already sorted),
+            # into a copy: the report's own word_stats may be read-only
+            word_stats = sorted(word_stats, key=lambda x: x[1], reverse=True)
             
             # Block signals during updates to improve performance
             self.table_widget.blockSignals(True)
@@ -749,7 +753,7 @@ class BOScoreBarLayout:
         self.show_bon1 = True  # Default to showing BOn1
         self.show_bon2 = False  # Default to hiding BOn2
         self.show_top_only = True  # Default to showing only top words
-        self.max_bars = 50  # Default number of bars to show
+        self.max_bars = getattr(vis, 'top_k', None) or 50  # Default number of bars to show
 
         # Store data for dynamic labels
         self.current_label_data = None
@@ -849,6 +853,19 @@ class BOScoreBarLayout:
         self.widgets['top_only_button'] = top_only_btn  # Prevent GC
         print("[DEBUG] Connected top_only_btn clicked signal.")
 
+        # Toggle for scoring only the pairs across two selected corpora
+        corpus_ids = getattr(self.vis, 'corpus_ids', [])
+        cross_btn = QToolButton()
+        cross_btn.setText("A vs B Only")
+        cross_btn.setToolTip("Count only text pairs with one text in each of the two selected corpora")
+        cross_btn.setCheckable(True)
+        cross_btn.setChecked(getattr(self.vis, 'cross_only', False))
+        cross_btn.setEnabled(len(corpus_ids) == 2 and hasattr(self.vis, 'set_cross_only'))
+        cross_btn.clicked.connect(self.on_cross_only_toggle_click)
+        cross_btn.setFocusPolicy(Qt.ClickFocus)
+        controls_layout.addWidget(cross_btn)
+        self.widgets['cross_only_button'] = cross_btn  # Prevent GC
+
         controls_layout.addStretch()
         layout.addLayout(controls_layout)
 
@@ -873,10 +890,24 @@ class BOScoreBarLayout:
         self.update_plot()
 
         self.widgets['layout_widget'] = layout_widget  # Prevent GC
+        # redraw when a background job delivers new data
+        self.vis.data_ready.connect(self.update_plot)
+
         return layout_widget
 
+    def sync_view(self):
+        """In "top only" mode fetch just the top words of the visible series."""
+        if not hasattr(self.vis, 'set_view'):
+            return
+        if self.show_top_only:
+            kinds = [kind for kind, shown in (("bon1", self.show_bon1), ("bon2", self.show_bon2)) if shown]
+            self.vis.set_view(self.max_bars, kinds)
+        else:
+            self.vis.set_view(None)
+
     def update_plot(self):
         print(f"[DEBUG] update_plot called. show_bon1={self.show_bon1}, show_bon2={self.show_bon2}, show_top_only={self.show_top_only}")
+        self.sync_view()
         bon1_data, bon2_data = self.vis.get_data()
         print(f"[DEBUG] BOn1={len(bon1_data)}, BOn2={len(bon2_data)}")
 
@@ -1019,6 +1050,11 @@ class BOScoreBarLayout:
         self.show_top_only = not self.show_top_only
         self.update_plot()
         print(f"[DEBUG] on_top_only_toggle_click -> show_top_only: {self.show_top_only}")
+
+    def on_cross_only_toggle_click(self):
+        self.vis.set_cross_only(not self.vis.cross_only)
+        self.update_plot()
+        print(f"[DEBUG] on_cross_only_toggle_click -> cross_only: {self.vis.cross_only}")
         
     def refresh_visualization(self):
         """Refresh visualization data from its anchored corpus."""
@@ -1163,6 +1199,9 @@ class BOScoreLineLayout:
         self.update_plot()
 
         self.widgets['layout_widget'] = layout_widget  # Prevent GC
+        # redraw when a background job delivers new data
+        self.vis.data_ready.connect(self.update_plot)
+
         return layout_widget
 
     def update_plot(self):
@@ -1291,6 +1330,9 @@ class BOScoreTableLayout:
         refresh_layout.addStretch(1)
         main_layout.addLayout(refresh_layout)
         
+        # redraw when a background job delivers new data
+        self.vis.data_ready.connect(self.fill_table)
+
         return container
         
     def fill_table(self):
@@ -1368,6 +1410,362 @@ class BOScoreTableLayout:
         self.fill_table()
 
 
+class NearDuplicateTableLayout:
+    """
+    Lists near-duplicate clusters in a table, with a similarity threshold selector.
+    """
+
+    THRESHOLDS = [0.5, 0.6, 0.7, 0.8, 0.9, 0.95]
+
+    def __init__(self, vis):
+        self.vis = vis  # Instance of NearDuplicateVisualization
+        self.table_widget = None
+        self.summary_label = None
+
+        print("[DEBUG] NearDuplicateTableLayout initialized.")
+
+    def generate_layout(self):
+        """Generate the table layout for near-duplicate clusters."""
+        container = QWidget()
+        container.setStyleSheet("background-color: #2b2b2b; color: white;")
+
+        main_layout = QVBoxLayout(container)
+        main_layout.setContentsMargins(2, 2, 2, 2)
+        main_layout.setSpacing(5)
+
+        title_label = QLabel("Near-Duplicate Clusters")
+        title_label.setStyleSheet("font-size: 14px; font-weight: bold;")
+        title_label.setAlignment(Qt.AlignCenter)
+        main_layout.addWidget(title_label)
+
+        # Threshold selector
+        controls_layout = QHBoxLayout()
+        controls_layout.addWidget(QLabel("Similarity ≥"))
+        self.threshold_combo = QComboBox()
+        for threshold in self.THRESHOLDS:
+            self.threshold_combo.addItem(f"{threshold:.2f}", threshold)
+        closest = min(range(len(self.THRESHOLDS)), key=lambda i: abs(self.THRESHOLDS[i] - self.vis.threshold))
+        self.threshold_combo.setCurrentIndex(closest)
+        self.threshold_combo.currentIndexChanged.connect(self.on_threshold_changed)
+        controls_layout.addWidget(self.threshold_combo)
+        controls_layout.addStretch(1)
+        self.summary_label = QLabel("")
+        self.summary_label.setStyleSheet("color: #aaa; font-size: 12px;")
+        controls_layout.addWidget(self.summary_label)
+        main_layout.addLayout(controls_layout)
+
+        self.table_widget = QTableWidget()
+        self.table_widget.setColumnCount(3)
+        self.table_widget.setHorizontalHeaderLabels(["Cluster", "File", "Similarity"])
+        apply_standard_table_styling(self.table_widget)
+        self.fill_table()
+        main_layout.addWidget(self.table_widget)
+
+        refresh_button = QPushButton("Refresh")
+        refresh_button.setStyleSheet("background-color: #444; color: white; border: none; padding: 4px 8px;")
+        refresh_button.clicked.connect(self.refresh_visualization)
+        refresh_layout = QHBoxLayout()
+        refresh_layout.addStretch(1)
+        refresh_layout.addWidget(refresh_button)
+        refresh_layout.addStretch(1)
+        main_layout.addLayout(refresh_layout)
+
+        return container
+
+    def fill_table(self):
+        """Fill the table with one row per clustered file."""
+        rows = self.vis.get_data()
+        self.table_widget.setRowCount(len(rows))
+        self.table_widget.blockSignals(True)
+        for row, (number, file, similarity) in enumerate(rows):
+            cluster_item = QTableWidgetItem(str(number))
+            cluster_item.setTextAlignment(Qt.AlignCenter)
+            self.table_widget.setItem(row, 0, cluster_item)
+
+            file_item = QTableWidgetItem(os.path.basename(file))
+            file_item.setToolTip(file)
+            self.table_widget.setItem(row, 1, file_item)
+
+            similarity_item = QTableWidgetItem(f"{similarity:.2f}")
+            similarity_item.setTextAlignment(Qt.AlignCenter)
+            self.table_widget.setItem(row, 2, similarity_item)
+        self.table_widget.blockSignals(False)
+
+        n_clusters = len(self.vis.clusters)
+        n_extra = len(rows) - n_clusters
+        self.summary_label.setText(f"{n_clusters} clusters, {n_extra} redundant files")
+
+    def on_threshold_changed(self, index):
+        self.vis.set_threshold(self.threshold_combo.itemData(index))
+        self.fill_table()
+
+    def refresh_visualization(self):
+        """Refresh the clusters with new data."""
+        if hasattr(self.vis, 'update_data'):
+            self.vis.update_data()
+        self.fill_table()
+
+
+class SimilarityTableLayout:
+    """
+    Lists text pairs ranked by a distribution similarity metric.
+    """
+
+    MAX_ROWS = 500
+
+    def __init__(self, vis):
+        self.vis = vis  # Instance of DistributionSimilarityVisualization
+        self.table_widget = None
+        self.summary_label = None
+
+        print("[DEBUG] SimilarityTableLayout initialized.")
+
+    def generate_layout(self):
+        """Generate the table layout for ranked text pairs."""
+        container = QWidget()
+        container.setStyleSheet("background-color: #2b2b2b; color: white;")
+
+        main_layout = QVBoxLayout(container)
+        main_layout.setContentsMargins(2, 2, 2, 2)
+        main_layout.setSpacing(5)
+
+        title_label = QLabel(self.vis.title)
+        title_label.setStyleSheet("font-size: 14px; font-weight: bold;")
+        title_label.setAlignment(Qt.AlignCenter)
+        main_layout.addWidget(title_label)
+
+        self.summary_label = QLabel("")
+        self.summary_label.setStyleSheet("color: #aaa; font-size: 12px;")
+        main_layout.addWidget(self.summary_label)
+
+        self.table_widget = QTableWidget()
+        self.table_widget.setColumnCount(3)
+        self.table_widget.setHorizontalHeaderLabels(["Text A", "Text B", self.vis.title])
+        apply_standard_table_styling(self.table_widget)
+        self.fill_table()
+        main_layout.addWidget(self.table_widget)
+
+        refresh_button = QPushButton("Refresh")
+        refresh_button.setStyleSheet("background-color: #444; color: white; border: none; padding: 4px 8px;")
+        refresh_button.clicked.connect(self.refresh_visualization)
+        refresh_layout = QHBoxLayout()
+        refresh_layout.addStretch(1)
+        refresh_layout.addWidget(refresh_button)
+        refresh_layout.addStretch(1)
+        main_layout.addLayout(refresh_layout)
+
+        # redraw when a background job delivers new data
+        self.vis.data_ready.connect(self.fill_table)
+
+        return container
+
+    def fill_table(self):
+        """Fill the table with the most similar pairs first."""
+        rows = self.vis.get_pairs(limit=self.MAX_ROWS)
+        self.table_widget.setRowCount(len(rows))
+        self.table_widget.blockSignals(True)
+        for row, (text_a, text_b, value) in enumerate(rows):
+            for col, text in enumerate((text_a, text_b)):
+                item = QTableWidgetItem(os.path.basename(text))
+                item.setToolTip(text)
+                self.table_widget.setItem(row, col, item)
+
+            value_item = QTableWidgetItem(f"{value:.4f}")
+            value_item.setTextAlignment(Qt.AlignCenter)
+            self.table_widget.setItem(row, 2, value_item)
+        self.table_widget.blockSignals(False)
+        self.summary_label.setText(f"{len(self.vis.text_keys)} texts; {self.vis.description}")
+
+    def refresh_visualization(self):
+        """Refresh the ranked pairs with new data."""
+        if hasattr(self.vis, 'update_data'):
+            self.vis.update_data()
+        self.fill_table()
+
+
+def downsample_heatmap(matrix, row_range=None, col_range=None, max_size=512):
+    """
+    Block-mean downsample a region of a square matrix for display.
+
+    row_range/col_range are (start, stop) ranges (default: everything). The
+    region is averaged in factor x factor blocks so the result is at most
+    max_size per side; edge blocks may be smaller.
+
+    Returns:
+        tuple: (image, factor)
+    """
+    r0, r1 = row_range if row_range else (0, matrix.shape[0])
+    c0, c1 = col_range if col_range else (0, matrix.shape[1])
+    region = matrix[r0:r1, c0:c1]
+    factor = max(1, math.ceil(max(region.shape) / max_size)) if region.size else 1
+    if factor == 1:
+        return region, 1
+    row_starts = np.arange(0, region.shape[0], factor)
+    col_starts = np.arange(0, region.shape[1], factor)
+    sums = np.add.reduceat(np.add.reduceat(region, row_starts, axis=0, dtype=np.float64), col_starts, axis=1)
+    rows = np.diff(np.append(row_starts, region.shape[0]))
+    cols = np.diff(np.append(col_starts, region.shape[1]))
+    return (sums / np.outer(rows, cols)).astype(np.float32), factor
+
+
+class HeatmapLayout:
+    """
+    Renders an N x N text-similarity matrix as a heatmap.
+
+    Large matrices are drawn with level-of-detail downsampling: the visible
+    region is block-averaged to at most max_render_size pixels per side and
+    re-rendered at finer detail as the user zooms in. Hovering shows the two
+    texts and their exact value.
+    """
+
+    def __init__(self, vis):
+        self.vis = vis  # Instance of a HeatmapVisualization
+        self.plot_widget = None
+        self.image_item = None
+        self.hover_label = None
+        self.info_label = None
+        self.max_render_size = 512
+        self.render_timer = None
+        self.rendered_view = None
+
+        # Store references to prevent garbage collection
+        self.widgets = {}
+        print("[DEBUG] HeatmapLayout initialized.")
+
+    def generate_layout(self):
+        layout_widget = QWidget()
+        layout = QVBoxLayout(layout_widget)
+        layout.setContentsMargins(5, 5, 5, 5)
+        layout.setSpacing(10)
+
+        # Header layout with title and refresh button
+        header_layout = QHBoxLayout()
+        header_layout.setContentsMargins(0, 0, 0, 0)
+
+        title_label = QLabel(getattr(self.vis, 'title', "Heatmap"))
+        title_label.setStyleSheet("color: #fff; font-size:16px;")
+        header_layout.addWidget(title_label)
+
+        self.info_label = QLabel("")
+        self.info_label.setStyleSheet("color: #aaa; font-size: 12px;")
+        header_layout.addWidget(self.info_label)
+        header_layout.addStretch()
+
+        refresh_btn = QToolButton()
+        refresh_btn.setText("⟳")
+        refresh_btn.setToolTip("Refresh visualization")
+        refresh_btn.setStyleSheet("""
+            QToolButton {
+                color: #888888;
+                border: none;
+                font-size: 16px;
+                padding: 4px;
+            }
+            QToolButton:hover {
+                color: #ffffff;
+            }
+        """)
+        refresh_btn.clicked.connect(self.refresh_visualization)
+        header_layout.addWidget(refresh_btn)
+        layout.addLayout(header_layout)
+
+        # Plot widget with a row-major image item
+        self.plot_widget = PlotWidget()
+        self.plot_widget.setBackground('k')
+        plot_item = self.plot_widget.getPlotItem()
+        plot_item.setLabel("bottom", "Text")
+        plot_item.setLabel("left", "Text")
+        plot_item.getViewBox().invertY(True)
+        plot_item.getViewBox().setAspectLocked(True)
+        self.image_item = pg.ImageItem(axisOrder='row-major')
+        self.image_item.setLookupTable(pg.colormap.get('viridis').getLookupTable(nPts=256))
+        plot_item.addItem(self.image_item)
+        layout.addWidget(self.plot_widget)
+
+        self.hover_label = QLabel("")
+        self.hover_label.setStyleSheet("color: #ccc; font-size: 12px;")
+        layout.addWidget(self.hover_label)
+
+        # Re-render the visible region shortly after the view stops changing
+        self.render_timer = QTimer(layout_widget)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.setInterval(50)
+        self.render_timer.timeout.connect(self.render_visible_region)
+        plot_item.getViewBox().sigRangeChanged.connect(lambda *args: self.render_timer.start())
+        self.plot_widget.scene().sigMouseMoved.connect(self.on_mouse_moved)
+
+        self.update_plot()
+
+        self.widgets['layout_widget'] = layout_widget  # Prevent GC
+        # redraw when a background job delivers new data
+        self.vis.data_ready.connect(self.update_plot)
+
+        return layout_widget
+
+    def update_plot(self):
+        labels, matrix = self.vis.get_data()
+        n = matrix.shape[0]
+        print(f"[DEBUG] HeatmapLayout.update_plot with {n} texts")
+        self.info_label.setText(getattr(self.vis, 'description', ""))
+        self.rendered_view = None
+        if n == 0:
+            self.image_item.clear()
+            self.hover_label.setText("No data available")
+            return
+        self.hover_label.setText("")
+        self.render_region((0, n), (0, n))
+        self.plot_widget.getPlotItem().getViewBox().setRange(xRange=(0, n), yRange=(0, n), padding=0)
+
+    def render_region(self, row_range, col_range):
+        """Draw the block-averaged region of the matrix at its matrix coordinates."""
+        _, matrix = self.vis.get_data()
+        image, factor = downsample_heatmap(matrix, row_range, col_range, self.max_render_size)
+        (r0, r1), (c0, c1) = row_range, col_range
+        finite = matrix[np.isfinite(matrix)]
+        top = float(finite.max()) if finite.size else 0.0
+        self.image_item.setImage(image, levels=(0.0, max(top, 1e-12)), autoLevels=False)
+        self.image_item.setRect(QRectF(c0, r0, c1 - c0, r1 - r0))
+        self.rendered_view = (row_range, col_range, factor)
+
+    def render_visible_region(self):
+        """Level of detail: re-render the visible part at up to max_render_size."""
+        _, matrix = self.vis.get_data()
+        n = matrix.shape[0]
+        if n <= self.max_render_size or self.image_item is None:
+            return
+        (x0, x1), (y0, y1) = self.plot_widget.getPlotItem().getViewBox().viewRange()
+        # render a margin around the visible region so small pans stay sharp
+        margin_x, margin_y = (x1 - x0) / 4, (y1 - y0) / 4
+        col_range = (max(0, int(x0 - margin_x)), min(n, int(math.ceil(x1 + margin_x))))
+        row_range = (max(0, int(y0 - margin_y)), min(n, int(math.ceil(y1 + margin_y))))
+        if row_range[0] >= row_range[1] or col_range[0] >= col_range[1]:
+            return
+        if self.rendered_view and self.rendered_view[:2] == (row_range, col_range):
+            return
+        self.render_region(row_range, col_range)
+
+    def on_mouse_moved(self, pos):
+        labels, matrix = self.vis.get_data()
+        if not len(labels):
+            return
+        view_box = self.plot_widget.getPlotItem().getViewBox()
+        if not view_box.sceneBoundingRect().contains(pos):
+            return
+        point = view_box.mapSceneToView(pos)
+        row, col = int(point.y()), int(point.x())
+        if 0 <= row < len(labels) and 0 <= col < len(labels):
+            self.hover_label.setText(f"{labels[row]} × {labels[col]}: {matrix[row, col]:.4f}")
+
+    def refresh_visualization(self):
+        """Refresh visualization data from its anchored corpus."""
+        print(f"[DEBUG] HeatmapLayout.refresh_visualization called")
+        if hasattr(self.vis, 'update_data'):
+            self.vis.update_data()
+            self.update_plot()
+        else:
+            print("[WARNING] Heatmap visualization lacks update_data method")
+
+
 class CorpusSelector(QDialog):
     corpus_changed = pyqtSignal(list)
 
@@ -3,27 +3,53 @@ import os
 import pyqtgraph as pg
 from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidgetItem
 from PyQt5.QtCore import Qt, QObject, pyqtSignal
+from PyQt5 import sip
 import logging
 import numpy as np
-from analysis.advanced_analysis import compute_bo_scores
+from analysis.advanced_analysis import calculate_jaccard_index, calculate_distribution_similarity
+from analysis.similarity import METRIC_INFO, SimilarityResult, ranked_pairs
+from analysis.bo_service import BOResult, EMPTY_RESULT, merge_corpus_reports
+from analysis.bo_topk import DEFAULT_TOP_K
+from analysis.bo_multi_corpus import compute_multi_corpus_bo_scores
+from model.columnar_store import word_stats_column
 from PyQt5.QtGui import QColor
 
 class BaseVisualization(QWidget):
     visibility_updated = pyqtSignal(dict)
+    # new data from a background job (see run_job); layouts redraw on it
+    data_ready = pyqtSignal()
 
     def __init__(self, controller=None, corpus_ids=None, initial_mode=None, parent=None):
         super().__init__(parent)
         self.controller = controller
         self.corpus_ids = corpus_ids if corpus_ids is not None else []
         self.initial_mode = initial_mode
-        self.file_reports = {}
+        # Revision of each corpus report fetched by update_data_source()
+        self.loaded_revisions = {}
+        self._job_key = None  # key of the latest job from run_job
         
         print(f"[DEBUG] BaseVisualization init with corpus_ids: {self.corpus_ids}")
         
+    @property
+    def file_reports(self):
+        """
+        {corpus_id: report} of the corpora fetched by update_data_source().
+        Looked up in the controller on each access rather than held, so the
+        report manager can free evicted reports.
+        """
+        if not self.controller or not hasattr(self.controller, 'get_report_for_corpus'):
+            return {}
+        return {corpus_id: self.controller.get_report_for_corpus(corpus_id) for corpus_id in self.loaded_revisions}
+
+    def report_revision(self, corpus_id):
+        """Revision of a corpus report, or None if unavailable."""
+        report_manager = getattr(self.controller, 'report_manager', None)
+        if report_manager is None or not hasattr(report_manager, 'get_report_revision'):
+            return None
+        return report_manager.get_report_revision(corpus_id)
+
     def update_data_source(self):
         """Update the data source based on corpus_ids"""
-        self.file_reports = getattr(self, 'file_reports', {})
-        
         if not self.controller:
             print("[ERROR] BaseViz has no controller reference")
             return
@@ -36,16 +62,19 @@ class BaseVisualization(QWidget):
             print("[ERROR] BaseViz controller lacks get_report_for_corpus method")
             return
             
-        # Fetch reports only for corpus_ids not already in cache
+        # Fetch reports only for corpus_ids not already fetched
         for corpus_id in self.corpus_ids:
-            if corpus_id not in self.file_reports:
+            if corpus_id not in self.loaded_revisions:
                 if hasattr(self.controller, 'has_report_for_corpus'):
                     has_report = self.controller.has_report_for_corpus(corpus_id)
                     print(f"[DEBUG] BaseViz checking if report exists for {corpus_id}: {has_report}")
                     
                     if not has_report:
                         print(f"[DEBUG] BaseViz generating initial report for corpus: {corpus_id}")
-                        success = self.controller.generate_report_for_corpus(corpus_id)
+                        if hasattr(self.controller, 'ensure_fresh_report'):
+                            success = self.controller.ensure_fresh_report(corpus_id)
+                        else:
+                            success = self.controller.generate_report_for_corpus(corpus_id)
                         if not success:
                             print(f"[ERROR] Failed to generate report for corpus: {corpus_id}")
                             continue
@@ -55,27 +84,82 @@ class BaseVisualization(QWidget):
                     print(f"[DEBUG] BaseViz generating report for corpus (no has_report method): {corpus_id}")
                     self.controller.generate_report_for_corpus(corpus_id)
                 
-                self.file_reports[corpus_id] = self.controller.get_report_for_corpus(corpus_id)
+                report = self.controller.get_report_for_corpus(corpus_id)
+                self.loaded_revisions[corpus_id] = self.report_revision(corpus_id)
                 
-                if not self.file_reports[corpus_id]:
+                if not report:
                     print(f"[ERROR] BaseViz got empty report for corpus: {corpus_id}")
                 else:
-                    print(f"[DEBUG] BaseViz fetched report for corpus: {corpus_id}, keys: {list(self.file_reports[corpus_id].keys())}")
+                    print(f"[DEBUG] BaseViz fetched report for corpus: {corpus_id}, keys: {list(report.keys())}")
         
-        if not self.file_reports:
+        if not self.loaded_revisions:
             print(f"[ERROR] BaseViz got empty report for corpus_ids: {self.corpus_ids}")
             self.debug_report_access()
         else:
-            print(f"[DEBUG] BaseViz has reports for corpus_ids: {list(self.file_reports.keys())}")
+            print(f"[DEBUG] BaseViz has reports for corpus_ids: {list(self.loaded_revisions.keys())}")
     
+    def report_revisions(self):
+        """Revisions of the selected corpus reports, or None if unavailable."""
+        report_manager = getattr(self.controller, 'report_manager', None)
+        if report_manager is None or not hasattr(report_manager, 'get_report_revision'):
+            return None
+        return tuple(self.report_revision(c) for c in sorted(self.corpus_ids))
+
+    def run_job(self, key, fn, on_result, *args):
+        """
+        Compute fn(*args) on the controller's job queue, then pass the result
+        to on_result and emit data_ready on the GUI thread. Without a queue
+        the work is done right here.
+
+        Only the latest job counts: the result of a job superseded by a
+        later run_job (e.g. for a newer report revision) is dropped.
+        """
+        job_queue = getattr(self.controller, 'job_queue', None)
+        if job_queue is None:
+            on_result(fn(*args))
+            return
+        self._job_key = key
+
+        def deliver(result):
+            if sip.isdeleted(self) or self._job_key != key:
+                return
+            on_result(result)
+            self.data_ready.emit()
+
+        job_queue.submit(key, fn, *args).when_done(deliver)
+
     def set_corpus_ids(self, corpus_ids):
         """Update corpus_ids without fetching data"""
         self.corpus_ids = corpus_ids if corpus_ids is not None else []
         print(f"[DEBUG] BaseVisualization updated corpus_ids to: {self.corpus_ids}")
 
+    def get_settings(self):
+        """JSON-serializable view settings, saved with the workspace."""
+        return {"corpus_ids": list(self.corpus_ids)}
+
+    def apply_settings(self, settings):
+        """
+        Restore settings from get_settings(). Called on a new visualization
+        before its layout is built, so the layout's controls show them.
+        """
+        if not settings or settings == self.get_settings():
+            return
+        if settings.get("corpus_ids") is not None:
+            self.set_corpus_ids(list(settings["corpus_ids"]))
+            self.loaded_revisions = {k: v for k, v in self.loaded_revisions.items() if k in self.corpus_ids}
+        self.restore_settings(settings)
+        if hasattr(self, 'update_data'):
+            self.update_data()
+        elif hasattr(self, 'update_plot'):
+            self.update_plot()
+
+    def restore_settings(self, settings):
+        """Apply the settings a subclass adds to get_settings()."""
+        pass
+
     def refresh_data_source(self):
         """Clear cache and refetch all data"""
-        self.file_reports.clear()
+        self.loaded_revisions.clear()
         self.update_data_source()
         print(f"[DEBUG] BaseVisualization refreshed data source for corpus_ids: {self.corpus_ids}")
     
@@ -175,7 +259,7 @@ class FrequencyDistributionSupplementary:
             if file_key != "Master Report" and 'data' in file_report and 'word_stats' in file_report['data']:
                 stats = file_report['data']['word_stats']
                 if stats:
-                    all_vals.append([s[self.mode_map.get(self.mode, 1)] for s in stats])
+                    all_vals.append(word_stats_column(stats, self.mode_map.get(self.mode, 1)))
         if not all_vals:
             return None
         max_len = max(len(vals) for vals in all_vals)
@@ -204,7 +288,7 @@ class FrequencyDistributionSupplementary:
             if file_key != "Master Report" and 'data' in file_report and 'word_stats' in file_report['data']:
                 stats = file_report['data']['word_stats']
                 if stats:
-                    all_vals.append([s[self.mode_map.get(self.mode, 1)] for s in stats])
+                    all_vals.append(word_stats_column(stats, self.mode_map.get(self.mode, 1)))
         if not all_vals:
             return None
         max_len = max(len(vals) for vals in all_vals)
@@ -250,17 +334,17 @@ class FrequencyDistributionVisualization(BaseVisualization):
         print("[DEBUG] Initialization complete")
 
     def update_data_source(self):
-        old_reports = self.file_reports.copy()
+        old_revisions = dict(self.loaded_revisions)
         super().update_data_source()
-        if old_reports != self.file_reports:  # Invalidate cache if data changes
+        if old_revisions != self.loaded_revisions:  # Invalidate cache if data changes
             self.analytics_cache.clear()
             print(f"[DEBUG] Analytics cache cleared due to data change")
 
     def get_available_plot_settings(self):
         items = []
-        if self.file_reports:
+        if self.loaded_revisions:
             for corpus_id in self.corpus_ids or []:
-                if corpus_id in self.file_reports:
+                if corpus_id in self.loaded_revisions:
                     items.append(corpus_id)
                     items.extend([f"{corpus_id} (Average)", f"{corpus_id} (Best Fit)", f"{corpus_id} (Band)"])
         return items
@@ -282,6 +366,30 @@ class FrequencyDistributionVisualization(BaseVisualization):
                 self.visibility_settings[key] = value
         self.update_plot()
 
+    def get_settings(self):
+        settings = super().get_settings()
+        settings.update({
+            "mode": self.current_mode,
+            "x_log": self.x_log,
+            "y_log": self.y_log,
+            "visibility": dict(self.visibility_settings),
+            "colors": {corpus_id: color.name() for corpus_id, color in self.corpus_colors.items()},
+            "color_grouping": dict(self.color_grouping_enabled),
+        })
+        return settings
+
+    def restore_settings(self, settings):
+        mode = settings.get("mode", self.current_mode)
+        self.current_mode = mode if mode in self.mode_map else 'nominal'
+        self.supplementary.mode = self.current_mode
+        self.x_log = bool(settings.get("x_log", self.x_log))
+        self.y_log = bool(settings.get("y_log", self.y_log))
+        self.visibility_settings.update(settings.get("visibility", {}))
+        for corpus_id, color in settings.get("colors", {}).items():
+            self.corpus_colors[corpus_id] = QColor(color)
+        self.color_grouping_enabled.update(settings.get("color_grouping", {}))
+        self.analytics_cache.clear()
+
     def set_corpus_color(self, corpus_name, color):
         """Set the color for all curves in a corpus."""
         # If color is a string (like "#RRGGBB"), convert to QColor
@@ -316,15 +424,16 @@ class FrequencyDistributionVisualization(BaseVisualization):
         col = self.mode_map.get(mode, 1)
         data_sets = {}
         self.update_data_source()
-        if not self.file_reports:
+        file_reports = self.file_reports
+        if not file_reports:
             print(f"[ERROR] No file_reports data available")
             return data_sets
         for corpus_id in self.corpus_ids or []:
-            if corpus_id in self.file_reports:
+            if corpus_id in file_reports:
                 if corpus_id not in self.analytics_cache:
                     self.analytics_cache[corpus_id] = {}
                 if self.visibility_settings.get(corpus_id, False):
-                    corpus_report = self.file_reports[corpus_id]
+                    corpus_report = file_reports[corpus_id]
                     for file_key in corpus_report.keys():
                         if file_key != "Master Report":
                             file_report = corpus_report[file_key]
@@ -332,21 +441,21 @@ class FrequencyDistributionVisualization(BaseVisualization):
                                 stats = file_report['data']['word_stats']
                                 if stats:
                                     ranks = list(range(1, len(stats) + 1))
-                                    vals = [s[col] for s in stats]
+                                    vals = word_stats_column(stats, col)
                                     data_sets[f"{corpus_id}: {os.path.basename(file_key)}"] = (ranks, vals)
                 if self.visibility_settings.get(f"{corpus_id} (Average)", False):
                     if "average" not in self.analytics_cache[corpus_id]:
-                        self.analytics_cache[corpus_id]["average"] = self.supplementary.compute_average_curve(corpus_id, self.file_reports)
+                        self.analytics_cache[corpus_id]["average"] = self.supplementary.compute_average_curve(corpus_id, file_reports)
                     if self.analytics_cache[corpus_id]["average"]:
                         data_sets[f"{corpus_id} (Average)"] = self.analytics_cache[corpus_id]["average"]
                 if self.visibility_settings.get(f"{corpus_id} (Best Fit)", False):
                     if "best_fit" not in self.analytics_cache[corpus_id]:
-                        self.analytics_cache[corpus_id]["best_fit"] = self.supplementary.compute_best_fit_curve(corpus_id, self.file_reports)
+                        self.analytics_cache[corpus_id]["best_fit"] = self.supplementary.compute_best_fit_curve(corpus_id, file_reports)
                     if self.analytics_cache[corpus_id]["best_fit"]:
                         data_sets[f"{corpus_id} (Best Fit)"] = self.analytics_cache[corpus_id]["best_fit"]
                 if self.visibility_settings.get(f"{corpus_id} (Band)", False):
                     if "band" not in self.analytics_cache[corpus_id]:
-                        self.analytics_cache[corpus_id]["band"] = self.supplementary.compute_variability_band(corpus_id, self.file_reports)
+                        self.analytics_cache[corpus_id]["band"] = self.supplementary.compute_variability_band(corpus_id, file_reports)
                     if self.analytics_cache[corpus_id]["band"]:
                         data_sets[f"{corpus_id} (Band)"] = self.analytics_cache[corpus_id]["band"]
         return data_sets
@@ -481,78 +590,144 @@ class FrequencyReportsAggregator:
         return self.aggregated_list[idx]
     
 
-class BOScoreBarVisualization(BaseVisualization):
+class BOScoreVisualization(BaseVisualization):
     """
-    This class computes BOn1 and BOn2, storing them in instance variables
-    so that the layout (BOScoreBarLayout) can retrieve them via get_data().
+    Common data handling for the BO score bar, line and table cells.
+
+    Results come from the controller's shared BOResultService, so cells
+    over the same corpora reuse one computation, and are fetched on the
+    controller's job queue when it has one. bon1_data/bon2_data are
+    shared read-only tuples of (word, score) sorted by descending score.
+
+    With top_k set only the top_k best words of each kind in top_kinds are
+    fetched, through the service's pruned top-k query. With cross_only set
+    and exactly two corpora selected, only pairs across the two corpora
+    are scored.
     """
+    label = "BOScore"
+    top_k = None
+    top_kinds = ("bon1", "bon2")
+    cross_only = False
 
     def __init__(self, controller=None, initial_mode=None, corpus_ids=None):
         super().__init__(controller, corpus_ids, initial_mode)
-        self.bon1_data = []
-        self.bon2_data = []
-        
-        print(f"[DEBUG] BOScoreBarVisualization initialized with corpus_ids: {corpus_ids}")
+        self.bon1_data = ()
+        self.bon2_data = ()
+
+        print(f"[DEBUG] {type(self).__name__} initialized with corpus_ids: {corpus_ids}")
         # Update data based on corpus_id
         self.update_data()
-        
+
     def update_data(self):
         """Update data using the appropriate corpus report"""
         try:
-            # First ensure we have the latest data
+            # First ensure the reports exist
             self.update_data_source()
-            
+
             # Verify we have data
-            if not self.file_reports:
-                print(f"[ERROR] BOScoreBar has no data for corpus: {self.corpus_ids[0] if self.corpus_ids else None}")
-                self.bon1_data = []
-                self.bon2_data = []
+            if not self.loaded_revisions:
+                print(f"[ERROR] {self.label} has no data for corpus: {self.corpus_ids[0] if self.corpus_ids else None}")
+                self.bon1_data = ()
+                self.bon2_data = ()
+                self._job_key = None
                 return
-                
-            # Process each corpus in corpus_ids
-            all_file_reports = {}
-            for corpus_id in self.corpus_ids:
-                if corpus_id not in self.file_reports:
-                    print(f"[ERROR] Corpus {corpus_id} not found in file_reports")
-                    continue
-                    
-                # Get the corpus report and add its file reports to all_file_reports
-                corpus_report = self.file_reports[corpus_id]
-                print(f"[DEBUG] Processing corpus report for {corpus_id}, keys: {list(corpus_report.keys())}")
-                
-                # Add all file reports except Master Report
-                for file_key, file_report in corpus_report.items():
-                    if file_key != "Master Report":
-                        all_file_reports[file_key] = file_report
-            
-            # Compute BO scores using all file reports
-            if all_file_reports:
-                bon1_dict, bon2_dict = compute_bo_scores(all_file_reports)
-                
-                # Sort descending by score
-                self.bon1_data = sorted(bon1_dict.items(), key=lambda x: x[1], reverse=True)
-                self.bon2_data = sorted(bon2_dict.items(), key=lambda x: x[1], reverse=True)
-                
-                print(f"[DEBUG] BOScoreBar calculated {len(self.bon1_data)} BOn1 scores and {len(self.bon2_data)} BOn2 scores for corpus: {self.corpus_ids}")
+
+            cross_only = self.cross_only and len(self.corpus_ids) == 2
+            # the job gets the reports resolved here; it must not touch the
+            # report manager from the worker thread
+            if hasattr(self.controller, 'snapshot_bo_reports'):
+                snapshots = self.controller.snapshot_bo_reports(self.corpus_ids)
             else:
-                print(f"[ERROR] No file reports found for corpus: {self.corpus_ids}")
-                self.bon1_data = []
-                self.bon2_data = []
+                snapshots = {corpus_id: (None, report) for corpus_id, report in self.file_reports.items()}
+            key = ("bo", tuple(sorted(self.corpus_ids)), cross_only, self.top_k, self.top_kinds,
+                   self.report_revisions())
+            self.run_job(key, self.fetch_results, self.set_results,
+                         tuple(self.corpus_ids), cross_only, self.top_k, self.top_kinds, snapshots)
 
         except Exception as e:
-            print(f"[ERROR BOScoreBarVisualization] compute_bo_scores failed for corpus {self.corpus_ids}: {e}")
+            print(f"[ERROR {type(self).__name__}] compute_bo_scores failed for corpus {self.corpus_ids}: {e}")
             import traceback
             traceback.print_exc()
-            self.bon1_data = []
-            self.bon2_data = []
+            self.bon1_data = ()
+            self.bon2_data = ()
+
+    def fetch_results(self, corpus_ids, cross_only, top_k, top_kinds, snapshots):
+        """
+        BOResult from the controller's shared service, for the reports in
+        snapshots ({corpus_id: (revision, report)}). Runs on the job queue.
+        """
+        if cross_only and hasattr(self.controller, 'get_bo_cross_results'):
+            return self.controller.get_bo_cross_results(*corpus_ids, snapshots=snapshots)
+        if top_k and hasattr(self.controller, 'get_bo_top_results'):
+            return tuple(
+                self.controller.get_bo_top_results(corpus_ids, top_k, kind, snapshots) if kind in top_kinds else ()
+                for kind in BOResult._fields
+            )
+        if hasattr(self.controller, 'get_bo_results'):
+            return self.controller.get_bo_results(corpus_ids, snapshots)
+        return self.compute_results({corpus_id: report for corpus_id, (_, report) in snapshots.items()})
+
+    def set_results(self, result):
+        self.bon1_data, self.bon2_data = result
+        if self.top_k:
+            self.bon1_data = self.bon1_data[:self.top_k] if "bon1" in self.top_kinds else ()
+            self.bon2_data = self.bon2_data[:self.top_k] if "bon2" in self.top_kinds else ()
+
+        if self.bon1_data or self.bon2_data:
+            print(f"[DEBUG] {self.label} has {len(self.bon1_data)} BOn1 scores and {len(self.bon2_data)} BOn2 scores for corpus: {self.corpus_ids}")
+        else:
+            print(f"[ERROR] No BO scores for corpus: {self.corpus_ids}")
+
+    @staticmethod
+    def compute_results(corpus_reports):
+        """Compute BO scores directly from {corpus_id: report} (no shared service)."""
+        if not merge_corpus_reports(corpus_reports.values()):
+            return EMPTY_RESULT
+        bon1_dict, bon2_dict = compute_multi_corpus_bo_scores(corpus_reports)
+        return BOResult(
+            tuple(sorted(bon1_dict.items(), key=lambda x: x[1], reverse=True)),
+            tuple(sorted(bon2_dict.items(), key=lambda x: x[1], reverse=True)),
+        )
+
+    def set_view(self, top_k=None, top_kinds=("bon1", "bon2")):
+        """Switch between the top_k best words of top_kinds and full results."""
+        if (top_k, tuple(top_kinds)) == (self.top_k, tuple(self.top_kinds)):
+            return
+        self.top_k = top_k
+        self.top_kinds = tuple(top_kinds)
+        self.update_data()
+
+    def get_settings(self):
+        settings = super().get_settings()
+        settings["cross_only"] = self.cross_only
+        return settings
+
+    def restore_settings(self, settings):
+        self.cross_only = bool(settings.get("cross_only", self.cross_only))
+
+    def set_cross_only(self, cross_only):
+        """Score only pairs across the two selected corpora (or all pairs)."""
+        if cross_only != self.cross_only:
+            self.cross_only = cross_only
+            self.update_data()
 
     def get_data(self):
         """
         Called by the layout to retrieve (bon1_data, bon2_data).
-        Each is a list of (word, score).
+        Each is a tuple of (word, score).
         """
         return (self.bon1_data, self.bon2_data)
 
+
+class BOScoreBarVisualization(BOScoreVisualization):
+    """
+    BOn1/BOn2 data for BOScoreBarLayout, which retrieves it via get_data().
+    Starts in the layout's "top only" mode showing BOn1.
+    """
+    label = "BOScoreBar"
+    top_k = DEFAULT_TOP_K
+    top_kinds = ("bon1",)
+
     def widget(self):
         """
         Typically, we'd return a PyQt widget. But in this approach,
@@ -562,156 +737,228 @@ class BOScoreBarVisualization(BaseVisualization):
         return None
 
 
-class BOScoreLineVisualization(BaseVisualization):
+class BOScoreLineVisualization(BOScoreVisualization):
     """
-    Computes BOn1/BOn2 exactly like the Bar counterpart,
-    storing data for line plotting.
+    BOn1/BOn2 data for line plotting.
     """
+    label = "BOScoreLine"
+
+    def widget(self):
+        """
+        Normally, the layout class will create the PlotWidget. So here, we can return None
+        or a placeholder if you prefer.
+        """
+        placeholder = QLabel("Line visualization is handled in BOScoreLineLayout.")
+        placeholder.setAlignment(Qt.AlignCenter)
+        placeholder.setStyleSheet("color: white; font-size: 16px;")
+        return placeholder
+
+
+class BOScoreTableVisualization(BOScoreVisualization):
+    """
+    BOn1/BOn2 data for table display.
+    """
+    label = "BOScoreTable"
+
+    def widget(self):
+        """
+        The layout class will create the QTableWidget. Here we just return None or
+        a placeholder again.
+        """
+        placeholder = QLabel("Table layout is handled in BOScoreTableLayout.")
+        placeholder.setAlignment(Qt.AlignCenter)
+        placeholder.setStyleSheet("color: white; font-size: 16px;")
+        return placeholder
+
+
+class HeatmapVisualization(BaseVisualization):
+    """
+    Base for N x N text-similarity heatmaps. Subclasses implement
+    compute_matrix(file_reports, mode) -> (text_keys, matrix, description)
+    as a pure function of its arguments, since it runs on the job queue.
+
+    The matrix is only recomputed when the revision of one of the input
+    corpus reports changes, on the controller's job queue when it has one.
+    """
+    title = "Heatmap"
+
     def __init__(self, controller=None, initial_mode=None, corpus_ids=None):
         super().__init__(controller, corpus_ids, initial_mode)
-        self.bon1_data = []
-        self.bon2_data = []
-        
-        print(f"[DEBUG] BOScoreLineVisualization initialized with corpus_ids: {corpus_ids}")
-        # Update data based on corpus_id
+        self.text_keys = []
+        self.labels = []
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.description = ""
+        self._fingerprint = None
+
+        print(f"[DEBUG] {type(self).__name__} initialized with corpus_ids: {corpus_ids}")
         self.update_data()
-        
+
+    def report_fingerprint(self):
+        """Revisions of the input corpus reports, or None if unavailable."""
+        revisions = self.report_revisions()
+        if revisions is None:
+            return None
+        return (self.initial_mode,) + revisions
+
     def update_data(self):
-        """Update data using the appropriate corpus report"""
+        """Recompute the matrix if any input report changed."""
         try:
-            # First ensure we have the latest data
             self.update_data_source()
-            
-            # Verify we have data
-            if not self.file_reports:
-                print(f"[ERROR] BOScoreLine has no data for corpus: {self.corpus_ids[0] if self.corpus_ids else None}")
-                self.bon1_data = []
-                self.bon2_data = []
+            fingerprint = self.report_fingerprint()
+            if fingerprint is not None and fingerprint == self._fingerprint:
+                print(f"[DEBUG] {type(self).__name__} reports unchanged for corpus: {self.corpus_ids}")
                 return
-                
-            # Process each corpus in corpus_ids
-            all_file_reports = {}
-            for corpus_id in self.corpus_ids:
-                if corpus_id not in self.file_reports:
-                    print(f"[ERROR] Corpus {corpus_id} not found in file_reports")
-                    continue
-                    
-                # Get the corpus report and add its file reports to all_file_reports
-                corpus_report = self.file_reports[corpus_id]
-                print(f"[DEBUG] Processing corpus report for {corpus_id}, keys: {list(corpus_report.keys())}")
-                
-                # Add all file reports except Master Report
-                for file_key, file_report in corpus_report.items():
-                    if file_key != "Master Report":
-                        all_file_reports[file_key] = file_report
-            
-            # Compute BO scores using all file reports
-            if all_file_reports:
-                bon1_dict, bon2_dict = compute_bo_scores(all_file_reports)
-                
-                # Sort descending by score
-                self.bon1_data = sorted(bon1_dict.items(), key=lambda x: x[1], reverse=True)
-                self.bon2_data = sorted(bon2_dict.items(), key=lambda x: x[1], reverse=True)
-                
-                print(f"[DEBUG] BOScoreLine calculated {len(self.bon1_data)} BOn1 scores and {len(self.bon2_data)} BOn2 scores for corpus: {self.corpus_ids}")
-            else:
+
+            file_reports = self.file_reports
+            all_file_reports = merge_corpus_reports(
+                file_reports[corpus_id] for corpus_id in self.corpus_ids if corpus_id in file_reports
+            )
+            if not all_file_reports:
                 print(f"[ERROR] No file reports found for corpus: {self.corpus_ids}")
-                self.bon1_data = []
-                self.bon2_data = []
-                
+                self.text_keys, self.labels = [], []
+                self.matrix = np.zeros((0, 0), dtype=np.float32)
+                self.description = ""
+                self._job_key = None
+                return
+
+            # file reports are immutable snapshots, safe to read on a worker
+            # thread; the job gets everything it reads as arguments
+            self.run_job((type(self).__name__, tuple(sorted(self.corpus_ids)), fingerprint), self.compute_matrix,
+                         lambda result: self.set_matrix(result, fingerprint), all_file_reports, self.initial_mode)
+
         except Exception as e:
-            print(f"[ERROR BOScoreLineVisualization] compute_bo_scores failed for corpus {self.corpus_ids}: {e}")
+            print(f"[ERROR {type(self).__name__}] matrix computation failed for corpus {self.corpus_ids}: {e}")
             import traceback
             traceback.print_exc()
-            self.bon1_data = []
-            self.bon2_data = []
+            self.text_keys, self.labels = [], []
+            self.matrix = np.zeros((0, 0), dtype=np.float32)
+            self._fingerprint = None
+
+    def set_matrix(self, result, fingerprint):
+        self.text_keys, self.matrix, self.description = result
+        self.labels = [os.path.basename(k) for k in self.text_keys]
+        self._fingerprint = fingerprint
+        print(f"[DEBUG] {type(self).__name__} computed {self.matrix.shape} matrix for corpus: {self.corpus_ids}")
+
+    @staticmethod
+    def compute_matrix(file_reports, mode):
+        """(text_keys, matrix, description) of the merged file reports. Runs on the job queue."""
+        raise NotImplementedError
 
     def get_data(self):
-        return (self.bon1_data, self.bon2_data)
+        """Called by HeatmapLayout to retrieve (labels, matrix)."""
+        return (self.labels, self.matrix)
 
     def widget(self):
-        """
-        Normally, the layout class will create the PlotWidget. So here, we can return None
-        or a placeholder if you prefer.
-        """
-        placeholder = QLabel("Line visualization is handled in BOScoreLineLayout.")
-        placeholder.setAlignment(Qt.AlignCenter)
-        placeholder.setStyleSheet("color: white; font-size: 16px;")
-        return placeholder
+        return None
+
+
+class JaccardHeatmapVisualization(HeatmapVisualization):
+    """
+    Pairwise Jaccard index of the texts' word sets: exact bitsets for
+    moderate corpora, MinHash estimates for large ones.
+    """
+    title = "Jaccard Index Heatmap"
+
+    @staticmethod
+    def compute_matrix(file_reports, mode):
+        result = calculate_jaccard_index(file_reports)
+        method = "exact" if result.method == "exact" else "MinHash estimate"
+        return result.text_keys, result.matrix, f"{len(result.text_keys)} texts, {method}"
 
 
-class BOScoreTableVisualization(BaseVisualization):
+class DistributionSimilarityVisualization(HeatmapVisualization):
     """
-    Computes BOn1/BOn2 for table display.
+    Pairwise cosine similarity, KL, Jensen-Shannon or Bhattacharyya measure
+    of the texts' word distributions; initial_mode names the metric. Serves
+    both the heatmap and the ranked pair table.
     """
+
+    def __init__(self, controller=None, initial_mode=None, corpus_ids=None):
+        super().__init__(controller, initial_mode or "cosine", corpus_ids)
+
+    @property
+    def title(self):
+        return METRIC_INFO[self.initial_mode][0]
+
+    @staticmethod
+    def compute_matrix(file_reports, mode):
+        result = calculate_distribution_similarity(file_reports, mode)
+        higher_is_similar = METRIC_INFO[mode][1]
+        description = "higher = more similar" if higher_is_similar else "lower = more similar"
+        if mode == "kl":
+            description += ", row text vs column text"
+        return result.text_keys, result.matrix, description
+
+    def get_pairs(self, limit=None):
+        """Text pairs from most to least similar, as (text_a, text_b, value)."""
+        if not len(self.text_keys):
+            return []
+        return ranked_pairs(SimilarityResult(self.text_keys, self.matrix, self.initial_mode), limit)
+
+
+class NearDuplicateVisualization(BaseVisualization):
+    """
+    Near-duplicate clusters among the files of the selected corpora, found
+    through the controller's MinHash LSH index.
+    """
+
     def __init__(self, controller=None, initial_mode=None, corpus_ids=None):
         super().__init__(controller, corpus_ids, initial_mode)
-        self.bon1_data = []
-        self.bon2_data = []
-        
-        print(f"[DEBUG] BOScoreTableVisualization initialized with corpus_ids: {corpus_ids}")
-        # Update data based on corpus_id
+        index = getattr(controller, 'duplicate_index', None)
+        self.threshold = index.threshold if index is not None else 0.8
+        self.clusters = []
+
+        print(f"[DEBUG] NearDuplicateVisualization initialized with corpus_ids: {corpus_ids}")
         self.update_data()
-        
+
+    def set_threshold(self, threshold):
+        self.threshold = threshold
+        self.update_data()
+
+    def get_settings(self):
+        settings = super().get_settings()
+        settings["threshold"] = self.threshold
+        return settings
+
+    def restore_settings(self, settings):
+        self.threshold = settings.get("threshold", self.threshold)
+
     def update_data(self):
-        """Update data using the appropriate corpus report"""
+        """Recompute clusters for the files of the selected corpora."""
         try:
-            # First ensure we have the latest data
             self.update_data_source()
-            
-            # Verify we have data
-            if not self.file_reports:
-                print(f"[ERROR] BOScoreTable has no data for corpus: {self.corpus_ids[0] if self.corpus_ids else None}")
-                self.bon1_data = []
-                self.bon2_data = []
+            file_reports = self.file_reports
+            corpus_reports = [file_reports[corpus_id] for corpus_id in self.corpus_ids if corpus_id in file_reports]
+            files = list(merge_corpus_reports(corpus_reports))
+            if not files or not hasattr(self.controller, 'duplicate_index'):
+                print(f"[ERROR] No files or index for near-duplicates in corpus: {self.corpus_ids}")
+                self.clusters = []
                 return
-                
-            # Process each corpus in corpus_ids
-            all_file_reports = {}
-            for corpus_id in self.corpus_ids:
-                if corpus_id not in self.file_reports:
-                    print(f"[ERROR] Corpus {corpus_id} not found in file_reports")
-                    continue
-                    
-                # Get the corpus report and add its file reports to all_file_reports
-                corpus_report = self.file_reports[corpus_id]
-                print(f"[DEBUG] Processing corpus report for {corpus_id}, keys: {list(corpus_report.keys())}")
-                
-                # Add all file reports except Master Report
-                for file_key, file_report in corpus_report.items():
-                    if file_key != "Master Report":
-                        all_file_reports[file_key] = file_report
-            
-            # Compute BO scores using all file reports
-            if all_file_reports:
-                bon1_dict, bon2_dict = compute_bo_scores(all_file_reports)
-                
-                # Sort descending by score
-                self.bon1_data = sorted(bon1_dict.items(), key=lambda x: x[1], reverse=True)
-                self.bon2_data = sorted(bon2_dict.items(), key=lambda x: x[1], reverse=True)
-                
-                print(f"[DEBUG] BOScoreTable calculated {len(self.bon1_data)} BOn1 scores and {len(self.bon2_data)} BOn2 scores for corpus: {self.corpus_ids}")
-            else:
-                print(f"[ERROR] No file reports found for corpus: {self.corpus_ids}")
-                self.bon1_data = []
-                self.bon2_data = []
-                
+            # signatures from the analyzed words; no file is read again
+            for report in corpus_reports:
+                self.controller.index_report_for_duplicates(report)
+            self.clusters = self.controller.duplicate_index.clusters(threshold=self.threshold, keys=files)
+            print(f"[DEBUG] NearDuplicateVisualization found {len(self.clusters)} clusters for corpus: {self.corpus_ids}")
         except Exception as e:
-            print(f"[ERROR BOScoreTableVisualization] compute_bo_scores failed for corpus {self.corpus_ids}: {e}")
+            print(f"[ERROR NearDuplicateVisualization] clustering failed for corpus {self.corpus_ids}: {e}")
             import traceback
             traceback.print_exc()
-            self.bon1_data = []
-            self.bon2_data = []
+            self.clusters = []
 
     def get_data(self):
-        return (self.bon1_data, self.bon2_data)
-
-    def widget(self):
         """
-        The layout class will create the QTableWidget. Here we just return None or
-        a placeholder again.
+        Called by the layout to retrieve table rows:
+        (cluster number, file, estimated similarity to the cluster's first file).
         """
-        placeholder = QLabel("Table layout is handled in BOScoreTableLayout.")
-        placeholder.setAlignment(Qt.AlignCenter)
-        placeholder.setStyleSheet("color: white; font-size: 16px;")
-        return placeholder
\ No newline at end of file
+        index = self.controller.duplicate_index
+        rows = []
+        for number, cluster in enumerate(self.clusters, start=1):
+            first = cluster[0]
+            for file in cluster:
+                similarity = 1.0 if file == first else index.similarity(first, file)
+                rows.append((number, file, similarity))
+        return rows
+
+    def widget(self):
+        return None
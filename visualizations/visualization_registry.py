@@ -3,14 +3,19 @@ from visualizations.metric_visualizations import (
     BOScoreBarVisualization,
     BOScoreLineVisualization,  # Placeholder
     BOScoreTableVisualization,  # Placeholder
-    
+    JaccardHeatmapVisualization,
+    NearDuplicateVisualization,
+    DistributionSimilarityVisualization,
 )
 from visualizations.cell_layout import (
     FrequencyDistributionLayout,
     FrequencyReportsLayout,
     BOScoreBarLayout,
     BOScoreLineLayout,  # Placeholder
-    BOScoreTableLayout  # Placeholder
+    BOScoreTableLayout,  # Placeholder
+    HeatmapLayout,
+    NearDuplicateTableLayout,
+    SimilarityTableLayout,
 )
 
 visualization_registry = {
@@ -41,6 +46,30 @@ visualization_registry = {
         "layout": BOScoreTableLayout,
         "needs_vis": True,
     },
+
+    # Overlap heatmaps
+    "heatmap": {
+        "class": JaccardHeatmapVisualization,
+        "layout": HeatmapLayout,
+        "needs_vis": True,
+    },
+    "near_duplicates": {
+        "class": NearDuplicateVisualization,
+        "layout": NearDuplicateTableLayout,
+        "needs_vis": True,
+    },
+
+    # Distribution similarity (metric chosen by initial_mode)
+    "similarity_heatmap": {
+        "class": DistributionSimilarityVisualization,
+        "layout": HeatmapLayout,
+        "needs_vis": True,
+    },
+    "similarity_table": {
+        "class": DistributionSimilarityVisualization,
+        "layout": SimilarityTableLayout,
+        "needs_vis": True,
+    },
 }
 
 def get_visualization_class(vis_type):